@@ -0,0 +1,139 @@
+#include <chrono> // Для измерения времени
+#include <cstdlib> // Для getenv
+#include <cstring> // Для memcpy
+#include <fstream> // Для работы с файлами (логирование)
+#include <iostream> // Для вывода ошибок
+#include <optional> // Для необязательного режима проверки
+#include <string> // Для имён сегментов
+#include <vector> // Для буферов
+
+#include "../common/bench_env.hpp" // Размеры из окружения
+#include "../common/latency_histogram.hpp" // Метки времени и гистограмма RTT
+#include "../common/metrics_channel.hpp" // Живые замеры для оркестратора
+#include "../common/ready.hpp" // Сигнал готовности оркестратору
+#include "../common/verify.hpp" // Режим проверки данных
+#include "boost_segment.hpp" // Управляемый сегмент Boost.Interprocess и его индекс
+
+using namespace boost::interprocess; // Пространство имён Boost Interprocess
+
+// Запрос-ответ (совпадает с boost_pingpong.py): два сегмента boost_segment.hpp —
+// BoostSharedMem<суффикс>_req (клиент -> сервер) и _rep (обратно). Оба создаёт клиент (ping), он стартует первым.
+// SHM_WAIT=spin — до SHM_SPIN_LIMIT попыток try_wait, прежде чем уснуть в wait
+static const std::size_t BUFFER_SIZE = chunk_size_from_env(); // Размер сообщения
+static const std::size_t TOTAL_SIZE  = total_size_from_env(); // Объём всех запросов
+
+// Один сегмент: отправитель ждёт mem_lock, пишет сообщение, поднимает client_ready и ждёт server_ready
+struct Segment {
+    std::size_t spin = 0;
+    std::optional<BoostSegment> segment;
+    shm_buf* shm = nullptr;
+    char* data = nullptr;
+
+    Segment(const std::string& segment_name, bool create, std::size_t spin_limit) : spin(spin_limit) {
+        if (create) segment.emplace(create_only, segment_name, BUFFER_SIZE, PageSettings());
+        else segment.emplace(open_only, segment_name, PageSettings());
+        shm = segment->shm;
+        data = segment->data;
+    }
+
+    void wait(interprocess_semaphore& sem) {
+        for (std::size_t i = 0; i < spin; ++i) {
+            if (sem.try_wait()) return;
+        }
+        sem.wait();
+    }
+
+    void send(const char* buf, std::size_t length) {
+        wait(shm->mem_lock);
+        shm->send_ns = LatencyHistogram::now_ns(); // Метка ставится, когда буфер уже свободен
+        shm->length = length;
+        std::memcpy(data, buf, length);
+        shm->client_ready.post();
+        if (length) wait(shm->server_ready); // На сообщение конца потока подтверждения нет
+    }
+
+    std::size_t recv(char* buf) {
+        wait(shm->client_ready);
+        const std::size_t length = shm->length;
+        std::memcpy(buf, data, length);
+        shm->mem_lock.post();
+        if (length) shm->server_ready.post();
+        return length;
+    }
+};
+
+int main(int argc, char** argv) {
+    const std::string role = argc == 2 ? argv[1] : "";
+    if (role != "ping" && role != "pong") {
+        std::cerr << "usage: " << argv[0] << " ping|pong\n";
+        return 1;
+    }
+    const bool ping = role == "ping";
+    const char* wait_env = std::getenv("SHM_WAIT");
+    // Бюджет опроса как у счётчиков futex: на одном CPU опроса нет, spin ведёт себя как block
+    const std::size_t spin = wait_env && std::string(wait_env) == "spin" ? seq_spin_budget() : 0;
+
+    Segment request("BoostSharedMem" + name_suffix() + "_req", ping, spin);
+    Segment reply("BoostSharedMem" + name_suffix() + "_rep", ping, spin);
+    signal_ready(); // Клиент создал оба сегмента, сервер может подключаться
+    std::vector<char> buffer(BUFFER_SIZE, 'A');
+    std::vector<char> answer(BUFFER_SIZE);
+    LatencyHistogram latency; // RTT у клиента
+    std::optional<PatternSource> pattern; // Режим проверки (IPC_VERIFY): узор у клиента, CRC32 у сервера
+    std::optional<PatternCheck> verify;
+    if (verify_enabled()) {
+        if (ping) pattern.emplace(BUFFER_SIZE);
+        else verify.emplace(BUFFER_SIZE);
+    }
+
+    auto wall_start = std::chrono::high_resolution_clock::now(); // Время начала общего таймера
+    // Первый круг — рукопожатие, не учитывается: сервер мог ещё не подключиться
+    if (ping) {
+        request.send(buffer.data(), BUFFER_SIZE);
+        reply.recv(answer.data());
+    } else {
+        reply.send(buffer.data(), request.recv(buffer.data()));
+    }
+    auto active_start = std::chrono::high_resolution_clock::now();
+
+    std::size_t transferred = 0;
+    MetricsChannel channel(ping ? "sender" : "receiver"); // Периодические замеры уходят оркестратору
+    if (ping) {
+        while (transferred < TOTAL_SIZE) {
+            if (pattern) pattern->fill(buffer.data(), BUFFER_SIZE);
+            const std::uint64_t start_ns = LatencyHistogram::now_ns();
+            request.send(buffer.data(), BUFFER_SIZE);
+            if (reply.recv(answer.data()) != BUFFER_SIZE) {
+                std::cerr << "unexpected reply length\n";
+                return 1;
+            }
+            latency.record(static_cast<std::int64_t>(LatencyHistogram::now_ns() - start_ns)); // Полный круг — RTT
+            transferred += BUFFER_SIZE;
+            channel.tick(transferred);
+        }
+        request.send(nullptr, 0); // Сообщение нулевой длины — конец потока
+    } else {
+        while (true) {
+            const std::size_t length = request.recv(buffer.data());
+            if (length == 0) break; // Клиент закончил
+            if (verify) verify->check(buffer.data(), length);
+            reply.send(buffer.data(), length);
+            transferred += length;
+            channel.tick(transferred);
+        }
+    }
+
+    auto end = std::chrono::high_resolution_clock::now();
+    double active_time = std::chrono::duration<double>(end - active_start).count();
+    double wall_time = std::chrono::duration<double>(end - wall_start).count();
+    double max_rss = MetricsChannel::peak_rss_mb(); // Пик RSS за весь прогон
+    const std::string prefix = ping ? "boost_ping" : "boost_pong";
+    std::ofstream log(metrics_path(prefix + "_metrics.csv"));
+    log << "active_time_sec,wall_time_sec," << (ping ? "bytes_sent" : "bytes_received") << ",rss_mb\n";
+    log << active_time << "," << wall_time << "," << transferred << "," << max_rss << "\n";
+    channel.finish(transferred, active_time, wall_time, max_rss);
+    if (ping) latency.write_csv(metrics_path(prefix));
+    if (pattern) pattern->write_csv(metrics_path(prefix));
+    if (verify) verify->write_csv(metrics_path(prefix));
+    return 0;
+}
@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import CHUNK_SIZE, NAME_SUFFIX
+from ipc.boost import BoostChannel
+from ipc.pingpong import ping, pong, role_from_argv, spin_from_env
+
+# Запрос-ответ через два сегмента Boost (ipc/boost.py): BoostSharedMem<суффикс>_req и _rep.
+# Оба сегмента создаёт клиент, поэтому он стартует первым. SHM_WAIT=spin — сначала sem_trywait в цикле, потом sem_wait
+def main():
+    role = role_from_argv(sys.argv)
+    spin = spin_from_env()
+    if role == "ping":
+        with BoostChannel.create(CHUNK_SIZE, NAME_SUFFIX + "_req", spin=spin) as request, \
+                BoostChannel.create(CHUNK_SIZE, NAME_SUFFIX + "_rep", spin=spin) as reply:
+            ping("boost_ping", request, reply)
+    else:
+        with BoostChannel.open(NAME_SUFFIX + "_req", spin=spin) as request, \
+                BoostChannel.open(NAME_SUFFIX + "_rep", spin=spin) as reply:
+            pong("boost_pong", request, reply)
+
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,106 @@
-#include <boost/interprocess/managed_shared_memory.hpp> // Для работы с разделяемой памятью
-#include <boost/interprocess/sync/interprocess_semaphore.hpp> // Для межпроцессных семафоров
 #include <chrono> // Для измерения времени
 #include <cstring> // Для memcpy
 #include <fstream> // Для логирования
 #include <iostream> // Для вывода (может быть неиспользовано)
-#include <sstream> // Для обработки строк
+#include <optional> // Для необязательной проверки данных
 #include <unistd.h> // Для POSIX функций
 
+#include "../common/batch.hpp" // Пакетирование мелких сообщений (IPC_BATCH_SIZE)
+#include "../common/bench_env.hpp" // Размеры из окружения
+#include "../common/latency_histogram.hpp" // Гистограмма задержек
+#include "../common/metrics_channel.hpp" // Живые замеры для оркестратора
+#include "../common/seq_sync.hpp" // Счётчики и futex вместо семафоров (SHM_SYNC=futex)
+#include "../common/shm_pages.hpp" // Huge pages и предварительное заполнение сегмента
+#include "../common/verify.hpp" // Режим проверки данных
+#include "boost_segment.hpp" // Управляемый сегмент Boost.Interprocess и его индекс
+
 using namespace boost::interprocess; // Пространство имён Boost Interprocess
 
 // Константы размеров
-static constexpr std::size_t BUFFER_SIZE    = 16 * 1024ul * 1024; // 16 МБ
-static constexpr std::size_t TOTAL_SIZE     = 10ul * 1024 * 1024 * 1024; // 10 ГБ
-static constexpr std::size_t NUM_ITERATIONS = TOTAL_SIZE / BUFFER_SIZE; // Количество итераций
-
-// Структура разделяемой памяти, содержащая семафоры и буфер
-struct shm_buf {
-    interprocess_semaphore mem_lock; // Мьютекс для доступа к буферу
-    interprocess_semaphore client_ready; // Семафор для сигнала о готовности данных
-    interprocess_semaphore server_ready; // Семафор для подтверждения обработки
-    char data[BUFFER_SIZE]; // Буфер данных
-};
-
-// Функция получения использования RSS в мегабайтах
-double get_rss_in_mb() {
-    std::ifstream status_file("/proc/self/status");
-    std::string line;
-    while (std::getline(status_file, line)) {
-        if (line.find("VmRSS:") == 0) {
-            std::istringstream iss(line);
-            std::string key, unit;
-            double value;
-            iss >> key >> value >> unit;
-            return value / 1024.0; // KB → MB
-        }
-    }
-    return 0.0; // Если не нашли, возвращаем 0
-}
+// Общий объём задаёт оркестратор через окружение (IPC_TOTAL_SIZE), размер буфера — отправитель в заголовке сегмента
+static const std::size_t TOTAL_SIZE     = total_size_from_env(); // 10 ГБ по умолчанию
 
 int main() {
     // Открываем существующий сегмент памяти
-    managed_shared_memory segment(open_only, "BoostSharedMem");
-    // Находим объект shm_buf по имени
-    shm_buf* shm = segment.find<shm_buf>("Buffer").first;
+    const std::string segment_name = "BoostSharedMem" + name_suffix(); // суффикс задаёт оркестратор
+    const PageSettings pages = page_settings_from_env(); // Страницы сегмента те же, что у отправителя
+    // Объекты "Buffer" и "Data" ищутся по именам (find); в сегменте отправителя на Python — по смещениям из индекса
+    BoostSegment segment(open_only, segment_name, pages);
+    shm_buf* shm = segment.shm;
+    const char* shm_data = segment.data;
+    const bool futex = shm->sync == SYNC_FUTEX; // Режим синхронизации выбрал отправитель
+    SeqCounter ready(reinterpret_cast<char*>(shm->ready_seq));
+    SeqCounter done(reinterpret_cast<char*>(shm->done_seq));
 
     // Открываем лог-файл для метрик
-    std::ofstream metrics_log("boost_reciever_metrics.csv");
+    std::ofstream metrics_log(metrics_path("boost_reciever_metrics.csv"));
     metrics_log << "active_time_sec,wall_time_sec,bytes_received,rss_mb\n"; // Заголовки
 
     // Выделяем буфер для приёма данных
-    char* buf = new char[BUFFER_SIZE];
+    char* buf = new char[shm->buffer_size];
     std::size_t received = 0; // Общее полученное количество байт
     double active_time = 0.0; // Время активной обработки
-    double max_rss = 0.0; // Максимальное использование RSS
+    LatencyHistogram latency; // Задержки от начала отправки до окончания копирования
+    std::optional<PatternCheck> verify; // Режим проверки (IPC_VERIFY): CRC32 каждого принятого сообщения
+    if (verify_enabled()) verify.emplace(shm->buffer_size);
+    const bool batching = batch_size_from_env() > 0; // В буфере пакет сообщений (common/batch.hpp)
 
     auto wall_start = std::chrono::high_resolution_clock::now(); // Время начала общего таймера
+    MetricsChannel channel("receiver"); // Периодические замеры уходят оркестратору
 
     // Основной цикл получения данных
-    for (std::size_t i = 0; i < NUM_ITERATIONS; ++i) {
-        shm->client_ready.wait(); // Ждём сигнала о готовности данных от отправителя
+    for (std::size_t i = 0; received < TOTAL_SIZE; ++i) {
+        if (futex) ready.wait_above(static_cast<std::int64_t>(i));
+        else shm->client_ready.wait(); // Ждём сигнала о готовности данных от отправителя
+        const std::size_t length = shm->length;
+        if (length == 0) { // Отправитель закончил передачу
+            if (futex) done.advance(i + 1);
+            else shm->mem_lock.post();
+            break;
+        }
 
         auto t0 = std::chrono::high_resolution_clock::now(); // Засекаем время начала обработки
-        std::memcpy(buf, shm->data, BUFFER_SIZE); // Копируем данные из разделяемого буфера
-        shm->mem_lock.post(); // Освобождаем мьютекс
-        shm->server_ready.post(); // Сигналим отправителю, что обработка завершена
+        std::memcpy(buf, shm_data, length); // Копируем данные из разделяемого буфера
+        if (!batching) latency.record(static_cast<std::int64_t>(LatencyHistogram::now_ns() - shm->send_ns));
+        if (futex) {
+            done.advance(i + 1); // Буфер свободен и обработка завершена — один счётчик
+        } else {
+            shm->mem_lock.post(); // Освобождаем мьютекс
+            shm->server_ready.post(); // Сигналим отправителю, что обработка завершена
+        }
         auto t1 = std::chrono::high_resolution_clock::now(); // Засекаем время окончания обработки
-
         // Накапливаем активное время
         active_time += std::chrono::duration<double>(t1 - t0).count();
-        // Обновляем количество полученных байт
-        received += BUFFER_SIZE;
 
-        // Каждые 100 итераций проверяем использование RSS
-        if (i % 100 == 0) {
-            double current_rss = get_rss_in_mb();
-            if (current_rss > max_rss)
-                max_rss = current_rss; // Обновляем максимум
+        if (batching) {
+            // Сообщения пакета разбираются на месте в своей копии, отправитель уже собирает следующий пакет
+            const bool ok = for_each_message(buf, length, [&](const char* message, std::size_t size, std::uint64_t send_ns) {
+                latency.record(static_cast<std::int64_t>(LatencyHistogram::now_ns() - send_ns));
+                if (verify) verify->check(message, size);
+                received += size;
+            });
+            if (!ok) {
+                std::cerr << "malformed batch of " << length << " bytes\n";
+                break;
+            }
+        } else {
+            if (verify) verify->check(buf, length); // Проверяем свою копию, отправитель уже пишет следующий чанк
+            // Обновляем количество полученных байт
+            received += length;
         }
+        channel.tick(received);
     }
 
     auto wall_end = std::chrono::high_resolution_clock::now(); // Время окончания общего таймера
     double total_time = std::chrono::duration<double>(wall_end - wall_start).count(); // Общее время
 
     // Записываем метрики
+    double max_rss = MetricsChannel::peak_rss_mb();  // пик RSS за весь прогон, без замеров в цикле
     metrics_log << active_time << "," << total_time << "," << received << "," << max_rss << "\n";
+    channel.finish(received, active_time, total_time, max_rss); // Итоговый замер
     metrics_log.close();
+    latency.write_csv(metrics_path("boost_reciever"));
+    if (verify) verify->write_csv(metrics_path("boost_reciever"));
 
     // Расчёт скоростей
     double mbps_active  = (received / (1024.0 * 1024.0)) / active_time;
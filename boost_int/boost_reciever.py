@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_receiver
+from ipc.bench import BenchRun, NAME_SUFFIX, TOTAL_SIZE
+from ipc.boost import BoostChannel
+from ipc.pages import settings_from_env
+
+def main():
+    run = BenchRun("receiver", "boost_reciever")
+    with BoostChannel.open(NAME_SUFFIX, settings_from_env()) as boost:
+        buf = bytearray(boost.buffer_size)# размер буфера задаёт отправитель
+        channel = batch_receiver(boost, boost.buffer_size)# IPC_BATCH_SIZE: в буфере пакет сообщений
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            if BATCH_SIZE:
+                chunk = channel.recv_view()# сообщение — срез принятого пакета, без копирования
+            else:
+                chunk = memoryview(buf)[:channel.recv_into(buf)]
+            nbytes = len(chunk)
+            if nbytes == 0:# отправитель закончил передачу
+                break
+            if run.verify:# режим проверки: CRC32 принятого сообщения
+                run.verify.check(chunk)
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
+
+if __name__ == "__main__":
+    main()
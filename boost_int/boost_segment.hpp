@@ -0,0 +1,171 @@
+#pragma once
+
+#include <boost/interprocess/file_mapping.hpp> // Для сегмента на hugetlbfs, созданного Python
+#include <boost/interprocess/managed_mapped_file.hpp> // Управляемый сегмент на hugetlbfs
+#include <boost/interprocess/managed_shared_memory.hpp> // Управляемый сегмент в /dev/shm
+#include <boost/interprocess/mapped_region.hpp> // Для отображения индекса и сегмента Python
+#include <boost/interprocess/shared_memory_object.hpp> // Для индекса сегмента
+#include <boost/interprocess/sync/interprocess_semaphore.hpp> // Для межпроцессных семафоров
+#include <unistd.h> // Для unlink
+
+#include <cstddef> // Для offsetof
+#include <cstdint>
+#include <iostream> // Для вывода ошибок
+#include <optional> // Для сегмента одного из видов
+#include <string>
+
+#include "../common/seq_sync.hpp" // SYNC_SEM / SYNC_FUTEX
+#include "../common/shm_pages.hpp" // Huge pages и предварительное заполнение сегмента
+
+// Сегмент метода boost_int (совпадает с ipc/boost.py). Отправитель на C++ создаёт управляемый сегмент
+// Boost.Interprocess (managed_shared_memory, для hugetlb — managed_mapped_file на hugetlbfs) и размещает в нём
+// именованные объекты "Buffer" (заголовок shm_buf) и "Data" (буфер данных). Python не умеет искать именованные
+// объекты, поэтому их смещения от начала файла сегмента отправитель пишет в индекс <имя сегмента>_index.
+// Отправитель на Python создаёт простой сегмент (заголовок с нуля, данные с RAW_DATA_OFFSET) и такой же индекс
+// с managed = 0; получатель на C++ находит объекты через find, если сегмент управляемый, иначе — по смещениям
+
+// Заголовок; раскладка фиксирована и совпадает с ipc/boost.py
+struct shm_buf {
+    boost::interprocess::interprocess_semaphore mem_lock; // Семафор для доступа к буферу
+    boost::interprocess::interprocess_semaphore client_ready; // Семафор для сигнала клиента о готовности данных
+    boost::interprocess::interprocess_semaphore server_ready; // Семафор для сигнала сервера о завершении обработки
+    std::uint64_t send_ns; // Метка времени отправки текущего чанка (monotonic, нс)
+    std::uint64_t length; // Длина текущего чанка, 0 — конец потока
+    std::uint64_t buffer_size; // Размер буфера данных
+    std::uint64_t sync; // Режим синхронизации: SYNC_SEM или SYNC_FUTEX
+    // Счётчики futex на смещениях 128 и 192 без alignas: именованные объекты Boost выравнивает не больше чем на 16
+    std::uint64_t ready_seq[8]; // Режим futex: сколько чанков записано (за счётчиком — число спящих)
+    std::uint64_t done_seq[8]; // Режим futex: сколько чанков получатель забрал
+    shm_buf() : mem_lock(1), client_ready(0), server_ready(0), send_ns(0), length(0), buffer_size(0), sync(SYNC_SEM),
+                ready_seq{}, done_seq{} {} // Конструктор инициализирует семафоры и счётчики
+};
+static_assert(sizeof(boost::interprocess::interprocess_semaphore) == 32, "interprocess_semaphore должен быть POSIX sem_t");
+static_assert(offsetof(shm_buf, send_ns) == 96 && offsetof(shm_buf, sync) == 120, "раскладка должна совпадать с ipc/boost.py");
+static_assert(offsetof(shm_buf, ready_seq) == 128 && offsetof(shm_buf, done_seq) == 192,
+              "раскладка счётчиков должна совпадать с ipc/boost.py");
+
+// Байт буфера данных без инициализации: construct<char> обнулил бы буфер и заранее отобразил все его страницы
+struct shm_byte {
+    char value;
+    shm_byte() {}
+};
+
+// Индекс сегмента
+struct SegmentIndex {
+    std::uint64_t managed; // 1 — управляемый сегмент Boost, 0 — простой сегмент Python
+    std::uint64_t header_offset; // Смещение shm_buf от начала файла сегмента
+    std::uint64_t data_offset; // Смещение буфера данных
+};
+static const std::size_t RAW_DATA_OFFSET = 4096; // Данные простого сегмента начинаются со следующей страницы
+static const std::size_t SEGMENT_OVERHEAD = 64 * 1024; // Запас управляемого сегмента под менеджер и имена объектов
+
+class BoostSegment {
+public:
+    shm_buf* shm = nullptr;
+    char* data = nullptr;
+
+    // Создаёт управляемый сегмент с объектами "Buffer" и "Data"; страницы — SHM_HUGEPAGES / SHM_PREFAULT
+    BoostSegment(boost::interprocess::create_only_t, const std::string& segment_name, std::size_t buffer_size,
+                 const PageSettings& page_settings)
+        : name(segment_name), pages(page_settings), owner(true) {
+        using namespace boost::interprocess;
+        remove_files(); // Сегмент прошлого запуска
+        const std::size_t size = segment_size(buffer_size + sizeof(shm_buf) + SEGMENT_OVERHEAD, pages);
+        if (pages.hugetlb()) {
+            file.emplace(create_only, hugetlb_path(name, pages).c_str(), size);
+            construct(*file, buffer_size);
+        } else {
+            shared.emplace(create_only, name.c_str(), size);
+            construct(*shared, buffer_size);
+        }
+    }
+
+    // Подключается к сегменту, созданному отправителем на C++ или Python
+    BoostSegment(boost::interprocess::open_only_t, const std::string& segment_name, const PageSettings& page_settings)
+        : name(segment_name), pages(page_settings) {
+        using namespace boost::interprocess;
+        const SegmentIndex index = read_index();
+        if (index.managed && pages.hugetlb()) {
+            file.emplace(open_only, hugetlb_path(name, pages).c_str());
+            find(*file);
+        } else if (index.managed) {
+            shared.emplace(open_only, name.c_str());
+            find(*shared);
+        } else {
+            // Простой сегмент Python: отображение целиком, MAP_POPULATE передаётся в map_options
+            if (pages.hugetlb()) {
+                file_mapping mapping(hugetlb_path(name, pages).c_str(), read_write);
+                region.emplace(mapping, read_write, 0, 0, nullptr, map_flags(pages));
+            } else {
+                shared_memory_object object(open_only, name.c_str(), read_write);
+                region.emplace(object, read_write, 0, 0, nullptr, map_flags(pages));
+            }
+            prepare_mapping(region->get_address(), region->get_size(), pages);
+            char* base = static_cast<char*>(region->get_address());
+            shm = reinterpret_cast<shm_buf*>(base + index.header_offset);
+            data = base + index.data_offset;
+        }
+    }
+
+    BoostSegment(const BoostSegment&) = delete;
+    BoostSegment& operator=(const BoostSegment&) = delete;
+
+    ~BoostSegment() {
+        if (owner) remove_files();
+    }
+
+private:
+    std::string name;
+    PageSettings pages;
+    bool owner = false;
+    std::optional<boost::interprocess::managed_shared_memory> shared;
+    std::optional<boost::interprocess::managed_mapped_file> file;
+    std::optional<boost::interprocess::mapped_region> region;
+
+    std::string index_name() const { return name + "_index"; }
+
+    template <class Managed>
+    void construct(Managed& segment, std::size_t buffer_size) {
+        // Управляемый сегмент отображает сама библиотека, MAP_POPULATE в него не передать
+        prepare_unpopulated_mapping(segment.get_address(), segment.get_size(), pages);
+        shm = segment.template construct<shm_buf>("Buffer")();
+        data = &segment.template construct<shm_byte>("Data")[buffer_size]()->value;
+        shm->buffer_size = buffer_size;
+        // Дескриптор Boost — смещение от начала отображения, то есть от начала файла сегмента
+        write_index({1, static_cast<std::uint64_t>(segment.get_handle_from_address(shm)),
+                     static_cast<std::uint64_t>(segment.get_handle_from_address(data))});
+    }
+
+    template <class Managed>
+    void find(Managed& segment) {
+        prepare_unpopulated_mapping(segment.get_address(), segment.get_size(), pages);
+        shm = segment.template find<shm_buf>("Buffer").first;
+        shm_byte* bytes = segment.template find<shm_byte>("Data").first;
+        if (!shm || !bytes) {
+            std::cerr << "no Buffer/Data objects in segment " << name << "\n";
+            std::exit(1);
+        }
+        data = &bytes->value;
+    }
+
+    void write_index(const SegmentIndex& index) {
+        using namespace boost::interprocess;
+        shared_memory_object object(create_only, index_name().c_str(), read_write);
+        object.truncate(sizeof(SegmentIndex));
+        mapped_region mapping(object, read_write);
+        *static_cast<SegmentIndex*>(mapping.get_address()) = index;
+    }
+
+    SegmentIndex read_index() const {
+        using namespace boost::interprocess;
+        shared_memory_object object(open_only, index_name().c_str(), read_only);
+        mapped_region mapping(object, read_only);
+        return *static_cast<const SegmentIndex*>(mapping.get_address());
+    }
+
+    void remove_files() {
+        if (pages.hugetlb()) unlink(hugetlb_path(name, pages).c_str());
+        else boost::interprocess::shared_memory_object::remove(name.c_str());
+        boost::interprocess::shared_memory_object::remove(index_name().c_str());
+    }
+};
@@ -1,95 +1,117 @@
-#include <boost/interprocess/managed_shared_memory.hpp> // Для управления разделяемой памятью
-#include <boost/interprocess/sync/interprocess_semaphore.hpp> // Для межпроцессных семафоров
 #include <chrono> // Для измерения времени
 #include <cstring> // Для memcpy
 #include <fstream> // Для работы с файлами (логирование)
 #include <iostream> // Для вывода в консоль (может быть неиспользовано)
-#include <sstream> // Для обработки строк
+#include <optional> // Для необязательного узора проверки
 #include <unistd.h> // Для функций POSIX, например sleep
 
+#include "../common/batch.hpp" // Пакетирование мелких сообщений (IPC_BATCH_SIZE)
+#include "../common/bench_env.hpp" // Размеры из окружения
+#include "../common/latency_histogram.hpp" // Метки времени отправки
+#include "../common/metrics_channel.hpp" // Живые замеры для оркестратора
+#include "../common/ready.hpp" // Сигнал готовности оркестратору
+#include "../common/seq_sync.hpp" // Счётчики и futex вместо семафоров (SHM_SYNC=futex)
+#include "../common/shm_pages.hpp" // Huge pages и предварительное заполнение сегмента
+#include "../common/verify.hpp" // Режим проверки данных
+#include "boost_segment.hpp" // Управляемый сегмент Boost.Interprocess и его индекс
+
 using namespace boost::interprocess; // Пространство имён Boost Interprocess
 
 // Константы для размеров буфера и общего объёма данных
-static constexpr std::size_t BUFFER_SIZE    = 16 * 1024ul * 1024; // Размер буфера 16 МБ
-static constexpr std::size_t TOTAL_SIZE     = 10ul * 1024 * 1024 * 1024; // Общий объём данных 10 ГБ
-static constexpr std::size_t NUM_ITERATIONS = TOTAL_SIZE / BUFFER_SIZE; // Количество итераций
-
-
-struct shm_buf {
-    interprocess_semaphore mem_lock; // Семафор для доступа к буферу
-    interprocess_semaphore client_ready; // Семафор для сигнала клиента о готовности данных
-    interprocess_semaphore server_ready; // Семафор для сигнала сервера о завершении обработки
-    char data[BUFFER_SIZE]; // Буфер данных
-    shm_buf() : mem_lock(1), client_ready(0), server_ready(0) {} // Конструктор инициализирует семафоры
-};
-
-// Функция получения текущего использования RSS (Resident Set Size) в мегабайтах
-double get_rss_in_mb() {
-    std::ifstream status_file("/proc/self/status"); // Открываем файл статуса процесса
-    std::string line;
-    while (std::getline(status_file, line)) { // Читаем построчно
-        if (line.find("VmRSS:") == 0) { // Ищем строку с RSS
-            std::istringstream iss(line);
-            std::string key, unit;
-            double value;
-            iss >> key >> value >> unit; // Парсим строку
-            return value / 1024.0; // Конвертация из KB в MB
-        }
-    }
-    return 0.0; // Если не нашли, возвращаем 0
-}
+// Размеры задаёт оркестратор через окружение (IPC_CHUNK_SIZE, IPC_TOTAL_SIZE)
+static const std::size_t BUFFER_SIZE    = chunk_size_from_env(); // Размер буфера, 16 МБ по умолчанию
+static const std::size_t TOTAL_SIZE     = total_size_from_env(); // Общий объём данных, 10 ГБ по умолчанию
+static const std::size_t NUM_ITERATIONS = TOTAL_SIZE / BUFFER_SIZE; // Количество итераций
+static const std::size_t SEGMENT_BUFFER_SIZE = transport_size(BUFFER_SIZE); // Буфер сегмента: сообщение или пакет
+static const bool BATCHING = batch_size_from_env() > 0; // Мелкие сообщения уходят пакетами (common/batch.hpp)
 
 int main() {
-    // Удаляем ранее существующий разделяемый сегмент памяти с именем "BoostSharedMem"
-    shared_memory_object::remove("BoostSharedMem");
-    // Создаём новый сегмент памяти с размером, достаточным для структуры и небольшого запаса
-    managed_shared_memory segment(create_only, "BoostSharedMem", sizeof(shm_buf) + 1024);
-    // Создаём объект shm_buf в сегменте памяти
-    shm_buf *shm = segment.construct<shm_buf>("Buffer")();
+    // Имя сегмента с суффиксом IPC_NAME_SUFFIX, чтобы параллельные пары не мешали друг другу
+    const std::string segment_name = "BoostSharedMem" + name_suffix();
+    // Создаём управляемый сегмент и именованные объекты "Buffer" и "Data"; страницы — SHM_HUGEPAGES / SHM_PREFAULT
+    const PageSettings pages = page_settings_from_env();
+    BoostSegment segment(create_only, segment_name, SEGMENT_BUFFER_SIZE, pages);
+    shm_buf *shm = segment.shm;
+    const bool futex = sync_mode_from_env() == SYNC_FUTEX;
+    shm->sync = futex ? SYNC_FUTEX : SYNC_SEM; // Получатель берёт режим из заголовка
+    SeqCounter ready(reinterpret_cast<char*>(shm->ready_seq));
+    SeqCounter done(reinterpret_cast<char*>(shm->done_seq));
+    char *shm_data = segment.data;
 
     // Открываем файл для логирования метрик
-    std::ofstream log("boost_sender_metrics.csv");
+    std::ofstream log(metrics_path("boost_sender_metrics.csv"));
     log << "active_time_sec,wall_time_sec,bytes_sent,rss_mb\n"; // Заголовки колонок
 
     // Выделяем буфер для отправки данных
     char *buf = new char[BUFFER_SIZE];
     std::memset(buf, 'A', BUFFER_SIZE); // Заполняем буфер символами 'A'
+    std::optional<PatternSource> pattern; // Режим проверки (IPC_VERIFY): узор с номером сообщения вместо 'A'
+    if (verify_enabled()) pattern.emplace(BUFFER_SIZE);
 
     std::size_t sent = 0; // Общее количество отправленных байт
+    std::size_t messages = 0; // Отправлено сообщений
     double active_time = 0.0; // Время активной передачи
-    double max_rss = 0.0; // Максимальное использование RSS
 
     auto wall_start = std::chrono::high_resolution_clock::now(); // Время начала общего таймера
+    signal_ready(); // Сегмент создан, получатель может подключаться
+    MetricsChannel channel("sender"); // Периодические замеры уходят оркестратору
 
-    // Основной цикл отправки данных
-    for (std::size_t i = 0; i < NUM_ITERATIONS; ++i) {
-        shm->mem_lock.wait(); // Захватываем мьютекс для доступа к буферу
+    // Основной цикл отправки данных; i — номер передачи буфера (с пакетированием — номер пакета)
+    std::size_t i = 0;
+    for (; messages < NUM_ITERATIONS; ++i) {
+        if (futex) done.wait_above(static_cast<std::int64_t>(i) - 1); // Буфер свободен, когда получатель забрал всё
+        else shm->mem_lock.wait(); // Захватываем мьютекс для доступа к буферу
+        // Метка ставится, когда буфер уже свободен: как у сокетов и каналов, ожидание буфера в задержку не входит
+        std::uint64_t send_ns = LatencyHistogram::now_ns();
 
         auto t0 = std::chrono::high_resolution_clock::now(); // Засекаем время начала передачи
-        std::memcpy(shm->data, buf, BUFFER_SIZE); // Копируем данные в разделяемый буфер
-        shm->client_ready.post(); // Сигналим клиенту, что данные готовы
+        shm->send_ns = send_ns;
+        if (BATCHING) {
+            // Пакет собирается прямо в разделяемом буфере, пока не подойдёт срок или не кончится место
+            BatchWriter batch(shm_data, SEGMENT_BUFFER_SIZE);
+            do {
+                char* message = batch.append(BUFFER_SIZE);
+                if (pattern) pattern->fill(message, BUFFER_SIZE);
+                else std::memcpy(message, buf, BUFFER_SIZE);
+                ++messages;
+            } while (messages < NUM_ITERATIONS && !batch.due(BUFFER_SIZE));
+            shm->length = batch.size();
+        } else {
+            shm->length = BUFFER_SIZE;
+            if (pattern) pattern->fill(shm_data, BUFFER_SIZE); // Пишем узор прямо в разделяемый буфер
+            else std::memcpy(shm_data, buf, BUFFER_SIZE); // Копируем данные в разделяемый буфер
+            ++messages;
+        }
+        if (futex) ready.advance(i + 1);
+        else shm->client_ready.post(); // Сигналим клиенту, что данные готовы
         auto t1 = std::chrono::high_resolution_clock::now(); // Засекаем время завершения копирования
 
-        shm->server_ready.wait(); // Ждём подтверждения от клиента о завершении обработки
+        if (futex) done.wait_above(static_cast<std::int64_t>(i));
+        else shm->server_ready.wait(); // Ждём подтверждения от клиента о завершении обработки
 
         // Накапливаем активное время передачи
         active_time += std::chrono::duration<double>(t1 - t0).count();
         // Обновляем количество отправленных байт
-        sent += BUFFER_SIZE;
-
-        // Каждые 100 итераций проверяем использование RSS
-        if (i % 100 == 0) {
-            double current_rss = get_rss_in_mb();
-            if (current_rss > max_rss)
-                max_rss = current_rss; // Обновляем максимум
-        }
+        sent = messages * BUFFER_SIZE;
+        channel.tick(sent);
     }
 
+    // Чанк нулевой длины — конец потока, подтверждения на него получатель не отправляет
+    if (futex) done.wait_above(static_cast<std::int64_t>(i) - 1);
+    else shm->mem_lock.wait();
+    shm->send_ns = 0;
+    shm->length = 0;
+    if (futex) ready.advance(i + 1);
+    else shm->client_ready.post();
+
     auto wall_end = std::chrono::high_resolution_clock::now(); // Время окончания общего таймера
     double total_time = std::chrono::duration<double>(wall_end - wall_start).count(); // Общее время
 
     // Записываем метрики в лог-файл
+    double max_rss = MetricsChannel::peak_rss_mb();  // пик RSS за весь прогон, без замеров в цикле
     log << active_time << "," << total_time << "," << sent << "," << max_rss << "\n";
+    channel.finish(sent, active_time, total_time, max_rss); // Итоговый замер
+    if (pattern) pattern->write_csv(metrics_path("boost_sender"));
     log.close();
 
     // Расчёт скоростей
@@ -99,7 +121,5 @@ int main() {
     double gbps_overall = (sent * 8.0) / (1e9 * total_time);
 
     delete[] buf; // Освобождение буфера
-    segment.destroy<shm_buf>("Buffer"); // Удаление объекта из сегмента
-    shared_memory_object::remove("BoostSharedMem"); // Удаление сегмента из системы
-    return 0; // Завершение программы
+    return 0; // Завершение программы, сегмент и его индекс удалит деструктор BoostSegment
 }
\ No newline at end of file
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import batch_sender, transport_size
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, TOTAL_SIZE
+from ipc.boost import BoostChannel
+from ipc.pages import settings_from_env
+from ipc.seqsync import sync_from_env
+
+def main():
+    run = BenchRun("sender", "boost_sender")
+    data = bytearray(b"A" * CHUNK_SIZE)
+    # простой сегмент с заголовком Boost и индексом (ipc/boost.py); SHM_SYNC=futex — счётчики вместо семафоров, получатель берёт режим из заголовка.
+    # При IPC_BATCH_SIZE буфер сегмента вмещает пакет сообщений (ipc/batch.py)
+    boost = BoostChannel.create(transport_size(CHUNK_SIZE), NAME_SUFFIX, settings_from_env(), sync=sync_from_env())
+    with batch_sender(boost, CHUNK_SIZE) as channel:
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            channel.send(run.verify.fill(data) if run.verify else data)
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#pragma once
+
+// Пакетирование мелких сообщений (IPC_BATCH_SIZE > 0), формат совпадает с ipc/batch.py: пакет — одно сообщение
+// транспорта, в нём подряд, без выравнивания, записи: заголовок (длина, метка отправки — uint64 little-endian),
+// затем данные. Пакет уходит, когда следующее сообщение того же размера в него не поместится или когда первое
+// сообщение пакета ждёт дольше IPC_BATCH_LINGER_US мкс. Метка ставится при добавлении сообщения в пакет,
+// поэтому задержка у получателя включает и ожидание в пакете
+
+#include <endian.h>
+
+#include <algorithm>
+#include <cstddef>
+#include <cstdint>
+#include <cstring>
+
+#include "bench_env.hpp"
+#include "latency_histogram.hpp"
+
+const std::size_t BATCH_RECORD_SIZE = 2 * sizeof(uint64_t);
+
+inline std::size_t batch_size_from_env() { return env_size("IPC_BATCH_SIZE", 0); }  // 0 — без пакетирования
+inline uint64_t batch_linger_ns() { return env_size("IPC_BATCH_LINGER_US", 1000) * 1000; }
+
+// Размер сообщения транспорта: пакет вмещает хотя бы одно сообщение chunk_size с заголовком
+inline std::size_t transport_size(std::size_t chunk_size) {
+    const std::size_t batch = batch_size_from_env();
+    return batch ? std::max(batch, chunk_size + BATCH_RECORD_SIZE) : chunk_size;
+}
+
+// Сборка пакета в чужом буфере: собственном буфере отправителя или прямо в слоте разделяемой памяти
+class BatchWriter {
+public:
+    BatchWriter(char* buffer, std::size_t capacity, uint64_t linger_ns = batch_linger_ns())
+        : buffer_(buffer), capacity_(capacity), linger_ns_(linger_ns) {}
+
+    // Место под сообщение size байт, заголовок записи уже заполнен; nullptr — не помещается, пакет пора отправить
+    char* append(std::size_t size) {
+        if (used_ + BATCH_RECORD_SIZE + size > capacity_) return nullptr;
+        last_ns_ = LatencyHistogram::now_ns();
+        if (used_ == 0) first_ns_ = last_ns_;
+        const uint64_t record[2] = {htole64(size), htole64(last_ns_)};
+        std::memcpy(buffer_ + used_, record, sizeof(record));
+        char* data = buffer_ + used_ + BATCH_RECORD_SIZE;
+        used_ += BATCH_RECORD_SIZE + size;
+        return data;
+    }
+
+    // Пакет пора отправить: сообщение next_size байт уже не поместится или первое сообщение ждёт дольше linger
+    bool due(std::size_t next_size) const {
+        return used_ > 0 && (used_ + BATCH_RECORD_SIZE + next_size > capacity_ || last_ns_ - first_ns_ >= linger_ns_);
+    }
+
+    const char* data() const { return buffer_; }
+    std::size_t size() const { return used_; }
+    bool empty() const { return used_ == 0; }
+
+    // Пакет отправлен: следующий собирается с начала буфера (или в новом буфере, например в следующем слоте)
+    void reset(char* buffer = nullptr) {
+        if (buffer) buffer_ = buffer;
+        used_ = 0;
+    }
+
+private:
+    char* buffer_;
+    std::size_t capacity_;
+    uint64_t linger_ns_;
+    std::size_t used_ = 0;
+    uint64_t first_ns_ = 0;
+    uint64_t last_ns_ = 0;
+};
+
+// Разбор принятого пакета: on_message(data, size, send_ns) для каждого сообщения, data указывает внутрь пакета,
+// без копирования. false — запись выходит за пакет
+template <typename F>
+bool for_each_message(const char* batch, std::size_t size, F on_message) {
+    std::size_t offset = 0;
+    while (offset < size) {
+        if (offset + BATCH_RECORD_SIZE > size) return false;
+        uint64_t record[2];
+        std::memcpy(record, batch + offset, sizeof(record));
+        const uint64_t length = le64toh(record[0]);
+        offset += BATCH_RECORD_SIZE;
+        if (length > size - offset) return false;
+        on_message(batch + offset, static_cast<std::size_t>(length), le64toh(record[1]));
+        offset += length;
+    }
+    return true;
+}
@@ -0,0 +1,28 @@
+#pragma once
+
+// Параметры запуска, которые оркестратор передаёт через окружение (см. orchestrator.py)
+
+#include <cstddef>
+#include <cstdlib>
+#include <string>
+
+inline std::size_t env_size(const char* name, std::size_t fallback) {
+    const char* value = std::getenv(name);
+    return value ? static_cast<std::size_t>(std::strtoull(value, nullptr, 10)) : fallback;
+}
+
+// Размер одного сообщения и общий объём передачи (режим перебора размеров сообщений)
+inline std::size_t chunk_size_from_env() { return env_size("IPC_CHUNK_SIZE", 16 * 1024ul * 1024); }
+inline std::size_t total_size_from_env() { return env_size("IPC_TOTAL_SIZE", 10ul * 1024 * 1024 * 1024); }
+
+// Параллельный запуск нескольких пар (режим масштабирования): у каждого экземпляра свои имена
+// сегментов/семафоров/сокетов, свои порты и своя папка для файлов метрик
+inline std::string name_suffix() {
+    const char* value = std::getenv("IPC_NAME_SUFFIX");
+    return value ? value : "";
+}
+inline std::size_t port_offset() { return env_size("IPC_PORT_OFFSET", 0); }
+inline std::string metrics_path(const std::string& file_name) {
+    const char* dir = std::getenv("IPC_METRICS_DIR");
+    return dir ? std::string(dir) + "/" + file_name : file_name;
+}
@@ -0,0 +1,80 @@
+#pragma once
+
+// HDR-подобная гистограмма задержек, совместимая с ipc/latency.py:
+// значения до SUB_BUCKETS нс хранятся точно, дальше каждая степень двойки делится на HALF корзин
+
+#include <chrono>
+#include <cstdint>
+#include <fstream>
+#include <string>
+#include <vector>
+
+class LatencyHistogram {
+public:
+    static constexpr int SUB_BUCKET_BITS = 7;
+    static constexpr uint64_t SUB_BUCKETS = 1ull << SUB_BUCKET_BITS;
+    static constexpr uint64_t HALF = SUB_BUCKETS >> 1;
+
+    LatencyHistogram() : counts_(SUB_BUCKETS + 64 * HALF, 0) {}
+
+    // Монотонное время в наносекундах; steady_clock на Linux — это CLOCK_MONOTONIC, как time.monotonic_ns()
+    static uint64_t now_ns() {
+        return std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now().time_since_epoch()).count();
+    }
+
+    void record(int64_t value_ns) {
+        uint64_t value = value_ns < 0 ? 0 : static_cast<uint64_t>(value_ns);
+        ++counts_[bucket_index(value)];
+        ++total_;
+        if (value > max_) max_ = value;
+    }
+
+    uint64_t percentile(double p) const {
+        if (total_ == 0) return 0;
+        uint64_t target = static_cast<uint64_t>(total_ * p / 100.0 + 0.5);
+        if (target < 1) target = 1;
+        uint64_t seen = 0;
+        for (size_t i = 0; i < counts_.size(); ++i) {
+            seen += counts_[i];
+            if (seen >= target) {
+                uint64_t upper = bucket_upper(i);
+                return upper < max_ ? upper : max_;
+            }
+        }
+        return max_;
+    }
+
+    // <prefix>_latency.csv — сводка перцентилей, <prefix>_latency_hist.csv — сами корзины
+    void write_csv(const std::string& prefix) const {
+        std::ofstream summary(prefix + "_latency.csv");
+        summary << "count,p50_ns,p90_ns,p99_ns,p999_ns,max_ns\n";
+        summary << total_ << "," << percentile(50.0) << "," << percentile(90.0) << ","
+                << percentile(99.0) << "," << percentile(99.9) << "," << max_ << "\n";
+
+        std::ofstream hist(prefix + "_latency_hist.csv");
+        hist << "latency_ns,count\n";
+        for (size_t i = 0; i < counts_.size(); ++i) {
+            if (counts_[i]) hist << bucket_upper(i) << "," << counts_[i] << "\n";
+        }
+    }
+
+private:
+    static size_t bucket_index(uint64_t value) {
+        if (value < SUB_BUCKETS) return value;
+        int shift = 64 - __builtin_clzll(value) - SUB_BUCKET_BITS;
+        return SUB_BUCKETS + (shift - 1) * HALF + ((value >> shift) - HALF);
+    }
+
+    static uint64_t bucket_upper(size_t index) {
+        if (index < SUB_BUCKETS) return index;
+        uint64_t k = index - SUB_BUCKETS;
+        uint64_t shift = k / HALF + 1;
+        uint64_t mantissa = k % HALF + HALF;
+        return ((mantissa + 1) << shift) - 1;
+    }
+
+    std::vector<uint64_t> counts_;
+    uint64_t total_ = 0;
+    uint64_t max_ = 0;
+};
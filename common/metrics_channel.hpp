@@ -0,0 +1,85 @@
+#pragma once
+
+// Периодические замеры процесса уходят сборщику оркестратора через UNIX datagram сокет IPC_METRICS_SOCKET
+// (формат датаграммы совпадает с ipc/metrics.py). Без переменной окружения канал ничего не отправляет
+
+#include <sys/resource.h>
+#include <sys/socket.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+
+class MetricsChannel {
+public:
+    explicit MetricsChannel(const char* role) : role_(role) {
+        const char* run_id = std::getenv("IPC_RUN_ID");
+        run_id_ = run_id ? run_id : "";
+        const char* path = std::getenv("IPC_METRICS_SOCKET");
+        if (path) {
+            fd_ = socket(AF_UNIX, SOCK_DGRAM | SOCK_NONBLOCK, 0);
+            addr_.sun_family = AF_UNIX;
+            std::strncpy(addr_.sun_path, path, sizeof(addr_.sun_path) - 1);
+        }
+        start_ = std::chrono::steady_clock::now();  // канал создаётся в начале активной передачи
+        next_sample_ = start_ + INTERVAL;
+    }
+
+    ~MetricsChannel() {
+        if (fd_ >= 0) close(fd_);
+    }
+
+    // Вызывается на каждой итерации цикла передачи, замер отправляется не чаще раза в INTERVAL
+    void tick(std::uint64_t bytes) {
+        if (fd_ < 0) return;
+        auto now = std::chrono::steady_clock::now();
+        if (now < next_sample_) return;
+        next_sample_ = now + INTERVAL;
+        double elapsed = std::chrono::duration<double>(now - start_).count();
+        send(bytes, elapsed, elapsed, peak_rss_mb(), false);
+    }
+
+    // Пиковый RSS процесса одним вызовом getrusage, без чтения /proc. Подробная динамика памяти и CPU
+    // снимается снаружи, опросом /proc/<pid> из оркестратора
+    static double peak_rss_mb() {
+        rusage usage{};
+        getrusage(RUSAGE_SELF, &usage);
+        return usage.ru_maxrss / 1024.0;  // ru_maxrss в КБ
+    }
+
+    // Итоговый замер с теми же значениями, что попадают в CSV метрик процесса
+    void finish(std::uint64_t bytes, double active_time, double wall_time, double max_rss_mb) {
+        if (fd_ < 0) return;
+        send(bytes, active_time, wall_time, max_rss_mb, true);
+        close(fd_);
+        fd_ = -1;
+    }
+
+private:
+    static constexpr std::chrono::milliseconds INTERVAL{100};
+
+    void send(std::uint64_t bytes, double active_time, double wall_time, double memory_mb, bool final) {
+        char buf[512];
+        int n = std::snprintf(buf, sizeof(buf),
+                              "{\"run\": \"%s\", \"role\": \"%s\", \"pid\": %d, \"final\": %s, "
+                              "\"wall_time_sec\": %.6f, \"active_time_sec\": %.6f, \"bytes\": %llu, \"rss_mb\": %.2f}",
+                              run_id_.c_str(), role_, static_cast<int>(getpid()), final ? "true" : "false",
+                              wall_time, active_time, static_cast<unsigned long long>(bytes), memory_mb);
+        // Ошибки (сборщик не успевает или уже остановлен) игнорируются: передача данных важнее замера
+        if (n > 0) sendto(fd_, buf, std::min<std::size_t>(n, sizeof(buf) - 1), 0,
+                          reinterpret_cast<const sockaddr*>(&addr_), sizeof(addr_));
+    }
+
+    const char* role_;
+    std::string run_id_;
+    int fd_ = -1;
+    sockaddr_un addr_{};
+    std::chrono::steady_clock::time_point start_;
+    std::chrono::steady_clock::time_point next_sample_;
+};
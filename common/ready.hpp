@@ -0,0 +1,21 @@
+#pragma once
+
+// Сигнал готовности оркестратору (совпадает с ipc/ready.py): процесс пары, который стартует первым, получает
+// в IPC_READY_FD пишущий конец пайпа и пишет в него байт, как только второй процесс может подключаться
+// (сегмент создан, сокет слушает, FIFO существует). Без переменной окружения ничего не делает, повторный вызов — тоже
+
+#include <unistd.h>
+
+#include <cstdlib>
+
+inline void signal_ready() {
+    const char* value = std::getenv("IPC_READY_FD");
+    if (!value) return;
+    const int fd = std::atoi(value);
+    unsetenv("IPC_READY_FD");
+    const char byte = 'R';
+    if (write(fd, &byte, 1) < 0) {
+        // оркестратор уже не ждёт
+    }
+    close(fd);
+}
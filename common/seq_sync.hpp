@@ -0,0 +1,94 @@
+#pragma once
+
+// Синхронизация передачи через счётчики в самом сегменте (совпадает с ipc/seqsync.py), SHM_SYNC=futex.
+// Счётчик — u64, который только растёт; через SEQ_WAITERS_SHIFT байт за ним лежит u32 — сколько процессов спит
+// на этом счётчике. Ожидающий сначала читает счётчик в цикле, затем регистрируется в waiters и засыпает на futex
+// младших 32 бит счётчика; пишущий зовёт FUTEX_WAKE, только если кто-то спит. Бюджет опроса адаптивный:
+// удачный опрос удваивает его (до SHM_SPIN_LIMIT), сон уменьшает вдвое; на одном CPU опроса нет
+
+#include <linux/futex.h>
+#include <sched.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+
+#include <algorithm>
+#include <chrono>
+#include <climits>
+#include <cstddef>
+#include <cstdint>
+#include <cstdlib>
+#include <ctime>
+#include <string>
+
+const uint64_t SYNC_SEM = 0;    // так режим записан в заголовке сегмента
+const uint64_t SYNC_FUTEX = 1;
+const std::size_t SEQ_WAITERS_SHIFT = 8;
+const std::size_t SEQ_SPIN_MIN = 16;
+
+inline uint64_t sync_mode_from_env() {
+    const char* value = std::getenv("SHM_SYNC");
+    return value && std::string(value) == "futex" ? SYNC_FUTEX : SYNC_SEM;
+}
+
+inline std::size_t seq_spin_budget() {
+    cpu_set_t cpus;
+    if (sched_getaffinity(0, sizeof(cpus), &cpus) == 0 && CPU_COUNT(&cpus) < 2) return 0;
+    const char* value = std::getenv("SHM_SPIN_LIMIT");
+    return value ? std::strtoull(value, nullptr, 10) : 10000;
+}
+
+class SeqCounter {
+public:
+    explicit SeqCounter(char* address)
+        : counter_(reinterpret_cast<uint64_t*>(address)),
+          waiters_(reinterpret_cast<uint32_t*>(address + SEQ_WAITERS_SHIFT)),
+          spin_max_(seq_spin_budget()), spin_(spin_max_) {}
+
+    uint64_t load() const { return __atomic_load_n(counter_, __ATOMIC_ACQUIRE); }
+
+    void advance(uint64_t value) {
+        // Запись с полным барьером: либо ожидающий увидит новое значение, либо мы увидим его в waiters
+        __atomic_store_n(counter_, value, __ATOMIC_SEQ_CST);
+        if (__atomic_load_n(waiters_, __ATOMIC_SEQ_CST)) {
+            syscall(SYS_futex, counter_, FUTEX_WAKE, INT_MAX, nullptr, nullptr, 0);
+        }
+    }
+
+    // Ждём, пока счётчик станет больше target; false — истёк timeout_sec (отрицательный — ждать без предела)
+    bool wait_above(int64_t target, double timeout_sec = -1.0) {
+        for (std::size_t i = 0; i < spin_; ++i) {
+            if (static_cast<int64_t>(load()) > target) {
+                spin_ = std::min(spin_max_, spin_ * 2);
+                return true;
+            }
+        }
+        spin_ = std::max(std::min(SEQ_SPIN_MIN, spin_max_), spin_ / 2);
+        const auto deadline = std::chrono::steady_clock::now() + std::chrono::duration<double>(timeout_sec);
+        while (true) {
+            __atomic_fetch_add(waiters_, 1, __ATOMIC_SEQ_CST);
+            uint64_t value = load();
+            if (static_cast<int64_t>(value) <= target) {
+                timespec pause{};
+                timespec* pause_ptr = nullptr;
+                if (timeout_sec >= 0) {
+                    const double left = std::max(0.0, std::chrono::duration<double>(deadline - std::chrono::steady_clock::now()).count());
+                    pause.tv_sec = static_cast<time_t>(left);
+                    pause.tv_nsec = static_cast<long>((left - pause.tv_sec) * 1e9);
+                    pause_ptr = &pause;
+                }
+                // Ядро сверит младшие 32 бита счётчика с value: если счётчик уже сдвинулся, сна не будет
+                syscall(SYS_futex, counter_, FUTEX_WAIT, static_cast<uint32_t>(value), pause_ptr, nullptr, 0);
+                value = load();
+            }
+            __atomic_fetch_sub(waiters_, 1, __ATOMIC_SEQ_CST);
+            if (static_cast<int64_t>(value) > target) return true;
+            if (timeout_sec >= 0 && std::chrono::steady_clock::now() >= deadline) return false;
+        }
+    }
+
+private:
+    uint64_t* counter_;
+    uint32_t* waiters_;
+    std::size_t spin_max_;
+    std::size_t spin_;
+};
@@ -0,0 +1,81 @@
+#pragma once
+
+// Страницы сегментов разделяемой памяти (совпадает с ipc/pages.py), параметры из окружения:
+//   SHM_HUGEPAGES  ""        — обычные страницы 4 КБ в /dev/shm
+//                  "thp"     — /dev/shm и madvise(MADV_HUGEPAGE); /dev/shm смонтирован с huge=advise (always, within_size)
+//                  "hugetlb" — файл сегмента на hugetlbfs (HUGETLB_DIR, /dev/hugepages), нужен пул vm.nr_hugepages
+//   SHM_PREFAULT=1 — все страницы сегмента отображаются при подключении (MAP_POPULATE), до начала замера
+
+#include <sys/mman.h>
+#include <unistd.h>
+
+#include <cstddef>
+#include <cstdlib>
+#include <fstream>
+#include <string>
+
+struct PageSettings {
+    std::string hugepages;
+    bool prefault = false;
+    std::string hugetlb_dir = "/dev/hugepages";
+
+    bool hugetlb() const { return hugepages == "hugetlb"; }
+    bool thp() const { return hugepages == "thp"; }
+};
+
+inline PageSettings page_settings_from_env() {
+    PageSettings pages;
+    if (const char* value = std::getenv("SHM_HUGEPAGES")) pages.hugepages = value;
+    if (const char* value = std::getenv("SHM_PREFAULT")) pages.prefault = std::string(value) == "1";
+    if (const char* value = std::getenv("HUGETLB_DIR")) pages.hugetlb_dir = value;
+    return pages;
+}
+
+inline std::size_t huge_page_size() {
+    std::ifstream meminfo("/proc/meminfo");
+    std::string key;
+    std::size_t value = 0;
+    while (meminfo >> key >> value) {
+        if (key == "Hugepagesize:") return value * 1024;
+        meminfo.ignore(256, '\n');
+    }
+    return 2 * 1024 * 1024;
+}
+
+// Файл сегмента на hugetlbfs; name — имя в стиле shm_open ("/my_shm", "BoostSharedMem")
+inline std::string hugetlb_path(const std::string& name, const PageSettings& pages) {
+    return pages.hugetlb_dir + "/" + (name[0] == '/' ? name.substr(1) : name);
+}
+
+// Файл на hugetlbfs и его отображение должны быть кратны размеру huge page
+inline std::size_t segment_size(std::size_t size, const PageSettings& pages) {
+    if (!pages.hugetlb()) return size;
+    const std::size_t huge = huge_page_size();
+    return (size + huge - 1) / huge * huge;
+}
+
+// Дополнительные флаги mmap. Для THP совет нужен до первого обращения, поэтому MAP_POPULATE не используется,
+// а страницы заполняются в prepare_mapping после madvise
+inline int map_flags(const PageSettings& pages) {
+    return pages.prefault && !pages.thp() ? MAP_POPULATE : 0;
+}
+
+inline void touch_pages(void* addr, std::size_t size) {
+    // Чтение страницы разделяемой памяти выделяет её и отображает на запись
+    const volatile char* bytes = static_cast<const volatile char*>(addr);
+    const std::size_t page = static_cast<std::size_t>(sysconf(_SC_PAGESIZE));
+    for (std::size_t offset = 0; offset < size; offset += page) (void)bytes[offset];
+}
+
+inline void prepare_mapping(void* addr, std::size_t size, const PageSettings& pages) {
+    if (!pages.thp()) return;
+    madvise(addr, size, MADV_HUGEPAGE);
+    if (pages.prefault) touch_pages(addr, size);
+}
+
+// Отображение, в которое MAP_POPULATE не передать (управляемые сегменты Boost.Interprocess отображает сама
+// библиотека): SHM_PREFAULT заполняет страницы чтением
+inline void prepare_unpopulated_mapping(void* addr, std::size_t size, const PageSettings& pages) {
+    if (pages.thp()) madvise(addr, size, MADV_HUGEPAGE);
+    if (pages.prefault) touch_pages(addr, size);
+}
@@ -0,0 +1,158 @@
+#pragma once
+
+// Режим проверки данных (IPC_VERIFY=1), формат совпадает с ipc/verify.py:
+//   первые 8 байт сообщения — номер (uint64, little-endian), остальное — узор варианта seq % VERIFY_VARIANTS:
+//   байт i = block[(i + variant * VERIFY_VARIANT_SHIFT) % VERIFY_BLOCK_SIZE], block — 4 КБ splitmix64 от IPC_VERIFY_SEED.
+// Получатель сверяет CRC32 (та же, что zlib.crc32) сообщения без номера с CRC32 ожидаемого варианта
+
+#include <chrono>
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <map>
+#include <stdexcept>
+#include <string>
+#include <utility>
+#include <vector>
+
+constexpr std::size_t VERIFY_SEQ_SIZE = sizeof(uint64_t);
+constexpr std::size_t VERIFY_BLOCK_SIZE = 4096;
+constexpr std::size_t VERIFY_VARIANTS = 4;
+constexpr std::size_t VERIFY_VARIANT_SHIFT = 1031;
+
+inline bool verify_enabled() {
+    const char* value = std::getenv("IPC_VERIFY");
+    return value && std::string(value) == "1";
+}
+
+inline uint64_t verify_seed_from_env() {
+    const char* value = std::getenv("IPC_VERIFY_SEED");
+    return value ? std::strtoull(value, nullptr, 10) : 1;
+}
+
+// CRC32 (IEEE 802.3, отражённая) по таблицам slicing-by-8: восемь байт за шаг
+class Crc32 {
+public:
+    Crc32() {
+        for (uint32_t i = 0; i < 256; ++i) {
+            uint32_t crc = i;
+            for (int bit = 0; bit < 8; ++bit) crc = (crc >> 1) ^ (0xEDB88320u & (0u - (crc & 1)));
+            table_[0][i] = crc;
+        }
+        for (uint32_t i = 0; i < 256; ++i)
+            for (int k = 1; k < 8; ++k) table_[k][i] = (table_[k - 1][i] >> 8) ^ table_[0][table_[k - 1][i] & 0xFF];
+    }
+
+    uint32_t operator()(const char* data, std::size_t size) const {
+        const unsigned char* p = reinterpret_cast<const unsigned char*>(data);
+        uint32_t crc = 0xFFFFFFFFu;
+        for (; size >= 8; size -= 8, p += 8) {
+            uint32_t lo, hi;
+            std::memcpy(&lo, p, 4);
+            std::memcpy(&hi, p + 4, 4);
+            lo ^= crc;
+            crc = table_[7][lo & 0xFF] ^ table_[6][(lo >> 8) & 0xFF] ^ table_[5][(lo >> 16) & 0xFF] ^ table_[4][lo >> 24] ^
+                  table_[3][hi & 0xFF] ^ table_[2][(hi >> 8) & 0xFF] ^ table_[1][(hi >> 16) & 0xFF] ^ table_[0][hi >> 24];
+        }
+        for (; size > 0; --size, ++p) crc = (crc >> 8) ^ table_[0][(crc ^ *p) & 0xFF];
+        return crc ^ 0xFFFFFFFFu;
+    }
+
+private:
+    uint32_t table_[8][256];
+};
+
+// VERIFY_VARIANTS полных сообщений размера size без номера
+inline std::vector<std::vector<char>> pattern_variants(std::size_t size, uint64_t seed) {
+    if (size < VERIFY_SEQ_SIZE) throw std::invalid_argument("IPC_VERIFY requires messages of at least 8 bytes");
+    std::vector<char> block(VERIFY_BLOCK_SIZE);
+    uint64_t state = seed;
+    for (std::size_t i = 0; i < VERIFY_BLOCK_SIZE; i += 8) {
+        state += 0x9E3779B97F4A7C15ull;
+        uint64_t z = state;
+        z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ull;
+        z = (z ^ (z >> 27)) * 0x94D049BB133111EBull;
+        z ^= z >> 31;
+        for (int b = 0; b < 8; ++b) block[i + b] = static_cast<char>(z >> (8 * b));
+    }
+    std::vector<std::vector<char>> variants(VERIFY_VARIANTS, std::vector<char>(size));
+    for (std::size_t v = 0; v < VERIFY_VARIANTS; ++v) {
+        const std::size_t shift = v * VERIFY_VARIANT_SHIFT % VERIFY_BLOCK_SIZE;
+        for (std::size_t i = 0; i < size; ++i) variants[v][i] = block[(i + shift) % VERIFY_BLOCK_SIZE];
+    }
+    return variants;
+}
+
+inline void write_verify_csv(const std::string& prefix, uint64_t messages, uint64_t corrupt, uint64_t out_of_order,
+                             double elapsed) {
+    std::ofstream log(prefix + "_verify.csv");
+    log << "messages,corrupt,out_of_order,verify_sec\n";
+    log << messages << "," << corrupt << "," << out_of_order << "," << elapsed << "\n";
+}
+
+// Отправитель: fill(dst) записывает в dst (size байт) следующее сообщение узора
+class PatternSource {
+public:
+    explicit PatternSource(std::size_t size, uint64_t seed = verify_seed_from_env())
+        : variants_(pattern_variants(size, seed)) {}
+
+    void fill(char* dst, std::size_t size) {
+        auto start = std::chrono::steady_clock::now();
+        std::memcpy(dst, variants_[seq_ % VERIFY_VARIANTS].data(), size);
+        std::memcpy(dst, &seq_, VERIFY_SEQ_SIZE);  // x86-64 и aarch64 — little-endian, как в ipc/verify.py
+        ++seq_;
+        elapsed_ += std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+    }
+
+    void write_csv(const std::string& prefix) const { write_verify_csv(prefix, seq_, 0, 0, elapsed_); }
+
+private:
+    std::vector<std::vector<char>> variants_;
+    uint64_t seq_ = 0;
+    double elapsed_ = 0.0;
+};
+
+// Получатель: check(data, size) сверяет CRC32 сообщения; номер, не больший предыдущего, — нарушение порядка
+class PatternCheck {
+public:
+    explicit PatternCheck(std::size_t size, uint64_t seed = verify_seed_from_env())
+        : variants_(pattern_variants(size, seed)) {}
+
+    void check(const char* data, std::size_t size) {
+        auto start = std::chrono::steady_clock::now();
+        ++messages_;
+        if (size < VERIFY_SEQ_SIZE || size > variants_[0].size()) {
+            ++corrupt_;
+        } else {
+            uint64_t seq;
+            std::memcpy(&seq, data, VERIFY_SEQ_SIZE);
+            const auto key = std::make_pair(seq % VERIFY_VARIANTS, size);
+            auto it = expected_.find(key);
+            if (it == expected_.end()) {
+                const char* expected = variants_[key.first].data() + VERIFY_SEQ_SIZE;
+                it = expected_.emplace(key, crc32_(expected, size - VERIFY_SEQ_SIZE)).first;
+            }
+            if (crc32_(data + VERIFY_SEQ_SIZE, size - VERIFY_SEQ_SIZE) != it->second) ++corrupt_;
+            if (has_last_ && seq <= last_seq_) ++out_of_order_;
+            last_seq_ = seq;
+            has_last_ = true;
+        }
+        elapsed_ += std::chrono::duration<double>(std::chrono::steady_clock::now() - start).count();
+    }
+
+    void write_csv(const std::string& prefix) const {
+        write_verify_csv(prefix, messages_, corrupt_, out_of_order_, elapsed_);
+    }
+
+private:
+    std::vector<std::vector<char>> variants_;
+    std::map<std::pair<uint64_t, std::size_t>, uint32_t> expected_;  // (вариант, длина) -> CRC32
+    Crc32 crc32_;
+    uint64_t messages_ = 0;
+    uint64_t corrupt_ = 0;
+    uint64_t out_of_order_ = 0;
+    uint64_t last_seq_ = 0;
+    bool has_last_ = false;
+    double elapsed_ = 0.0;
+};
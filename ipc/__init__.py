@@ -0,0 +1,22 @@
+# Транспорты IPC с общим интерфейсом Channel: send(buf), recv_into(buf), close(); AsyncChannel — то же для asyncio.
+# ShmChannel требует posix_ipc, ZmqChannel — pyzmq, поэтому они загружаются только при обращении
+from .boost import BoostChannel
+from .channel import AsyncChannel, Channel
+from .memfd import MemfdChannel
+from .sockets import AsyncSocketChannel, SocketChannel
+
+LAZY = {
+    "ShmChannel": ".shm",
+    "AsyncShmChannel": ".shm",
+    "ZmqChannel": ".zmq_channel",
+    "AsyncZmqChannel": ".zmq_channel",
+}
+
+def __getattr__(name):
+    if name in LAZY:
+        from importlib import import_module
+        return getattr(import_module(LAZY[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["AsyncChannel", "AsyncShmChannel", "AsyncSocketChannel", "AsyncZmqChannel", "BoostChannel", "Channel",
+           "MemfdChannel", "ShmChannel", "SocketChannel", "ZmqChannel"]
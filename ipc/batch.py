@@ -0,0 +1,137 @@
+import os
+import struct
+import time
+
+from .channel import Channel
+
+# Пакетирование мелких сообщений (IPC_BATCH_SIZE > 0), формат совпадает с common/batch.hpp: отправитель складывает
+# логические сообщения в один буфер и передаёт его транспорту одним сообщением, получатель нарезает принятый пакет
+# на сообщения срезами memoryview, без копирования. Запись пакета — заголовок RECORD (длина, метка отправки,
+# little-endian), затем данные; записи идут подряд без выравнивания, конец пакета — длина транспортного сообщения.
+# Пакет уходит, когда следующее сообщение того же размера в него не поместится или когда первое сообщение пакета
+# ждёт дольше IPC_BATCH_LINGER_US мкс. Срок проверяется при каждой отправке: производитель, который замолкает,
+# должен сам вызвать flush(). Метка отправки ставится при добавлении сообщения в пакет, поэтому задержка
+# у получателя включает и ожидание в пакете
+BATCH_SIZE = int(os.environ.get("IPC_BATCH_SIZE", "0"))  # предельный размер пакета, Б; 0 — без пакетирования
+LINGER_US = int(os.environ.get("IPC_BATCH_LINGER_US", "1000"))
+RECORD = struct.Struct("<QQ")  # длина сообщения, метка отправки (monotonic, нс)
+
+def transport_size(chunk_size):
+    # Размер сообщения транспорта: пакет вмещает хотя бы одно сообщение chunk_size с заголовком
+    return max(BATCH_SIZE, chunk_size + RECORD.size) if BATCH_SIZE else chunk_size
+
+def batch_sender(channel, chunk_size):
+    return BatchSender(channel, transport_size(chunk_size)) if BATCH_SIZE else channel
+
+def batch_receiver(channel, size, views=False):
+    # size — размер сообщения транспорта, см. transport_size (у shm и boost его задаёт отправитель);
+    # при views=True пакет остаётся в буфере канала и size не используется
+    return BatchReceiver(channel, size, views) if BATCH_SIZE else channel
+
+class BatchSender(Channel):
+    # Обёртка отправляющей стороны канала: send(buf) копирует сообщение в пакет, reserve(n) / publish() —
+    # заполнение места в пакете на месте (тот же интерфейс, что у MemfdChannel). close() отправляет остаток пакета
+    def __init__(self, channel, capacity, linger_us=LINGER_US):
+        super().__init__()
+        self.channel = channel
+        self.buf = bytearray(capacity)
+        self.view = memoryview(self.buf)
+        self.linger_ns = linger_us * 1000
+        self.used = 0
+        self.first_ns = 0
+        self.pending = 0  # длина сообщения из reserve()
+        self.pending_ns = 0
+
+    def reserve(self, nbytes):
+        if RECORD.size + nbytes > len(self.buf):
+            raise ValueError(f"Сообщение {nbytes} байт больше пакета {len(self.buf)}")
+        if self.used + RECORD.size + nbytes > len(self.buf):
+            self.flush()
+        self.pending_ns = time.monotonic_ns()
+        if self.used == 0:
+            self.first_ns = self.pending_ns
+        RECORD.pack_into(self.buf, self.used, nbytes, self.pending_ns)
+        self.pending = nbytes
+        start = self.used + RECORD.size
+        return self.view[start:start + nbytes]
+
+    def publish(self):
+        nbytes = self.pending
+        self.used += RECORD.size + nbytes
+        full = self.used + RECORD.size + nbytes > len(self.buf)
+        if full or self.pending_ns - self.first_ns >= self.linger_ns:
+            self.flush()
+
+    def send(self, buf):
+        self.reserve(len(buf))[:] = buf
+        self.publish()
+
+    def flush(self):
+        if self.used:
+            self.channel.send(self.view[:self.used])
+            self.used = 0
+
+    def close(self):
+        self.flush()
+        self.view.release()
+        self.channel.close()
+
+class BatchReceiver(Channel):
+    # Обёртка принимающей стороны: recv_view() — следующее сообщение срезом принятого пакета, без копии.
+    # Срез действителен до release() (или до следующего recv_view()); пакет отпускается целиком вместе
+    # с последним сообщением. views=True — пакет берётся из recv_view() / release() самого канала
+    # (ShmChannel, MemfdChannel) и читается прямо из разделяемой памяти, иначе принимается в свой буфер
+    def __init__(self, channel, capacity, views=False):
+        super().__init__()
+        self.channel = channel
+        self.views = views
+        self.buf = None if views else bytearray(capacity)
+        self.batch = memoryview(b"")
+        self.offset = 0
+        self.held = False  # пакет из recv_view() канала ещё не возвращён
+
+    def drop(self):
+        self.batch.release()
+        self.batch = memoryview(b"")
+        self.offset = 0
+        if self.held:
+            self.held = False
+            self.channel.release()
+
+    def next_batch(self):
+        self.drop()
+        if self.views:
+            self.batch = self.channel.recv_view()
+            self.held = True  # и пустое сообщение конца потока занимает слот shm
+        else:
+            self.batch = memoryview(self.buf)[:self.channel.recv_into(self.buf)]
+
+    def recv_view(self):
+        if self.offset >= len(self.batch):
+            self.next_batch()
+            if not len(self.batch):
+                return memoryview(b"")  # конец потока
+        if self.offset + RECORD.size > len(self.batch):
+            raise ValueError("Обрезанный заголовок записи пакета")
+        nbytes, self.last_send_ns = RECORD.unpack_from(self.batch, self.offset)
+        start = self.offset + RECORD.size
+        if start + nbytes > len(self.batch):
+            raise ValueError(f"Запись {nbytes} байт выходит за пакет {len(self.batch)}")
+        self.offset = start + nbytes
+        return self.batch[start:self.offset]
+
+    def release(self):
+        if self.offset >= len(self.batch):
+            self.drop()
+
+    def recv_into(self, buf):
+        view = self.recv_view()
+        nbytes = len(view)
+        memoryview(buf)[:nbytes] = view
+        view.release()
+        self.release()
+        return nbytes
+
+    def close(self):
+        self.drop()
+        self.channel.close()
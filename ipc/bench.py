@@ -0,0 +1,66 @@
+import csv
+import os
+import time
+
+from .latency import LatencyHistogram
+from .metrics import MetricsChannel, peak_rss_mb
+from .ready import signal_ready
+from .verify import VERIFY, PatternCheck, PatternSource
+
+# Параметры запуска, которые оркестратор передаёт через окружение (см. orchestrator.py)
+CHUNK_SIZE = int(os.environ.get("IPC_CHUNK_SIZE", 16 * 1024 * 1024))
+TOTAL_SIZE = int(os.environ.get("IPC_TOTAL_SIZE", 10 * 1024 * 1024 * 1024))  # 10 GB
+# Параллельный запуск нескольких пар (режим масштабирования): свои имена, порты и папка метрик у каждого экземпляра
+NAME_SUFFIX = os.environ.get("IPC_NAME_SUFFIX", "")
+PORT_OFFSET = int(os.environ.get("IPC_PORT_OFFSET", "0"))
+METRICS_DIR = os.environ.get("IPC_METRICS_DIR", ".")
+
+class BenchRun:
+    # Таймеры, пик памяти, задержки и файлы метрик одного конца пары. Файлы: <prefix>_metrics.csv и,
+    # у получателя, <prefix>_latency.csv / <prefix>_latency_hist.csv в IPC_METRICS_DIR.
+    # verify — узор отправителя или проверка получателя в режиме IPC_VERIFY (ipc/verify.py), иначе None.
+    # latency — вести ли гистограмму задержек (по умолчанию у получателя; в режиме запрос-ответ — у клиента)
+    def __init__(self, role, prefix, latency=None):
+        self.role = role
+        self.prefix = prefix
+        self.wall_start = time.perf_counter()  # с момента запуска, включая подключение
+        self.active_start = self.wall_start
+        self.bytes = 0
+        self.messages = 0
+        if latency is None:
+            latency = role == "receiver"
+        self.latency = LatencyHistogram() if latency else None
+        self.channel = None
+        self.verify = None
+        if VERIFY:
+            self.verify = PatternSource(CHUNK_SIZE) if role == "sender" else PatternCheck(CHUNK_SIZE)
+
+    def start(self):
+        # Канал установлен: дальше идёт активная передача. Если оркестратор ждёт этот процесс,
+        # второй процесс пары запускается теперь (концы, которые сами ждут подключения, сообщают раньше)
+        signal_ready()
+        self.active_start = time.perf_counter()
+        self.channel = MetricsChannel(self.role)
+
+    def record(self, nbytes, send_ns=None):
+        if send_ns is not None and self.latency is not None:
+            self.latency.record(time.monotonic_ns() - send_ns)
+        self.messages += 1
+        self.bytes += nbytes
+        self.channel.tick(self.bytes)
+
+    def finish(self):
+        end = time.perf_counter()
+        active_time = end - self.active_start
+        wall_time = end - self.wall_start
+        max_rss = peak_rss_mb()  # пик за весь процесс одним вызовом вместо замеров в цикле
+        byte_column = "bytes_sent" if self.role == "sender" else "bytes_received"
+        with open(os.path.join(METRICS_DIR, f"{self.prefix}_metrics.csv"), "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["active_time_sec", "wall_time_sec", byte_column, "rss_mb"])
+            w.writerow([f"{active_time:.6f}", f"{wall_time:.6f}", self.bytes, f"{max_rss:.2f}"])
+        if self.latency is not None:
+            self.latency.write_csv(os.path.join(METRICS_DIR, self.prefix))
+        if self.verify is not None:
+            self.verify.write_csv(os.path.join(METRICS_DIR, self.prefix))
+        self.channel.finish(self.bytes, active_time, wall_time, max_rss)
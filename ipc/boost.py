@@ -0,0 +1,181 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import time
+
+from .channel import Channel
+from .pages import map_file, segment_path, segment_size
+from .seqsync import SYNC_CODES, SYNC_MODES, SeqCounter
+
+# Сегмент /dev/shm/BoostSharedMem<suffix> (hugetlb — на hugetlbfs, см. ipc/pages.py), общий с boost_int/*.cpp.
+# Отправитель на C++ создаёт управляемый сегмент Boost.Interprocess с именованными объектами "Buffer" (заголовок)
+# и "Data" (буфер) — см. boost_int/boost_segment.hpp; найти их по имени Python не может, поэтому смещения объектов
+# от начала файла сегмента лежат в индексе /dev/shm/BoostSharedMem<suffix>_index. Отправитель на Python создаёт
+# простой сегмент: заголовок с нуля, данные с RAW_DATA_OFFSET, и такой же индекс с managed = 0.
+# boost::interprocess::interprocess_semaphore на Linux — это межпроцессный POSIX sem_t, поэтому Python работает
+# с теми же семафорами через libc. Смещения полей — от начала заголовка
+INDEX = struct.Struct("QQQ")  # managed (1 — сегмент Boost), смещение заголовка, смещение данных
+SEM_SIZE = 32             # sizeof(sem_t) на 64-битном Linux
+MEM_LOCK_OFFSET = 0       # буфер свободен
+CLIENT_READY_OFFSET = 32  # данные в буфере готовы
+SERVER_READY_OFFSET = 64  # получатель забрал данные
+MESSAGE_INFO_OFFSET = 96  # метка отправки (monotonic, нс), длина сообщения и размер буфера
+MESSAGE_INFO = struct.Struct("QQQ")
+SYNC_OFFSET = 120         # режим синхронизации (ipc/seqsync.py): 0 — семафоры, 1 — счётчики и futex
+SYNC = struct.Struct("Q")
+READY_OFFSET = 128        # режим futex: сколько сообщений записано (за ним через 8 байт — число спящих)
+DONE_OFFSET = 192         # режим futex: сколько сообщений получатель забрал, в отдельной кэш-линии
+RAW_DATA_OFFSET = 4096    # данные простого сегмента начинаются со следующей страницы
+EOF_TIMEOUT = 1.0         # получатель мог уже выйти: буфер для сообщения конца потока ждём не дольше этого
+
+libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+class timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+def sem_call(func, *args):
+    # Повторяем вызов, прерванный сигналом
+    while func(*args) != 0:
+        err = ctypes.get_errno()
+        if err != 4:  # EINTR
+            raise OSError(err, os.strerror(err))
+
+def sem_spin(sem, limit):
+    # До limit попыток sem_trywait без сна, затем обычный sem_wait
+    for _ in range(limit):
+        if libc.sem_trywait(sem) == 0:
+            return
+        err = ctypes.get_errno()
+        if err not in (4, 11):  # EINTR, EAGAIN
+            raise OSError(err, os.strerror(err))
+    sem_call(libc.sem_wait, sem)
+
+def index_path(suffix):
+    return f"/dev/shm/BoostSharedMem{suffix}_index"
+
+def read_index(suffix):
+    with open(index_path(suffix), "rb") as f:
+        return INDEX.unpack(f.read(INDEX.size))
+
+def write_index(suffix, managed, header_offset, data_offset):
+    path = index_path(suffix)
+    if os.path.exists(path):
+        os.unlink(path)
+    with open(path, "xb") as f:
+        f.write(INDEX.pack(managed, header_offset, data_offset))
+
+class BoostChannel(Channel):
+    # Один буфер и три семафора, как в boost_int/*.cpp: отправитель ждёт mem_lock, пишет сообщение, поднимает
+    # client_ready и ждёт server_ready; получатель копирует сообщение и поднимает mem_lock и server_ready.
+    # spin — сколько раз попробовать sem_trywait, прежде чем уснуть в sem_wait (0 — сразу спать).
+    # sync="futex" (задаёт создатель в заголовке) — вместо семафоров счётчики ready/done с опросом и сном на futex
+    def __init__(self, suffix, fd, owner, pages=None, spin=0):
+        super().__init__()
+        self.path = segment_path(f"BoostSharedMem{suffix}", pages)
+        self.index = index_path(suffix)
+        self.owner = owner
+        self.spin = spin
+        _, self.header, data_offset = read_index(suffix)
+        self.mapfile = map_file(fd, os.fstat(fd).st_size, pages)
+        os.close(fd)
+        self.base = ctypes.addressof(ctypes.c_char.from_buffer(self.mapfile))
+        self.view = memoryview(self.mapfile)
+        self.buffer_size = MESSAGE_INFO.unpack_from(self.mapfile, self.header + MESSAGE_INFO_OFFSET)[2]
+        self.data = self.view[data_offset:data_offset + self.buffer_size]
+        self.futex = SYNC_MODES[SYNC.unpack_from(self.mapfile, self.header + SYNC_OFFSET)[0]] == "futex"
+        self.sequence = 0  # отправителю — сколько сообщений записано, получателю — сколько забрано
+        if self.futex:
+            self.ready = SeqCounter(self.mapfile, self.header + READY_OFFSET)
+            self.done = SeqCounter(self.mapfile, self.header + DONE_OFFSET)
+
+    @classmethod
+    def create(cls, buffer_size, suffix="", pages=None, spin=0, sync="sem"):
+        path = segment_path(f"BoostSharedMem{suffix}", pages)
+        if os.path.exists(path):
+            os.unlink(path)
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o666)
+        os.ftruncate(fd, segment_size(RAW_DATA_OFFSET + buffer_size, pages))
+        # Заголовок пишется через отображение всего файла с теми же страницами: отображение hugetlbfs должно быть
+        # кратно huge page, а страница, выделенная без MADV_HUGEPAGE, не даст собрать THP в начале сегмента
+        with map_file(fd, os.fstat(fd).st_size, {**(pages or {}), "prefault": False}) as header:
+            MESSAGE_INFO.pack_into(header, MESSAGE_INFO_OFFSET, 0, 0, buffer_size)
+            SYNC.pack_into(header, SYNC_OFFSET, SYNC_CODES[sync])
+            base = ctypes.addressof(ctypes.c_char.from_buffer(header))
+            for offset, value in ((MEM_LOCK_OFFSET, 1), (CLIENT_READY_OFFSET, 0), (SERVER_READY_OFFSET, 0)):
+                sem_call(libc.sem_init, ctypes.c_void_p(base + offset), 1, value)
+            del base
+        write_index(suffix, 0, 0, RAW_DATA_OFFSET)
+        return cls(suffix, fd, owner=True, pages=pages, spin=spin)
+
+    @classmethod
+    def open(cls, suffix="", pages=None, spin=0):
+        return cls(suffix, os.open(segment_path(f"BoostSharedMem{suffix}", pages), os.O_RDWR), owner=False,
+                   pages=pages, spin=spin)
+
+    def sem(self, offset):
+        return ctypes.c_void_p(self.base + self.header + offset)
+
+    def wait(self, offset):
+        if self.spin:
+            sem_spin(self.sem(offset), self.spin)
+        else:
+            sem_call(libc.sem_wait, self.sem(offset))
+
+    def write_message(self, buf, send_ns=None):
+        nbytes = len(buf)
+        if nbytes > self.buffer_size:
+            raise ValueError(f"Сообщение {nbytes} байт больше буфера {self.buffer_size}")
+        if send_ns is None:
+            send_ns = time.monotonic_ns()# метка ставится, когда буфер уже свободен: ожидание в задержку не входит
+        self.data[:nbytes] = buf
+        struct.pack_into("QQ", self.mapfile, self.header + MESSAGE_INFO_OFFSET, send_ns, nbytes)
+        if self.futex:
+            self.sequence += 1
+            self.ready.advance(self.sequence)
+        else:
+            sem_call(libc.sem_post, self.sem(CLIENT_READY_OFFSET))
+
+    def send(self, buf):
+        if self.futex:
+            self.done.wait_above(self.sequence - 1)# буфер свободен, когда получатель забрал всё записанное
+            self.write_message(buf)
+            self.done.wait_above(self.sequence - 1)
+            return
+        self.wait(MEM_LOCK_OFFSET)
+        self.write_message(buf)
+        self.wait(SERVER_READY_OFFSET)# ждём, пока получатель заберёт данные
+
+    def recv_into(self, buf):
+        if self.futex:
+            self.ready.wait_above(self.sequence)
+        else:
+            self.wait(CLIENT_READY_OFFSET)
+        self.last_send_ns, nbytes, _ = MESSAGE_INFO.unpack_from(self.mapfile, self.header + MESSAGE_INFO_OFFSET)
+        memoryview(buf)[:nbytes] = self.data[:nbytes]
+        if self.futex:
+            self.sequence += 1
+            self.done.advance(self.sequence)
+            return nbytes
+        sem_call(libc.sem_post, self.sem(MEM_LOCK_OFFSET))
+        if nbytes:# на сообщение конца потока отправитель подтверждения не ждёт
+            sem_call(libc.sem_post, self.sem(SERVER_READY_OFFSET))
+        return nbytes
+
+    def close(self):
+        if self.owner:
+            if self.futex:
+                free = self.done.wait_above(self.sequence - 1, EOF_TIMEOUT) is not None
+            else:
+                deadline = time.clock_gettime(time.CLOCK_REALTIME) + EOF_TIMEOUT
+                abs_timeout = timespec(int(deadline), int(deadline % 1 * 1e9))
+                free = libc.sem_timedwait(self.sem(MEM_LOCK_OFFSET), ctypes.byref(abs_timeout)) == 0
+            if free:
+                self.write_message(b"", 0)
+        self.data.release()
+        self.view.release()
+        self.base = None
+        self.mapfile.close()
+        if self.owner:
+            os.unlink(self.path)
+            os.unlink(self.index)
@@ -0,0 +1,41 @@
+class Channel:
+    # Общий интерфейс транспортов. Сообщение передаётся целиком: send(buf) отправляет его,
+    # recv_into(buf) кладёт следующее сообщение в buf и возвращает его длину. Длина 0 означает конец
+    # потока, поэтому пустые сообщения не передаются
+    def __init__(self):
+        self.last_send_ns = 0  # метка отправки последнего принятого сообщения (CLOCK_MONOTONIC, нс)
+
+    def send(self, buf):
+        raise NotImplementedError
+
+    def recv_into(self, buf):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class AsyncChannel:
+    # Тот же интерфейс для asyncio: send, recv_into и close — корутины, ожидание не блокирует цикл событий
+    def __init__(self):
+        self.last_send_ns = 0
+
+    async def send(self, buf):
+        raise NotImplementedError
+
+    async def recv_into(self, buf):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
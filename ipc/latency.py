@@ -0,0 +1,63 @@
+import csv
+
+# HDR-подобная гистограмма задержек: значения до SUB_BUCKETS нс хранятся точно,
+# дальше каждая степень двойки делится на HALF корзин (относительная погрешность < 1/HALF)
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+HALF = SUB_BUCKETS >> 1
+BUCKET_COUNT = SUB_BUCKETS + 64 * HALF  # хватает на любые 64-битные значения
+
+PERCENTILES = (("p50", 50.0), ("p90", 90.0), ("p99", 99.0), ("p999", 99.9))
+
+def bucket_index(value):
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS
+    return SUB_BUCKETS + (shift - 1) * HALF + ((value >> shift) - HALF)
+
+def bucket_upper(index):
+    # Наибольшее значение, попадающее в корзину index
+    if index < SUB_BUCKETS:
+        return index
+    k = index - SUB_BUCKETS
+    shift = k // HALF + 1
+    mantissa = k % HALF + HALF
+    return ((mantissa + 1) << shift) - 1
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.total = 0
+        self.max = 0
+
+    def record(self, value_ns):
+        if value_ns < 0:# часы отправителя и получателя общие (CLOCK_MONOTONIC), но на всякий случай
+            value_ns = 0
+        self.counts[bucket_index(value_ns)] += 1
+        self.total += 1
+        if value_ns > self.max:
+            self.max = value_ns
+
+    def percentile(self, p):
+        if self.total == 0:
+            return 0
+        target = max(1, int(self.total * p / 100.0 + 0.5))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(bucket_upper(index), self.max)
+        return self.max
+
+    def write_csv(self, prefix):
+        # <prefix>_latency.csv — сводка перцентилей, <prefix>_latency_hist.csv — сами корзины
+        with open(f"{prefix}_latency.csv", "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["count"] + [f"{name}_ns" for name, _ in PERCENTILES] + ["max_ns"])
+            w.writerow([self.total] + [self.percentile(p) for _, p in PERCENTILES] + [self.max])
+        with open(f"{prefix}_latency_hist.csv", "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["latency_ns", "count"])
+            for index, count in enumerate(self.counts):
+                if count:
+                    w.writerow([bucket_upper(index), count])
@@ -0,0 +1,121 @@
+import fcntl
+import os
+import socket
+import struct
+import time
+
+from .channel import Channel
+from .pages import map_file, segment_size
+from .ready import signal_ready
+
+# Передача буферов целиком (совпадает с memfd/*.cpp): на каждое сообщение отправитель создаёт анонимный файл
+# memfd_create, заполняет его на месте, запечатывает от записи и изменения размера и передаёт дескриптор через
+# AF_UNIX SOCK_SEQPACKET (SCM_RIGHTS), после чего закрывает свою копию. Буфер переходит получателю вместе
+# с владением, полезная нагрузка не копируется ни ядром, ни процессами. Пакет — заголовок FRAME и один дескриптор;
+# длина 0 без дескриптора — конец потока. Сокет живёт в абстрактном пространстве имён: после падения процесса
+# не остаётся ни файлов в /dev/shm, ни файла сокета, а пары с разными IPC_NAME_SUFFIX не мешают друг другу.
+# Страницы буферов — SHM_HUGEPAGES (hugetlb — MFD_HUGETLB без hugetlbfs) и SHM_PREFAULT, см. ipc/pages.py
+FRAME = struct.Struct("QQ")  # длина сообщения, метка отправки (monotonic, нс)
+SEALS = fcntl.F_SEAL_WRITE | fcntl.F_SEAL_SHRINK | fcntl.F_SEAL_GROW | fcntl.F_SEAL_SEAL
+
+def socket_address(suffix):
+    return f"\0ipc_memfd{suffix}"
+
+class MemfdChannel(Channel):
+    # Отправитель подключается (connect), получатель слушает (accept). Без копий: reserve(n) / publish()
+    # у отправителя и recv_view() / release() у получателя; send и recv_into — обычный интерфейс Channel
+    def __init__(self, sock, pages=None, listener=None):
+        super().__init__()
+        self.sock = sock
+        self.pages = pages or {}
+        self.listener = listener
+        self.sending = listener is None
+        self.flags = os.MFD_CLOEXEC | os.MFD_ALLOW_SEALING
+        if self.pages.get("hugepages") == "hugetlb":
+            self.flags |= os.MFD_HUGETLB
+        self.pending = None  # (дескриптор, длина, отображение, view) буфера из reserve()
+        self.mapping = None  # буфер, принятый recv_view() и ещё не отпущенный release()
+
+    @classmethod
+    def connect(cls, suffix="", pages=None):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        sock.connect(socket_address(suffix))
+        return cls(sock, pages)
+
+    @classmethod
+    def accept(cls, suffix="", pages=None):
+        # Блокируется до подключения отправителя
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        listener.bind(socket_address(suffix))
+        listener.listen(1)
+        signal_ready()  # отправитель может подключаться
+        conn, _ = listener.accept()
+        return cls(conn, pages, listener)
+
+    def reserve(self, nbytes):
+        # Новый буфер под сообщение nbytes байт; производитель заполняет view на месте и вызывает publish()
+        self.pending_ns = time.monotonic_ns()
+        size = segment_size(nbytes, self.pages)
+        fd = os.memfd_create("ipc_memfd", self.flags)
+        os.ftruncate(fd, size)
+        mapping = map_file(fd, size, self.pages)
+        view = memoryview(mapping)[:nbytes]
+        self.pending = (fd, nbytes, mapping, view)
+        return view
+
+    def publish(self):
+        # Буфер из reserve() запечатывается и уходит получателю, своя копия дескриптора закрывается
+        fd, nbytes, mapping, view = self.pending
+        self.pending = None
+        view.release()
+        mapping.close()  # F_SEAL_WRITE не ставится, пока буфер отображён на запись
+        fcntl.fcntl(fd, fcntl.F_ADD_SEALS, SEALS)
+        socket.send_fds(self.sock, [FRAME.pack(nbytes, self.pending_ns)], [fd])
+        os.close(fd)
+
+    def send(self, buf):
+        nbytes = len(buf)
+        self.reserve(nbytes)[:] = buf
+        self.publish()
+
+    def recv_view(self):
+        # Следующий буфер, отображённый только на чтение; пустой view — конец потока.
+        # Буфер освобождается release(), view нужно освободить до этого
+        data, fds, _, _ = socket.recv_fds(self.sock, FRAME.size, 1)
+        if len(data) != FRAME.size:
+            raise ConnectionError("Соединение закрыто до конца потока")
+        nbytes, self.last_send_ns = FRAME.unpack(data)
+        if not fds:
+            return memoryview(b"")
+        try:
+            # Без печати отправитель мог бы менять буфер и после передачи
+            if not fcntl.fcntl(fds[0], fcntl.F_GET_SEALS) & fcntl.F_SEAL_WRITE:
+                raise ValueError("Буфер memfd не запечатан от записи")
+            self.mapping = map_file(fds[0], os.fstat(fds[0]).st_size, self.pages, writable=False)
+        finally:
+            os.close(fds[0])  # отображение держит буфер и без дескриптора
+        return memoryview(self.mapping)[:nbytes]
+
+    def release(self):
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
+
+    def recv_into(self, buf):
+        view = self.recv_view()
+        nbytes = len(view)
+        memoryview(buf)[:nbytes] = view
+        view.release()
+        self.release()
+        return nbytes
+
+    def close(self):
+        if self.sending:
+            try:
+                self.sock.send(FRAME.pack(0, 0))# заголовок без дескриптора — конец потока
+            except BrokenPipeError:
+                pass# получатель принял весь объём и уже вышел
+        self.release()
+        self.sock.close()
+        if self.listener is not None:
+            self.listener.close()
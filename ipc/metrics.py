@@ -0,0 +1,60 @@
+import json
+import os
+import resource
+import socket
+import time
+
+# Периодические замеры процесса уходят сборщику оркестратора через UNIX datagram сокет IPC_METRICS_SOCKET.
+# Один замер — одна датаграмма с JSON; без переменной окружения канал ничего не отправляет
+SAMPLE_INTERVAL = 0.1  # секунды между промежуточными замерами
+
+def peak_rss_mb():
+    # Пиковый RSS процесса одним вызовом getrusage, без чтения /proc. Подробная динамика памяти и CPU
+    # снимается снаружи, опросом /proc/<pid> из оркестратора
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss в КБ
+
+class MetricsChannel:
+    def __init__(self, role):
+        self.role = role
+        self.run_id = os.environ.get("IPC_RUN_ID", "")
+        self.path = os.environ.get("IPC_METRICS_SOCKET")
+        self.sock = None
+        if self.path:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.setblocking(False)
+        self.start = time.perf_counter()  # канал создаётся в начале активной передачи
+        self.next_sample = self.start + SAMPLE_INTERVAL
+
+    def tick(self, nbytes):
+        # Вызывается на каждой итерации цикла передачи, замер отправляется не чаще раза в SAMPLE_INTERVAL
+        if self.sock is None:
+            return
+        now = time.perf_counter()
+        if now >= self.next_sample:
+            self.next_sample = now + SAMPLE_INTERVAL
+            elapsed = now - self.start
+            self.send(nbytes, elapsed, elapsed, peak_rss_mb(), False)
+
+    def finish(self, nbytes, active_time, wall_time, max_rss_mb):
+        # Итоговый замер с теми же значениями, что попадают в CSV метрик процесса
+        if self.sock is None:
+            return
+        self.send(nbytes, active_time, wall_time, max_rss_mb, True)
+        self.sock.close()
+        self.sock = None
+
+    def send(self, nbytes, active_time, wall_time, memory_mb, final):
+        sample = {
+            "run": self.run_id,
+            "role": self.role,
+            "pid": os.getpid(),
+            "final": final,
+            "wall_time_sec": wall_time,
+            "active_time_sec": active_time,
+            "bytes": nbytes,
+            "rss_mb": memory_mb,
+        }
+        try:
+            self.sock.sendto(json.dumps(sample).encode(), self.path)
+        except OSError:
+            pass  # сборщик не успевает или уже остановлен: замер теряется, передача данных важнее
@@ -0,0 +1,61 @@
+import mmap
+import os
+
+# Страницы сегментов разделяемой памяти (ipc/shm.py, ipc/boost.py; в C++ — common/shm_pages.hpp):
+#   hugepages ""        — обычные страницы 4 КБ в /dev/shm, как раньше
+#             "thp"     — тот же /dev/shm и madvise(MADV_HUGEPAGE); /dev/shm должен быть смонтирован с huge=advise
+#                         (или always/within_size), настройка shmem_enabled на файлы tmpfs не влияет
+#             "hugetlb" — файл сегмента на hugetlbfs (HUGETLB_DIR), нужен пул vm.nr_hugepages
+#   prefault  — все страницы сегмента отображаются при подключении (MAP_POPULATE), до начала замера,
+#               а не сбоями страниц на первом проходе по буферу
+SHM_DIR = "/dev/shm"
+HUGETLB_DIR = "/dev/hugepages"
+PAGE_SIZE = mmap.PAGESIZE
+HUGEPAGE_MODES = ("", "thp", "hugetlb")
+
+def settings_from_env():
+    # Параметры, которые оркестратор передаёт через окружение (варианты методов shm и boost)
+    settings = {
+        "hugepages": os.environ.get("SHM_HUGEPAGES", ""),
+        "prefault": os.environ.get("SHM_PREFAULT") == "1",
+        "hugetlb_dir": os.environ.get("HUGETLB_DIR", HUGETLB_DIR),
+    }
+    if settings["hugepages"] not in HUGEPAGE_MODES:
+        raise ValueError(f"Неизвестный режим SHM_HUGEPAGES: {settings['hugepages']}")
+    return settings
+
+def huge_page_size():
+    with open("/proc/meminfo") as f:
+        for line in f:
+            if line.startswith("Hugepagesize:"):
+                return int(line.split()[1]) * 1024
+    return 2 * 1024 * 1024
+
+def segment_path(name, pages):
+    # Файл сегмента: shm_open кладёт его в /dev/shm, hugetlb-сегмент живёт на смонтированной hugetlbfs
+    pages = pages or {}
+    if pages.get("hugepages") == "hugetlb":
+        return os.path.join(pages.get("hugetlb_dir", HUGETLB_DIR), name.lstrip("/"))
+    return os.path.join(SHM_DIR, name.lstrip("/"))
+
+def segment_size(size, pages):
+    # Файл на hugetlbfs и его отображение должны быть кратны размеру huge page
+    if (pages or {}).get("hugepages") == "hugetlb":
+        huge = huge_page_size()
+        return (size + huge - 1) // huge * huge
+    return size
+
+def map_file(fd, size, pages, writable=True):
+    # Отображение сегмента с выбранными страницами. Для THP совет даётся до первого обращения,
+    # поэтому предварительное заполнение идёт после madvise чтением по байту на страницу, а не MAP_POPULATE.
+    # writable=False — только чтение (буфер memfd, запечатанный от записи, иначе не отобразить)
+    pages = pages or {}
+    thp = pages.get("hugepages") == "thp"
+    populate = pages.get("prefault", False) and not thp
+    mapfile = mmap.mmap(fd, size, flags=mmap.MAP_SHARED | (mmap.MAP_POPULATE if populate else 0),
+                        prot=mmap.PROT_READ | (mmap.PROT_WRITE if writable else 0))
+    if thp:
+        mapfile.madvise(mmap.MADV_HUGEPAGE)
+        if pages.get("prefault", False):
+            mapfile[::PAGE_SIZE]  # чтение страницы разделяемой памяти выделяет её и отображает на запись
+    return mapfile
@@ -0,0 +1,154 @@
+import os
+import pickle
+import struct
+
+from .verify import SEQ
+
+# Структурированная нагрузка (IPC_PAYLOAD): вместо постоянного блока байт отправитель передаёт объекты Python,
+# сериализованные pickle протокола 5: массив NumPy (array), словарь массивов с метаданными (dict) или список мелких
+# записей (records). Данных в объекте около IPC_CHUNK_SIZE байт, в метриках объект учитывается как CHUNK_SIZE байт,
+# поэтому сообщений в секунду — это объектов в секунду. Записей не больше RECORDS_MAX: каждая — отдельный dict,
+# и 16 МиБ записей сериализуются десятые доли секунды; у records сравниваются объекты в секунду, а не МБ/с.
+# IPC_PICKLE=oob — данные массивов уходят вне потока pickle (buffer_callback, PickleBuffer) отдельными частями
+# сообщения: транспорт берёт их прямо из памяти массива (копия в слот shm, sendmsg, кадры zmq без склейки),
+# а получатель собирает массивы поверх принятого буфера, без копии. IPC_PICKLE=inband — обычный pickle.dumps:
+# массивы копируются в поток pickle и обратно в новые массивы при загрузке.
+# Сообщение — список частей: поток pickle, затем буферы. Транспортам с одним буфером на сообщение (shm, сокеты)
+# части передаются склеенными gather(): заголовок PARTS (число частей, длины), части выровнены по ALIGN
+PAYLOAD = os.environ.get("IPC_PAYLOAD", "bytes")  # bytes — постоянный блок байт, без сериализации
+PICKLE = os.environ.get("IPC_PICKLE", "oob")
+PAYLOADS = ("array", "dict", "records")
+PICKLE_MODES = ("oob", "inband")
+RECORD_SIZE = 32  # данных в одной записи records, Б: четыре числа по 8 байт
+RECORDS_MAX = 16384  # записей в объекте records (512 КиБ данных): pickle и загрузка — около 7 мс на объект
+ALIGN = 64  # части выровнены по кэш-линии: массивы получателя не теряют выравнивания
+CAPACITY_SLACK = 4096  # запас буфера сообщения: номер объекта в потоке pickle меняет его длину
+PARTS = struct.Struct("<I")  # число частей, за ним длина каждой части (uint64)
+ZEROS = bytes(ALIGN)
+
+def check_payload():
+    # Проверка настройки из окружения: ValueError, если IPC_PAYLOAD или IPC_PICKLE неизвестны
+    if PAYLOAD != "bytes" and PAYLOAD not in PAYLOADS:
+        raise ValueError(f"Неизвестная нагрузка IPC_PAYLOAD={PAYLOAD}, ожидается bytes, {', '.join(PAYLOADS)}")
+    if PICKLE not in PICKLE_MODES:
+        raise ValueError(f"Неизвестный режим IPC_PICKLE={PICKLE}, ожидается {' или '.join(PICKLE_MODES)}")
+
+def make_object(kind, size):
+    import numpy as np  # нужен только в режиме структурированной нагрузки
+    if kind == "array":
+        return np.arange(max(1, size // 8), dtype=np.float64)
+    if kind == "dict":
+        half = max(1, size // 2)
+        return {"seq": 0, "name": "frame", "shape": (half,), "image": np.zeros(half, dtype=np.uint8),
+                "points": np.ones((max(1, (size - half) // 8), 2), dtype=np.float32)}
+    return [{"seq": 0, "id": i, "price": 100.0 + i, "qty": i % 100}
+            for i in range(max(1, min(size // RECORD_SIZE, RECORDS_MAX)))]
+
+def primary_array(obj):
+    # Массив, данные которого несут узор режима проверки; у списка записей его нет
+    if isinstance(obj, dict):
+        return obj["image"]
+    return None if isinstance(obj, list) else obj
+
+def dumps(obj, oob):
+    # Части сообщения: поток pickle, затем (oob) плоские memoryview на данные массивов, без копии
+    if not oob:
+        return [pickle.dumps(obj, protocol=5)]
+    buffers = []
+    data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    return [data] + [buffer.raw() for buffer in buffers]
+
+def loads(parts):
+    return pickle.loads(parts[0], buffers=parts[1:])
+
+def padding(nbytes):
+    return -nbytes % ALIGN
+
+def gather(parts):
+    # Буферы одного сообщения для транспорта с одним буфером: заголовок PARTS, затем части с выравниванием.
+    # Сами части не копируются: sendmsg берёт их списком, write_into копирует сразу в слот
+    lengths = [len(part) for part in parts]
+    header = PARTS.pack(len(parts)) + struct.pack(f"<{len(parts)}Q", *lengths)
+    buffers = [header, ZEROS[:padding(len(header))]]
+    for part, nbytes in zip(parts, lengths):
+        buffers += [part, ZEROS[:padding(nbytes)]]
+    return [buffer for buffer in buffers if len(buffer)]
+
+def scatter(view):
+    # Части сообщения из gather() — срезы принятого буфера, без копии
+    (count,) = PARTS.unpack_from(view, 0)
+    lengths = struct.unpack_from(f"<{count}Q", view, PARTS.size)
+    offset = PARTS.size + 8 * count
+    offset += padding(offset)
+    parts = []
+    for nbytes in lengths:
+        if offset + nbytes > len(view):
+            raise ValueError(f"Часть {nbytes} байт выходит за сообщение {len(view)}")
+        parts.append(view[offset:offset + nbytes])
+        offset += nbytes + padding(nbytes)
+    return parts
+
+def write_into(dst, buffers):
+    # Копирует буферы gather() подряд в dst (слот разделяемой памяти) и возвращает длину сообщения
+    view = memoryview(dst)
+    offset = 0
+    for buffer in buffers:
+        nbytes = len(buffer)
+        if offset + nbytes > len(view):
+            raise ValueError(f"Сообщение больше буфера {len(view)} байт")
+        view[offset:offset + nbytes] = buffer
+        offset += nbytes
+    return offset
+
+def message_capacity(chunk_size, kind=PAYLOAD, oob=PICKLE == "oob"):
+    # Размер буфера под одно сообщение gather(): обе стороны строят один и тот же объект и сериализуют его
+    return sum(len(buffer) for buffer in gather(dumps(make_object(kind, chunk_size), oob))) + CAPACITY_SLACK
+
+class PayloadSource:
+    # Отправитель: объект строится один раз, next_parts() сериализует его с номером очередного сообщения.
+    # В режиме проверки (verify — PatternSource) основной массив каждый раз новый и заполнен узором:
+    # массив прошлого сообщения ещё может читать транспорт (кадры zmq без копии)
+    def __init__(self, chunk_size, kind=PAYLOAD, oob=PICKLE == "oob", verify=None):
+        self.obj = make_object(kind, chunk_size)
+        self.oob = oob
+        self.verify = verify
+        self.seq = bytearray(SEQ.size)
+        self.messages = 0
+
+    def next_parts(self):
+        obj = self.obj
+        array = primary_array(obj)
+        if self.verify is not None:
+            if array is None:
+                self.verify.fill(self.seq)
+            else:
+                array = array.copy()
+                self.verify.fill(memoryview(array).cast("B"))
+                obj = {**obj, "image": array} if isinstance(obj, dict) else array
+        seq = SEQ.unpack(self.seq)[0] if self.verify is not None and array is None else self.messages
+        if isinstance(obj, dict):
+            obj["seq"] = seq
+        elif isinstance(obj, list):
+            obj[0]["seq"] = seq
+        self.messages += 1
+        return dumps(obj, self.oob)
+
+class PayloadSink:
+    # Получатель: consume(parts) собирает объект и отпускает его до возврата буфера транспорту — в режиме oob
+    # массивы объекта смотрят прямо в принятый буфер (слот shm, буфер сокета, кадр zmq).
+    # verify (PatternCheck) сверяет узор основного массива или номер первой записи
+    def __init__(self, verify=None):
+        self.verify = verify
+
+    def consume(self, parts):
+        obj = loads(parts)
+        if self.verify is not None:
+            array = primary_array(obj)
+            if array is None:
+                self.verify.check(SEQ.pack(obj[0]["seq"]))
+            else:
+                self.verify.check(memoryview(array).cast("B"))
+        del obj  # массивы поверх частей должны исчезнуть до их release()
+        for part in parts:
+            if isinstance(part, memoryview):
+                part.release()
@@ -0,0 +1,64 @@
+import os
+import time
+
+from .bench import BenchRun, CHUNK_SIZE, TOTAL_SIZE
+from .ready import signal_ready
+from .seqsync import spin_budget
+
+# Режим запрос-ответ (ping-pong): клиент (в оркестраторе — роль sender) отправляет сообщение CHUNK_SIZE байт
+# и ждёт его эхо, сервер (receiver) возвращает каждое сообщение как есть. Задержка — полный круг (RTT) на стороне
+# клиента: гистограмма в <prefix>_latency*.csv клиента. Число кругов — IPC_TOTAL_SIZE / IPC_CHUNK_SIZE,
+# перед ними один неучтённый круг-рукопожатие: сервер мог ещё не подключиться к каналу.
+# Формат и порядок сообщений совпадают с C++ версиями (*/pingpong_*.cpp, boost_int/boost_pingpong.cpp)
+WAIT_MODES = ("block", "spin")
+
+def role_from_argv(argv):
+    if len(argv) != 2 or argv[1] not in ("ping", "pong"):
+        raise SystemExit(f"Использование: {argv[0]} ping|pong")
+    return argv[1]
+
+def spin_from_env():
+    # SHM_WAIT для путей через разделяемую память: block — сразу сон на семафоре, spin — сначала до
+    # SHM_SPIN_LIMIT опросов без сна, затем семафор. Возвращает число опросов для spin= каналов;
+    # на одном CPU опроса нет (spin_budget), и spin ведёт себя как block
+    wait = os.environ.get("SHM_WAIT", "block")
+    if wait not in WAIT_MODES:
+        raise ValueError(f"Неизвестный режим SHM_WAIT: {wait}")
+    return spin_budget() if wait == "spin" else 0
+
+def ping(prefix, request, reply):
+    # request — канал к серверу, reply — обратно (для сокетов и ZeroMQ это один и тот же канал)
+    run = BenchRun("sender", prefix, latency=True)
+    buf = bytearray(b"A" * CHUNK_SIZE)
+    answer = bytearray(CHUNK_SIZE)
+    signal_ready()  # каналы созданы: рукопожатие ждёт сервер, которого оркестратор запустит по этому сигналу
+    request.send(buf)# рукопожатие
+    reply.recv_into(answer)
+    run.start()
+    while run.bytes < TOTAL_SIZE:
+        if run.verify:
+            run.verify.fill(buf)
+        start_ns = time.monotonic_ns()
+        request.send(buf)
+        nbytes = reply.recv_into(answer)
+        if nbytes != CHUNK_SIZE:
+            raise RuntimeError(f"Ответ {nbytes} байт вместо {CHUNK_SIZE}")
+        run.record(nbytes, start_ns)# задержка от начала отправки до получения ответа — RTT
+    run.finish()
+
+def pong(prefix, request, reply):
+    # Эхо-сервер: пустое сообщение в request — клиент закончил
+    run = BenchRun("receiver", prefix, latency=False)
+    buf = bytearray(CHUNK_SIZE)
+    reply.send(memoryview(buf)[:request.recv_into(buf)])# рукопожатие
+    run.start()
+    while True:
+        nbytes = request.recv_into(buf)
+        if nbytes == 0:
+            break
+        view = memoryview(buf)[:nbytes]
+        if run.verify:# режим проверки: CRC32 запроса
+            run.verify.check(view)
+        reply.send(view)
+        run.record(nbytes)
+    run.finish()
@@ -0,0 +1,129 @@
+import fcntl
+import os
+import stat
+import struct
+import sys
+import time
+
+from .channel import Channel
+from .ready import signal_ready
+
+# Поток кадров через именованный канал (FIFO) или унаследованный пайп (совпадает с pipes/*.cpp): заголовок FRAME
+# (длина, метка отправки), затем данные; длина 0 — конец потока. FIFO создаёт получатель и удаляет его, как только
+# подключился отправитель; путь "-" — stdout отправителя и stdin получателя (конвейер оболочки, тот же пайп ядра).
+# Получатель читает данные сообщения и начало следующего заголовка одним readv, поэтому в установившемся
+# режиме на сообщение уходит один системный вызов
+FRAME = struct.Struct("QQ")  # длина сообщения, метка отправки (monotonic, нс)
+OPEN_RETRIES = 100  # отправитель ждёт, пока получатель создаст FIFO
+OPEN_RETRY_DELAY = 0.05
+
+def set_pipe_size(fd, size):
+    # F_SETPIPE_SZ: ядро округляет размер вверх до степени двойки страниц, без CAP_SYS_RESOURCE — не больше
+    # /proc/sys/fs/pipe-max-size; при отказе остаётся прежний размер. Возвращает действующий размер
+    if size:
+        try:
+            fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, size)
+        except OSError as e:
+            print(f"[WARN] F_SETPIPE_SZ {size}: {e.strerror}, размер пайпа не изменён", file=sys.stderr)
+    return fcntl.fcntl(fd, fcntl.F_GETPIPE_SZ)
+
+class PipeChannel(Channel):
+    # Отправитель открывает канал на запись (writer), получатель создаёт FIFO и открывает его на чтение (reader)
+    def __init__(self, fd, sending):
+        super().__init__()
+        self.fd = fd
+        self.sending = sending
+        self.header = bytearray(FRAME.size)
+        self.header_view = memoryview(self.header)
+        self.header_got = 0  # байты следующего заголовка, прочитанные вместе с прошлым сообщением
+
+    @classmethod
+    def writer(cls, path, pipe_size=0):
+        if path == "-":
+            fd = sys.stdout.fileno()
+        else:
+            for attempt in range(OPEN_RETRIES):
+                try:
+                    fd = os.open(path, os.O_WRONLY)
+                    break
+                except FileNotFoundError:
+                    if attempt == OPEN_RETRIES - 1:
+                        raise
+                    time.sleep(OPEN_RETRY_DELAY)
+        if not stat.S_ISFIFO(os.fstat(fd).st_mode):
+            raise ValueError(f"{path} — не пайп")
+        channel = cls(fd, sending=True)
+        channel.pipe_size = set_pipe_size(fd, pipe_size)
+        return channel
+
+    @classmethod
+    def reader(cls, path):
+        # Блокируется до подключения отправителя; FIFO прошлого (упавшего) запуска пересоздаётся
+        if path == "-":
+            return cls(sys.stdin.fileno(), sending=False)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        os.mkfifo(path, 0o600)
+        signal_ready()  # отправитель может открывать FIFO
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        finally:
+            os.unlink(path)  # оба конца открыты, имя больше не нужно
+        return cls(fd, sending=False)
+
+    def write_all(self, buffers):
+        # writev заголовка и данных; в блокирующий пайп запись проходит целиком, цикл — на случай сигнала
+        views = [memoryview(b) for b in buffers]
+        while views:
+            written = os.writev(self.fd, views)
+            while views and written >= len(views[0]):
+                written -= len(views[0])
+                views.pop(0)
+            if views and written:
+                views[0] = views[0][written:]
+
+    def send(self, buf):
+        self.write_all([FRAME.pack(len(buf), time.monotonic_ns()), buf])
+
+    def splice(self, fd, offset, count):
+        # Кадр, данные которого ядро переносит в пайп ссылками на страницы файла fd (os.splice), без копии.
+        # Страницы нельзя менять, пока получатель их не прочитал: в пайпе помещается не больше pipe_size байт
+        os.write(self.fd, FRAME.pack(count, time.monotonic_ns()))
+        end = offset + count
+        while offset < end:
+            offset += os.splice(fd, self.fd, end - offset, offset_src=offset)
+
+    def read_some(self, buffers):
+        n = os.readv(self.fd, buffers)
+        if n == 0:
+            raise ConnectionError("Пайп закрыт посреди кадра")
+        return n
+
+    def recv_into(self, buf):
+        while self.header_got < FRAME.size:
+            self.header_got += self.read_some([self.header_view[self.header_got:]])
+        length, self.last_send_ns = FRAME.unpack(self.header)
+        self.header_got = 0
+        if length == 0:
+            return 0
+        view = memoryview(buf)
+        if length > len(view):
+            raise ValueError(f"Кадр {length} байт больше буфера {len(view)}")
+        view = view[:length]
+        got = 0
+        while got < length:
+            # Остаток данных и, если уже есть, начало следующего заголовка
+            got += self.read_some([view[got:], self.header_view])
+        self.header_got = got - length
+        return length
+
+    def close(self):
+        if self.sending:
+            try:
+                os.write(self.fd, FRAME.pack(0, 0))# пустой кадр — приёмник понимает, что отправка окончена
+            except BrokenPipeError:
+                pass# получатель принял весь объём и уже вышел
+        if self.fd > 2:
+            os.close(self.fd)
@@ -0,0 +1,17 @@
+import os
+
+# Сигнал готовности оркестратору (совпадает с common/ready.hpp): процесс пары, который стартует первым, получает
+# в IPC_READY_FD пишущий конец пайпа и пишет в него байт, как только второй процесс может подключаться
+# (сегмент создан, сокет слушает, FIFO существует). Оркестратор запускает второй процесс сразу по этому байту,
+# без фиксированных пауз. Без переменной окружения (ручной запуск) ничего не делает, повторный вызов — тоже
+
+def signal_ready():
+    fd = os.environ.pop("IPC_READY_FD", None)
+    if fd is None:
+        return
+    try:
+        os.write(int(fd), b"R")
+    except OSError:
+        pass  # оркестратор уже не ждёт
+    finally:
+        os.close(int(fd))
@@ -0,0 +1,103 @@
+import ctypes
+import ctypes.util
+import os
+import platform
+import struct
+import time
+
+# Синхронизация передачи через счётчики в самом сегменте (SHM_SYNC=futex), общая с common/seq_sync.hpp.
+# Счётчик — u64, который только растёт (записано / прочитано сообщений); через WAITERS_SHIFT байт за ним лежит
+# u32 — сколько процессов спит на этом счётчике. Ожидающий сначала читает счётчик в цикле без системных вызовов,
+# затем регистрируется в waiters и засыпает на futex младших 32 бит счётчика. Пишущий сдвигает счётчик и зовёт
+# FUTEX_WAKE, только если кто-то спит, поэтому при встречном темпе передача обходится без обращений к ядру.
+# Бюджет опроса адаптивный: удачный опрос удваивает его (до SHM_SPIN_LIMIT), сон — уменьшает вдвое
+SYNC_MODES = ("sem", "futex")
+SYNC_CODES = {"sem": 0, "futex": 1}  # так режим записан в заголовке сегмента
+WAITERS_SHIFT = 8
+SPIN_LIMIT = int(os.environ.get("SHM_SPIN_LIMIT", "10000"))
+SPIN_MIN = 16
+
+COUNTER = struct.Struct("Q")
+WAITERS = struct.Struct("I")
+SEQ_CST = 5  # __ATOMIC_SEQ_CST
+FUTEX_WAIT = 0
+FUTEX_WAKE = 1
+SYS_FUTEX = {"x86_64": 202, "aarch64": 98}.get(platform.machine())
+INT_MAX = 2 ** 31 - 1
+
+libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+# Атомарные запись и сложение с полным барьером — из libatomic (та же реализация, что у GCC в C++)
+ATOMIC_LIB = ctypes.util.find_library("atomic")
+libatomic = ctypes.CDLL(ATOMIC_LIB) if ATOMIC_LIB else None
+atomic_store = atomic_add = atomic_sub = None
+if libatomic is not None:
+    # Берём функции здесь: внутри класса имена __atomic_* исказил бы name mangling
+    atomic_store = libatomic.__atomic_store_8
+    atomic_store.argtypes = (ctypes.c_void_p, ctypes.c_uint64, ctypes.c_int)
+    atomic_store.restype = None
+    atomic_add = libatomic.__atomic_fetch_add_4
+    atomic_sub = libatomic.__atomic_fetch_sub_4
+    for func in (atomic_add, atomic_sub):
+        func.argtypes = (ctypes.c_void_p, ctypes.c_uint32, ctypes.c_int)
+        func.restype = ctypes.c_uint32
+
+class timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+def sync_from_env():
+    sync = os.environ.get("SHM_SYNC", "sem")
+    if sync not in SYNC_MODES:
+        raise ValueError(f"Неизвестный режим SHM_SYNC: {sync}")
+    return sync
+
+def spin_budget():
+    # На одном доступном CPU опрос бесполезен: пишущий не получит процессор, пока ожидающий крутится
+    return SPIN_LIMIT if len(os.sched_getaffinity(0)) > 1 else 0
+
+class SeqCounter:
+    # Счётчик по смещению offset в отображении mapfile. Один процесс его двигает (advance), другой ждёт (wait_above)
+    def __init__(self, mapfile, offset):
+        if libatomic is None or SYS_FUTEX is None:
+            raise RuntimeError("SHM_SYNC=futex требует libatomic и Linux x86_64/aarch64")
+        self.mapfile = mapfile
+        self.offset = offset
+        self.address = ctypes.addressof(ctypes.c_char.from_buffer(mapfile, offset))
+        self.waiters_address = self.address + WAITERS_SHIFT
+        self.spin_max = spin_budget()
+        self.spin = self.spin_max
+
+    def load(self):
+        return COUNTER.unpack_from(self.mapfile, self.offset)[0]
+
+    def advance(self, value):
+        # Запись с полным барьером: либо ожидающий увидит новое значение, либо мы увидим его в waiters
+        atomic_store(self.address, value, SEQ_CST)
+        if WAITERS.unpack_from(self.mapfile, self.offset + WAITERS_SHIFT)[0]:
+            libc.syscall(ctypes.c_long(SYS_FUTEX), ctypes.c_void_p(self.address), FUTEX_WAKE, INT_MAX, None, None, 0)
+
+    def wait_above(self, target, timeout=None):
+        # Ждём, пока счётчик станет больше target; возвращает значение или None по истечении timeout секунд
+        for _ in range(self.spin):
+            value = self.load()
+            if value > target:
+                self.spin = min(self.spin_max, self.spin * 2)
+                return value
+        self.spin = max(min(SPIN_MIN, self.spin_max), self.spin // 2)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            atomic_add(self.waiters_address, 1, SEQ_CST)
+            value = self.load()
+            if value <= target:
+                pause = None
+                if deadline is not None:
+                    left = max(0.0, deadline - time.monotonic())
+                    pause = ctypes.byref(timespec(int(left), int(left % 1 * 1e9)))
+                # Ядро сверит младшие 32 бита счётчика с value: если счётчик уже сдвинулся, сна не будет
+                libc.syscall(ctypes.c_long(SYS_FUTEX), ctypes.c_void_p(self.address), FUTEX_WAIT,
+                             ctypes.c_uint32(value & 0xFFFFFFFF), pause, None, 0)
+                value = self.load()
+            atomic_sub(self.waiters_address, 1, SEQ_CST)
+            if value > target:
+                return value
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
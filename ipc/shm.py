@@ -0,0 +1,323 @@
+import asyncio
+import os
+import socket
+import struct
+import time
+
+import posix_ipc
+
+from .channel import AsyncChannel, Channel
+from .pages import map_file, segment_path, segment_size
+from .ready import signal_ready
+from .seqsync import SYNC_CODES, SYNC_MODES, SeqCounter
+
+# Раскладка сегмента, общая с posix_shared_memory/*.cpp: страница заголовка, затем slots слотов по slot_size байт
+HEADER_SIZE = 4096        # заголовок занимает целую страницу, слоты выровнены по странице
+SEGMENT_INFO = struct.Struct("QQ")  # смещение 0: число слотов и размер слота
+SYNC_OFFSET = 16          # режим синхронизации (ipc/seqsync.py): 0 — семафоры, 1 — счётчики head/tail и futex
+HEAD_OFFSET = 64          # head (счётчик записанных сообщений) в отдельной кэш-линии
+TAIL_OFFSET = 128         # tail (счётчик прочитанных сообщений) в отдельной кэш-линии
+# В режиме futex за head и tail (через 8 байт) лежат u32 — число процессов, спящих на счётчике
+SLOT_INFO_OFFSET = 256    # по записи на слот: метка отправки (monotonic, нс) и длина сообщения
+SLOT_INFO = struct.Struct("QQ")
+COUNTER = struct.Struct("Q")
+MAX_SLOTS = (HEADER_SIZE - SLOT_INFO_OFFSET) // SLOT_INFO.size
+NOTIFY_PATH = "/tmp/ipc_shm_notify{}.sock"  # через этот unix-сокет асинхронный получатель забирает eventfd отправителя
+EOF_TIMEOUT = 1.0  # получатель мог уже выйти: слот для сообщения конца потока ждём не дольше этого
+
+def map_segment(name, flags=0, size=0, pages=None):
+    # pages — страницы сегмента (см. ipc/pages.py); hugetlb-сегмент создаётся файлом на hugetlbfs, а не shm_open
+    if (pages or {}).get("hugepages") == "hugetlb":
+        fd = os.open(segment_path(name, pages), os.O_RDWR | (os.O_CREAT | os.O_EXCL if flags else 0), 0o666)
+        if flags:
+            os.ftruncate(fd, segment_size(size, pages))
+        size = os.fstat(fd).st_size
+    else:
+        shm = posix_ipc.SharedMemory(name, flags, size=size)
+        fd, size = shm.fd, shm.size
+    mapfile = map_file(fd, size, pages)
+    os.close(fd)# дальше работаем через отображение
+    return mapfile
+
+def unlink_segment(name, pages=None):
+    if (pages or {}).get("hugepages") == "hugetlb":
+        os.unlink(segment_path(name, pages))
+    else:
+        posix_ipc.unlink_shared_memory(name)
+
+class ShmChannel(Channel):
+    # Кольцо слотов в POSIX shared memory; sem_empty считает свободные слоты, sem_full — заполненные.
+    # Отправитель создаёт сегмент (create), получатель подключается к нему (open).
+    # spin — сколько раз проверить счётчики head/tail сегмента, прежде чем уснуть на семафоре (0 — сразу спать).
+    # Если слот освободился за время опроса, семафор берётся уже готовым, и его sem_post не будит спящего.
+    # sync="futex" (задаёт создатель в заголовке сегмента) — вместо семафоров ждать сами счётчики head/tail
+    # с адаптивным опросом и сном на futex (SeqCounter); семафоры тогда создаются, но не используются
+    def __init__(self, suffix, mapfile, sem_empty, sem_full, owner, pages=None, spin=0):
+        super().__init__()
+        self.suffix = suffix
+        self.mapfile = mapfile
+        self.pages = pages
+        self.sem_empty = sem_empty
+        self.sem_full = sem_full
+        self.owner = owner
+        self.spin = spin
+        self.slots, self.slot_size = SEGMENT_INFO.unpack_from(mapfile, 0)
+        self.sync = SYNC_MODES[COUNTER.unpack_from(mapfile, SYNC_OFFSET)[0]]
+        if self.sync == "futex":
+            self.head_counter = SeqCounter(mapfile, HEAD_OFFSET)
+            self.tail_counter = SeqCounter(mapfile, TAIL_OFFSET)
+        self.view = memoryview(mapfile)
+        self.slot_views = [self.view[HEADER_SIZE + k * self.slot_size:HEADER_SIZE + (k + 1) * self.slot_size]
+                           for k in range(self.slots)]
+        self.head = 0
+        self.tail = 0
+        self.pending_ns = 0
+
+    @classmethod
+    def create(cls, slot_size, slots=1, suffix="", pages=None, spin=0, sync="sem"):
+        if not 1 <= slots <= MAX_SLOTS:
+            raise ValueError(f"Число слотов должно быть от 1 до {MAX_SLOTS}")
+        mapfile = map_segment(f"/my_shm{suffix}", posix_ipc.O_CREX, HEADER_SIZE + slots * slot_size, pages)
+        SEGMENT_INFO.pack_into(mapfile, 0, slots, slot_size)
+        COUNTER.pack_into(mapfile, SYNC_OFFSET, SYNC_CODES[sync])
+        COUNTER.pack_into(mapfile, HEAD_OFFSET, 0)
+        COUNTER.pack_into(mapfile, TAIL_OFFSET, 0)
+        sem_empty = posix_ipc.Semaphore(f"/sem_empty{suffix}", posix_ipc.O_CREX, initial_value=slots)
+        sem_full = posix_ipc.Semaphore(f"/sem_full{suffix}", posix_ipc.O_CREX, initial_value=0)
+        return cls(suffix, mapfile, sem_empty, sem_full, owner=True, pages=pages, spin=spin)
+
+    @classmethod
+    def open(cls, suffix="", pages=None, spin=0):
+        mapfile = map_segment(f"/my_shm{suffix}", pages=pages)
+        sem_empty = posix_ipc.Semaphore(f"/sem_empty{suffix}")
+        sem_full = posix_ipc.Semaphore(f"/sem_full{suffix}")
+        return cls(suffix, mapfile, sem_empty, sem_full, owner=False, pages=pages, spin=spin)
+
+    def reserve(self):
+        # Ждём свободный слот и отдаём memoryview на него: производитель может заполнить слот на месте
+        # метка ставится, когда слот уже получен: как у сокетов и каналов, ожидание места в задержку не входит
+        if self.sync == "futex":
+            self.tail_counter.wait_above(self.head - self.slots)
+        else:
+            for _ in range(self.spin):
+                if self.head - COUNTER.unpack_from(self.mapfile, TAIL_OFFSET)[0] < self.slots:
+                    break
+            self.sem_empty.acquire()
+        self.pending_ns = time.monotonic_ns()
+        return self.slot_views[self.head % self.slots]
+
+    def publish(self, nbytes):
+        # Слот, полученный из reserve(), становится видим получателю
+        index = self.head % self.slots
+        SLOT_INFO.pack_into(self.mapfile, SLOT_INFO_OFFSET + index * SLOT_INFO.size, self.pending_ns, nbytes)
+        self.head += 1
+        if self.sync == "futex":
+            self.head_counter.advance(self.head)
+            return
+        COUNTER.pack_into(self.mapfile, HEAD_OFFSET, self.head)
+        self.sem_full.release()
+
+    def send(self, buf):
+        nbytes = len(buf)
+        if nbytes > self.slot_size:
+            raise ValueError(f"Сообщение {nbytes} байт больше слота {self.slot_size}")
+        self.reserve()[:nbytes] = buf
+        self.publish(nbytes)
+
+    def recv_view(self):
+        # Ждём заполненный слот и отдаём memoryview на сообщение прямо в разделяемой памяти.
+        # Слот возвращается отправителю только после release(), view нужно освободить до close()
+        if self.sync == "futex":
+            self.head_counter.wait_above(self.tail)
+        else:
+            for _ in range(self.spin):
+                if COUNTER.unpack_from(self.mapfile, HEAD_OFFSET)[0] > self.tail:
+                    break
+            self.sem_full.acquire()
+        index = self.tail % self.slots
+        self.last_send_ns, nbytes = SLOT_INFO.unpack_from(self.mapfile, SLOT_INFO_OFFSET + index * SLOT_INFO.size)
+        return self.slot_views[index][:nbytes]
+
+    def release(self):
+        self.tail += 1
+        if self.sync == "futex":
+            self.tail_counter.advance(self.tail)
+            return
+        COUNTER.pack_into(self.mapfile, TAIL_OFFSET, self.tail)
+        self.sem_empty.release()
+
+    def recv_into(self, buf):
+        view = self.recv_view()
+        nbytes = len(view)
+        memoryview(buf)[:nbytes] = view
+        view.release()
+        self.release()
+        return nbytes
+
+    def close(self):
+        if self.owner:
+            # Пустое сообщение — конец потока. Получатель мог уже выйти, поэтому слот ждём не дольше секунды
+            if self.sync == "futex":
+                if self.tail_counter.wait_above(self.head - self.slots, EOF_TIMEOUT) is not None:
+                    self.publish(0)
+            else:
+                try:
+                    self.sem_empty.acquire(EOF_TIMEOUT)
+                    self.publish(0)
+                except posix_ipc.BusyError:
+                    pass
+        for view in self.slot_views:# все memoryview нужно освободить до закрытия mmap
+            view.release()
+        self.view.release()
+        self.mapfile.close()
+        self.sem_empty.close()
+        self.sem_full.close()
+        if self.owner:
+            unlink_segment(f"/my_shm{self.suffix}", self.pages)
+            posix_ipc.unlink_semaphore(f"/sem_empty{self.suffix}")
+            posix_ipc.unlink_semaphore(f"/sem_full{self.suffix}")
+
+class AsyncShmChannel(AsyncChannel):
+    # То же кольцо слотов, но вместо семафоров — два eventfd: data (отправитель опубликовал слот) и
+    # space (получатель освободил слот). eventfd ждётся через loop.add_reader, поэтому сотни каналов
+    # живут в одном цикле событий без потока на канал. Дескрипторы передаются получателю через SCM_RIGHTS
+    def __init__(self, suffix, mapfile, data_fd, space_fd, owner):
+        super().__init__()
+        self.loop = asyncio.get_running_loop()
+        self.suffix = suffix
+        self.mapfile = mapfile
+        self.owner = owner
+        self.slots, self.slot_size = SEGMENT_INFO.unpack_from(mapfile, 0)
+        self.view = memoryview(mapfile)
+        self.slot_views = [self.view[HEADER_SIZE + k * self.slot_size:HEADER_SIZE + (k + 1) * self.slot_size]
+                           for k in range(self.slots)]
+        self.head = 0
+        self.tail = 0
+        self.pending_ns = 0
+        # Отправитель пишет в data и ждёт space, получатель — наоборот
+        self.notify_fd, self.wait_fd = (data_fd, space_fd) if owner else (space_fd, data_fd)
+        self.event = asyncio.Event()
+        self.loop.add_reader(self.wait_fd, self.on_notify)
+
+    @classmethod
+    async def create(cls, slot_size, slots=1, suffix=""):
+        # Создаёт сегмент и ждёт подключения получателя, чтобы передать ему eventfd
+        if not 1 <= slots <= MAX_SLOTS:
+            raise ValueError(f"Число слотов должно быть от 1 до {MAX_SLOTS}")
+        mapfile = map_segment(f"/my_shm{suffix}", posix_ipc.O_CREX, HEADER_SIZE + slots * slot_size)
+        SEGMENT_INFO.pack_into(mapfile, 0, slots, slot_size)
+        COUNTER.pack_into(mapfile, HEAD_OFFSET, 0)
+        COUNTER.pack_into(mapfile, TAIL_OFFSET, 0)
+        data_fd = os.eventfd(0, os.EFD_NONBLOCK)
+        space_fd = os.eventfd(0, os.EFD_NONBLOCK)
+        path = NOTIFY_PATH.format(suffix)
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(1)
+        listener.setblocking(False)
+        signal_ready()  # получатель может подключаться
+        loop = asyncio.get_running_loop()
+        try:
+            conn, _ = await loop.sock_accept(listener)
+            with conn:
+                socket.send_fds(conn, [b"E"], [data_fd, space_fd])
+        finally:
+            listener.close()
+            os.unlink(path)
+        return cls(suffix, mapfile, data_fd, space_fd, owner=True)
+
+    @classmethod
+    async def open(cls, suffix=""):
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.setblocking(False)
+        loop = asyncio.get_running_loop()
+        with conn:
+            await loop.sock_connect(conn, NOTIFY_PATH.format(suffix))
+            fut = loop.create_future()# recv_fds блокирующий, поэтому сначала ждём готовности сокета
+            loop.add_reader(conn.fileno(), fut.set_result, None)
+            try:
+                await fut
+            finally:
+                loop.remove_reader(conn.fileno())
+            _, (data_fd, space_fd), _, _ = socket.recv_fds(conn, 1, 2)
+        return cls(suffix, map_segment(f"/my_shm{suffix}"), data_fd, space_fd, owner=False)
+
+    def on_notify(self):
+        try:
+            os.eventfd_read(self.wait_fd)
+        except BlockingIOError:
+            pass
+        self.event.set()
+
+    async def wait_until(self, ready):
+        # Сначала проверяем кольцо без системных вызовов; ждём eventfd, только если условие не выполнено.
+        # Флаг сбрасывается до проверки, поэтому уведомление после неё не теряется
+        while True:
+            self.event.clear()
+            if ready():
+                return
+            await self.event.wait()
+
+    def free_slot(self):
+        return self.head - COUNTER.unpack_from(self.mapfile, TAIL_OFFSET)[0] < self.slots
+
+    def filled_slot(self):
+        return COUNTER.unpack_from(self.mapfile, HEAD_OFFSET)[0] > self.tail
+
+    async def reserve(self):
+        # метка ставится после ожидания свободного слота, как в ShmChannel.reserve
+        await self.wait_until(self.free_slot)
+        self.pending_ns = time.monotonic_ns()
+        return self.slot_views[self.head % self.slots]
+
+    def publish(self, nbytes):
+        index = self.head % self.slots
+        SLOT_INFO.pack_into(self.mapfile, SLOT_INFO_OFFSET + index * SLOT_INFO.size, self.pending_ns, nbytes)
+        self.head += 1
+        COUNTER.pack_into(self.mapfile, HEAD_OFFSET, self.head)
+        os.eventfd_write(self.notify_fd, 1)
+
+    async def send(self, buf):
+        nbytes = len(buf)
+        if nbytes > self.slot_size:
+            raise ValueError(f"Сообщение {nbytes} байт больше слота {self.slot_size}")
+        (await self.reserve())[:nbytes] = buf
+        self.publish(nbytes)
+
+    async def recv_view(self):
+        await self.wait_until(self.filled_slot)
+        index = self.tail % self.slots
+        self.last_send_ns, nbytes = SLOT_INFO.unpack_from(self.mapfile, SLOT_INFO_OFFSET + index * SLOT_INFO.size)
+        return self.slot_views[index][:nbytes]
+
+    def release(self):
+        self.tail += 1
+        COUNTER.pack_into(self.mapfile, TAIL_OFFSET, self.tail)
+        os.eventfd_write(self.notify_fd, 1)
+
+    async def recv_into(self, buf):
+        view = await self.recv_view()
+        nbytes = len(view)
+        memoryview(buf)[:nbytes] = view
+        view.release()
+        self.release()
+        return nbytes
+
+    async def close(self):
+        if self.owner:
+            try:
+                await asyncio.wait_for(self.reserve(), EOF_TIMEOUT)
+                self.publish(0)
+            except asyncio.TimeoutError:
+                pass
+        self.loop.remove_reader(self.wait_fd)
+        os.close(self.wait_fd)
+        os.close(self.notify_fd)
+        for view in self.slot_views:
+            view.release()
+        self.view.release()
+        self.mapfile.close()
+        if self.owner:
+            posix_ipc.unlink_shared_memory(f"/my_shm{self.suffix}")
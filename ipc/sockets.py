@@ -0,0 +1,261 @@
+import asyncio
+import os
+import socket
+import struct
+import time
+
+from .channel import AsyncChannel, Channel
+from .ready import signal_ready
+
+# Кадр: заголовок (длина полезной нагрузки и метка отправки, monotonic нс), затем данные; длина 0 — конец потока.
+# Формат совпадает с sockets/*.cpp
+FRAME_HEADER = struct.Struct("!QQ")
+SEQPACKET_SEGMENT = 64 * 1024  # максимальный размер пакета SOCK_SEQPACKET, должен совпадать у обеих сторон
+FAMILIES = {
+    "tcp": (socket.AF_INET, socket.SOCK_STREAM),
+    "unix": (socket.AF_UNIX, socket.SOCK_STREAM),
+    "seqpacket": (socket.AF_UNIX, socket.SOCK_SEQPACKET),
+}
+
+def sendmsg_all(sock, buffers):
+    # Отправляем заголовок и данные одним вызовом sendmsg, досылая остаток при частичной отправке
+    views = [memoryview(b) for b in buffers]
+    while views:
+        sent = sock.sendmsg(views)
+        while views and sent >= len(views[0]):
+            sent -= len(views[0])
+            views.pop(0)
+        if views and sent:
+            views[0] = views[0][sent:]
+
+def sendfile_all(sock, fd, offset, count):
+    # Передаём данные из файла ядром, минуя пространство пользователя
+    end = offset + count
+    while offset < end:
+        offset += os.sendfile(sock.fileno(), fd, offset, end - offset)
+
+def sysctl_max(path):
+    # Последнее число настройки вида "min default max" (net.ipv4.tcp_wmem, tcp_rmem)
+    try:
+        with open(path) as f:
+            return int(f.read().split()[-1])
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def send_packets(sock, header, chunk):
+    # SOCK_SEQPACKET сохраняет границы сообщений: заголовок идёт отдельным пакетом, данные — пакетами по SEQPACKET_SEGMENT
+    sock.send(header)
+    view = memoryview(chunk)
+    for offset in range(0, len(view), SEQPACKET_SEGMENT):
+        sock.send(view[offset:offset + SEQPACKET_SEGMENT])
+
+def recv_exact(conn, view, max_recv):
+    # Дочитываем ровно len(view) байт прямо в переданный буфер, без создания новых bytes.
+    # Для SOCK_SEQPACKET запрашиваем не больше одного пакета, иначе ядро обрежет его хвост
+    size = len(view)
+    got = 0
+    while got < size:
+        n = conn.recv_into(view[got:], min(size - got, max_recv))
+        if n == 0:
+            raise ConnectionError("Соединение закрыто посреди кадра")
+        got += n
+    return got
+
+def family_of(name):
+    if name not in FAMILIES:
+        raise ValueError(f"Неизвестное семейство сокетов: {name}")
+    return FAMILIES[name]
+
+def bind_tcp(port):
+    # SO_REUSEADDR: соединения прошлого запуска в TIME_WAIT не мешают привязке, а живого слушателя на порту
+    # не бывает — оркестратор даёт каждому прогону свой IPC_PORT_OFFSET
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    try:
+        sock.bind(("localhost", port))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+def bind_unix(sock_type, path):
+    # Unix-сокету не нужен TIME_WAIT: достаточно удалить файл сокета от прошлого запуска
+    sock = socket.socket(socket.AF_UNIX, sock_type)
+    if os.path.exists(path):
+        os.unlink(path)
+    sock.bind(path)
+    return sock
+
+class SocketChannel(Channel):
+    # Поток кадров через TCP, AF_UNIX stream или AF_UNIX SOCK_SEQPACKET. Отправитель подключается (connect),
+    # получатель слушает (accept); close() отправителя посылает пустой кадр конца потока
+    def __init__(self, sock, family, path=None, listener=None):
+        super().__init__()
+        self.sock = sock
+        self.family = family
+        self.path = path
+        self.listener = listener
+        self.sending = listener is None
+        self.max_recv = SEQPACKET_SEGMENT if family == "seqpacket" else 1 << 30
+        self.header = bytearray(FRAME_HEADER.size)
+        self.header_view = memoryview(self.header)
+
+    @classmethod
+    def connect(cls, family="tcp", path=None, port=5000):
+        sock_family, sock_type = family_of(family)
+        sock = socket.socket(sock_family, sock_type)
+        sock.connect(("localhost", port) if family == "tcp" else path)
+        return cls(sock, family)
+
+    @classmethod
+    def accept(cls, family="tcp", path=None, port=5000):
+        # Блокируется до подключения отправителя
+        _, sock_type = family_of(family)
+        listener = bind_tcp(port) if family == "tcp" else bind_unix(sock_type, path)
+        listener.listen(1)
+        signal_ready()  # отправитель может подключаться
+        conn, _ = listener.accept()
+        return cls(conn, family, path, listener)
+
+    def send(self, buf):
+        header = FRAME_HEADER.pack(len(buf), time.monotonic_ns())
+        if self.family == "seqpacket":
+            send_packets(self.sock, header, buf)
+        else:
+            sendmsg_all(self.sock, [header, buf])# заголовок и данные одним системным вызовом
+
+    def send_buffers(self, buffers):
+        # Кадр из нескольких буферов (например, частей сообщения ipc/payload.py) без склейки: заголовок и все
+        # буферы одним sendmsg; пакетам SOCK_SEQPACKET нужна непрерывная нагрузка, там буферы склеиваются
+        nbytes = sum(len(buffer) for buffer in buffers)
+        header = FRAME_HEADER.pack(nbytes, time.monotonic_ns())
+        if self.family == "seqpacket":
+            send_packets(self.sock, header, b"".join(buffers))
+        else:
+            sendmsg_all(self.sock, [header, *buffers])
+
+    def sendfile(self, fd, offset, count):
+        # Кадр, данные которого ядро берёт из файла fd; границы пакетов SOCK_SEQPACKET так не сохранить.
+        # Ядро может ссылаться на страницы файла, пока получатель их не прочитал (см. inflight_limit)
+        if self.family == "seqpacket":
+            raise ValueError("sendfile не сохраняет границы пакетов SOCK_SEQPACKET")
+        self.sock.sendall(FRAME_HEADER.pack(count, time.monotonic_ns()))
+        sendfile_all(self.sock, fd, offset, count)
+
+    def inflight_limit(self):
+        # Сколько отправленных, но ещё не прочитанных получателем байт может держать ядро: у TCP — буферы
+        # отправки и приёма с автоподстройкой до максимумов tcp_wmem и tcp_rmem, у AF_UNIX — оба буфера сокета
+        sndbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        rcvbuf = self.sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        if self.family == "tcp":
+            sndbuf = max(sndbuf, sysctl_max("/proc/sys/net/ipv4/tcp_wmem"))
+            rcvbuf = max(rcvbuf, sysctl_max("/proc/sys/net/ipv4/tcp_rmem"))
+        return sndbuf + rcvbuf
+
+    def recv_into(self, buf):
+        recv_exact(self.sock, self.header_view, self.max_recv)
+        length, self.last_send_ns = FRAME_HEADER.unpack(self.header)
+        if length == 0:
+            return 0
+        view = memoryview(buf)
+        if length > len(view):
+            raise ValueError(f"Кадр {length} байт больше буфера {len(view)}")
+        return recv_exact(self.sock, view[:length], self.max_recv)
+
+    def close(self):
+        if self.sending:
+            self.sock.sendall(FRAME_HEADER.pack(0, 0))# пустой кадр — приёмник понимает, что отправка окончена
+            self.sock.shutdown(socket.SHUT_WR)
+        self.sock.close()
+        if self.listener is not None:
+            self.listener.close()
+            if self.family != "tcp":
+                os.unlink(self.path)
+
+async def sendmsg_all_async(loop, sock, buffers):
+    # Сначала неблокирующий sendmsg; то, что не поместилось в буфер сокета, досылает цикл событий
+    views = [memoryview(b) for b in buffers]
+    try:
+        sent = sock.sendmsg(views)
+    except BlockingIOError:
+        sent = 0
+    for view in views:
+        if sent >= len(view):
+            sent -= len(view)
+            continue
+        await loop.sock_sendall(sock, view[sent:])
+        sent = 0
+
+async def recv_exact_async(loop, sock, view, max_recv):
+    size = len(view)
+    got = 0
+    while got < size:
+        n = await loop.sock_recv_into(sock, view[got:got + min(size - got, max_recv)])
+        if n == 0:
+            raise ConnectionError("Соединение закрыто посреди кадра")
+        got += n
+    return got
+
+class AsyncSocketChannel(AsyncChannel):
+    # SocketChannel для asyncio: тот же формат кадров, неблокирующие сокеты и loop.sock_*
+    def __init__(self, sock, family, path=None, listener=None):
+        super().__init__()
+        self.loop = asyncio.get_running_loop()
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.family = family
+        self.path = path
+        self.listener = listener
+        self.sending = listener is None
+        self.max_recv = SEQPACKET_SEGMENT if family == "seqpacket" else 1 << 30
+        self.header = bytearray(FRAME_HEADER.size)
+        self.header_view = memoryview(self.header)
+
+    @classmethod
+    async def connect(cls, family="tcp", path=None, port=5000):
+        sock_family, sock_type = family_of(family)
+        sock = socket.socket(sock_family, sock_type)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, ("localhost", port) if family == "tcp" else path)
+        return cls(sock, family)
+
+    @classmethod
+    async def accept(cls, family="tcp", path=None, port=5000):
+        _, sock_type = family_of(family)
+        listener = bind_tcp(port) if family == "tcp" else bind_unix(sock_type, path)
+        listener.listen(1)
+        signal_ready()  # отправитель может подключаться
+        listener.setblocking(False)
+        conn, _ = await asyncio.get_running_loop().sock_accept(listener)
+        return cls(conn, family, path, listener)
+
+    async def send(self, buf):
+        header = FRAME_HEADER.pack(len(buf), time.monotonic_ns())
+        if self.family == "seqpacket":
+            # Неблокирующая отправка пакета SOCK_SEQPACKET либо проходит целиком, либо не проходит вовсе
+            await self.loop.sock_sendall(self.sock, header)
+            view = memoryview(buf)
+            for offset in range(0, len(view), SEQPACKET_SEGMENT):
+                await self.loop.sock_sendall(self.sock, view[offset:offset + SEQPACKET_SEGMENT])
+        else:
+            await sendmsg_all_async(self.loop, self.sock, [header, buf])
+
+    async def recv_into(self, buf):
+        await recv_exact_async(self.loop, self.sock, self.header_view, self.max_recv)
+        length, self.last_send_ns = FRAME_HEADER.unpack(self.header)
+        if length == 0:
+            return 0
+        view = memoryview(buf)
+        if length > len(view):
+            raise ValueError(f"Кадр {length} байт больше буфера {len(view)}")
+        return await recv_exact_async(self.loop, self.sock, view[:length], self.max_recv)
+
+    async def close(self):
+        if self.sending:
+            await self.loop.sock_sendall(self.sock, FRAME_HEADER.pack(0, 0))
+            self.sock.shutdown(socket.SHUT_WR)
+        self.sock.close()
+        if self.listener is not None:
+            self.listener.close()
+            if self.family != "tcp":
+                os.unlink(self.path)
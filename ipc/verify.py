@@ -0,0 +1,104 @@
+import csv
+import os
+import struct
+import time
+import zlib
+
+# Режим проверки данных (IPC_VERIFY=1): отправитель заполняет сообщения узором, зависящим от номера сообщения,
+# получатель сверяет CRC32 каждого принятого сообщения. Формат совпадает с common/verify.hpp:
+#   первые 8 байт — номер сообщения (uint64, little-endian), остальное — узор варианта seq % VARIANTS:
+#   байт i сообщения = block[(i + variant * VARIANT_SHIFT) % BLOCK_SIZE], block — 4 КБ splitmix64 от IPC_VERIFY_SEED.
+# Соседние сообщения несут разные узоры, поэтому разорванное чтение (начало одного сообщения и конец другого)
+# не совпадёт с ожидаемой CRC32
+VERIFY = os.environ.get("IPC_VERIFY") == "1"
+SEED = int(os.environ.get("IPC_VERIFY_SEED", "1"))
+SEQ = struct.Struct("<Q")
+BLOCK_SIZE = 4096
+VARIANTS = 4
+VARIANT_SHIFT = 1031
+MASK64 = (1 << 64) - 1
+
+def pattern_block(seed):
+    # 4 КБ псевдослучайных байт: splitmix64, слова little-endian
+    words = []
+    state = seed & MASK64
+    for _ in range(BLOCK_SIZE // 8):
+        state = (state + 0x9E3779B97F4A7C15) & MASK64
+        z = state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        words.append(z ^ (z >> 31))
+    return struct.pack(f"<{len(words)}Q", *words)
+
+def pattern_variants(size, seed):
+    # VARIANTS полных сообщений размера size без номера (первые 8 байт узора тоже остаются на месте)
+    if size < SEQ.size:
+        raise ValueError(f"Режим проверки требует сообщений не меньше {SEQ.size} байт, задано {size}")
+    block = pattern_block(seed)
+    repeats = (size + BLOCK_SIZE - 1) // BLOCK_SIZE + 1
+    variants = []
+    for variant in range(VARIANTS):
+        shift = variant * VARIANT_SHIFT % BLOCK_SIZE
+        variants.append(((block[shift:] + block[:shift]) * repeats)[:size])
+    return variants
+
+class PatternSource:
+    # Отправитель: fill(buf) записывает в buf следующее сообщение узора. Копирование узора — та же работа,
+    # что и заполнение чанка константой, его время учитывается как накладные расходы проверки
+    def __init__(self, size, seed=SEED):
+        self.variants = pattern_variants(size, seed)
+        self.seq = 0
+        self.elapsed = 0.0
+
+    def fill(self, buf):
+        start = time.perf_counter()
+        view = memoryview(buf)
+        view[:] = self.variants[self.seq % VARIANTS][:len(view)]
+        SEQ.pack_into(view, 0, self.seq)
+        self.seq += 1
+        self.elapsed += time.perf_counter() - start
+        return buf
+
+    def write_csv(self, prefix):
+        write_verify_csv(prefix, self.seq, 0, 0, self.elapsed)
+
+class PatternCheck:
+    # Получатель: check(chunk) сверяет CRC32 сообщения (без номера) с CRC32 ожидаемого варианта той же длины.
+    # Номер, не больший предыдущего, считается нарушением порядка (при нескольких отправителях это ожидаемо)
+    def __init__(self, size, seed=SEED):
+        self.variants = pattern_variants(size, seed)
+        self.expected = {}  # (вариант, длина) -> CRC32, считается один раз
+        self.messages = 0
+        self.corrupt = 0
+        self.out_of_order = 0
+        self.last_seq = -1
+        self.elapsed = 0.0
+
+    def check(self, chunk):
+        start = time.perf_counter()
+        view = memoryview(chunk)
+        self.messages += 1
+        if len(view) < SEQ.size or len(view) > len(self.variants[0]):
+            self.corrupt += 1
+        else:
+            (seq,) = SEQ.unpack_from(view)
+            key = (seq % VARIANTS, len(view))
+            if key not in self.expected:
+                self.expected[key] = zlib.crc32(memoryview(self.variants[key[0]])[SEQ.size:len(view)])
+            if zlib.crc32(view[SEQ.size:]) != self.expected[key]:
+                self.corrupt += 1
+            if seq <= self.last_seq:
+                self.out_of_order += 1
+            self.last_seq = seq
+        self.elapsed += time.perf_counter() - start
+        return len(view)
+
+    def write_csv(self, prefix):
+        write_verify_csv(prefix, self.messages, self.corrupt, self.out_of_order, self.elapsed)
+
+def write_verify_csv(prefix, messages, corrupt, out_of_order, elapsed):
+    # <prefix>_verify.csv: сообщений заполнено/проверено, испорчено, не по порядку и время, ушедшее на проверку
+    with open(f"{prefix}_verify.csv", "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["messages", "corrupt", "out_of_order", "verify_sec"])
+        w.writerow([messages, corrupt, out_of_order, f"{elapsed:.6f}"])
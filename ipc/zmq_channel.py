@@ -0,0 +1,219 @@
+import os
+import struct
+import time
+
+import zmq
+import zmq.asyncio
+
+from .channel import AsyncChannel, Channel
+
+# Сообщение — два кадра: метка отправки (8 байт, monotonic нс) и полезная нагрузка. Конец потока — одиночный кадр DONE.
+# Формат совпадает с zmq/*.cpp
+STAMP = struct.Struct("<Q")
+DONE = b"DONE"
+DONE_TIMEOUT_MS = 1000  # DONE мог уйти другому получателю: после первого DONE ждём остальные не дольше этого
+SOCKET_OPTIONS = {"sndhwm": zmq.SNDHWM, "rcvhwm": zmq.RCVHWM, "sndbuf": zmq.SNDBUF, "rcvbuf": zmq.RCVBUF}
+
+def settings_from_env():
+    # Параметры ZeroMQ, которые оркестратор передаёт через окружение (варианты метода zmq)
+    def env_int(name):
+        value = os.environ.get(name)
+        return int(value) if value else None
+    return {
+        "transport": os.environ.get("ZMQ_TRANSPORT", "tcp"),
+        "options": {"sndhwm": env_int("ZMQ_SNDHWM"), "rcvhwm": env_int("ZMQ_RCVHWM"),
+                    "sndbuf": env_int("ZMQ_SNDBUF"), "rcvbuf": env_int("ZMQ_RCVBUF")},
+        "io_threads": env_int("ZMQ_IO_THREADS") or 1,
+        "zero_copy": os.environ.get("ZMQ_ZERO_COPY") == "1",
+    }
+
+def endpoint(transport, port, bind):
+    # Адрес точки встречи; номер порта различает каналы и для ipc:// и inproc://.
+    # inproc работает только между потоками одного процесса с общим контекстом
+    if transport == "tcp":
+        return f"tcp://*:{port}" if bind else f"tcp://localhost:{port}"
+    if transport == "ipc":
+        return f"ipc:///tmp/ipc_zmq_{port}.sock"
+    if transport == "inproc":
+        return f"inproc://ipc_zmq_{port}"
+    raise ValueError(f"Неизвестный транспорт ZeroMQ: {transport}")
+
+def remove_ipc_path(address):
+    # libzmq оставляет файл сокета ipc:// после закрытия слушающей стороны
+    if address.startswith("ipc://"):
+        try:
+            os.unlink(address[len("ipc://"):])
+        except FileNotFoundError:
+            pass
+
+def make_socket(context, kind, options):
+    # options: sndhwm, rcvhwm, sndbuf, rcvbuf; None — значение libzmq по умолчанию
+    sock = context.socket(kind)
+    for name, value in (options or {}).items():
+        if value is not None:
+            sock.setsockopt(SOCKET_OPTIONS[name], value)
+    return sock
+
+class ZmqChannel(Channel):
+    # PUSH/PULL. Отправитель слушает порт (bind) и раздаёт сообщения получателям round-robin,
+    # получатель подключается ко всем отправителям (connect) и завершается, получив DONE от каждого.
+    # zero_copy: отправка без копирования с отслеживанием (send возвращает MessageTracker, буфер нельзя менять
+    # до его завершения), приём — через recv_frame() без копирования в отдельный буфер.
+    # kind=zmq.PAIR — двусторонний канал для режима запрос-ответ: обе стороны и отправляют, и принимают
+    def __init__(self, context, sock, peers, sending, own_context, zero_copy):
+        super().__init__()
+        self.context = context
+        self.sock = sock
+        self.peers = peers  # отправителю — число получателей, получателю — число отправителей
+        self.sending = sending
+        self.own_context = own_context
+        self.zero_copy = zero_copy
+        self.done_count = 0
+        self.stamp = bytearray(STAMP.size)
+        self.frame = None
+        self.address = ""
+
+    @classmethod
+    def bind(cls, port, receivers=1, transport="tcp", options=None, io_threads=1, zero_copy=False, context=None,
+             kind=zmq.PUSH):
+        own_context = context is None
+        context = context or zmq.Context(io_threads)
+        sock = make_socket(context, kind, options)
+        channel = cls(context, sock, receivers, True, own_context, zero_copy)
+        channel.address = endpoint(transport, port, bind=True)
+        sock.bind(channel.address)
+        return channel
+
+    @classmethod
+    def connect(cls, ports, transport="tcp", options=None, io_threads=1, zero_copy=False, context=None,
+                kind=zmq.PULL):
+        own_context = context is None
+        context = context or zmq.Context(io_threads)
+        sock = make_socket(context, kind, options)
+        for port in ports:
+            sock.connect(endpoint(transport, port, bind=False))
+        return cls(context, sock, len(ports), False, own_context, zero_copy)
+
+    def send(self, buf):
+        self.sock.send(STAMP.pack(time.monotonic_ns()), zmq.SNDMORE)
+        if self.zero_copy:
+            return self.sock.send(buf, copy=False, track=True)
+        self.sock.send(buf)
+
+    def send_parts(self, parts):
+        # Одно сообщение из нескольких кадров (части ipc/payload.py) без копирования: zmq держит ссылку на каждый
+        # буфер до отправки, поэтому менять их после вызова нельзя
+        self.sock.send(STAMP.pack(time.monotonic_ns()), zmq.SNDMORE)
+        for part in parts[:-1]:
+            self.sock.send(part, zmq.SNDMORE, copy=False)
+        self.sock.send(parts[-1], copy=False)
+
+    def next_message(self):
+        # Кадр метки следующего сообщения; False, когда получены DONE от всех отправителей
+        while True:
+            try:
+                n = self.sock.recv_into(self.stamp)
+            except zmq.Again:# остальные DONE достались другим получателям
+                return False
+            if n == len(DONE) and self.stamp[:n] == DONE:
+                self.done_count += 1
+                if self.done_count >= self.peers:
+                    return False
+                self.sock.setsockopt(zmq.RCVTIMEO, DONE_TIMEOUT_MS)
+                continue
+            (self.last_send_ns,) = STAMP.unpack(self.stamp)
+            return True
+
+    def recv_into(self, buf):
+        if not self.next_message():
+            return 0
+        n = self.sock.recv_into(buf)
+        if n > len(memoryview(buf)):
+            raise ValueError(f"Сообщение {n} байт больше буфера {len(memoryview(buf))}")
+        return n
+
+    def recv_frame(self):
+        # memoryview на данные сообщения внутри zmq.Frame, действителен до следующего вызова; пустой — конец потока
+        self.frame = None
+        if not self.next_message():
+            return memoryview(b"")
+        self.frame = self.sock.recv(copy=False)
+        return self.frame.buffer
+
+    def recv_parts(self):
+        # Кадры данных сообщения из send_parts() — memoryview внутри zmq.Frame, действительны до следующего вызова;
+        # пустой список — конец потока
+        self.frame = None
+        if not self.next_message():
+            return []
+        self.frame = self.sock.recv_multipart(copy=False)
+        return [frame.buffer for frame in self.frame]
+
+    def close(self):
+        if self.sending:
+            for _ in range(self.peers):# каждый получатель должен получить своё финальное сообщение
+                self.sock.send(DONE)
+        self.frame = None
+        self.sock.close()  # LINGER по умолчанию бесконечен: context.term() дождётся доставки
+        if self.own_context:
+            self.context.term()
+        remove_ipc_path(self.address)
+
+class AsyncZmqChannel(AsyncChannel):
+    # ZmqChannel на zmq.asyncio: тот же формат сообщений, ожидание сокета встроено в цикл событий
+    def __init__(self, context, sock, peers, sending):
+        super().__init__()
+        self.context = context
+        self.sock = sock
+        self.peers = peers
+        self.sending = sending
+        self.done_count = 0
+        self.stamp = bytearray(STAMP.size)
+        self.address = ""
+
+    @classmethod
+    def bind(cls, port, receivers=1, transport="tcp", options=None, io_threads=1):
+        context = zmq.asyncio.Context(io_threads)
+        sock = make_socket(context, zmq.PUSH, options)
+        channel = cls(context, sock, receivers, sending=True)
+        channel.address = endpoint(transport, port, bind=True)
+        sock.bind(channel.address)
+        return channel
+
+    @classmethod
+    def connect(cls, ports, transport="tcp", options=None, io_threads=1):
+        context = zmq.asyncio.Context(io_threads)
+        sock = make_socket(context, zmq.PULL, options)
+        for port in ports:
+            sock.connect(endpoint(transport, port, bind=False))
+        return cls(context, sock, len(ports), sending=False)
+
+    async def send(self, buf):
+        await self.sock.send(STAMP.pack(time.monotonic_ns()), zmq.SNDMORE)
+        await self.sock.send(buf)
+
+    async def recv_into(self, buf):
+        while True:
+            try:
+                n = await self.sock.recv_into(self.stamp)
+            except zmq.Again:# остальные DONE достались другим получателям
+                return 0
+            if n == len(DONE) and self.stamp[:n] == DONE:
+                self.done_count += 1
+                if self.done_count >= self.peers:
+                    return 0
+                self.sock.setsockopt(zmq.RCVTIMEO, DONE_TIMEOUT_MS)
+                continue
+            (self.last_send_ns,) = STAMP.unpack(self.stamp)
+            n = await self.sock.recv_into(buf)
+            if n > len(memoryview(buf)):
+                raise ValueError(f"Сообщение {n} байт больше буфера {len(memoryview(buf))}")
+            return n
+
+    async def close(self):
+        if self.sending:
+            for _ in range(self.peers):
+                await self.sock.send(DONE)
+        self.sock.close()
+        self.context.term()
+        remove_ipc_path(self.address)
@@ -0,0 +1,28 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import batch_receiver
+from ipc.bench import BenchRun, NAME_SUFFIX, TOTAL_SIZE
+from ipc.memfd import MemfdChannel
+from ipc.pages import settings_from_env
+
+def main():
+    run = BenchRun("receiver", "memfd_reciever")
+    # ожидание подключения отправителя; при IPC_BATCH_SIZE буфер memfd — пакет, сообщения читаются его срезами
+    with batch_receiver(MemfdChannel.accept(NAME_SUFFIX, settings_from_env()), 0, views=True) as channel:
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            view = channel.recv_view()# принятый буфер читается на месте, без копии
+            nbytes = len(view)
+            if nbytes == 0:# пустой кадр — отправитель закончил передачу
+                break
+            if run.verify:# режим проверки: CRC32 принятого сообщения
+                run.verify.check(view)
+            view.release()
+            channel.release()
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
+
+if __name__ == "__main__":
+    main()
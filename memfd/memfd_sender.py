@@ -0,0 +1,32 @@
+import ctypes
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import batch_sender
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, TOTAL_SIZE
+from ipc.memfd import MemfdChannel
+from ipc.pages import settings_from_env
+
+def produce(view):
+    # Производитель пишет кадр прямо в новый буфер memfd, без промежуточного объекта bytes
+    ctypes.memset(ctypes.addressof(ctypes.c_char.from_buffer(view)), ord("A"), len(view))
+
+def main():
+    run = BenchRun("sender", "memfd_sender")
+    # получатель уже слушает сокет. IPC_BATCH_SIZE: reserve/publish заполняют место в пакете, а буфер memfd
+    # уходит получателю целым пакетом (ipc/batch.py)
+    with batch_sender(MemfdChannel.connect(NAME_SUFFIX, settings_from_env()), CHUNK_SIZE) as channel:
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            view = channel.reserve(CHUNK_SIZE)
+            if run.verify:
+                run.verify.fill(view)# узор режима проверки пишется прямо в буфер
+            else:
+                produce(view)
+            channel.publish()# буфер целиком уходит получателю
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+if __name__ == "__main__":
+    main()
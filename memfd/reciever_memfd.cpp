@@ -0,0 +1,146 @@
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/socket.h>
+#include <sys/stat.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+#include <chrono>
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <optional>
+#include <string>
+
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/shm_pages.hpp"
+#include "../common/verify.hpp"
+
+// Приём буферов memfd (совпадает с ipc/memfd.py): заголовок и дескриптор одним пакетом SOCK_SEQPACKET.
+// Буфер отображается только на чтение и читается на месте, без копии, затем отображение и дескриптор закрываются
+struct Frame {
+    uint64_t length;   // длина сообщения, 0 — конец потока (без дескриптора)
+    uint64_t send_ns;  // метка отправки (monotonic, нс)
+};
+
+// Абстрактное пространство имён: файла сокета нет, после падения процесса ничего не остаётся
+socklen_t memfd_address(sockaddr_un& addr) {
+    const std::string name = "ipc_memfd" + name_suffix();
+    addr = sockaddr_un{};
+    addr.sun_family = AF_UNIX;
+    std::memcpy(addr.sun_path + 1, name.data(), name.size());
+    return static_cast<socklen_t>(offsetof(sockaddr_un, sun_path) + 1 + name.size());
+}
+
+// Заголовок и дескриптор буфера (-1, если его нет); false — соединение закрыто
+bool recv_frame(int sock, Frame& frame, int& fd) {
+    iovec iov{&frame, sizeof(frame)};
+    alignas(cmsghdr) char control[CMSG_SPACE(sizeof(int))] = {};
+    msghdr msg{};
+    msg.msg_iov = &iov;
+    msg.msg_iovlen = 1;
+    msg.msg_control = control;
+    msg.msg_controllen = sizeof(control);
+    if (recvmsg(sock, &msg, MSG_CMSG_CLOEXEC) != static_cast<ssize_t>(sizeof(frame))) return false;
+    fd = -1;
+    cmsghdr* cmsg = CMSG_FIRSTHDR(&msg);
+    if (cmsg && cmsg->cmsg_level == SOL_SOCKET && cmsg->cmsg_type == SCM_RIGHTS) {
+        std::memcpy(&fd, CMSG_DATA(cmsg), sizeof(int));
+    }
+    return true;
+}
+
+int main() {
+    using namespace std::chrono;
+    const size_t CHUNK_SIZE = chunk_size_from_env();
+    const size_t TOTAL_SIZE = total_size_from_env();
+    const PageSettings pages = page_settings_from_env();
+    auto wall_start = high_resolution_clock::now();
+
+    int listener = socket(AF_UNIX, SOCK_SEQPACKET, 0);
+    sockaddr_un addr;
+    const socklen_t addr_len = memfd_address(addr);
+    if (listener < 0 || bind(listener, reinterpret_cast<sockaddr*>(&addr), addr_len) < 0 || listen(listener, 1) < 0) {
+        perror("bind");
+        return 1;
+    }
+    signal_ready();  // отправитель может подключаться
+    int sock = accept(listener, nullptr, nullptr);
+    if (sock < 0) {
+        perror("accept");
+        return 1;
+    }
+
+    LatencyHistogram latency;
+    std::optional<PatternCheck> verify;  // режим проверки (IPC_VERIFY): CRC32 прямо по принятому буферу
+    if (verify_enabled()) verify.emplace(CHUNK_SIZE);
+    const bool batching = batch_size_from_env() > 0;  // в буфере пакет сообщений (common/batch.hpp)
+
+    size_t received = 0;
+    MetricsChannel channel("receiver");  // живые замеры для оркестратора
+    auto active_start = high_resolution_clock::now();
+    while (received < TOTAL_SIZE) {
+        Frame frame{};
+        int fd = -1;
+        if (!recv_frame(sock, frame, fd)) {
+            std::cerr << "connection closed before end of stream\n";
+            return 1;
+        }
+        if (fd < 0) break;  // отправитель закончил передачу
+        struct stat st{};
+        // Без печати отправитель мог бы менять буфер и после передачи
+        if (!(fcntl(fd, F_GET_SEALS) & F_SEAL_WRITE) || fstat(fd, &st) != 0) {
+            std::cerr << "memfd buffer is not sealed\n";
+            return 1;
+        }
+        const size_t map_size = static_cast<size_t>(st.st_size);
+        void* data = mmap(nullptr, map_size, PROT_READ, MAP_SHARED | map_flags(pages), fd, 0);
+        close(fd);  // отображение держит буфер и без дескриптора
+        if (data == MAP_FAILED) {
+            perror("mmap");
+            return 1;
+        }
+        prepare_mapping(data, map_size, pages);
+        if (batching) {
+            // Сообщения пакета читаются прямо из запечатанного буфера
+            const bool ok = frame.length <= map_size &&
+                for_each_message(static_cast<const char*>(data), frame.length,
+                                 [&](const char* message, size_t size, uint64_t send_ns) {
+                    if (verify) verify->check(message, size);
+                    latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - send_ns));
+                    received += size;
+                });
+            munmap(data, map_size);
+            if (!ok) {
+                std::cerr << "malformed batch of " << frame.length << " bytes\n";
+                return 1;
+            }
+            channel.tick(received);
+            continue;
+        }
+        if (verify) verify->check(static_cast<const char*>(data), frame.length);
+        munmap(data, map_size);
+        latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - frame.send_ns));
+        received += frame.length;
+        channel.tick(received);
+    }
+    auto active_end = high_resolution_clock::now();
+    close(sock);
+    close(listener);
+
+    double active_time = duration<double>(active_end - active_start).count();
+    double wall_time = duration<double>(high_resolution_clock::now() - wall_start).count();
+    double max_rss = MetricsChannel::peak_rss_mb();
+    std::ofstream log(metrics_path("memfd_reciever_metrics.csv"));
+    log << "active_time_sec,wall_time_sec,bytes_received,rss_mb\n";
+    log << active_time << "," << wall_time << "," << received << "," << max_rss << "\n";
+    channel.finish(received, active_time, wall_time, max_rss);
+    latency.write_csv(metrics_path("memfd_reciever"));
+    if (verify) verify->write_csv(metrics_path("memfd_reciever"));
+    return 0;
+}
@@ -0,0 +1,138 @@
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/socket.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+#include <cerrno>
+#include <chrono>
+#include <cstdint>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <optional>
+#include <string>
+
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/shm_pages.hpp"
+#include "../common/verify.hpp"
+
+// Передача буферов целиком (совпадает с ipc/memfd.py): на каждое сообщение — новый memfd, заполненный на месте,
+// запечатанный от записи и изменения размера и переданный через AF_UNIX SOCK_SEQPACKET (SCM_RIGHTS).
+// Своя копия дескриптора закрывается сразу после отправки: буфер вместе с владением переходит получателю
+struct Frame {
+    uint64_t length;   // длина сообщения, 0 — конец потока (без дескриптора)
+    uint64_t send_ns;  // метка отправки (monotonic, нс)
+};
+
+// Абстрактное пространство имён: файла сокета нет, после падения процесса ничего не остаётся
+socklen_t memfd_address(sockaddr_un& addr) {
+    const std::string name = "ipc_memfd" + name_suffix();
+    addr = sockaddr_un{};
+    addr.sun_family = AF_UNIX;
+    std::memcpy(addr.sun_path + 1, name.data(), name.size());
+    return static_cast<socklen_t>(offsetof(sockaddr_un, sun_path) + 1 + name.size());
+}
+
+// Заголовок и, если fd >= 0, дескриптор буфера одним пакетом
+bool send_frame(int sock, const Frame& frame, int fd) {
+    iovec iov{const_cast<Frame*>(&frame), sizeof(frame)};
+    alignas(cmsghdr) char control[CMSG_SPACE(sizeof(int))] = {};
+    msghdr msg{};
+    msg.msg_iov = &iov;
+    msg.msg_iovlen = 1;
+    if (fd >= 0) {
+        msg.msg_control = control;
+        msg.msg_controllen = sizeof(control);
+        cmsghdr* cmsg = CMSG_FIRSTHDR(&msg);
+        cmsg->cmsg_level = SOL_SOCKET;
+        cmsg->cmsg_type = SCM_RIGHTS;
+        cmsg->cmsg_len = CMSG_LEN(sizeof(int));
+        std::memcpy(CMSG_DATA(cmsg), &fd, sizeof(int));
+    }
+    if (sendmsg(sock, &msg, MSG_NOSIGNAL) != static_cast<ssize_t>(sizeof(frame))) {
+        if (fd < 0 && errno == EPIPE) return true;  // конец потока: получатель принял весь объём и уже вышел
+        perror("sendmsg");
+        return false;
+    }
+    return true;
+}
+
+int main() {
+    using namespace std::chrono;
+    const size_t CHUNK_SIZE = chunk_size_from_env();
+    const size_t TOTAL_SIZE = total_size_from_env();
+    const PageSettings pages = page_settings_from_env();  // SHM_HUGEPAGES / SHM_PREFAULT для каждого буфера
+    const bool batching = batch_size_from_env() > 0;  // буфер — пакет мелких сообщений (common/batch.hpp)
+    const size_t map_size = segment_size(transport_size(CHUNK_SIZE), pages);
+    const unsigned memfd_flags = MFD_CLOEXEC | MFD_ALLOW_SEALING | (pages.hugetlb() ? MFD_HUGETLB : 0);
+    auto wall_start = high_resolution_clock::now();
+
+    int sock = socket(AF_UNIX, SOCK_SEQPACKET, 0);
+    sockaddr_un addr;
+    const socklen_t addr_len = memfd_address(addr);
+    if (sock < 0 || connect(sock, reinterpret_cast<sockaddr*>(&addr), addr_len) < 0) {
+        perror("connect");
+        return 1;
+    }
+
+    std::optional<PatternSource> pattern;  // режим проверки (IPC_VERIFY): узор пишется прямо в буфер
+    if (verify_enabled()) pattern.emplace(CHUNK_SIZE);
+
+    size_t sent = 0;
+    MetricsChannel channel("sender");  // живые замеры для оркестратора
+    auto active_start = high_resolution_clock::now();
+    while (sent < TOTAL_SIZE) {
+        Frame frame{CHUNK_SIZE, LatencyHistogram::now_ns()};
+        int fd = memfd_create("ipc_memfd", memfd_flags);
+        if (fd < 0 || ftruncate(fd, map_size) != 0) {
+            perror("memfd_create");
+            return 1;
+        }
+        void* data = mmap(nullptr, map_size, PROT_READ | PROT_WRITE, MAP_SHARED | map_flags(pages), fd, 0);
+        if (data == MAP_FAILED) {
+            perror("mmap");
+            return 1;
+        }
+        prepare_mapping(data, map_size, pages);
+        if (batching) {
+            // Пакет собирается прямо в буфере, пока не подойдёт срок или не кончится место
+            BatchWriter batch(static_cast<char*>(data), transport_size(CHUNK_SIZE));
+            do {
+                char* message = batch.append(CHUNK_SIZE);
+                if (pattern) pattern->fill(message, CHUNK_SIZE);
+                else std::memset(message, 'A', CHUNK_SIZE);
+                sent += CHUNK_SIZE;
+            } while (sent < TOTAL_SIZE && !batch.due(CHUNK_SIZE));
+            frame.length = batch.size();
+        } else {
+            if (pattern) pattern->fill(static_cast<char*>(data), CHUNK_SIZE);
+            else std::memset(data, 'A', CHUNK_SIZE);  // производитель пишет кадр прямо в буфер
+            sent += CHUNK_SIZE;
+        }
+        munmap(data, map_size);  // F_SEAL_WRITE не ставится, пока буфер отображён на запись
+        if (fcntl(fd, F_ADD_SEALS, F_SEAL_WRITE | F_SEAL_SHRINK | F_SEAL_GROW | F_SEAL_SEAL) != 0) {
+            perror("F_ADD_SEALS");
+            return 1;
+        }
+        if (!send_frame(sock, frame, fd)) return 1;
+        close(fd);
+        channel.tick(sent);
+    }
+    send_frame(sock, Frame{0, 0}, -1);  // заголовок без дескриптора — конец потока
+    auto active_end = high_resolution_clock::now();
+    close(sock);
+
+    double active_time = duration<double>(active_end - active_start).count();
+    double wall_time = duration<double>(high_resolution_clock::now() - wall_start).count();
+    double max_rss = MetricsChannel::peak_rss_mb();
+    std::ofstream log(metrics_path("memfd_sender_metrics.csv"));
+    log << "active_time_sec,wall_time_sec,bytes_sent,rss_mb\n";
+    log << active_time << "," << wall_time << "," << sent << "," << max_rss << "\n";
+    channel.finish(sent, active_time, wall_time, max_rss);
+    if (pattern) pattern->write_csv(metrics_path("memfd_sender"));
+    return 0;
+}
@@ -1,11 +1,25 @@
 
 import subprocess            
-import shutil               
 import os                    
 import time                  
 import signal                
+import json
+import math
+import shutil
+import argparse
+import statistics
+import tempfile
+import socket
+import sys
+import threading
+import itertools
+import re
+import select
+import sqlite3
+import platform
 from pathlib import Path    
 from datetime import datetime
+from fnmatch import fnmatch
 
 import pandas as pd         
 import matplotlib.pyplot as plt  
@@ -17,6 +31,119 @@ PROJECT_ROOT = Path(__file__).parent.parent
 RESULTS_DIR = PROJECT_ROOT / "results"
 RESULTS_DIR.mkdir(exist_ok=True)  # Создать папку, если её нет
 
+# Размеры по умолчанию, с которыми сценарии работают без переменных IPC_CHUNK_SIZE / IPC_TOTAL_SIZE
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+DEFAULT_TOTAL_SIZE = 10 * 1024 ** 3
+
+# Режим перебора размеров сообщений: от 64 Б до 64 МБ степенями двойки
+SWEEP_MIN_SIZE = 64
+SWEEP_MAX_SIZE = 64 * 1024 * 1024
+SWEEP_MAX_MESSAGES = 200_000  # ограничение числа сообщений, чтобы маленькие размеры не шли часами
+
+# Ожидание получателя одного прогона, с; методы могут задать свой "timeout"
+RUN_TIMEOUT = 60
+# Второй процесс пары запускается по сигналу готовности первого (IPC_READY_FD, см. ipc/ready.py): сегмент создан,
+# сокет слушает. START_DELAY — дополнительная пауза после сигнала, с; методы могут задать свой "start_delay".
+# READY_TIMEOUT — сколько ждать сигнала от процесса, который его не посылает, прежде чем запускать второй
+START_DELAY = 0.0
+READY_TIMEOUT = 30
+PEER_FAILED_GRACE = 5  # сколько ждать получателя, если отправитель завершился с ошибкой, с
+
+# Свои имена сегментов, семафоров, сокетов и FIFO (IPC_NAME_SUFFIX) и свой диапазон портов (IPC_PORT_OFFSET)
+# у каждого прогона: соседние прогоны не ждут TIME_WAIT и не натыкаются на остатки друг друга. В суффиксе —
+# pid оркестратора, по нему остатки упавших запусков находятся и удаляются при следующем старте
+RUN_COUNTER = itertools.count()
+PORT_SLOTS = 200   # диапазоны портов переиспользуются по кругу
+PORT_STRIDE = 64   # портов на прогон: в режиме масштабирования экземпляр i получает смещение + i
+NAME_DIRS = (Path("/dev/shm"), Path(os.environ.get("HUGETLB_DIR", "/dev/hugepages")), Path("/tmp"))
+RUN_NAME = re.compile(r"_r(\d+)_\d+(?:_|$)")
+# Начала имён, которые создают сами методы; чужие файлы с похожим суффиксом не трогаем
+NAME_PREFIXES = ("my_shm", "sem.sem_", "BoostSharedMem", "ipc_")
+
+# Режим запрос-ответ (методы с "pingpong": True, см. ipc/pingpong.py): PINGPONG_ITERATIONS кругов
+# сообщениями по PINGPONG_MESSAGE_SIZE байт, задержка — RTT на стороне клиента (роль sender)
+PINGPONG_MESSAGE_SIZE = 64
+PINGPONG_ITERATIONS = 1_000_000
+PINGPONG_ENV = {"IPC_CHUNK_SIZE": str(PINGPONG_MESSAGE_SIZE),
+                "IPC_TOTAL_SIZE": str(PINGPONG_MESSAGE_SIZE * PINGPONG_ITERATIONS)}
+PINGPONG_TIMEOUT = 600  # миллион кругов Python -> Python занимает десятки секунд
+
+# Пакетирование мелких сообщений (--batch, см. ipc/batch.py и common/batch.hpp): отправитель складывает сообщения
+# в пакет до IPC_BATCH_SIZE байт и отправляет его, когда следующее не помещается или первое ждёт дольше
+# IPC_BATCH_LINGER_US мкс. Методы с "batch": False (запись на месте, asyncio, splice) и запрос-ответ не пакетируются
+BATCH_LINGER_US = 1000
+
+# Структурированная нагрузка (--payload, см. ipc/payload.py): вместо блока байт передаются объекты Python
+# (массив NumPy, словарь массивов, список записей), сериализованные pickle 5 с буферами вне потока (oob) или
+# внутри него (inband). Только Python -> Python и только методы с "payload": True.
+# Объект сериализуется и собирается на каждом сообщении, поэтому объём такого прогона ограничен PAYLOAD_TOTAL_SIZE:
+# 10 ГБ объектов по 16 МиБ не укладываются в RUN_TIMEOUT
+PAYLOAD_KINDS = ["array", "dict", "records"]
+PICKLE_MODES = ["oob", "inband"]
+PAYLOAD_TOTAL_SIZE = 1024 ** 3
+
+# Повторные прогоны каждой комбинации (метод, отправитель, получатель, размер)
+TRIALS_CONFIG = {
+    "warmup": 1,        # прогревочные прогоны, их результаты отбрасываются
+    "min_trials": 3,    # минимум замеров до проверки доверительного интервала
+    "max_trials": 10,   # максимум замеров
+    "ci_target": 0.05,  # остановка, когда половина 95% ДИ скорости меньше 5% от среднего
+}
+
+# Критические значения t-распределения Стьюдента для двустороннего 95% интервала (ключ — степени свободы)
+T_CRITICAL_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+    11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086,
+    21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042,
+}
+
+# Режим масштабирования: N отправителей и M получателей одновременно
+SCALING_COUNTS = [1, 2, 4, 8]
+SCALING_TOTAL_SIZE = 1024 ** 3  # объём на одного отправителя, чтобы прогон с 8 парами не шёл десятки минут
+SCALING_TIMEOUT = 120          # процессы делят ядра, поэтому таймаут больше, чем у одиночного прогона
+SCALING_PAIRS = [
+    ("py_sender", "py_receiver"),
+    ("cpp_sender", "cpp_receiver"),
+]
+
+# Итоговые столбцы опроса /proc в results.csv и scaling.csv (см. ProcSampler, read_proc_summary)
+PROC_SUMMARY_COLUMNS = ["cpu_user_sec", "cpu_sys_sec", "cpu_sec", "voluntary_ctxt", "nonvoluntary_ctxt",
+                        "minflt", "majflt", "peak_rss_mb"]
+
+# Столбцы режима проверки данных (--verify, см. ipc/verify.py): файл <префикс метрик>_verify.csv у каждой роли
+VERIFY_COLUMNS = ["verify_messages", "corrupt", "out_of_order", "verify_sec"]
+
+# История результатов (см. record_history и compare_history): все запуски дописываются в SQLite-базу, строка на замер
+# и роль. Таблица только пополняется; сравнение с базовым запуском или ревизией — --compare
+HISTORY_DB = RESULTS_DIR / "history.sqlite"
+HISTORY_DIR = RESULTS_DIR / "history"  # comparison.csv и графики трендов последнего сравнения
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trials (
+    run_dir TEXT NOT NULL, run TEXT NOT NULL, role TEXT NOT NULL,
+    started_at TEXT, recorded_at TEXT, host TEXT, kernel TEXT, git_rev TEXT,
+    method TEXT, sender TEXT, receiver TEXT, chunk_size INTEGER, batch TEXT, payload TEXT, placement TEXT,
+    trial INTEGER, mbps REAL, msgs_per_sec REAL, p50_us REAL, p99_us REAL, cpu_sec REAL, bytes_per_cpu_sec REAL,
+    PRIMARY KEY (run_dir, run, role)
+);
+CREATE INDEX IF NOT EXISTS trials_config ON trials (method, sender, receiver, chunk_size, host, git_rev);
+"""
+HISTORY_COLUMNS = ["run_dir", "run", "role", "started_at", "recorded_at", "host", "kernel", "git_rev", "method",
+                   "sender", "receiver", "chunk_size", "batch", "payload", "placement", "trial", "mbps",
+                   "msgs_per_sec", "p50_us", "p99_us", "cpu_sec", "bytes_per_cpu_sec"]
+# Комбинация, внутри которой сравниваются замеры: другой хост — другое железо, его числа не сравниваются
+HISTORY_KEYS = ["method", "sender", "receiver", "chunk_size", "batch", "payload", "placement", "host"]
+# Метрики сравнения: (столбец, больше — лучше). Скорость — получателя; перцентили задержки записаны у роли с
+# гистограммой: у получателя задержка доставки, у клиента запрос-ответ RTT
+HISTORY_METRICS = [("mbps", True), ("p50_us", False), ("p99_us", False)]
+REGRESSION_THRESHOLD = 0.05  # значимое изменение меньше 5% регрессией не считается
+
+# Политики размещения отправителя и получателя по CPU (см. placement_cpus)
+PLACEMENT_POLICIES = ["none", "same_core", "smt_siblings", "same_socket", "cross_numa"]
+
+# Ключи файла матрицы сценариев (--matrix, см. orchestrator/matrix_example.toml и load_matrix)
+MATRIX_KEYS = {"methods", "pairs", "sizes", "sweep", "placements", "trials", "env", "timeout", "start_delay",
+               "variants", "batch", "linger", "payload", "verify"}
+
 # Конфигурация методов IPC
 METHODS_CONFIG = {
     "posix_shared_memory": {
@@ -26,12 +153,54 @@ METHODS_CONFIG = {
         "cpp_receiver":"./reciever_shm",               # C++ получатель через POSIX shared memory
         "sender_metric":   "shm_sender_metrics.csv",   # Файл метрик отправителя
         "receiver_metric": "shm_reciever_metrics.csv", # Файл метрик получателя
+        "sender_first": True,                          # Отправитель создаёт сегмент, поэтому стартует первым
+        "payload": True,                               # Объекты pickle 5 (--payload): части пишутся прямо в слот
+    },
+    "posix_shared_memory_async": {
+        "dir": "posix_shared_memory",
+        "env": {"SHM_SLOTS": "4"},
+        "py_sender":   "python3 shm_async_sender.py",  # asyncio: кольцо из 4 слотов с уведомлением через eventfd
+        "py_receiver": "python3 shm_async_reciever.py",
+        "sender_metric":   "shm_sender_metrics.csv",
+        "receiver_metric": "shm_reciever_metrics.csv",
+        "sender_first": True,
+        "baseline": "posix_shared_memory_ring",        # Блокирующий аналог для сравнения накладных расходов asyncio
+        "batch": False,
+    },
+    "posix_shared_memory_pingpong": {
+        "dir": "posix_shared_memory",
+        "env": PINGPONG_ENV,                           # Запрос-ответ через два однослотовых кольца _req / _rep
+        "py_sender":   "python3 shm_pingpong.py ping", # Клиент: создаёт оба кольца и замеряет RTT
+        "py_receiver": "python3 shm_pingpong.py pong", # Сервер: возвращает каждое сообщение
+        "cpp_sender":  "./pingpong_shm ping",
+        "cpp_receiver":"./pingpong_shm pong",
+        "sender_metric":   "shm_ping_metrics.csv",
+        "receiver_metric": "shm_pong_metrics.csv",
+        "sender_first": True,
+        "pingpong": True,
+        "timeout": PINGPONG_TIMEOUT,
     },
     "boost_int": {
-        "sender": "./boost_sender",                    # Boost.Interprocess отправитель
-        "receiver": "./boost_reciever",                # Boost.Interprocess получатель
+        "py_sender":   "python3 boost_sender.py",      # Python отправитель: простой сегмент с заголовком Boost (ipc/boost.py)
+        "py_receiver": "python3 boost_reciever.py",    # Python получатель: объекты сегмента по индексу
+        "cpp_sender":  "./boost_sender",               # Boost.Interprocess отправитель
+        "cpp_receiver":"./boost_reciever",             # Boost.Interprocess получатель
         "sender_metric":   "boost_sender_metrics.csv",  # Файл метрик отправителя
         "receiver_metric": "boost_reciever_metrics.csv",# Файл метрик получателя
+        "sender_first": True,                          # Отправитель создаёт сегмент, поэтому стартует первым
+    },
+    "boost_int_pingpong": {
+        "dir": "boost_int",
+        "env": PINGPONG_ENV,                           # Запрос-ответ через два сегмента _req / _rep
+        "py_sender":   "python3 boost_pingpong.py ping",
+        "py_receiver": "python3 boost_pingpong.py pong",
+        "cpp_sender":  "./boost_pingpong ping",
+        "cpp_receiver":"./boost_pingpong pong",
+        "sender_metric":   "boost_ping_metrics.csv",
+        "receiver_metric": "boost_pong_metrics.csv",
+        "sender_first": True,
+        "pingpong": True,
+        "timeout": PINGPONG_TIMEOUT,
     },
     "zmq": {
         "py_sender":   "python3 sender_zmq.py",        # Python отправитель через ZeroMQ
@@ -40,6 +209,31 @@ METHODS_CONFIG = {
         "cpp_receiver":"./zmq_reciever",               # C++ получатель через ZeroMQ
         "sender_metric":   "zmq_sender_metrics.csv",    # Файл метрик отправителя
         "receiver_metric": "zmq_receiver_metrics.csv", # Файл метрик получателя
+        "fan_out": True,                               # PUSH/PULL: N отправителей и M получателей в одной сети
+        "payload": True,
+    },
+    "zmq_async": {
+        "dir": "zmq",
+        "py_sender":   "python3 sender_zmq_async.py",  # asyncio: zmq.asyncio
+        "py_receiver": "python3 reciever_zmq_async.py",
+        "sender_metric":   "zmq_sender_metrics.csv",
+        "receiver_metric": "zmq_receiver_metrics.csv",
+        "fan_out": True,
+        "baseline": "zmq",
+        "batch": False,
+    },
+    "zmq_pingpong": {
+        "dir": "zmq",
+        "env": PINGPONG_ENV,                           # Запрос-ответ через пару сокетов PAIR
+        "py_sender":   "python3 pingpong_zmq.py ping", # Клиент слушает порт и замеряет RTT
+        "py_receiver": "python3 pingpong_zmq.py pong",
+        "cpp_sender":  "./zmq_pingpong ping",
+        "cpp_receiver":"./zmq_pingpong pong",
+        "sender_metric":   "zmq_ping_metrics.csv",
+        "receiver_metric": "zmq_pong_metrics.csv",
+        "sender_first": True,
+        "pingpong": True,
+        "timeout": PINGPONG_TIMEOUT,
     },
     "sockets": {
         "py_sender":   "python3 sockets_sender.py",    # Python отправитель через сокеты
@@ -48,6 +242,158 @@ METHODS_CONFIG = {
         "cpp_receiver":"./reciever_socket",             # C++ получатель через сокеты
         "sender_metric":   "socket_sender_metrics.csv", # Файл метрик отправителя
         "receiver_metric": "socket_receiver_metrics.csv",# Файл метрик получателя
+        "payload": True,
+    },
+    "sockets_async": {
+        "dir": "sockets",
+        "py_sender":   "python3 sockets_async_sender.py",   # asyncio: loop.sock_sendall / loop.sock_recv_into
+        "py_receiver": "python3 sockets_async_reciever.py",
+        "sender_metric":   "socket_sender_metrics.csv",
+        "receiver_metric": "socket_receiver_metrics.csv",
+        "baseline": "sockets",
+        "batch": False,
+    },
+    "memfd": {
+        "py_sender":   "python3 memfd_sender.py",      # Новый буфер memfd на каждое сообщение, передача дескриптора (SCM_RIGHTS)
+        "py_receiver": "python3 memfd_reciever.py",    # Принятый буфер читается на месте, без копии
+        "cpp_sender":  "./sender_memfd",
+        "cpp_receiver":"./reciever_memfd",
+        "sender_metric":   "memfd_sender_metrics.csv",
+        "receiver_metric": "memfd_reciever_metrics.csv",
+    },
+    "pipes": {
+        "py_sender":   "python3 pipes_sender.py",      # FIFO: заголовок и чанк одним writev, приём readv
+        "py_receiver": "python3 pipes_reciever.py",    # Получатель создаёт FIFO, поэтому стартует первым
+        "cpp_sender":  "./sender_pipes",
+        "cpp_receiver":"./reciever_pipes",
+        "sender_metric":   "pipe_sender_metrics.csv",
+        "receiver_metric": "pipe_reciever_metrics.csv",
+    },
+    "sockets_pingpong": {
+        "dir": "sockets",
+        "env": PINGPONG_ENV,                           # Эхо через одно TCP-соединение с TCP_NODELAY
+        "py_sender":   "python3 sockets_pingpong.py ping",
+        "py_receiver": "python3 sockets_pingpong.py pong",  # Сервер слушает, поэтому стартует первым
+        "cpp_sender":  "./pingpong_sockets ping",
+        "cpp_receiver":"./pingpong_sockets pong",
+        "sender_metric":   "socket_ping_metrics.csv",
+        "receiver_metric": "socket_pong_metrics.csv",
+        "pingpong": True,
+        "timeout": PINGPONG_TIMEOUT,
+    },
+}
+
+# Варианты методов: базовый метод из METHODS_CONFIG и отличия от него, как у вариантов матрицы сценариев
+# (register_variants). Окружение складывается с окружением базового метода, None снимает ключ базового метода
+METHOD_VARIANTS = {
+    "posix_shared_memory_ring": {
+        "base": "posix_shared_memory",
+        "env": {"SHM_SLOTS": "4"},                     # Кольцевой буфер из 4 слотов вместо одного
+    },
+    "posix_shared_memory_zerocopy": {
+        "base": "posix_shared_memory",
+        "env": {"SHM_SLOTS": "4", "SHM_ZERO_COPY": "1"},  # Кольцо + запись/чтение слотов на месте (Python)
+        "payload": None,
+        "batch": False,                                # Сообщение пишется прямо в слот, пакету негде собираться
+    },
+    "posix_shared_memory_prefault": {
+        "base": "posix_shared_memory",
+        "env": {"SHM_PREFAULT": "1"},          # Все страницы сегмента отображаются до начала замера (MAP_POPULATE)
+        "payload": None,
+        "pages_of": "posix_shared_memory",             # Сравнивается с обычными страницами (plot_pages)
+    },
+    "posix_shared_memory_thp": {
+        "base": "posix_shared_memory",
+        "env": {"SHM_HUGEPAGES": "thp"},       # madvise(MADV_HUGEPAGE), /dev/shm с huge=advise
+        "payload": None,
+        "pages_of": "posix_shared_memory",
+    },
+    "posix_shared_memory_hugetlb": {
+        "base": "posix_shared_memory",
+        "env": {"SHM_HUGEPAGES": "hugetlb"},   # Сегмент на hugetlbfs, нужен пул vm.nr_hugepages
+        "payload": None,
+        "pages_of": "posix_shared_memory",
+    },
+    "posix_shared_memory_futex": {
+        "base": "posix_shared_memory",
+        "env": {"SHM_SYNC": "futex"},          # Счётчики head/tail с опросом и сном на futex вместо семафоров
+    },
+    "posix_shared_memory_ring_futex": {
+        "base": "posix_shared_memory",
+        "env": {"SHM_SLOTS": "4", "SHM_SYNC": "futex"},  # Кольцо: пишущий будит только спящего соседа
+    },
+    "posix_shared_memory_pingpong_spin": {
+        "base": "posix_shared_memory_pingpong",
+        "env": {"SHM_WAIT": "spin"},                   # Опрос счётчиков кольца до SHM_SPIN_LIMIT раз, затем семафор
+    },
+    "boost_int_prefault": {
+        "base": "boost_int",
+        "env": {"SHM_PREFAULT": "1"},          # Все страницы сегмента отображаются до начала замера
+        "pages_of": "boost_int",                       # Сравнивается с обычными страницами (plot_pages)
+    },
+    "boost_int_thp": {
+        "base": "boost_int",
+        "env": {"SHM_HUGEPAGES": "thp"},       # madvise(MADV_HUGEPAGE), /dev/shm с huge=advise
+        "pages_of": "boost_int",
+    },
+    "boost_int_hugetlb": {
+        "base": "boost_int",
+        "env": {"SHM_HUGEPAGES": "hugetlb"},   # Сегмент на hugetlbfs, нужен пул vm.nr_hugepages
+        "pages_of": "boost_int",
+    },
+    "boost_int_futex": {
+        "base": "boost_int",
+        "env": {"SHM_SYNC": "futex"},          # Счётчики ready/done с опросом и сном на futex вместо семафоров
+    },
+    "boost_int_pingpong_spin": {
+        "base": "boost_int_pingpong",
+        "env": {"SHM_WAIT": "spin"},                   # sem_trywait до SHM_SPIN_LIMIT раз, затем sem_wait
+    },
+    "zmq_zerocopy": {
+        "base": "zmq",
+        "env": {"ZMQ_ZERO_COPY": "1"},                 # copy=False + track=True при отправке, zmq.Frame при приёме
+        "cpp_sender": None,                            # Только Python
+        "cpp_receiver": None,
+        "payload": None,
+        "batch": False,                                # Буфер сообщения отдаётся libzmq, а не копируется в пакет
+    },
+    "zmq_tuned": {
+        "base": "zmq",
+        "env": {"ZMQ_SNDHWM": "8", "ZMQ_RCVHWM": "8",  # короткие очереди сообщений вместо 1000 по умолчанию,
+                "ZMQ_SNDBUF": str(4 * 1024 ** 2), "ZMQ_RCVBUF": str(4 * 1024 ** 2),  # буферы ядра 4 МБ
+                "ZMQ_IO_THREADS": "2"},
+    },
+    "zmq_ipc": {
+        "base": "zmq",
+        "env": {"ZMQ_TRANSPORT": "ipc"},               # ipc:// (unix-сокеты) вместо tcp://localhost
+    },
+    "zmq_inproc": {
+        "base": "zmq",
+        "env": {"ZMQ_TRANSPORT": "inproc"},            # inproc:// — отправитель и получатель потоки одного процесса,
+        "cpp_sender": None,                            # процесс отправителя сразу завершается; только Python
+        "cpp_receiver": None,
+        "fan_out": None,
+    },
+    "sockets_unix": {
+        "base": "sockets",
+        "env": {"SOCKET_FAMILY": "unix"},              # AF_UNIX stream вместо TCP loopback
+    },
+    "sockets_seqpacket": {
+        "base": "sockets",
+        "env": {"SOCKET_FAMILY": "seqpacket"},         # AF_UNIX SOCK_SEQPACKET с сохранением границ пакетов
+    },
+    "sockets_unix_pingpong": {
+        "base": "sockets_pingpong",
+        "env": {"SOCKET_FAMILY": "unix"},
+    },
+    "pipes_large": {
+        "base": "pipes",
+        "env": {"PIPE_SIZE": "1048576"},               # Буфер пайпа 1 МБ вместо 64 КБ (F_SETPIPE_SZ)
+    },
+    "pipes_splice": {
+        "base": "pipes",
+        "env": {"PIPE_MODE": "splice", "PIPE_SIZE": "1048576"},  # Чанк в пайп без копии: vmsplice / splice из memfd
+        "batch": False,                                # Страницы чанка уходят в пайп ссылками, пакет их копировал бы
     },
 }
 
@@ -59,101 +405,1645 @@ SENDER_RECEIVER_PAIRS = [
     ("cpp_sender", "cpp_receiver"),# C++ → C++
 ]
 
-def run_boost(method_name, method_config, output_root):
-    code_dir = PROJECT_ROOT / method_name
-    output_subdir = output_root / f"{method_name}_run"
-    output_subdir.mkdir()
+def method_dir(method_name, method_config):
+    # Несколько методов могут использовать одну папку со скриптами (например, варианты shm)
+    return PROJECT_ROOT / method_config.get("dir", method_name)
 
-    sender_cmd = method_config["sender"]
-    receiver_cmd = method_config["receiver"]
-    print(f"[INFO] Запуск {method_name}: отправитель -> {sender_cmd}, получатель -> {receiver_cmd}")
+def method_env(method_config, size_env=None):
+    # Переменные окружения варианта метода и размеры сообщений добавляются к окружению оркестратора
+    return {**os.environ, **method_config.get("env", {}), **(size_env or {})}
 
-    sender_proc = subprocess.Popen(sender_cmd, cwd=code_dir, shell=True, preexec_fn=os.setsid)
-    time.sleep(0.2)
-    receiver_proc = subprocess.Popen(receiver_cmd, cwd=code_dir, shell=True, preexec_fn=os.setsid)
+def cpp_binary(method_name, method_config, role_key):
+    # Путь исполняемого файла C++ роли относительно корня проекта (цель Makefile); None — роль на Python
+    cmd = method_config.get(role_key)
+    if not role_key.startswith("cpp_") or not cmd:
+        return None
+    return method_dir(method_name, method_config).relative_to(PROJECT_ROOT) / Path(cmd.split()[0]).name
 
+def build_binaries(methods, pairs=None):
+    # Сборка исполняемых файлов C++ нужных пар одним вызовом make -k: что не собралось (например, без libzmq),
+    # отсеивает missing_binary
+    keys = {key for pair in pairs or SENDER_RECEIVER_PAIRS for key in pair}
+    targets = sorted({str(binary) for name, config in methods.items() for key in keys
+                      for binary in [cpp_binary(name, config, key)] if binary})
+    if not targets:
+        return
+    print(f"[INFO] Сборка C++: make {' '.join(targets)}")
     try:
-        receiver_proc.wait(timeout=60)
-    except subprocess.TimeoutExpired:
-        print("[WARN] Получатель завис, убиваем процесс")
-        os.killpg(os.getpgid(receiver_proc.pid), signal.SIGKILL)
+        result = subprocess.run(["make", "-k", "-C", str(PROJECT_ROOT), *targets], capture_output=True, text=True)
+    except OSError as e:
+        print(f"[WARN] make не запустился ({e}), C++ пары будут работать с уже собранными файлами")
+        return
+    if result.returncode != 0:
+        print(f"[WARN] Не всё собралось, такие C++ пары будут пропущены:\n{result.stderr.strip()}")
 
-    for role in ("sender", "receiver"):
-        metric_file = method_config[f"{role}_metric"]
-        source_file = code_dir / metric_file
-        if source_file.exists():
-            shutil.copy(source_file, output_subdir / metric_file)
+def missing_binary(method_name, method_config, sender_key, receiver_key):
+    # Причина пропустить пару (None — можно запускать): исполняемый файл C++ не собран или старше исходников —
+    # старая сборка говорит на прежнем протоколе и зависает с новыми участниками на Python
+    for key in (sender_key, receiver_key):
+        binary = cpp_binary(method_name, method_config, key)
+        if binary is None:
+            continue
+        if not (PROJECT_ROOT / binary).exists():
+            return f"нет {binary} (make {binary})"
+        try:
+            stale = subprocess.run(["make", "-q", "-C", str(PROJECT_ROOT), str(binary)],
+                                   capture_output=True).returncode != 0
+        except OSError:
+            stale = False  # без make проверяется только наличие файла
+        if stale:
+            return f"{binary} старше исходников (make {binary})"
+    return None
 
+def missing_requirement(method_config):
+    # Причина, по которой вариант с huge pages невыполним на этой машине (None — можно запускать):
+    # без настройки ядра отправитель не создаст сегмент, а получатель будет ждать его до таймаута
+    hugepages = method_config.get("env", {}).get("SHM_HUGEPAGES")
+    if hugepages == "hugetlb":
+        hugetlb_dir = os.environ.get("HUGETLB_DIR", "/dev/hugepages")
+        if not os.path.ismount(hugetlb_dir):
+            return f"hugetlbfs не смонтирована в {hugetlb_dir}"
+        with open("/proc/meminfo") as f:
+            free = next((int(line.split()[1]) for line in f if line.startswith("HugePages_Free:")), 0)
+        if free == 0:
+            return "нет свободных huge pages (vm.nr_hugepages)"
+    if hugepages == "thp":
+        with open("/proc/mounts") as f:
+            # при повторном монтировании действует последняя запись
+            mounts = [line.split() for line in f]
+        options = next((fields[3] for fields in reversed(mounts) if fields[1] == "/dev/shm"), "")
+        if not any(option in options.split(",") for option in ("huge=advise", "huge=always", "huge=within_size")):
+            return "/dev/shm смонтирован без huge=advise"
+    return None
 
-def run_method(method_name, method_config, output_root):
+def sweep_sizes(min_size=SWEEP_MIN_SIZE, max_size=SWEEP_MAX_SIZE):
+    sizes = []
+    size = min_size
+    while size <= max_size:
+        sizes.append(size)
+        size *= 2
+    return sizes
 
-    code_dir = PROJECT_ROOT / method_name
+def sweep_env(chunk_size):
+    # Общий объём кратен размеру сообщения и ограничен как DEFAULT_TOTAL_SIZE, так и SWEEP_MAX_MESSAGES сообщениями
+    messages = max(1, min(DEFAULT_TOTAL_SIZE // chunk_size, SWEEP_MAX_MESSAGES))
+    return {"IPC_CHUNK_SIZE": str(chunk_size), "IPC_TOTAL_SIZE": str(chunk_size * messages)}
 
-    if method_name == "posix_shared_memory":
-        tasks = [(s_key, method_config[s_key], r_key, method_config[r_key], 0.2)
-                 for s_key, r_key in SENDER_RECEIVER_PAIRS]
-        start_sender_first = True
-    else:
-        tasks = [(s_key, method_config.get(s_key), r_key, method_config.get(r_key), 0.2)
-                 for s_key, r_key in SENDER_RECEIVER_PAIRS]
-        start_sender_first = False
+def batch_runs(batch_sizes, lingers=None):
+    # Окружение и суффикс имени на каждое сочетание размера пакета и срока; размер 0 — прогон без пакетирования
+    runs = []
+    for batch_size in batch_sizes:
+        if not batch_size:
+            runs.append(({"IPC_BATCH_SIZE": "0"}, "_b0"))
+            continue
+        for linger_us in lingers or [BATCH_LINGER_US]:
+            runs.append(({"IPC_BATCH_SIZE": str(batch_size), "IPC_BATCH_LINGER_US": str(linger_us)},
+                         f"_b{batch_size}_l{linger_us}us"))
+    return runs
 
-    for sender_key, sender_cmd, receiver_key, receiver_cmd, delay in tasks:
-        if not sender_cmd or not receiver_cmd:
+def batch_label(batch_size, linger_us):
+    return f"{batch_size}B/{linger_us}us" if batch_size else "none"
+
+def payload_runs(kinds):
+    # Окружение и суффикс имени на каждую нагрузку: bytes — обычный блок байт для сравнения,
+    # объекты — с обоими режимами pickle
+    runs = []
+    for kind in kinds:
+        if kind == "bytes":
+            runs.append(({"IPC_PAYLOAD": "bytes"}, "_bytes"))
             continue
+        for mode in PICKLE_MODES:
+            runs.append(({"IPC_PAYLOAD": kind, "IPC_PICKLE": mode}, f"_{kind}_{mode}"))
+    return runs
 
-        run_tag = f"{method_name}_{sender_key}_{receiver_key}"
-        output_subdir = output_root / run_tag
-        output_subdir.mkdir()
+def payload_size_env(size_env):
+    # Размеры прогона со структурированной нагрузкой: объём не больше PAYLOAD_TOTAL_SIZE, но хотя бы одно сообщение
+    size_env = size_env or {}
+    chunk_size = int(size_env.get("IPC_CHUNK_SIZE", DEFAULT_CHUNK_SIZE))
+    total_size = int(size_env.get("IPC_TOTAL_SIZE", DEFAULT_TOTAL_SIZE))
+    messages = max(1, min(total_size, PAYLOAD_TOTAL_SIZE) // chunk_size)
+    return {**size_env, "IPC_CHUNK_SIZE": str(chunk_size), "IPC_TOTAL_SIZE": str(chunk_size * messages)}
 
-        if start_sender_first:
-            print(f"[INFO] Запуск отправителя ({sender_key}): {sender_cmd}")
-            subprocess.Popen(sender_cmd, cwd=code_dir, shell=True, preexec_fn=os.setsid)
-            time.sleep(delay)
-            print(f"[INFO] Запуск получателя ({receiver_key}): {receiver_cmd}")
-            receiver_proc = subprocess.Popen(receiver_cmd, cwd=code_dir, shell=True, preexec_fn=os.setsid)
-        else:
-            print(f"[INFO] Запуск получателя ({receiver_key}): {receiver_cmd}")
-            receiver_proc = subprocess.Popen(receiver_cmd, cwd=code_dir, shell=True, preexec_fn=os.setsid)
-            time.sleep(delay)
-            print(f"[INFO] Запуск отправителя ({sender_key}): {sender_cmd}")
-            subprocess.run(sender_cmd, cwd=code_dir, shell=True)
+def payload_label(payload, pickle_mode):
+    return payload if payload == "bytes" else f"{payload}/{pickle_mode}"
+
+def load_matrix(path):
+    # Матрица сценариев из TOML (пример — orchestrator/matrix_example.toml). Ключи верхнего уровня:
+    #   methods     — шаблоны имён методов (fnmatch), по умолчанию все
+    #   pairs       — пары языков "py-py", "py-cpp", "cpp-py", "cpp-cpp"
+    #   sizes       — размеры сообщений, Б, или sweep = {min = ..., max = ...} — степени двойки
+    #   placements  — политики размещения по CPU, trials — как TRIALS_CONFIG
+    #   env         — окружение всех прогонов (окружение самого метода важнее), timeout и start_delay — умолчания
+    #   variants    — новые методы: [variants.<имя>] с base = "<метод>" и ключами METHODS_CONFIG поверх него
+    #   batch       — предельные размеры пакета, Б (0 — без пакетирования), linger — сроки ожидания, мкс
+    #   payload     — нагрузки: bytes, array, dict, records (объекты — с pickle oob и inband)
+    #   verify      — проверка данных, как --verify
+    import tomllib  # Python 3.11+, нужен только для --matrix
+    with open(path, "rb") as f:
+        matrix = tomllib.load(f)
+    unknown = set(matrix) - MATRIX_KEYS
+    if unknown:
+        raise ValueError(f"неизвестные ключи матрицы {path}: {', '.join(sorted(unknown))}")
+    if "sweep" in matrix:
+        sweep = matrix.pop("sweep")
+        matrix.setdefault("sizes", sweep_sizes(sweep.get("min", SWEEP_MIN_SIZE), sweep.get("max", SWEEP_MAX_SIZE)))
+    return matrix
+
+def apply_cli_args(matrix, args):
+    # Явные аргументы командной строки поверх матрицы: списки заменяются целиком, замеры — по отдельным ключам
+    if args.sweep:
+        matrix["sizes"] = sweep_sizes(args.min_size, args.max_size)
+    cli_trials = {"warmup": args.warmup, "min_trials": args.min_trials, "max_trials": args.trials,
+                  "ci_target": args.ci_target}
+    matrix["trials"] = {**matrix.get("trials", {}), **{k: v for k, v in cli_trials.items() if v is not None}}
+    for key, value in (("placements", args.placement), ("methods", args.methods), ("pairs", args.pairs)):
+        if value:
+            matrix[key] = value.split(",")
+    for key, value in (("batch", args.batch), ("linger", args.linger)):
+        if value:
+            matrix[key] = [int(v) for v in value.split(",")]
+    if args.payload:
+        matrix["payload"] = args.payload.split(",")
+    if args.verify:
+        matrix["verify"] = True
+    return matrix
+
+def check_resume(run_dir, matrix):
+    # Проверка данных меняет скорость (узор у отправителя, CRC32 у получателя), поэтому дописываемый запуск
+    # должен идти в том же режиме, что и готовые замеры: иначе они попадут в одну группу замеров и ДИ
+    matrix_file = run_dir / "matrix.json"
+    if not matrix_file.exists():
+        return
+    verified = bool(json.loads(matrix_file.read_text()).get("verify"))
+    if verified != bool(matrix.get("verify")):
+        raise ValueError(f"--resume: запуск {run_dir.name} шёл {'с проверкой' if verified else 'без проверки'} "
+                         f"данных, дописывать его нужно {'с --verify' if verified else 'без --verify'}")
 
+def register_variants(variants):
+    # Варианты методов из матрицы добавляются в METHODS_CONFIG, чтобы их прогоны находили графики
+    for name, variant in variants.items():
+        variant = dict(variant)
+        base = variant.pop("base", None)
+        if base is not None and base not in METHODS_CONFIG:
+            raise ValueError(f"вариант {name}: неизвестный базовый метод {base}")
+        base_config = METHODS_CONFIG.get(base, {})
+        config = {**base_config, **variant, "env": {**base_config.get("env", {}), **variant.get("env", {})}}
+        if base is not None and "dir" not in variant:
+            config["dir"] = base_config.get("dir", base)  # скрипты базового метода
+        config = {key: value for key, value in config.items() if value is not None}  # None снимает ключ базы
+        missing = {"sender_metric", "receiver_metric"} - set(config)
+        if missing:
+            raise ValueError(f"вариант {name}: не заданы {', '.join(sorted(missing))}")
+        METHODS_CONFIG[name] = config
+
+register_variants(METHOD_VARIANTS)
+
+def select_methods(matrix):
+    # Методы матрицы {имя: конфигурация}: отбор по шаблонам и умолчания env / timeout / start_delay
+    patterns = matrix.get("methods")
+    names = [name for name in METHODS_CONFIG if not patterns or any(fnmatch(name, p) for p in patterns)]
+    unmatched = [p for p in patterns or [] if not any(fnmatch(name, p) for name in METHODS_CONFIG)]
+    if unmatched:
+        raise ValueError(f"нет методов под шаблоны: {', '.join(unmatched)}")
+    methods = {}
+    for name in names:
+        config = {**METHODS_CONFIG[name], "env": {**matrix.get("env", {}), **METHODS_CONFIG[name].get("env", {})}}
+        for key in ("timeout", "start_delay"):
+            if key in matrix:
+                config.setdefault(key, matrix[key])
+        methods[name] = config
+    return methods
+
+def parse_pairs(pairs):
+    # "py-cpp" -> ("py_sender", "cpp_receiver"); только пары из SENDER_RECEIVER_PAIRS
+    parsed = []
+    for pair in pairs:
+        sender, _, receiver = pair.partition("-")
+        keys = (f"{sender}_sender", f"{receiver}_receiver")
+        if keys not in SENDER_RECEIVER_PAIRS:
+            raise ValueError(f"неизвестная пара {pair}, ожидается py-py, py-cpp, cpp-py или cpp-cpp")
+        parsed.append(keys)
+    return parsed
+
+def parse_cpu_list(text):
+    # Формат списков CPU в /sys: "0-3,8,10-11" -> [0, 1, 2, 3, 8, 10, 11]
+    cpus = []
+    for part in text.strip().split(","):
+        if part:
+            first, _, last = part.partition("-")
+            cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+def read_cpu_topology():
+    # Ядро, сокет и узел NUMA каждого доступного оркестратору логического CPU (из /sys)
+    nodes = {}
+    for node_dir in Path("/sys/devices/system/node").glob("node[0-9]*"):
+        for cpu in parse_cpu_list((node_dir / "cpulist").read_text()):
+            nodes[cpu] = int(node_dir.name[len("node"):])
+    topology = {}
+    for cpu in sorted(os.sched_getaffinity(0)):
+        topo_dir = Path(f"/sys/devices/system/cpu/cpu{cpu}/topology")
+        topology[cpu] = {
+            "core": int((topo_dir / "core_id").read_text()),
+            "package": int((topo_dir / "physical_package_id").read_text()),
+            "node": nodes.get(cpu, 0),
+        }
+    return topology
+
+def placement_cpus(policy, topology):
+    # CPU отправителя и получателя для политики размещения; None — политика невыполнима на этой машине
+    #   same_core    — оба процесса на одном логическом CPU
+    #   smt_siblings — два гиперпотока одного физического ядра
+    #   same_socket  — разные физические ядра одного сокета
+    #   cross_numa   — разные узлы NUMA (на двухсокетных машинах — разные сокеты)
+    def pair(match):
+        for a in sorted(topology):
+            for b in sorted(topology):
+                if a != b and match(topology[a], topology[b]):
+                    return {"policy": policy, "sender": [a], "receiver": [b]}
+        return None
+
+    if policy == "none":
+        return {"policy": policy, "sender": None, "receiver": None}
+    if policy == "same_core":
+        cpu = min(topology)
+        return {"policy": policy, "sender": [cpu], "receiver": [cpu]}
+    if policy == "smt_siblings":
+        return pair(lambda a, b: (a["package"], a["core"]) == (b["package"], b["core"]))
+    if policy == "same_socket":
+        return pair(lambda a, b: a["package"] == b["package"] and a["core"] != b["core"])
+    if policy == "cross_numa":
+        return pair(lambda a, b: a["node"] != b["node"])
+    raise ValueError(f"Неизвестная политика размещения: {policy}")
+
+def process_setup(cpus):
+    # Выполняется в дочернем процессе до exec: своя группа процессов и привязка к CPU.
+    # Оболочка shell=True привязывается сама, запущенный ею сценарий наследует маску
+    def setup():
+        os.setsid()
+        if cpus:
+            os.sched_setaffinity(0, cpus)
+    return setup
+
+def cpu_list(cpus):
+    return ",".join(map(str, cpus)) if cpus else ""
+
+def write_run_info(output_subdir, method_name, sender_key, receiver_key, size_env, trial=0, placement=None):
+    # Описание прогона рядом с метриками: по нему строится общая таблица результатов
+    size_env = size_env or {}
+    placement = placement or {}
+    info = {
+        "method": method_name,
+        "sender": sender_key,
+        "receiver": receiver_key,
+        "chunk_size": int(size_env.get("IPC_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)),
+        "total_size": int(size_env.get("IPC_TOTAL_SIZE", DEFAULT_TOTAL_SIZE)),
+        "trial": trial,
+        "batch_size": int(size_env.get("IPC_BATCH_SIZE", 0)),
+        "batch_linger_us": int(size_env.get("IPC_BATCH_LINGER_US", BATCH_LINGER_US)),
+        "payload_kind": size_env.get("IPC_PAYLOAD", "bytes"),
+        "pickle_mode": size_env.get("IPC_PICKLE", "oob"),
+        "placement": placement.get("policy", "none"),
+        "sender_cpus": cpu_list(placement.get("sender")),
+        "receiver_cpus": cpu_list(placement.get("receiver")),
+    }
+    with open(output_subdir / "run_info.json", "w") as f:
+        json.dump(info, f, indent=2)
+
+def match_method(run_tag):
+    # Самое длинное совпадающее имя метода, чтобы posix_shared_memory_ring не путался с posix_shared_memory
+    matches = [m for m in METHODS_CONFIG if run_tag.startswith(m)]
+    return max(matches, key=len) if matches else None
+
+class MetricsCollector:
+    # Живой сбор замеров: процессы шлют датаграммы в UNIX сокет (ipc/metrics.py, common/metrics_channel.hpp), поток сборщика
+    # складывает их в столбцы и печатает строку прогресса. Путь к сокету получают все дочерние процессы
+    # через IPC_METRICS_SOCKET, по остановке столбцы сохраняются одним файлом
+    COLUMNS = ("run", "role", "pid", "final", "wall_time_sec", "active_time_sec", "bytes", "rss_mb")
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(self, store_file):
+        self.store_file = store_file
+        self.path = f"/tmp/ipc_metrics_{os.getpid()}.sock"  # путь к сокету ограничен 108 байтами, поэтому /tmp
+        self.columns = {column: [] for column in self.COLUMNS}
+        self.running = False
+        self.last_progress = 0.0
+        self.show_progress = sys.stdout.isatty()
+
+    def __enter__(self):
+        Path(self.path).unlink(missing_ok=True)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind(self.path)
+        self.sock.settimeout(0.2)
+        self.running = True
+        self.thread = threading.Thread(target=self.receive_loop, daemon=True)
+        self.thread.start()
+        os.environ["IPC_METRICS_SOCKET"] = self.path
+        return self
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join()
+        # Итоговые замеры последнего прогона могут ещё лежать в очереди сокета: процессы отправили их до выхода,
+        # поэтому очередь дочитывается без ожидания
+        self.sock.setblocking(False)
+        while True:
+            try:
+                self.handle(self.sock.recv(65536))
+            except BlockingIOError:
+                break
+        self.sock.close()
+        Path(self.path).unlink(missing_ok=True)
+        os.environ.pop("IPC_METRICS_SOCKET", None)
+        frame = self.frame()
+        if self.store_file.exists():  # дописывание прерванного запуска: замеры прошлых прогонов сохраняются
+            frame = pd.concat([pd.read_csv(self.store_file), frame], ignore_index=True)
+        frame.to_csv(self.store_file, index=False)
+        print(f"[INFO] Сохранено {len(self.columns['run'])} замеров в {self.store_file.name}")
+
+    def receive_loop(self):
+        while self.running:
+            try:
+                self.handle(self.sock.recv(65536))
+            except socket.timeout:
+                continue
+
+    def handle(self, datagram):
+        try:
+            sample = json.loads(datagram)
+        except ValueError:
+            return
+        for column in self.COLUMNS:
+            self.columns[column].append(sample.get(column))
+        self.progress(sample)
+
+    def progress(self, sample):
+        now = time.time()
+        if not self.show_progress or (now - self.last_progress < self.PROGRESS_INTERVAL and not sample["final"]):
+            return
+        self.last_progress = now
+        active_time = sample["active_time_sec"] or 0.0
+        mbps = sample["bytes"] / 1024**2 / active_time if active_time > 0 else 0.0
+        line = f"[LIVE] {sample['run']} {sample['role']}: {sample['bytes'] / 1024**3:.2f} GiB, {mbps:.0f} MB/s"
+        print(line.ljust(120), end="\r", flush=True)
+
+    def frame(self):
+        return pd.DataFrame(self.columns)
+
+
+class ProcSampler:
+    # Опрос /proc/<pid> запущенных процессов из отдельного потока оркестратора: память, процессорное время,
+    # переключения контекста и сбои страниц снимаются без единого лишнего вызова в измеряемых циклах.
+    # watch(proc, файл) — процесс вместе с потомками (оболочка shell=True и то, что она запустила).
+    # wait(proc) дожидается процесса через wait4 и дописывает точный итог CPU, переключений и сбоев из rusage:
+    # короткий прогон может закончиться раньше первого опроса. В файл пишется временной ряд: rss_mb — текущий,
+    # остальные столбцы — накопленные значения
+    INTERVAL = 0.05  # секунды между опросами, задаётся --proc-interval; 0 — только итог по wait4
+    COLUMNS = ("time_sec", "processes", "rss_mb", "peak_rss_mb", "utime_sec", "stime_sec",
+               "voluntary_ctxt", "nonvoluntary_ctxt", "minflt", "majflt")
+    COUNTERS = COLUMNS[4:]
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 1024**2
+
+    def __init__(self):
+        self.targets = {}  # {pid корня: {"file", "rows", "last_seen": {pid: накопленные значения}, "peak"}}
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.thread = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        if self.INTERVAL > 0:
+            self.thread = threading.Thread(target=self.sample_loop, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        if self.thread is not None:
+            self.thread.join()
+        for target in self.targets.values():
+            pd.DataFrame(target["rows"], columns=self.COLUMNS).to_csv(target["file"], index=False)
+
+    def watch(self, proc, output_file):
+        with self.lock:
+            self.targets[proc.pid] = {"file": output_file, "rows": [], "last_seen": {}, "peak": 0.0}
+
+    def wait(self, proc, timeout=None):
+        # Popen.wait через wait4: rusage корня включает всех дождавшихся его потомков. TimeoutExpired — как у Popen
+        if proc.returncode is not None:
+            return proc.returncode
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+            if pid:
+                break
+            if deadline is not None and time.time() > deadline:
+                raise subprocess.TimeoutExpired(proc.args, timeout)
+            time.sleep(0.01)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        with self.lock:
+            target = self.targets.get(proc.pid)
+            if target is not None:
+                # ru_maxrss не годится: после fork в нём остаётся пик памяти самого оркестратора,
+                # поэтому пиковая память — только по опросу, nan, если опросов не было
+                peak = round(target["peak"], 2) if target["peak"] > 0 else float("nan")
+                target["rows"].append({
+                    "time_sec": round(time.perf_counter() - self.start, 4), "processes": 0, "rss_mb": 0.0,
+                    "peak_rss_mb": peak, "utime_sec": usage.ru_utime, "stime_sec": usage.ru_stime,
+                    "voluntary_ctxt": usage.ru_nvcsw, "nonvoluntary_ctxt": usage.ru_nivcsw,
+                    "minflt": usage.ru_minflt, "majflt": usage.ru_majflt,
+                })
+                target["done"] = True
+        return proc.returncode
+
+    def failed(self, proc):
+        # Процесс уже завершился с ненулевым кодом (проверка без ожидания)
         try:
-            receiver_proc.wait(timeout=60)
+            return self.wait(proc, timeout=0) != 0
         except subprocess.TimeoutExpired:
-            print("[WARN] Получатель завис, убиваем процесс")
-            os.killpg(os.getpgid(receiver_proc.pid), signal.SIGKILL)
+            return False
+
+    def sample_loop(self):
+        while not self.stop.wait(self.INTERVAL):
+            with self.lock:
+                roots = [(pid, target) for pid, target in self.targets.items() if not target.get("done")]
+            for root, target in roots:
+                row = self.sample(root, target)
+                with self.lock:
+                    if row is not None and not target.get("done"):
+                        target["rows"].append(row)
+
+    def sample(self, root, target):
+        # Завершившиеся процессы остаются в last_seen с последними значениями
+        last_seen = target["last_seen"]
+        rss_mb = 0.0
+        alive = 0
+        for pid in self.process_tree(root):
+            counters = self.read_counters(pid)
+            if counters is None:
+                continue
+            rss_mb += counters.pop("rss_mb")
+            last_seen[pid] = counters
+            alive += 1
+        if not last_seen:
+            return None
+        target["peak"] = max(target["peak"], rss_mb)
+        totals = {column: sum(c[column] for c in last_seen.values()) for column in self.COUNTERS}
+        return {"time_sec": round(time.perf_counter() - self.start, 4), "processes": alive,
+                "rss_mb": round(rss_mb, 2), "peak_rss_mb": round(target["peak"], 2), **totals}
+
+    @staticmethod
+    def process_tree(root):
+        # Корень и все его потомки по /proc/<pid>/task/<tid>/children
+        pids = [root]
+        for pid in pids:
+            try:
+                tasks = os.listdir(f"/proc/{pid}/task")
+            except OSError:
+                continue
+            for task in tasks:
+                try:
+                    with open(f"/proc/{pid}/task/{task}/children") as f:
+                        pids.extend(int(child) for child in f.read().split())
+                except OSError:
+                    pass
+        return pids
+
+    @classmethod
+    def read_counters(cls, pid):
+        # None, если процесс уже завершился
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                stat = f.read()
+            # Поля после имени процесса в скобках (имя может содержать пробелы), нумерация с поля 3 (state)
+            fields = stat[stat.rindex(")") + 2:].split()
+            voluntary = nonvoluntary = 0
+            for task in os.listdir(f"/proc/{pid}/task"):# переключения контекста считаются по потокам
+                with open(f"/proc/{pid}/task/{task}/status") as f:
+                    for line in f:
+                        if line.startswith("voluntary_ctxt_switches:"):
+                            voluntary += int(line.split()[1])
+                        elif line.startswith("nonvoluntary_ctxt_switches:"):
+                            nonvoluntary += int(line.split()[1])
+        except (OSError, ValueError):
+            return None
+        if fields[0] == "Z":  # зомби: счётчики уже не растут, а итог придёт из wait4
+            return None
+        return {
+            "rss_mb": int(fields[21]) * cls.PAGE_MB,
+            "utime_sec": int(fields[11]) / cls.CLOCK_TICKS,
+            "stime_sec": int(fields[12]) / cls.CLOCK_TICKS,
+            "voluntary_ctxt": voluntary,
+            "nonvoluntary_ctxt": nonvoluntary,
+            "minflt": int(fields[7]),
+            "majflt": int(fields[9]),
+        }
+
+
+def final_samples(results_dir):
+    # Итоговые замеры из хранилища samples.csv: {(прогон, роль): метрики}; пусто для старых запусков
+    store_file = results_dir / "samples.csv"
+    if not store_file.exists():
+        return {}
+    samples = pd.read_csv(store_file)
+    samples = samples[samples.final.astype(str) == "True"]
+    return {
+        (row.run, row.role): {
+            'active_time_sec': float(row.active_time_sec),
+            'wall_time_sec': float(row.wall_time_sec),
+            'bytes': int(row.bytes),
+            'rss_mb': row.rss_mb,
+        }
+        for row in samples.itertuples()
+    }
+
+def ci95_halfwidth(values):
+    # Половина ширины 95% доверительного интервала среднего (t-распределение Стьюдента)
+    n = len(values)
+    if n < 2:
+        return float("nan")
+    return T_CRITICAL_95.get(n - 1, 1.96) * statistics.stdev(values) / math.sqrt(n)
+
+def run_names():
+    n = next(RUN_COUNTER)
+    return {"IPC_NAME_SUFFIX": f"_r{os.getpid()}_{n}", "IPC_PORT_OFFSET": str(n % PORT_SLOTS * PORT_STRIDE)}
+
+def remove_names(matches):
+    # Файлы сегментов и семафоров (/dev/shm, hugetlbfs), сокетов и FIFO (/tmp), имена которых подходят под matches
+    removed = []
+    for directory in NAME_DIRS:
+        try:
+            entries = list(directory.iterdir())
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith(NAME_PREFIXES) and matches(entry.name):
+                try:
+                    entry.unlink()
+                    removed.append(entry.name)
+                except OSError:
+                    pass
+    return removed
 
-        for role in ("sender", "receiver"):
-            metric_file = method_config[f"{role}_metric"]
-            source_file = code_dir / metric_file
-            if source_file.exists():
-                shutil.copy(source_file, output_subdir / metric_file)
+def cleanup_run_names(suffix):
+    # Остатки прогона: процесс, убитый по таймауту или упавший, не успевает удалить свои сегменты и семафоры
+    pattern = re.compile(re.escape(suffix) + r"(?:_|$)")
+    removed = remove_names(pattern.search)
+    if removed:
+        print(f"[INFO] Удалены остатки прогона: {', '.join(sorted(removed))}")
 
+def cleanup_stale_names():
+    # Остатки запусков, оркестратор которых уже не работает
+    def stale(name):
+        match = RUN_NAME.search(name)
+        if not match:
+            return False
+        try:
+            os.kill(int(match.group(1)), 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass
+        return False
+
+    removed = remove_names(stale)
+    if removed:
+        print(f"[INFO] Удалено {len(removed)} сегментов, семафоров и сокетов прошлых запусков")
+
+def start_process(cmd, code_dir, env, setup, ready=False):
+    # ready=True: процесс получает пишущий конец пайпа готовности в IPC_READY_FD; возвращает (процесс, читающий конец)
+    if not ready:
+        return subprocess.Popen(cmd, cwd=code_dir, env=env, shell=True, preexec_fn=setup), None
+    read_fd, write_fd = os.pipe()
+    try:
+        proc = subprocess.Popen(cmd, cwd=code_dir, env={**env, "IPC_READY_FD": str(write_fd)}, shell=True,
+                                preexec_fn=setup, pass_fds=(write_fd,))
+    except BaseException:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)  # у оркестратора копии нет: конец пайпа без байта значит, что процесс завершился
+    return proc, read_fd
 
-def run_all_tests():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")#получаем данные даты и времени для имени папки
-    current_run_dir = RESULTS_DIR / timestamp# создаём команду для создания папки
-    current_run_dir.mkdir()#создаём папку с датой внутри папки results
+def wait_ready(ready_fds, delay=0.0):
+    # Ждём байт готовности от каждого процесса, запущенного первым, затем паузу delay.
+    # False — кто-то из них завершился, не сообщив о готовности: второй роли не с кем работать
+    pending = set(ready_fds)
+    alive = True
+    deadline = time.time() + READY_TIMEOUT
+    while pending:
+        readable, _, _ = select.select(list(pending), [], [], max(0.0, deadline - time.time()))
+        if not readable:
+            print(f"[WARN] Нет сигнала готовности за {READY_TIMEOUT} с, запускаем второй процесс")
+            break
+        for fd in readable:
+            if not os.read(fd, 1):
+                alive = False
+            pending.discard(fd)
+    for fd in ready_fds:
+        os.close(fd)
+    if alive and delay:
+        time.sleep(delay)
+    return alive
+
+def run_pair(method_name, method_config, sender_key, receiver_key, output_subdir, size_env=None, placement=None):
+    # Один прогон пары отправитель-получатель, процессы пишут метрики прямо в output_subdir
+    code_dir = method_dir(method_name, method_config)
+    placement = placement or {}
+    sender_setup = process_setup(placement.get("sender"))
+    receiver_setup = process_setup(placement.get("receiver"))
+    names = run_names()
+    env = {**method_env(method_config, size_env), **names, "IPC_METRICS_DIR": str(Path(output_subdir).resolve()),
+           "IPC_RUN_ID": Path(output_subdir).name}
+    sender_cmd = method_config[sender_key]
+    receiver_cmd = method_config[receiver_key]
+    delay = method_config.get("start_delay", START_DELAY)
+
+    roles = {
+        "sender": ("отправителя", sender_key, sender_cmd, sender_setup),
+        "receiver": ("получателя", receiver_key, receiver_cmd, receiver_setup),
+    }
+    order = ("sender", "receiver") if method_config.get("sender_first", False) else ("receiver", "sender")
+
+    # Память, CPU, переключения контекста и сбои страниц обоих процессов снимаются снаружи: <роль>_proc.csv.
+    # Второй процесс запускается по сигналу готовности первого
+    procs = {}
+    with ProcSampler() as sampler:
+        for role in order:
+            title, key, cmd, setup = roles[role]
+            print(f"[INFO] Запуск {title} ({key}): {cmd}")
+            procs[role], ready_fd = start_process(cmd, code_dir, env, setup, ready=role == order[0])
+            sampler.watch(procs[role], Path(output_subdir) / f"{role}_proc.csv")
+            if ready_fd is not None and not wait_ready([ready_fd], delay):
+                print(f"[WARN] Процесс {title} завершился, не сообщив о готовности; второй процесс не запускается")
+                break
 
-    for method_name, method_config in METHODS_CONFIG.items():#цикл для прохождения всех методов во всех комбинациях
-        if method_name == "boost_int":# так как boost имеет только c++ скрипты то для него отдельая функция
-            run_boost(method_name, method_config, current_run_dir)
+        receiver_proc = procs.get("receiver")
+        sender_proc = procs.get("sender")
+        if receiver_proc is not None:
+            # Упавший отправитель уже не пришлёт конец потока: тогда получателю остаётся PEER_FAILED_GRACE с
+            deadline = time.time() + method_config.get("timeout", RUN_TIMEOUT)
+            while True:
+                try:
+                    sampler.wait(receiver_proc, timeout=max(0.0, min(deadline - time.time(), 0.5)))
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                if time.time() >= deadline:
+                    print("[WARN] Получатель завис, убиваем процесс")
+                    os.killpg(os.getpgid(receiver_proc.pid), signal.SIGKILL)
+                    break
+                if sender_proc is not None and sampler.failed(sender_proc):
+                    deadline = min(deadline, time.time() + PEER_FAILED_GRACE)
+        if sender_proc is not None:
+            try:
+                # Отправитель заканчивает раньше получателя или сразу вслед за ним; дольше ждёт только тот,
+                # кому не с кем работать (получатель упал)
+                sampler.wait(sender_proc, timeout=5)
+            except subprocess.TimeoutExpired:
+                print("[WARN] Отправитель завис, убиваем процесс")
+                os.killpg(os.getpgid(sender_proc.pid), signal.SIGKILL)
+    cleanup_run_names(names["IPC_NAME_SUFFIX"])
+
+def trial_speed(output_subdir, method_config):
+    # Скорость получателя одного замера, МБ/с; None, если замер не завершился (нет итоговой строки метрик)
+    metric_file = output_subdir / method_config["receiver_metric"]
+    try:
+        metrics = read_metrics(metric_file, "receiver") if metric_file.exists() else None
+    except (ValueError, IndexError):  # процесс убит, не дописав файл
+        return None
+    if metrics and metrics["active_time_sec"] > 0:
+        return (metrics["bytes"] / 1024**2) / metrics["active_time_sec"]
+    return None
+
+def run_trials(method_name, method_config, sender_key, receiver_key, output_root, run_tag,
+               size_env=None, trials=None, placement=None):
+    # Прогрев и повторные замеры одной комбинации; ранняя остановка, когда 95% ДИ скорости получателя
+    # становится уже ci_target от среднего. Каждый замер пишется в свою папку <run_tag>_t<номер>.
+    # При дописывании прерванного запуска (--resume) готовые замеры учитываются без повторного прогона,
+    # а незавершённые и неудачные переделываются; прогрев — только если хоть что-то запускается
+    trials = {**TRIALS_CONFIG, **(trials or {})}
+
+    warmed_up = False
+    speeds = []
+    for trial in range(trials["max_trials"]):
+        output_subdir = output_root / f"{run_tag}_t{trial}"
+        speed = trial_speed(output_subdir, method_config) if output_subdir.exists() else None
+        if speed is not None:
+            print(f"[INFO] {output_subdir.name}: замер уже есть, пропускаем")
         else:
-            run_method(method_name, method_config, current_run_dir)
+            if output_subdir.exists():
+                shutil.rmtree(output_subdir)
+            if not warmed_up:
+                for warmup in range(trials["warmup"]):
+                    print(f"[INFO] Прогрев {run_tag} ({warmup + 1}/{trials['warmup']})")
+                    with tempfile.TemporaryDirectory(prefix=f"{run_tag}_warmup_") as warmup_dir:
+                        run_pair(method_name, method_config, sender_key, receiver_key, Path(warmup_dir), size_env,
+                                 placement)
+                warmed_up = True
+            output_subdir.mkdir()
+            run_sizes = {**method_config.get("env", {}), **(size_env or {})}  # размеры метода, если не перебираются
+            write_run_info(output_subdir, method_name, sender_key, receiver_key, run_sizes, trial, placement)
+            run_pair(method_name, method_config, sender_key, receiver_key, output_subdir, size_env, placement)
+            speed = trial_speed(output_subdir, method_config)
+            if speed is None:
+                print(f"[WARN] {output_subdir.name}: нет итоговых метрик получателя (процесс убит или упал), "
+                      f"замер не засчитан")
+        if speed is not None:
+            speeds.append(speed)
+
+        if len(speeds) >= trials["min_trials"]:
+            mean = statistics.mean(speeds)
+            relative_ci = ci95_halfwidth(speeds) / mean if mean > 0 else float("inf")
+            if relative_ci <= trials["ci_target"]:
+                print(f"[INFO] {run_tag}: 95% ДИ ±{relative_ci:.1%} после {len(speeds)} замеров, останавливаемся")
+                break
+
+
+def run_method(method_name, method_config, output_root, size_env=None, run_suffix="", trials=None, placement=None,
+               pairs=None):
+    reason = missing_requirement(method_config)
+    if reason:
+        print(f"[WARN] {method_name}: {reason}, пропускаем")
+        return
+    batched = int((size_env or {}).get("IPC_BATCH_SIZE", 0)) > 0
+    if batched and (not method_config.get("batch", True) or method_config.get("pingpong")):
+        print(f"[WARN] {method_name}: пакетирование не поддерживается, пропускаем")
+        return
+    payload = (size_env or {}).get("IPC_PAYLOAD", "bytes") != "bytes"
+    if payload and not method_config.get("payload"):
+        print(f"[WARN] {method_name}: структурированная нагрузка не поддерживается, пропускаем")
+        return
+    for sender_key, receiver_key in pairs or SENDER_RECEIVER_PAIRS:
+        if not method_config.get(sender_key) or not method_config.get(receiver_key):
+            continue
+        if payload and (sender_key, receiver_key) != ("py_sender", "py_receiver"):
+            continue  # pickle есть только у Python
+        reason = missing_binary(method_name, method_config, sender_key, receiver_key)
+        if reason:
+            print(f"[WARN] {method_name} {sender_key}->{receiver_key}: {reason}, пропускаем")
+            continue
+        run_trials(method_name, method_config, sender_key, receiver_key, output_root,
+                   f"{method_name}_{sender_key}_{receiver_key}{run_suffix}", size_env, trials, placement)
+
+
+def scaling_shapes(counts, fan_out):
+    # Пары (N отправителей, M получателей). Без общей точки встречи (shm, сокеты, boost) — только N = M пар,
+    # у ZeroMQ ещё веер 1 -> M и сбор N -> 1
+    shapes = [(k, k) for k in counts]
+    if fan_out:
+        shapes += [(1, k) for k in counts if k > 1] + [(k, 1) for k in counts if k > 1]
+    return shapes
+
+def instance_env(method_config, role, index, senders, receivers, names):
+    # Окружение одного процесса в режиме масштабирования; names — имена и порты всего прогона (run_names)
+    port_offset = int(names["IPC_PORT_OFFSET"])
+    if method_config.get("fan_out", False):
+        # Отправитель i слушает свой порт, каждый получатель подключается ко всем отправителям
+        if role == "sender":
+            return {"IPC_PORT_OFFSET": str(port_offset + index), "IPC_RECEIVERS": str(receivers)}
+        return {"IPC_PORT_OFFSET": str(port_offset), "IPC_SENDERS": str(senders)}
+    # Пара i работает через свой сегмент / сокет / порт
+    return {"IPC_NAME_SUFFIX": f"{names['IPC_NAME_SUFFIX']}_{index}", "IPC_PORT_OFFSET": str(port_offset + index)}
+
+def run_scaled(method_name, method_config, sender_key, receiver_key, output_subdir, senders, receivers, size_env=None):
+    # N отправителей и M получателей одновременно; каждый процесс пишет метрики в свою папку <роль>_<номер>
+    code_dir = method_dir(method_name, method_config)
+    base_env = method_env(method_config, size_env)
+    keys = {"sender": sender_key, "receiver": receiver_key}
+    counts = {"sender": senders, "receiver": receivers}
+    order = ("sender", "receiver") if method_config.get("sender_first", False) else ("receiver", "sender")
+    names = run_names()
+
+    procs = []
+    with ProcSampler() as sampler:
+        for role in order:
+            print(f"[INFO] Запуск {counts[role]} x {role} ({keys[role]}): {method_config[keys[role]]}")
+            ready_fds = []  # вторая роль запускается, когда все процессы первой сообщили о готовности
+            for index in range(counts[role]):
+                proc_dir = output_subdir / f"{role}_{index}"
+                proc_dir.mkdir()
+                env = {**base_env, **instance_env(method_config, role, index, senders, receivers, names),
+                       "IPC_METRICS_DIR": str(proc_dir.resolve()), "IPC_RUN_ID": f"{output_subdir.name}/{proc_dir.name}"}
+                proc, ready_fd = start_process(method_config[keys[role]], code_dir, env, os.setsid,
+                                               ready=role == order[0])
+                procs.append(proc)
+                sampler.watch(proc, proc_dir / f"{role}_proc.csv")
+                if ready_fd is not None:
+                    ready_fds.append(ready_fd)
+            if ready_fds and not wait_ready(ready_fds, method_config.get("start_delay", START_DELAY)):
+                print("[WARN] Не все процессы первой роли сообщили о готовности; прогон останавливается")
+                for proc in procs:  # оставшимся некого ждать
+                    try:
+                        os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+                    except ProcessLookupError:
+                        pass
+                break
+
+        deadline = time.time() + SCALING_TIMEOUT
+        for proc in procs:
+            try:
+                sampler.wait(proc, timeout=max(0.0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                print("[WARN] Процесс завис, убиваем его")
+                os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
+    cleanup_run_names(names["IPC_NAME_SUFFIX"])
+
+def run_scaling_tests(counts=None, methods=None):
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    current_run_dir = RESULTS_DIR / f"{timestamp}_scaling"
+    current_run_dir.mkdir()
+    size_env = {"IPC_CHUNK_SIZE": str(DEFAULT_CHUNK_SIZE), "IPC_TOTAL_SIZE": str(SCALING_TOTAL_SIZE)}
+
+    with MetricsCollector(current_run_dir / "samples.csv"):
+        for method_name, method_config in (methods or METHODS_CONFIG).items():
+            reason = missing_requirement(method_config)
+            if reason:
+                print(f"[WARN] {method_name}: {reason}, пропускаем")
+                continue
+            for sender_key, receiver_key in SCALING_PAIRS:
+                if not method_config.get(sender_key) or not method_config.get(receiver_key):
+                    continue
+                reason = missing_binary(method_name, method_config, sender_key, receiver_key)
+                if reason:
+                    print(f"[WARN] {method_name} {sender_key}->{receiver_key}: {reason}, пропускаем")
+                    continue
+                for senders, receivers in scaling_shapes(counts or SCALING_COUNTS, method_config.get("fan_out", False)):
+                    output_subdir = current_run_dir / f"{method_name}_{sender_key}_{receiver_key}_{senders}x{receivers}"
+                    output_subdir.mkdir()
+                    info = {"method": method_name, "sender": sender_key, "receiver": receiver_key,
+                            "senders": senders, "receivers": receivers,
+                            "chunk_size": DEFAULT_CHUNK_SIZE, "total_size_per_sender": SCALING_TOTAL_SIZE}
+                    with open(output_subdir / "scale_info.json", "w") as f:
+                        json.dump(info, f, indent=2)
+                    run_scaled(method_name, method_config, sender_key, receiver_key, output_subdir,
+                               senders, receivers, size_env)
+
+    return current_run_dir
+
+
+def run_all_tests(message_sizes=None, trials=None, placements=None, methods=None, pairs=None, run_dir=None,
+                  matrix=None, batches=None, payloads=None):
+    # methods — {имя: конфигурация} (по умолчанию все METHODS_CONFIG), pairs — пары ролей. run_dir — папка
+    # прерванного запуска, которую нужно дописать (--resume); matrix сохраняется в ней для следующего --resume.
+    # batches — список (окружение, суффикс) из batch_runs: каждый размер сообщения прогоняется с каждым пакетом,
+    # payloads — так же из payload_runs, с каждой нагрузкой
+    if run_dir is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")#получаем данные даты и времени для имени папки
+        current_run_dir = RESULTS_DIR / timestamp# создаём команду для создания папки
+        current_run_dir.mkdir()#создаём папку с датой внутри папки results
+    else:
+        current_run_dir = run_dir
+    if matrix is not None:
+        with open(current_run_dir / "matrix.json", "w") as f:
+            json.dump(matrix, f, indent=2)
+
+    # Хост и ревизия кода запуска — для истории результатов; дописываемый запуск (--resume) сохраняет исходные
+    if not (current_run_dir / "host.json").exists():
+        with open(current_run_dir / "host.json", "w") as f:
+            json.dump(host_info(), f, indent=2)
+
+    # Топология машины сохраняется рядом с результатами, CPU каждого прогона — в его run_info.json
+    topology = read_cpu_topology()
+    with open(current_run_dir / "topology.json", "w") as f:
+        json.dump({str(cpu): info for cpu, info in topology.items()}, f, indent=2)
+
+    # Без политик размещения процессы запускаются где угодно, как раньше
+    placement_runs = [(None, "")]
+    if placements:
+        placement_runs = []
+        for policy in placements:
+            placement = placement_cpus(policy, topology)
+            if placement is None:
+                print(f"[WARN] Политика размещения {policy} невыполнима на этой машине, пропускаем")
+                continue
+            print(f"[INFO] Размещение {policy}: отправитель на CPU {cpu_list(placement['sender']) or 'любых'}, "
+                  f"получатель на CPU {cpu_list(placement['receiver']) or 'любых'}")
+            placement_runs.append((placement, f"_{policy}"))
+
+    # Без перебора размеров сценарии работают со своими размерами по умолчанию
+    size_runs = [(None, "")]
+    if message_sizes:
+        size_runs = [(sweep_env(size), f"_{size}B") for size in message_sizes]
+
+    with MetricsCollector(current_run_dir / "samples.csv"):
+        for size_env, run_suffix in size_runs:
+            if size_env:
+                print(f"[INFO] Размер сообщения {size_env['IPC_CHUNK_SIZE']} Б, объём {size_env['IPC_TOTAL_SIZE']} Б")
+            for batch_env, batch_suffix in batches or [(None, "")]:
+                for payload_env, payload_suffix in payloads or [(None, "")]:
+                    extra_env = {**(batch_env or {}), **(payload_env or {})}
+                    run_env = {**(size_env or {}), **extra_env} if extra_env else size_env
+                    if payload_env:
+                        run_env = payload_size_env(run_env)  # и прогон bytes для сравнения — тем же объёмом
+                    for placement, placement_suffix in placement_runs:
+                        for method_name, method_config in (methods or METHODS_CONFIG).items():#цикл для прохождения всех методов во всех комбинациях
+                            run_method(method_name, method_config, current_run_dir, run_env,
+                                       run_suffix + batch_suffix + payload_suffix + placement_suffix, trials,
+                                       placement, pairs)
 
     return current_run_dir# возвращаем путь к папке для построения графиков
 
 
+def git_revision():
+    # Короткий хеш HEAD, с пометкой -dirty при незакоммиченных изменениях отслеживаемых файлов
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{rev}-dirty" if dirty else rev
+
+def host_info():
+    return {
+        "host": socket.gethostname(),
+        "kernel": platform.release(),
+        "python": platform.python_version(),
+        "git_rev": git_revision(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def read_metrics(file_path, role):
+    # Итоговая строка CSV метрик: время, объём и память; None, если формат не распознан
+    df = pd.read_csv(file_path)
+    if 'active_time_sec' not in df.columns or 'wall_time_sec' not in df.columns:
+        return None
+    byte_column = 'bytes_sent' if role == 'sender' else 'bytes_received'
+    if 'rss_mb_max' in df.columns:
+        mem_usage = df['rss_mb_max'].iloc[-1]
+    elif 'rss_mb' in df.columns:
+        mem_usage = df['rss_mb'].iloc[-1]
+    elif 'rss_bytes' in df.columns:# zmq исторически пишет МБ в колонку rss_bytes
+        mem_usage = df['rss_bytes'].iloc[-1]
+    else:
+        mem_usage = None
+    return {
+        'active_time_sec': float(df['active_time_sec'].iloc[-1]),
+        'wall_time_sec': float(df['wall_time_sec'].iloc[-1]),
+        'bytes': int(df[byte_column].iloc[-1]),
+        'rss_mb': mem_usage,
+    }
+
+
+def read_proc_summary(file_path):
+    # Итог опроса /proc одного процесса (см. ProcSampler): процессорное время, переключения контекста
+    # и сбои страниц к последнему замеру, пиковый RSS; пустые значения, если опроса не было
+    summary = dict.fromkeys(PROC_SUMMARY_COLUMNS, float("nan"))
+    if not file_path.exists():
+        return summary
+    df = pd.read_csv(file_path)
+    if df.empty:
+        return summary
+    last = df.iloc[-1]
+    summary.update({
+        'cpu_user_sec': float(last.utime_sec),
+        'cpu_sys_sec': float(last.stime_sec),
+        'cpu_sec': float(last.utime_sec + last.stime_sec),
+        'voluntary_ctxt': int(last.voluntary_ctxt),
+        'nonvoluntary_ctxt': int(last.nonvoluntary_ctxt),
+        'minflt': int(last.minflt),
+        'majflt': int(last.majflt),
+        'peak_rss_mb': float(last.peak_rss_mb),
+    })
+    return summary
+
+
+def read_verify(run_dir, method_config, role):
+    # Итог режима проверки одной роли: сообщений заполнено/проверено, испорчено, не по порядку и время проверки;
+    # пустые значения, если прогон шёл без --verify
+    summary = dict.fromkeys(VERIFY_COLUMNS, float("nan"))
+    file_path = run_dir / method_config[f"{role}_metric"].replace("_metrics.csv", "_verify.csv")
+    if not file_path.exists():
+        return summary
+    last = pd.read_csv(file_path).iloc[-1]
+    summary.update({
+        'verify_messages': int(last.messages),
+        'corrupt': int(last.corrupt),
+        'out_of_order': int(last.out_of_order),
+        'verify_sec': float(last.verify_sec),
+    })
+    return summary
+
+
+def report_verify(df, keys, results_dir):
+    # verify.csv: итог проверки данных по методам и парам; verify_share — доля времени прогона, ушедшая на узор
+    # у отправителя и CRC32 у получателя. Испорченные сообщения — повод не доверять методу, о них предупреждаем
+    checked = df.dropna(subset=['corrupt']) if 'corrupt' in df else df.iloc[0:0]
+    if checked.empty:
+        return
+    summary = checked.groupby(keys).agg(
+        runs=('corrupt', 'count'),
+        verify_messages=('verify_messages', 'sum'),
+        corrupt=('corrupt', 'sum'),
+        out_of_order=('out_of_order', 'sum'),
+        verify_sec=('verify_sec', 'sum'),
+        wall_time_sec=('wall_time_sec', 'sum'),
+    ).reset_index()
+    summary['verify_share'] = summary.verify_sec / summary.wall_time_sec
+    summary.to_csv(results_dir / "verify.csv", index=False)
+    receivers = summary[summary.role == 'receiver']
+    # При нескольких отправителях на получателя (масштабирование) номера сообщений чередуются — это не ошибка
+    single_sender = receivers.senders == 1 if 'senders' in receivers else True
+    for row in receivers[(receivers.corrupt > 0) | ((receivers.out_of_order > 0) & single_sender)].itertuples():
+        print(f"[WARN] Проверка данных: {row.method} {row.sender} -> {row.receiver} — испорчено {int(row.corrupt)}, "
+              f"не по порядку {int(row.out_of_order)} из {int(row.verify_messages)} сообщений")
+    print(f"[INFO] Сохранён verify.csv: проверено {int(receivers.verify_messages.sum())} сообщений, "
+          f"испорчено {int(receivers.corrupt.sum())}")
+
+
+def bytes_per_cpu_sec(nbytes, cpu_sec):
+    # Байт на секунду процессорного времени (user + sys) — в этих единицах считается бюджет железа
+    return nbytes / cpu_sec if cpu_sec > 0 else float("nan")
+
+
+def collect_results(results_dir):
+    # Общая таблица: одна строка на прогон и роль, с размером сообщения и производными скоростями
+    rows = []
+    finals = final_samples(results_dir)
+    for run_subdir in sorted(results_dir.iterdir()):
+        if not run_subdir.is_dir() or (run_subdir / "scale_info.json").exists():
+            continue
+        info_file = run_subdir / "run_info.json"
+        if info_file.exists():
+            info = {"placement": "none", "sender_cpus": "", "receiver_cpus": "", "batch_size": 0,
+                    "batch_linger_us": BATCH_LINGER_US, "payload_kind": "bytes", "pickle_mode": "oob",
+                    **json.loads(info_file.read_text())}
+        else:
+            # Папки старых запусков без run_info.json: метод и пара восстанавливаются по имени
+            sender, receiver = next(((s, r) for s, r in SENDER_RECEIVER_PAIRS if f"{s}_{r}" in run_subdir.name),
+                                    ("sender", "receiver"))
+            info = {"method": match_method(run_subdir.name), "sender": sender, "receiver": receiver,
+                    "chunk_size": DEFAULT_CHUNK_SIZE, "total_size": DEFAULT_TOTAL_SIZE, "trial": 0,
+                    "batch_size": 0, "batch_linger_us": BATCH_LINGER_US, "payload_kind": "bytes", "pickle_mode": "oob",
+                    "placement": "none", "sender_cpus": "", "receiver_cpus": ""}
+        info["batch"] = batch_label(info["batch_size"], info["batch_linger_us"])
+        info["payload"] = payload_label(info["payload_kind"], info["pickle_mode"])
+        method_config = METHODS_CONFIG.get(info["method"])
+        if method_config is None:
+            continue
+        for role in ('sender', 'receiver'):
+            # Итоговый замер из живого хранилища, иначе (старые запуски, потерянная датаграмма) — CSV процесса
+            metrics = finals.get((run_subdir.name, role))
+            metric_file = run_subdir / method_config[f"{role}_metric"]
+            if metrics is None and metric_file.exists():
+                metrics = read_metrics(metric_file, role)
+            if metrics is None:
+                continue
+            active_time = metrics['active_time_sec']
+            proc = read_proc_summary(run_subdir / f"{role}_proc.csv")
+            rows.append({
+                "run": run_subdir.name,
+                **info,
+                "role": role,
+                **metrics,
+                "mbps": (metrics['bytes'] / 1024**2) / active_time if active_time > 0 else None,
+                "msgs_per_sec": (metrics['bytes'] / info["chunk_size"]) / active_time if active_time > 0 else None,
+                **proc,
+                "bytes_per_cpu_sec": bytes_per_cpu_sec(metrics['bytes'], proc['cpu_sec']),
+                **read_verify(run_subdir, method_config, role),
+            })
+    results = pd.DataFrame(rows)
+    if not results.empty:
+        results.to_csv(results_dir / "results.csv", index=False)
+    return results
+
+
+def aggregate_results(results):
+    # Статистика по повторным замерам: среднее, медиана, стандартное отклонение и 95% ДИ
+    def ci95(values):
+        return ci95_halfwidth(list(values.dropna()))
+
+    keys = ['method', 'sender', 'receiver', 'chunk_size', 'batch', 'payload', 'placement', 'role']
+    stats = results.groupby(keys).agg(
+        trials=('mbps', 'count'),
+        mbps_mean=('mbps', 'mean'),
+        mbps_median=('mbps', 'median'),
+        mbps_std=('mbps', 'std'),
+        mbps_ci95=('mbps', ci95),
+        msgs_per_sec_mean=('msgs_per_sec', 'mean'),
+        msgs_per_sec_ci95=('msgs_per_sec', ci95),
+        rss_mb_mean=('rss_mb', 'mean'),
+        peak_rss_mb_mean=('peak_rss_mb', 'mean'),
+        cpu_sec_mean=('cpu_sec', 'mean'),
+        minflt_mean=('minflt', 'mean'),
+        bytes_per_cpu_sec_mean=('bytes_per_cpu_sec', 'mean'),
+        bytes_per_cpu_sec_ci95=('bytes_per_cpu_sec', ci95),
+    ).reset_index()
+    return stats
+
+
+def plot_sweep(stats, results_dir):
+    # Скорость и число сообщений в секунду в зависимости от размера сообщения, по линии на пару языков
+    receivers = stats[stats.role == 'receiver']
+    for method_name, df_method in receivers.groupby('method'):
+        fig, (ax_tp, ax_mps) = plt.subplots(1, 2, figsize=(14, 5))
+        for (sender, receiver, batch, payload, placement), df_pair in df_method.groupby(['sender', 'receiver', 'batch',
+                                                                                          'payload', 'placement']):
+            df_pair = df_pair.sort_values('chunk_size')
+            label = f"{sender.split('_')[0]}->{receiver.split('_')[0]}"
+            if batch != "none":
+                label += f" пакет {batch}"
+            if payload != "bytes":
+                label += f" {payload}"
+            if placement != "none":
+                label += f" {placement}"
+            ax_tp.errorbar(df_pair.chunk_size, df_pair.mbps_mean, yerr=df_pair.mbps_ci95.fillna(0),
+                           marker='o', capsize=3, label=label)
+            ax_mps.errorbar(df_pair.chunk_size, df_pair.msgs_per_sec_mean, yerr=df_pair.msgs_per_sec_ci95.fillna(0),
+                            marker='o', capsize=3, label=label)
+        for ax, ylabel in ((ax_tp, 'MB/s'), (ax_mps, 'сообщений/с')):
+            ax.set_xscale('log', base=2)
+            ax.set_yscale('log')
+            ax.set_xlabel('Размер сообщения, Б')
+            ax.set_ylabel(ylabel)
+            ax.grid(True, which='both', alpha=0.3)
+            ax.legend(fontsize=8)
+        fig.suptitle(f'Перебор размеров сообщений: {method_name}')
+        fig.tight_layout()
+        fig.savefig(results_dir / f"{method_name}_sweep.png")
+        plt.close(fig)
+        print(f"[INFO] Сохранён {method_name}_sweep.png")
+
+    # Сводный график по всем методам
+    plt.figure(figsize=(12, 6))
+    for (method_name, sender, receiver, batch, payload, placement), df_pair in receivers.groupby(
+            ['method', 'sender', 'receiver', 'batch', 'payload', 'placement']):
+        df_pair = df_pair.sort_values('chunk_size')
+        label = f"{method_name} {sender.split('_')[0]}->{receiver.split('_')[0]}"
+        if batch != "none":
+            label += f" пакет {batch}"
+        if payload != "bytes":
+            label += f" {payload}"
+        plt.plot(df_pair.chunk_size, df_pair.msgs_per_sec_mean, marker='.',
+                 label=label if placement == "none" else f"{label} {placement}")
+    plt.xscale('log', base=2)
+    plt.yscale('log')
+    plt.xlabel('Размер сообщения, Б')
+    plt.ylabel('сообщений/с')
+    plt.title('Сообщений в секунду, все методы')
+    plt.legend(loc='upper left', bbox_to_anchor=(1.02, 1), borderaxespad=0, fontsize=7)
+    plt.tight_layout()
+    plt.subplots_adjust(right=0.75)
+    plt.savefig(results_dir / "sweep_msgs_per_sec.png")
+    plt.close()
+    print("[INFO] Сохранён sweep_msgs_per_sec.png")
+
+
+def collect_scaling(results_dir):
+    # Строка на процесс: метрики каждого отправителя и получателя из папок <роль>_<номер>
+    rows = []
+    finals = final_samples(results_dir)
+    for run_subdir in sorted(results_dir.iterdir()):
+        info_file = run_subdir / "scale_info.json"
+        if not info_file.exists():
+            continue
+        info = json.loads(info_file.read_text())
+        method_config = METHODS_CONFIG.get(info["method"])
+        if method_config is None:
+            continue
+        for role in ('sender', 'receiver'):
+            for index in range(info[f"{role}s"]):
+                metrics = finals.get((f"{run_subdir.name}/{role}_{index}", role))
+                metric_file = run_subdir / f"{role}_{index}" / method_config[f"{role}_metric"]
+                if metrics is None and metric_file.exists():
+                    metrics = read_metrics(metric_file, role)
+                if metrics is None:
+                    continue
+                active_time = metrics['active_time_sec']
+                proc = read_proc_summary(run_subdir / f"{role}_{index}" / f"{role}_proc.csv")
+                rows.append({
+                    "run": run_subdir.name, **info, "role": role, "index": index, **metrics,
+                    "mbps": (metrics['bytes'] / 1024**2) / active_time if active_time > 0 else None,
+                    **proc,
+                    **read_verify(run_subdir / f"{role}_{index}", method_config, role),
+                })
+    return pd.DataFrame(rows)
+
+
+def plot_scaling(results_dir):
+    # Суммарная скорость и скорость одного процесса в зависимости от числа процессов
+    per_process = collect_scaling(results_dir)
+    if per_process.empty:
+        print("[WARN] Нет результатов масштабирования")
+        return
+    per_process.to_csv(results_dir / "scaling.csv", index=False)
+    report_verify(per_process, ['method', 'sender', 'receiver', 'senders', 'receivers', 'role'], results_dir)
+
+    # Процессы работают одновременно: суммарная скорость = весь объём роли / самое долгое активное время
+    keys = ['method', 'sender', 'receiver', 'senders', 'receivers', 'role']
+    summary = per_process.groupby(keys).agg(
+        processes=('index', 'count'),
+        total_bytes=('bytes', 'sum'),
+        max_active_time_sec=('active_time_sec', 'max'),
+        per_process_mbps_mean=('mbps', 'mean'),
+        per_process_mbps_min=('mbps', 'min'),
+        per_process_mbps_max=('mbps', 'max'),
+        cpu_sec=('cpu_sec', 'sum'),
+    ).reset_index()
+    summary['aggregate_mbps'] = (summary.total_bytes / 1024**2) / summary.max_active_time_sec
+    summary['bytes_per_cpu_sec'] = [bytes_per_cpu_sec(row.total_bytes, row.cpu_sec) for row in summary.itertuples()]
+    summary.to_csv(results_dir / "scaling_summary.csv", index=False)
+
+    def shape(row):
+        if row.senders == row.receivers:
+            return "N=M"
+        return "1->M" if row.senders == 1 else "N->1"
+
+    receivers = summary[summary.role == 'receiver'].copy()
+    receivers['shape'] = [shape(row) for row in receivers.itertuples()]
+    receivers['processes_per_side'] = receivers[['senders', 'receivers']].max(axis=1)
+
+    fig, (ax_total, ax_each) = plt.subplots(1, 2, figsize=(14, 5))
+    for (method_name, sender, receiver, shape_name), df in receivers.groupby(['method', 'sender', 'receiver', 'shape']):
+        df = df.sort_values('processes_per_side')
+        label = f"{method_name} {sender.split('_')[0]}->{receiver.split('_')[0]} {shape_name}"
+        ax_total.plot(df.processes_per_side, df.aggregate_mbps, marker='o', label=label)
+        ax_each.plot(df.processes_per_side, df.per_process_mbps_mean, marker='o', label=label)
+    for ax, title in ((ax_total, 'Суммарная скорость получателей'), (ax_each, 'Средняя скорость одного получателя')):
+        ax.set_xscale('log', base=2)
+        ax.set_xlabel('Процессов на стороне (N или M)')
+        ax.set_ylabel('MB/s')
+        ax.set_title(title)
+        ax.grid(True, which='both', alpha=0.3)
+    ax_each.legend(loc='upper left', bbox_to_anchor=(1.02, 1), borderaxespad=0, fontsize=7)
+    fig.tight_layout()
+    fig.savefig(results_dir / "scaling.png")
+    plt.close(fig)
+    print("[INFO] Сохранён scaling.png")
+
+
+def plot_placement(stats, results_dir):
+    # Скорость получателя при разных политиках размещения: по группе столбцов на метод и пару языков
+    receivers = stats[(stats.role == 'receiver') & stats.mbps_mean.notna()].copy()
+    receivers['combo'] = [f"{row.method} {row.sender.split('_')[0]}->{row.receiver.split('_')[0]} {row.chunk_size}B"
+                          + (f" пакет {row.batch}" if row.batch != 'none' else '')
+                          + (f" {row.payload}" if row.payload != 'bytes' else '') for row in receivers.itertuples()]
+    combos = sorted(receivers.combo.unique())
+    policies = [p for p in PLACEMENT_POLICIES if p in set(receivers.placement)]
+    width = 0.8 / len(policies)
+    plt.figure(figsize=(max(12, len(combos) * 0.6), 6))
+    for offset, policy in enumerate(policies):
+        df = receivers[receivers.placement == policy].set_index('combo').reindex(combos)
+        plt.bar([i + (offset - (len(policies) - 1) / 2) * width for i in range(len(combos))],
+                df.mbps_mean, width, yerr=df.mbps_ci95.fillna(0), capsize=2, label=policy)
+    plt.xticks(range(len(combos)), combos, rotation=90, fontsize=7)
+    plt.ylabel('MB/s (среднее, 95% ДИ)')
+    plt.title('Скорость получателя в зависимости от размещения по CPU')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(results_dir / "placement.png")
+    plt.close()
+    print("[INFO] Сохранён placement.png")
+
+
+def plot_async(stats, results_dir):
+    # asyncio-вариант против блокирующего аналога (ключ baseline): Python -> Python, скорость получателя
+    # и число сообщений в секунду; async_overhead.csv — отношение async / блокирующий
+    receivers = stats[(stats.role == 'receiver') & (stats.sender == 'py_sender') & (stats.receiver == 'py_receiver')
+                      & (stats.batch == 'none') & (stats.payload == 'bytes')]  # asyncio-варианты передают только байты
+    rows = []
+    for method_name, method_config in METHODS_CONFIG.items():
+        baseline = method_config.get("baseline")
+        if baseline is None:
+            continue
+        merged = receivers[receivers.method == method_name].merge(
+            receivers[receivers.method == baseline], on=['chunk_size', 'placement'], suffixes=('_async', '_blocking'))
+        for row in merged.itertuples():
+            rows.append({
+                'method': method_name, 'baseline': baseline, 'chunk_size': row.chunk_size, 'placement': row.placement,
+                'mbps_async': row.mbps_mean_async, 'mbps_blocking': row.mbps_mean_blocking,
+                'mbps_ci95_async': row.mbps_ci95_async, 'mbps_ci95_blocking': row.mbps_ci95_blocking,
+                'msgs_per_sec_async': row.msgs_per_sec_mean_async, 'msgs_per_sec_blocking': row.msgs_per_sec_mean_blocking,
+                'speed_ratio': row.mbps_mean_async / row.mbps_mean_blocking if row.mbps_mean_blocking else None,
+            })
+    if not rows:
+        return
+    df = pd.DataFrame(rows)
+    df.to_csv(results_dir / "async_overhead.csv", index=False)
+
+    labels = [f"{row.method} {row.chunk_size}B" + (f" {row.placement}" if row.placement != 'none' else '')
+              for row in df.itertuples()]
+    x = range(len(df))
+    plt.figure(figsize=(max(8, len(df) * 0.8), 6))
+    plt.bar([i - 0.2 for i in x], df.mbps_blocking, 0.4, yerr=df.mbps_ci95_blocking.fillna(0), capsize=2,
+            label='блокирующий')
+    plt.bar([i + 0.2 for i in x], df.mbps_async, 0.4, yerr=df.mbps_ci95_async.fillna(0), capsize=2, label='asyncio')
+    plt.xticks(list(x), labels, rotation=90, fontsize=8)
+    plt.ylabel('MB/s (среднее, 95% ДИ)')
+    plt.title('asyncio против блокирующего аналога (py -> py)')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(results_dir / "async.png")
+    plt.close()
+    print("[INFO] Сохранён async.png")
+
+
+def plot_pages(stats, results_dir):
+    # Варианты shm и boost с другими страницами сегмента (ключ pages_of) против обычных 4 КБ страниц:
+    # скорость получателя и число минорных сбоев страниц; pages.csv — отношение скоростей вариант / обычный
+    keys = ['sender', 'receiver', 'chunk_size', 'batch', 'payload', 'placement']
+    receivers = stats[stats.role == 'receiver']
+    rows = []
+    for method_name, method_config in METHODS_CONFIG.items():
+        base = method_config.get("pages_of")
+        if base is None:
+            continue
+        merged = receivers[receivers.method == method_name].merge(
+            receivers[receivers.method == base], on=keys, suffixes=('_pages', '_base'))
+        for row in merged.itertuples():
+            rows.append({
+                'method': method_name, 'base': base, 'sender': row.sender, 'receiver': row.receiver,
+                'chunk_size': row.chunk_size, 'batch': row.batch, 'placement': row.placement,
+                'mbps_pages': row.mbps_mean_pages, 'mbps_base': row.mbps_mean_base,
+                'mbps_ci95_pages': row.mbps_ci95_pages, 'mbps_ci95_base': row.mbps_ci95_base,
+                'minflt_pages': row.minflt_mean_pages, 'minflt_base': row.minflt_mean_base,
+                'speed_ratio': row.mbps_mean_pages / row.mbps_mean_base if row.mbps_mean_base else None,
+            })
+    if not rows:
+        return
+    df = pd.DataFrame(rows)
+    df.to_csv(results_dir / "pages.csv", index=False)
+
+    labels = [f"{row.method} {row.sender[:-7]}->{row.receiver[:-9]} {row.chunk_size}B"
+              + (f" пакет {row.batch}" if row.batch != 'none' else '')
+              + (f" {row.placement}" if row.placement != 'none' else '') for row in df.itertuples()]
+    x = range(len(df))
+    plt.figure(figsize=(max(8, len(df) * 0.8), 6))
+    plt.bar([i - 0.2 for i in x], df.mbps_base, 0.4, yerr=df.mbps_ci95_base.fillna(0), capsize=2,
+            label='обычные страницы')
+    plt.bar([i + 0.2 for i in x], df.mbps_pages, 0.4, yerr=df.mbps_ci95_pages.fillna(0), capsize=2,
+            label='prefault / huge pages')
+    plt.xticks(list(x), labels, rotation=90, fontsize=8)
+    plt.ylabel('MB/s (среднее, 95% ДИ)')
+    plt.title('Huge pages и предварительное заполнение сегмента')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(results_dir / "pages.png")
+    plt.close()
+    print("[INFO] Сохранён pages.png")
+
+
+def plot_cpu_efficiency(results, results_dir):
+    # Сколько данных пара передаёт за секунду процессорного времени обоих процессов (user + sys по опросу /proc):
+    # байты получателя / (CPU отправителя + CPU получателя). cpu_efficiency.csv — среднее по повторным замерам
+    keys = ['method', 'sender', 'receiver', 'chunk_size', 'batch', 'payload', 'placement']
+    per_run = results.dropna(subset=['cpu_sec']).pivot_table(index=['run'] + keys, columns='role',
+                                                            values=['bytes', 'cpu_sec'], aggfunc='first')
+    if per_run.empty or 'receiver' not in per_run['bytes'] or 'sender' not in per_run['cpu_sec']:
+        return
+    per_run = pd.DataFrame({
+        'pair_cpu_sec': per_run['cpu_sec']['sender'] + per_run['cpu_sec']['receiver'],
+        'bytes': per_run['bytes']['receiver'],
+    }).dropna().reset_index()
+    if per_run.empty:
+        return
+    per_run['bytes_per_cpu_sec'] = per_run.bytes / per_run.pair_cpu_sec
+    df = per_run.groupby(keys).agg(
+        trials=('bytes_per_cpu_sec', 'count'),
+        pair_cpu_sec_mean=('pair_cpu_sec', 'mean'),
+        bytes_per_cpu_sec_mean=('bytes_per_cpu_sec', 'mean'),
+        bytes_per_cpu_sec_ci95=('bytes_per_cpu_sec', lambda values: ci95_halfwidth(list(values))),
+    ).reset_index()
+    df.to_csv(results_dir / "cpu_efficiency.csv", index=False)
+
+    with_size = df.chunk_size.nunique() > 1
+    with_batch = df.batch.nunique() > 1
+    with_payload = df.payload.nunique() > 1
+    with_placement = df.placement.nunique() > 1
+    labels = [f"{row.method} {row.sender.split('_')[0]}->{row.receiver.split('_')[0]}"
+              + (f" {row.chunk_size}B" if with_size else "") + (f" пакет {row.batch}" if with_batch else "")
+              + (f" {row.payload}" if with_payload else "")
+              + (f" {row.placement}" if with_placement else "") for row in df.itertuples()]
+    plt.figure(figsize=(max(12, len(df) * 0.4), 6))
+    plt.bar(labels, df.bytes_per_cpu_sec_mean / 1024**2, yerr=df.bytes_per_cpu_sec_ci95.fillna(0) / 1024**2,
+            capsize=3, alpha=0.7)
+    plt.xticks(rotation=90, fontsize=8)
+    plt.ylabel('MB на CPU-секунду (отправитель + получатель)')
+    plt.title('Эффективность по процессорному времени')
+    plt.tight_layout()
+    plt.savefig(results_dir / "cpu_efficiency.png")
+    plt.close()
+    print("[INFO] Сохранён cpu_efficiency.png")
+
+
+def percentile_us(hist, p):
+    cumulative = hist.sort_index().cumsum()
+    return cumulative.index[cumulative.searchsorted(cumulative.iloc[-1] * p / 100.0)] / 1e3
+
+def plot_latency(latency_hists, results_dir, name, title):
+    # Перцентили и функция распределения по сложенным гистограммам: <name>_summary.csv,
+    # <name>_percentiles.png и <name>_cdf.png
+    if not latency_hists:
+        return
+    latency_records = [
+        (label, percentile_us(hist, 50), percentile_us(hist, 99), percentile_us(hist, 99.9), hist.index.max() / 1e3)
+        for label, hist in sorted(latency_hists.items())
+    ]
+    df_lat = pd.DataFrame(latency_records, columns=('label', 'p50', 'p99', 'p999', 'max'))
+    df_lat.to_csv(results_dir / f'{name}_summary.csv', index=False)
+    x = range(len(df_lat))
+    width = 0.2
+    plt.figure(figsize=(12, 6))
+    for offset, column in enumerate(('p50', 'p99', 'p999', 'max')):
+        plt.bar([i + (offset - 1.5) * width for i in x], df_lat[column], width, label=column)
+    plt.xticks(list(x), df_lat.label, rotation=90, fontsize=8)
+    plt.yscale('log')
+    plt.ylabel('мкс')
+    plt.title(f'{title} (перцентили)')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(results_dir / f'{name}_percentiles.png')
+    plt.close()
+    print(f"[INFO] Сохранён {name}_percentiles.png")
+
+    plt.figure(figsize=(12, 6))
+    for label, hist in sorted(latency_hists.items()):
+        hist = hist.sort_index()
+        cdf = hist.cumsum() / hist.sum()
+        plt.step(hist.index / 1e3, cdf, where='post', label=label)
+    plt.xscale('log')
+    plt.xlabel('мкс')
+    plt.ylabel('доля сообщений')
+    plt.title(f'{title}: функция распределения')
+    plt.legend(loc='upper left', bbox_to_anchor=(1.02, 1), borderaxespad=0, fontsize=7)
+    plt.tight_layout()
+    plt.subplots_adjust(right=0.8)
+    plt.savefig(results_dir / f'{name}_cdf.png')
+    plt.close()
+    print(f"[INFO] Сохранён {name}_cdf.png")
+
+def plot_batching(stats, batch_hists, results_dir):
+    # Пакетирование мелких сообщений: сообщений в секунду и задержка доставки (p50 и p99 по сложенным гистограммам)
+    # в зависимости от размера сообщения, по линии на настройку пакета, и кривая компромисса «задержка — сообщений/с».
+    # batching.csv — выигрыш в сообщениях/с и добавленная задержка относительно прогона без пакетирования ("none")
+    # с теми же методом, парой, размером и размещением
+    keys = ['method', 'sender', 'receiver', 'chunk_size', 'placement']
+    receivers = stats[stats.role == 'receiver'].copy()
+    hists = [batch_hists.get(key) for key in zip(receivers.method, receivers.sender, receivers.receiver,
+                                                  receivers.chunk_size, receivers.batch, receivers.placement)]
+    receivers['p50_us'] = [percentile_us(h, 50) if h is not None else float("nan") for h in hists]
+    receivers['p99_us'] = [percentile_us(h, 99) if h is not None else float("nan") for h in hists]
+
+    baseline = receivers[receivers.batch == 'none'][keys + ['msgs_per_sec_mean', 'p50_us', 'p99_us']]
+    df = receivers[receivers.batch != 'none'].merge(baseline, on=keys, how='left', suffixes=('', '_none'))
+    if df.empty:
+        return
+    df['speedup'] = df.msgs_per_sec_mean / df.msgs_per_sec_mean_none
+    df['added_p50_us'] = df.p50_us - df.p50_us_none
+    df['added_p99_us'] = df.p99_us - df.p99_us_none
+    df[keys + ['batch', 'msgs_per_sec_mean', 'msgs_per_sec_mean_none', 'speedup', 'p50_us', 'p50_us_none',
+               'added_p50_us', 'p99_us', 'p99_us_none', 'added_p99_us']].to_csv(results_dir / "batching.csv", index=False)
+    print("[INFO] Сохранён batching.csv")
+
+    for (method_name, sender, receiver, placement), df_pair in receivers.groupby(['method', 'sender', 'receiver',
+                                                                                   'placement']):
+        if (df_pair.batch == 'none').all():
+            continue
+        pair = f"{sender.split('_')[0]}->{receiver.split('_')[0]}"
+        fig, (ax_mps, ax_lat, ax_trade) = plt.subplots(1, 3, figsize=(18, 5))
+        for batch, df_batch in df_pair.groupby('batch'):
+            df_batch = df_batch.sort_values('chunk_size')
+            label = "без пакетирования" if batch == 'none' else f"пакет {batch}"
+            line, = ax_mps.plot(df_batch.chunk_size, df_batch.msgs_per_sec_mean, marker='o', label=label)
+            ax_lat.plot(df_batch.chunk_size, df_batch.p50_us, marker='o', color=line.get_color(), label=f"{label} p50")
+            ax_lat.plot(df_batch.chunk_size, df_batch.p99_us, marker='x', linestyle='--', color=line.get_color(),
+                        label=f"{label} p99")
+            ax_trade.plot(df_batch.p99_us, df_batch.msgs_per_sec_mean, marker='o', color=line.get_color(), label=label)
+        for ax, xlabel, ylabel in ((ax_mps, 'Размер сообщения, Б', 'сообщений/с'),
+                                   (ax_lat, 'Размер сообщения, Б', 'задержка, мкс'),
+                                   (ax_trade, 'задержка p99, мкс', 'сообщений/с')):
+            ax.set_xscale('log', base=2 if ax is not ax_trade else 10)
+            ax.set_yscale('log')
+            ax.set_xlabel(xlabel)
+            ax.set_ylabel(ylabel)
+            ax.grid(True, which='both', alpha=0.3)
+            ax.legend(fontsize=7)
+        fig.suptitle(f'Пакетирование мелких сообщений: {method_name} {pair}'
+                     + (f" {placement}" if placement != 'none' else ''))
+        fig.tight_layout()
+        filename = f"{method_name}_{sender.split('_')[0]}-{receiver.split('_')[0]}"
+        filename += f"_{placement}" if placement != 'none' else ''
+        fig.savefig(results_dir / f"{filename}_batching.png")
+        plt.close(fig)
+        print(f"[INFO] Сохранён {filename}_batching.png")
+
+def failed_payload_runs(results, results_dir):
+    # Замеры со структурированной нагрузкой без итоговых метрик получателя (убиты по таймауту или упали):
+    # в results их нет, поэтому они берутся из run_info.json папок запуска
+    done = set(results[results.role == 'receiver'].run)
+    rows = []
+    for info_file in sorted(results_dir.glob("*/run_info.json")):
+        info = json.loads(info_file.read_text())
+        if info_file.parent.name in done or info.get("payload_kind", "bytes") == "bytes":
+            continue
+        rows.append({"method": info["method"], "sender": info["sender"], "receiver": info["receiver"],
+                     "chunk_size": info["chunk_size"], "placement": info.get("placement", "none"),
+                     "kind": info["payload_kind"], "pickle_mode": info.get("pickle_mode", "oob")})
+    return pd.DataFrame(rows, columns=['method', 'sender', 'receiver', 'chunk_size', 'placement', 'kind',
+                                       'pickle_mode'])
+
+def plot_payload(stats, results, results_dir):
+    # Структурированная нагрузка: объектов в секунду у получателя при pickle с буферами вне потока (oob) и внутри
+    # него (inband) на каждом транспорте. payload.csv — обе скорости, их отношение oob / inband и, если был прогон
+    # bytes с теми же методом и размером, доля скорости блока байт, которая остаётся после сериализации.
+    # Незавершённые замеры не пропадают молча: их число — в failed_trials_oob / failed_trials_inband
+    keys = ['method', 'sender', 'receiver', 'chunk_size', 'placement']
+    receivers = stats[(stats.role == 'receiver') & (stats.batch == 'none')].copy()
+    objects = receivers[receivers.payload != 'bytes'].copy()
+    failed = failed_payload_runs(results, results_dir)
+    if objects.empty and failed.empty:
+        return
+    for row in failed.groupby(keys + ['kind', 'pickle_mode']).size().reset_index(name='count').itertuples():
+        print(f"[WARN] {row.method} {row.kind}/{row.pickle_mode} {row.chunk_size}B: {row.count} замеров "
+              f"без метрик получателя (убиты по таймауту или упали)")
+    objects['kind'] = objects.payload.str.split('/').str[0]
+    objects['pickle_mode'] = objects.payload.str.split('/').str[1]
+    columns = keys + ['kind', 'msgs_per_sec_mean', 'msgs_per_sec_ci95']
+    oob = objects[objects.pickle_mode == 'oob'][columns]
+    inband = objects[objects.pickle_mode == 'inband'][columns]
+    df = oob.merge(inband, on=keys + ['kind'], how='outer', suffixes=('_oob', '_inband'))
+    if failed.empty:
+        df['failed_trials_oob'] = df['failed_trials_inband'] = 0
+    else:
+        counts = failed.groupby(keys + ['kind', 'pickle_mode']).size().unstack('pickle_mode', fill_value=0)
+        counts = counts.reindex(columns=PICKLE_MODES, fill_value=0).add_prefix('failed_trials_').reset_index()
+        df = df.merge(counts, on=keys + ['kind'], how='outer')
+        df[['failed_trials_oob', 'failed_trials_inband']] = df[['failed_trials_oob',
+                                                                'failed_trials_inband']].fillna(0).astype(int)
+    df['oob_speedup'] = df.msgs_per_sec_mean_oob / df.msgs_per_sec_mean_inband
+    baseline = receivers[receivers.payload == 'bytes'][keys + ['msgs_per_sec_mean']]
+    df = df.merge(baseline.rename(columns={'msgs_per_sec_mean': 'msgs_per_sec_bytes'}), on=keys, how='left')
+    df['oob_of_bytes'] = df.msgs_per_sec_mean_oob / df.msgs_per_sec_bytes
+    df = df.sort_values(keys + ['kind'])
+    df[keys + ['kind', 'msgs_per_sec_mean_oob', 'msgs_per_sec_ci95_oob', 'msgs_per_sec_mean_inband',
+               'msgs_per_sec_ci95_inband', 'oob_speedup', 'msgs_per_sec_bytes', 'oob_of_bytes',
+               'failed_trials_oob', 'failed_trials_inband']].to_csv(results_dir / "payload.csv", index=False)
+    print("[INFO] Сохранён payload.csv")
+
+    with_size = df.chunk_size.nunique() > 1
+    with_placement = df.placement.nunique() > 1
+    labels = [f"{row.method} {row.kind}" + (f" {row.chunk_size}B" if with_size else "")
+              + (f" {row.placement}" if with_placement else "") for row in df.itertuples()]
+    x = range(len(df))
+    plt.figure(figsize=(max(8, len(df) * 0.8), 6))
+    plt.bar([i - 0.2 for i in x], df.msgs_per_sec_mean_inband, 0.4, yerr=df.msgs_per_sec_ci95_inband.fillna(0),
+            capsize=2, label='pickle inband')
+    plt.bar([i + 0.2 for i in x], df.msgs_per_sec_mean_oob, 0.4, yerr=df.msgs_per_sec_ci95_oob.fillna(0),
+            capsize=2, label='pickle 5 out-of-band')
+    plt.xticks(list(x), labels, rotation=90, fontsize=8)
+    plt.yscale('log')
+    plt.ylabel('объектов/с (среднее, 95% ДИ)')
+    plt.title('Объекты Python: буферы вне потока pickle против сериализации целиком (py -> py)')
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(results_dir / "payload.png")
+    plt.close()
+    print("[INFO] Сохранён payload.png")
+
 def plot_results(results_dir):
     def short_label(run_tag: str) -> str:
         # Карты для префиксов методов
         prefix_map = {
             'posix_shared_memory': 'shm',
+            'posix_shared_memory_ring': 'shm_ring',
+            'posix_shared_memory_zerocopy': 'shm_zc',
+            'posix_shared_memory_prefault': 'shm_prefault',
+            'posix_shared_memory_thp': 'shm_thp',
+            'posix_shared_memory_hugetlb': 'shm_hugetlb',
+            'posix_shared_memory_futex': 'shm_futex',
+            'posix_shared_memory_ring_futex': 'shm_ring_futex',
+            'posix_shared_memory_async': 'shm_async',
             'boost_int': 'boost',
+            'boost_int_prefault': 'boost_prefault',
+            'boost_int_thp': 'boost_thp',
+            'boost_int_hugetlb': 'boost_hugetlb',
+            'boost_int_futex': 'boost_futex',
             'zmq': 'zmq',
-            'sockets': 'sock'
+            'zmq_zerocopy': 'zmq_zc',
+            'zmq_tuned': 'zmq_tuned',
+            'zmq_ipc': 'zmq_ipc',
+            'zmq_inproc': 'zmq_inproc',
+            'zmq_async': 'zmq_async',
+            'sockets': 'sock',
+            'sockets_unix': 'sock_unix',
+            'sockets_seqpacket': 'sock_seq',
+            'sockets_async': 'sock_async',
+            'memfd': 'memfd',
+            'pipes': 'pipe',
+            'pipes_large': 'pipe_large',
+            'pipes_splice': 'pipe_splice',
+            'posix_shared_memory_pingpong': 'shm_pp',
+            'posix_shared_memory_pingpong_spin': 'shm_pp_spin',
+            'boost_int_pingpong': 'boost_pp',
+            'boost_int_pingpong_spin': 'boost_pp_spin',
+            'zmq_pingpong': 'zmq_pp',
+            'sockets_pingpong': 'sock_pp',
+            'sockets_unix_pingpong': 'sock_unix_pp',
         }
 
         # Карты для коротких обозначений ролей
@@ -165,14 +2055,11 @@ def plot_results(results_dir):
         }
 
         # Определяем префикс метода по началу строки
-        method_prefix = None
-        for key in prefix_map:
-            if run_tag.startswith(key):
-                method_prefix = prefix_map[key]
-                break
-        if method_prefix is None:
+        method_name = match_method(run_tag)
+        if method_name is None:
             # Не нашли подходящий метод
             return run_tag
+        method_prefix = prefix_map.get(method_name, method_name)
 
         # Ищем роли по наличию точных строк
         sender_role = None
@@ -191,105 +2078,56 @@ def plot_results(results_dir):
 
         return f"{method_prefix}_{s}->{r}"
 
-    # Подготовка накопителей
-    throughput_records   = []  # (run_tag, role, mbps)
-    memory_records       = []  # (run_tag, role, memory_mb)
-    speeds_by_method     = {}  # { method_name: [ (run_tag, mbps), ... ] }
-    memory_by_method     = {}  # { method_name: [ (run_tag, memory_mb), ... ] }
+    def group_label(row, with_size, with_placement, with_batch=False, with_payload=False):
+        label = short_label(f"{row.method}_{row.sender}_{row.receiver}")
+        if with_size:
+            label += f" {row.chunk_size}B"
+        if with_batch:
+            label += f" пакет {row.batch}"
+        if with_payload:
+            label += f" {row.payload}"
+        if with_placement:
+            label += f" {row.placement}"
+        return label
 
-    # Сбор данных из CSV
-    for run_subdir in results_dir.iterdir():
-        if not run_subdir.is_dir():
-            continue
+    # Общая таблица результатов и статистика по повторным замерам
+    results = collect_results(results_dir)
+    if results.empty:
+        print("[WARN] Нет результатов для построения графиков")
+        return
+    stats = aggregate_results(results)
+    stats.to_csv(results_dir / "stats.csv", index=False)
+    with_size = stats.chunk_size.nunique() > 1
+    with_placement = stats.placement.nunique() > 1
+    with_batch = stats.batch.nunique() > 1
+    with_payload = stats.payload.nunique() > 1
+    stats['label'] = [group_label(row, with_size, with_placement, with_batch, with_payload)
+                      for row in stats.itertuples()]
 
-        sender_file = next(run_subdir.glob("*sender*metrics.csv"), None)
-        receiver_file = (
-            next(run_subdir.glob("*receiver*metrics.csv"), None)
-            or next(run_subdir.glob("*reciever*metrics.csv"), None)
-        )
-        run_tag = run_subdir.name
-
-        def parse_metrics(file_path, role):
-            df = pd.read_csv(file_path)
-            if 'active_time_sec' in df.columns and 'wall_time_sec' in df.columns:
-                active_time = df['active_time_sec'].iloc[-1]
-                byte_count  = (
-                    df['bytes_sent'].iloc[-1]
-                    if role == 'sender'
-                    else df['bytes_received'].iloc[-1]
-                )
-                # память
-                if 'rss_mb_max' in df.columns:
-                    mem_usage = df['rss_mb_max'].iloc[-1]
-                elif 'rss_mb' in df.columns:
-                    mem_usage = df['rss_mb'].iloc[-1]
-                else:
-                    mem_usage = None
-
-                # скорость
-                if active_time > 0:
-                    speed_mbps = (byte_count / 1024**2) / active_time
-                    throughput_records.append((run_tag, role, speed_mbps))
-                else:
-                    speed_mbps = None
-
-                # память по ролям
-                if mem_usage is not None:
-                    memory_records.append((run_tag, role, mem_usage))
-
-                # группировка по методам
-                method_prefix = next(
-                    (m for m in METHODS_CONFIG if run_tag.startswith(m)),
-                    None
-                )
-                if method_prefix:
-                    if speed_mbps is not None:
-                        speeds_by_method.setdefault(method_prefix, []).append((run_tag, speed_mbps))
-                    if mem_usage is not None:
-                        memory_by_method.setdefault(method_prefix, []).append((run_tag, mem_usage))
-
-        if sender_file:
-            parse_metrics(sender_file, 'sender')
-        if receiver_file:
-            parse_metrics(receiver_file, 'receiver')
-    if throughput_records:
-        df_tp = pd.DataFrame(throughput_records, columns=('run', 'role', 'mbps'))
-
-        # отправители
-        sender_df = df_tp[df_tp.role == 'sender']
-        if not sender_df.empty:
-            plt.figure(figsize=(12, 6))
-            labels = [short_label(tag) for tag in sender_df.run]
-            plt.bar(labels, sender_df.mbps, alpha=0.7)
-            plt.xticks(rotation=90, fontsize=8)
-            plt.ylabel('MB/s')
-            plt.title('Пропускная способность отправителей')
-            plt.tight_layout()
-            plt.savefig(results_dir / "throughput_sender.png")
-            plt.close()
-            print("[INFO] Сохранён throughput_sender.png")
-
-        # получатели
-        receiver_df = df_tp[df_tp.role == 'receiver']
-        if not receiver_df.empty:
-            plt.figure(figsize=(12, 6))
-            labels = [short_label(tag) for tag in receiver_df.run]
-            plt.bar(labels, receiver_df.mbps, alpha=0.7)
-            plt.xticks(rotation=90, fontsize=8)
-            plt.ylabel('MB/s')
-            plt.title('Пропускная способность получателей')
-            plt.tight_layout()
-            plt.savefig(results_dir / "throughput_receiver.png")
-            plt.close()
-            print("[INFO] Сохранён throughput_receiver.png")
+    def bar_with_ci(df, title, filename, figsize=(12, 6), rotation=90):
+        plt.figure(figsize=figsize)
+        plt.bar(df.label, df.mbps_mean, yerr=df.mbps_ci95.fillna(0), capsize=3, alpha=0.7)
+        plt.xticks(rotation=rotation, ha='right' if rotation != 90 else 'center', fontsize=8)
+        plt.ylabel('MB/s (среднее, 95% ДИ)')
+        plt.title(title)
+        plt.tight_layout()
+        plt.savefig(results_dir / filename)
+        plt.close()
+        print(f"[INFO] Сохранён {filename}")
 
-    if memory_records:
-        df_mem = pd.DataFrame(memory_records, columns=('run', 'role', 'mb'))
+    # отправители и получатели
+    for role, title in (('sender', 'Пропускная способность отправителей'),
+                        ('receiver', 'Пропускная способность получателей')):
+        role_df = stats[(stats.role == role) & stats.mbps_mean.notna()]
+        if not role_df.empty:
+            bar_with_ci(role_df, title, f"throughput_{role}.png")
+
+    mem_df = stats[stats.rss_mb_mean.notna()]
+    if not mem_df.empty:
         plt.figure(figsize=(12, 6))
         for role in ('sender', 'receiver'):
-            subset = df_mem[df_mem.role == role]
-            labels = [short_label(tag) for tag in subset.run]
-            plt.bar(labels, subset.mb, alpha=0.7, label=role)
+            subset = mem_df[mem_df.role == role]
+            plt.bar(subset.label, subset.rss_mb_mean, alpha=0.7, label=role)
         plt.xticks(rotation=90, fontsize=8)
         plt.ylabel('MB')
         plt.title('Использование памяти по ролям (все методы)')
@@ -304,40 +2142,336 @@ def plot_results(results_dir):
         plt.close()
         print("[INFO] Сохранён memory_usage_comparison.png")
 
-    for method_name, mem_list in memory_by_method.items():
-        if method_name == 'boost_int':
+    for method_name, df_m in stats.groupby('method'):
+        df_mem = df_m[df_m.rss_mb_mean.notna()]
+        if not df_mem.empty:
+            plt.figure(figsize=(8, 4))
+            plt.bar(df_mem.label + ' ' + df_mem.role, df_mem.rss_mb_mean)
+            plt.xticks(rotation=30, ha='right', fontsize=8)
+            plt.ylabel('MB')
+            plt.title(f'Использование памяти: {method_name}')
+            plt.tight_layout()
+            plt.savefig(results_dir / f'{method_name}_memory.png')
+            plt.close()
+            print(f"[INFO] Сохранён {method_name}_memory.png")
+
+        df_speed = df_m[df_m.mbps_mean.notna()].copy()
+        if not df_speed.empty:
+            df_speed['label'] = df_speed.label + ' ' + df_speed.role
+            bar_with_ci(df_speed, f'Пропускная способность: {method_name}', f"{method_name}_throughput.png",
+                        figsize=(8, 4), rotation=30)
+
+    # задержки: гистограммы всех замеров одной комбинации складываются, перцентили считаются по сумме.
+    # У методов запрос-ответ гистограмма клиента — полный круг (RTT), она строится отдельно от задержки доставки
+    latency_hists = {"latency": {}, "rtt": {}}  # { вид: { label: Series(count, index=latency_ns) } }
+    batch_hists = {}  # { (метод, отправитель, получатель, размер, пакет, размещение): Series } для plot_batching
+    for run_subdir in results_dir.iterdir():
+        hist_file = next(run_subdir.glob("*_latency_hist.csv"), None) if run_subdir.is_dir() else None
+        if hist_file is None:
             continue
-        df_m = pd.DataFrame(mem_list, columns=('run', 'mb'))
-        plt.figure(figsize=(8, 4))
-        labels = [short_label(tag) for tag in df_m.run]
-        plt.bar(labels, df_m.mb)
-        plt.xticks(rotation=30, ha='right', fontsize=8)
-        plt.ylabel('MB')
-        plt.title(f'Использование памяти: {method_name}')
-        plt.tight_layout()
-        plt.savefig(results_dir / f'{method_name}_memory.png')
-        plt.close()
-        print(f"[INFO] Сохранён {method_name}_memory.png")
+        run = results[results.run == run_subdir.name]
+        if run.empty:
+            continue
+        label = group_label(run.iloc[0], with_size, with_placement, with_batch, with_payload)
+        hists = latency_hists["rtt" if METHODS_CONFIG[run.iloc[0].method].get("pingpong") else "latency"]
+        hist = pd.read_csv(hist_file).set_index('latency_ns')['count']
+        hists[label] = hists[label].add(hist, fill_value=0) if label in hists else hist
+        if with_batch:
+            key = tuple(run.iloc[0][['method', 'sender', 'receiver', 'chunk_size', 'batch', 'placement']])
+            batch_hists[key] = batch_hists[key].add(hist, fill_value=0) if key in batch_hists else hist
+    plot_latency(latency_hists["latency"], results_dir, "latency", 'Задержка доставки чанка')
+    plot_latency(latency_hists["rtt"], results_dir, "rtt", 'Время полного круга запрос-ответ (RTT)')
+
+    # При переборе размеров — графики зависимости от размера сообщения
+    if with_size:
+        plot_sweep(stats, results_dir)
+    if with_placement:
+        plot_placement(stats, results_dir)
+    if with_batch:
+        plot_batching(stats, batch_hists, results_dir)
+    plot_payload(stats, results, results_dir)  # и когда все замеры с объектами убиты: о них нужно сообщить
+    plot_async(stats, results_dir)
+    plot_pages(stats, results_dir)
+    plot_cpu_efficiency(results, results_dir)
+    report_verify(results, ['method', 'sender', 'receiver', 'chunk_size', 'batch', 'payload', 'placement', 'role'],
+                  results_dir)
 
-    for method_name, sp_list in speeds_by_method.items():
-        if method_name == 'boost_int':
+def record_history(results_dir, db=HISTORY_DB):
+    # Дописывает замеры папки запуска в историю и возвращает число новых строк. Уже записанные (прогон, роль)
+    # пропускаются, поэтому повторная запись после --resume добавляет только новые замеры. У старых запусков
+    # без host.json хост — этот, ревизия неизвестна
+    results = collect_results(results_dir)
+    if results.empty:
+        return 0
+    info_file = results_dir / "host.json"
+    if info_file.exists():
+        info = json.loads(info_file.read_text())
+    else:
+        info = {"host": socket.gethostname(), "kernel": "", "git_rev": "unknown",
+                "started_at": datetime.fromtimestamp(results_dir.stat().st_mtime).isoformat(timespec="seconds")}
+    recorded_at = datetime.now().isoformat(timespec="seconds")
+    rows = []
+    for row in results.itertuples():
+        # перцентили замера — по его гистограмме: у получателя задержка доставки, у клиента запрос-ответ RTT
+        p50_us = p99_us = None
+        if row.role == ("sender" if METHODS_CONFIG[row.method].get("pingpong") else "receiver"):
+            hist_file = next((results_dir / row.run).glob("*_latency_hist.csv"), None)
+            hist = pd.read_csv(hist_file).set_index('latency_ns')['count'] if hist_file else None
+            if hist is not None and hist.sum() > 0:
+                p50_us, p99_us = percentile_us(hist, 50), percentile_us(hist, 99)
+        values = {**row._asdict(), "run_dir": results_dir.name, "started_at": info.get("started_at"),
+                  "recorded_at": recorded_at, "host": info.get("host"), "kernel": info.get("kernel"),
+                  "git_rev": info.get("git_rev"), "p50_us": p50_us, "p99_us": p99_us}
+        rows.append([None if pd.isna(values.get(c)) else values.get(c) for c in HISTORY_COLUMNS])
+    with sqlite3.connect(db) as conn:
+        conn.executescript(HISTORY_SCHEMA)
+        before = conn.total_changes
+        conn.executemany(f"INSERT OR IGNORE INTO trials ({', '.join(HISTORY_COLUMNS)}) "
+                         f"VALUES ({', '.join('?' * len(HISTORY_COLUMNS))})", rows)
+        added = conn.total_changes - before
+    conn.close()
+    print(f"[INFO] {results_dir.name}: в историю {db.name} записано {added} замеров")
+    return added
+
+def load_history(db=HISTORY_DB):
+    if not Path(db).exists():
+        raise ValueError(f"нет базы истории {db}")
+    with sqlite3.connect(db) as conn:
+        df = pd.read_sql_query("SELECT * FROM trials", conn)
+    conn.close()
+    return df
+
+def select_history(df, ref):
+    # Замеры запуска (имя папки в results) или всех запусков ревизии git (начало хеша)
+    runs = df[df.run_dir == ref]
+    return runs if not runs.empty else df[df.git_rev.fillna("").str.startswith(ref)]
+
+def welch_significant(base, cand):
+    # t-критерий Уэлча: разница средних значима на уровне 95% (степени свободы Уэлча — Саттертуэйта);
+    # None — меньше двух замеров с одной из сторон
+    if len(base) < 2 or len(cand) < 2:
+        return None
+    var_base = statistics.variance(base) / len(base)
+    var_cand = statistics.variance(cand) / len(cand)
+    diff = statistics.mean(cand) - statistics.mean(base)
+    se = math.sqrt(var_base + var_cand)
+    if se == 0:
+        return diff != 0
+    dof = (var_base + var_cand) ** 2 / (var_base ** 2 / (len(base) - 1) + var_cand ** 2 / (len(cand) - 1))
+    return abs(diff) / se > T_CRITICAL_95.get(max(1, int(dof)), 1.96)
+
+def compare_history(baseline, candidate=None, db=HISTORY_DB, threshold=REGRESSION_THRESHOLD):
+    # Сравнение запуска candidate (по умолчанию последнего записанного) с базовым запуском или ревизией:
+    # по каждой комбинации HISTORY_KEYS и метрике HISTORY_METRICS. Регрессия — значимое по Уэлчу ухудшение
+    # больше threshold. comparison.csv и графики трендов — в HISTORY_DIR; возвращает таблицу регрессий
+    df = load_history(db)
+    if candidate is None:
+        candidate = df.sort_values(['started_at', 'run_dir']).run_dir.iloc[-1]
+    cand = select_history(df, candidate)
+    base = select_history(df, baseline)
+    base = base[~base.run_dir.isin(set(cand.run_dir))]  # ревизия базы могла включать и сравниваемый запуск
+    if cand.empty or base.empty:
+        raise ValueError(f"в истории нет замеров {candidate if cand.empty else baseline}, кроме сравниваемых")
+    print(f"[INFO] Сравнение {candidate} ({', '.join(sorted(set(cand.git_rev.fillna('unknown'))))}) "
+          f"с базой {baseline}: {base.run_dir.nunique()} запусков")
+
+    rows = []
+    for column, higher_better in HISTORY_METRICS:
+        def samples(trials):
+            trials = trials[trials.role == 'receiver'] if column == 'mbps' else trials
+            return {key: list(group[column]) for key, group in trials.dropna(subset=[column]).groupby(HISTORY_KEYS)}
+        base_samples = samples(base)
+        for key, cand_values in samples(cand).items():
+            base_values = base_samples.get(key)
+            if not base_values:
+                continue
+            base_mean, cand_mean = statistics.mean(base_values), statistics.mean(cand_values)
+            change = (cand_mean - base_mean) / base_mean if base_mean else float("nan")
+            significant = welch_significant(base_values, cand_values)
+            worse = change < -threshold if higher_better else change > threshold
+            better = change > threshold if higher_better else change < -threshold
+            if significant is None:
+                status = "insufficient"
+            elif significant and worse:
+                status = "regression"
+            elif significant and better:
+                status = "improvement"
+            else:
+                status = "unchanged"
+            rows.append({**dict(zip(HISTORY_KEYS, key)), 'metric': column, 'base_trials': len(base_values),
+                         'base_mean': base_mean, 'cand_trials': len(cand_values), 'cand_mean': cand_mean,
+                         'change': change, 'status': status})
+    if not rows:
+        raise ValueError(f"у {candidate} и {baseline} нет общих комбинаций метода, пары, размера и хоста")
+    report = pd.DataFrame(rows)
+    HISTORY_DIR.mkdir(exist_ok=True)
+    report.to_csv(HISTORY_DIR / "comparison.csv", index=False)
+    print(f"[INFO] Сохранён {HISTORY_DIR.name}/comparison.csv: "
+          + ", ".join(f"{status} {count}" for status, count in report.status.value_counts().items()))
+    regressions = report[report.status == 'regression']
+    for row in regressions.itertuples():
+        print(f"[WARN] Регрессия {row.method} {row.sender.split('_')[0]}->{row.receiver.split('_')[0]} "
+              f"{row.chunk_size}B {row.metric}: {row.base_mean:.4g} -> {row.cand_mean:.4g} ({row.change:+.1%})")
+    plot_trends(df, cand, HISTORY_DIR)
+    return regressions
+
+def plot_trends(df, cand, output_dir):
+    # Тренды по всем запускам истории для комбинаций сравниваемого запуска: скорость получателя (среднее и 95% ДИ
+    # по замерам запуска) и задержка p99, по графику на метод. По оси X — запуски по времени с ревизией git
+    for method_name, cand_method in cand.groupby('method'):
+        history = df[df.method == method_name].merge(cand_method[HISTORY_KEYS].drop_duplicates(), on=HISTORY_KEYS)
+        runs = history.sort_values(['started_at', 'run_dir']).drop_duplicates('run_dir')
+        if len(runs) < 2:
             continue
-        df_s = pd.DataFrame(sp_list, columns=('run', 'mbps'))
-        plt.figure(figsize=(8, 4))
-        labels = [short_label(tag) for tag in df_s.run]
-        plt.bar(labels, df_s.mbps)
-        plt.xticks(rotation=30, ha='right', fontsize=8)
-        plt.ylabel('MB/s')
-        plt.title(f'Пропускная способность: {method_name}')
-        plt.tight_layout()
-        plt.savefig(results_dir / f"{method_name}_throughput.png")
-        plt.close()
-        print(f"[INFO] Сохранён {method_name}_throughput.png")
+        position = {run_dir: i for i, run_dir in enumerate(runs.run_dir)}
+        fig, (ax_tp, ax_lat) = plt.subplots(1, 2, figsize=(max(12, len(runs) * 1.2), 5))
+        for key, trials in history.groupby(HISTORY_KEYS):
+            config = dict(zip(HISTORY_KEYS, key))
+            label = (f"{config['sender'].split('_')[0]}->{config['receiver'].split('_')[0]} {config['chunk_size']}B"
+                     + (f" пакет {config['batch']}" if config['batch'] != 'none' else '')
+                     + (f" {config['payload']}" if config['payload'] != 'bytes' else '')
+                     + (f" {config['placement']}" if config['placement'] != 'none' else '')
+                     + f" {config['host']}")
+            speeds = trials[trials.role == 'receiver'].groupby('run_dir').mbps
+            per_run = pd.DataFrame({
+                'mbps': speeds.mean(),
+                'mbps_ci95': speeds.agg(lambda values: ci95_halfwidth(list(values.dropna()))),
+                'p99_us': trials.groupby('run_dir').p99_us.mean(),
+            })
+            per_run['x'] = per_run.index.map(position)
+            per_run = per_run.sort_values('x')
+            line = ax_tp.errorbar(per_run.x, per_run.mbps, yerr=per_run.mbps_ci95.fillna(0), marker='o', capsize=3,
+                                  label=label)
+            ax_lat.plot(per_run.x, per_run.p99_us, marker='o', color=line[0].get_color(), label=label)
+        ticks = [f"{row.run_dir}\n{row.git_rev}" for row in runs.itertuples()]
+        for ax, ylabel in ((ax_tp, 'MB/s (среднее, 95% ДИ)'), (ax_lat, 'задержка p99, мкс')):
+            ax.set_xticks(range(len(runs)))
+            ax.set_xticklabels(ticks, rotation=90, fontsize=7)
+            ax.set_ylabel(ylabel)
+            ax.grid(True, alpha=0.3)
+        ax_lat.legend(loc='upper left', bbox_to_anchor=(1.02, 1), borderaxespad=0, fontsize=7)
+        fig.suptitle(f'История результатов: {method_name}')
+        fig.tight_layout()
+        fig.savefig(output_dir / f"{method_name}_trend.png")
+        plt.close(fig)
+        print(f"[INFO] Сохранён {output_dir.name}/{method_name}_trend.png")
 
 def main():
+    parser = argparse.ArgumentParser(description="Сравнение методов IPC")
+    parser.add_argument("--sweep", action="store_true", help="перебор размеров сообщений степенями двойки")
+    parser.add_argument("--min-size", type=int, default=SWEEP_MIN_SIZE, help="минимальный размер сообщения, Б")
+    parser.add_argument("--max-size", type=int, default=SWEEP_MAX_SIZE, help="максимальный размер сообщения, Б")
+    parser.add_argument("--warmup", type=int, help=f"прогревочных прогонов ({TRIALS_CONFIG['warmup']})")
+    parser.add_argument("--min-trials", type=int, help=f"минимум замеров ({TRIALS_CONFIG['min_trials']})")
+    parser.add_argument("--trials", type=int, help=f"максимум замеров ({TRIALS_CONFIG['max_trials']})")
+    parser.add_argument("--ci-target", type=float,
+                        help=f"относительная половина 95%% ДИ, при которой замеры прекращаются ({TRIALS_CONFIG['ci_target']})")
+    parser.add_argument("--scale", nargs="?", const=",".join(map(str, SCALING_COUNTS)), metavar="1,2,4,8",
+                        help="режим масштабирования: N отправителей и M получателей, числа процессов через запятую")
+    parser.add_argument("--placement", metavar="POLICY[,POLICY]",
+                        help="политики размещения по CPU через запятую: " + ", ".join(PLACEMENT_POLICIES))
+    parser.add_argument("--proc-interval", type=float, default=ProcSampler.INTERVAL,
+                        help="период опроса /proc запущенных процессов, с (0 — не опрашивать)")
+    parser.add_argument("--verify", action="store_true",
+                        help="проверка данных: узор с номером сообщения у отправителя и CRC32 у получателя "
+                             "(сохраняется в matrix.json, --resume идёт в том же режиме)")
+    parser.add_argument("--batch", metavar="SIZE[,SIZE]",
+                        help="пакетирование мелких сообщений: предельные размеры пакета, Б, через запятую; "
+                             "0 — прогон без пакетирования для сравнения, например '0,4096,65536'")
+    parser.add_argument("--linger", metavar="US[,US]",
+                        help=f"сроки ожидания первого сообщения в пакете, мкс, через запятую ({BATCH_LINGER_US})")
+    parser.add_argument("--payload", metavar="KIND[,KIND]",
+                        help="структурированная нагрузка через pickle 5, oob против inband (py -> py): "
+                             + ", ".join(PAYLOAD_KINDS) + "; bytes — обычный блок байт для сравнения")
+    parser.add_argument("--matrix", metavar="FILE.toml",
+                        help="матрица сценариев: методы, пары, размеры, замеры, размещение, окружение, варианты методов; "
+                             "аргументы командной строки важнее файла")
+    parser.add_argument("--methods", metavar="PATTERN[,PATTERN]",
+                        help="только методы под шаблоны через запятую, например 'posix_shared_memory*,sockets'")
+    parser.add_argument("--pairs", metavar="PAIR[,PAIR]", help="только пары языков: py-py, py-cpp, cpp-py, cpp-cpp")
+    parser.add_argument("--history", metavar="FILE", type=Path, default=HISTORY_DB,
+                        help="база истории результатов (SQLite), в неё дописывается каждый запуск (results/history.sqlite)")
+    parser.add_argument("--record", metavar="DIR[,DIR]",
+                        help="только записать в историю готовые папки запусков из results (например, старые)")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="только сравнить запуск с базой — папкой запуска или ревизией git: значимые по Уэлчу "
+                             "регрессии скорости и задержки, comparison.csv и тренды в results/history; "
+                             "код выхода 1 при регрессиях")
+    parser.add_argument("--candidate", metavar="RUN",
+                        help="сравниваемый запуск или ревизия для --compare (последний записанный)")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help=f"наименьшее относительное ухудшение, считающееся регрессией ({REGRESSION_THRESHOLD})")
+    parser.add_argument("--resume", metavar="DIR",
+                        help="дописать прерванный запуск (папка в results): готовые замеры пропускаются, "
+                             "незавершённые и неудачные переделываются; без --matrix берётся его matrix.json")
+    args = parser.parse_args()
+    ProcSampler.INTERVAL = args.proc_interval
+
+    # Команды истории результатов работают с уже записанными запусками, без прогонов
+    if args.record or args.compare:
+        try:
+            for name in args.record.split(",") if args.record else []:
+                results_dir = Path(name) if Path(name).is_dir() else RESULTS_DIR / name
+                if not results_dir.is_dir():
+                    raise ValueError(f"нет папки запуска {name}")
+                record_history(results_dir, args.history)
+            if args.compare:
+                regressions = compare_history(args.compare, args.candidate, args.history, args.threshold)
+                sys.exit(1 if not regressions.empty else 0)
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    cleanup_stale_names()
+
+    # Матрица: файл --matrix, matrix.json дописываемого запуска или пустая; поверх — явные аргументы
+    run_dir = None
+    if args.resume:
+        run_dir = Path(args.resume) if Path(args.resume).is_dir() else RESULTS_DIR / args.resume
+        if not run_dir.is_dir() or args.scale:
+            parser.error(f"--resume: нет папки запуска {args.resume}" if not args.scale
+                         else "--resume не поддерживается в режиме масштабирования")
+    try:
+        if args.matrix:
+            matrix = load_matrix(args.matrix)
+        elif run_dir is not None and (run_dir / "matrix.json").exists():
+            matrix = json.loads((run_dir / "matrix.json").read_text())
+        else:
+            matrix = {}
+        matrix = apply_cli_args(matrix, args)
+        if run_dir is not None:
+            check_resume(run_dir, matrix)
+        register_variants(matrix.get("variants", {}))
+        methods = select_methods(matrix)
+        pairs = parse_pairs(matrix["pairs"]) if matrix.get("pairs") else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if matrix.get("verify"):
+        os.environ["IPC_VERIFY"] = "1"  # окружение оркестратора наследуют все запускаемые процессы (method_env)
+    build_binaries(methods, SCALING_PAIRS if args.scale else pairs)
+    if args.scale:
+        current_run_dir = run_scaling_tests([int(k) for k in args.scale.split(",")], methods)
+        plot_scaling(current_run_dir)
+        return
 
-    current_run_dir = run_all_tests()
+    message_sizes = matrix.get("sizes")
+    trials = {**TRIALS_CONFIG, **matrix["trials"]}
+    trials["min_trials"] = min(trials["min_trials"], trials["max_trials"])
+    placements = matrix.get("placements")
+    unknown = set(placements or []) - set(PLACEMENT_POLICIES)
+    if unknown:
+        parser.error(f"неизвестные политики размещения: {', '.join(sorted(unknown))}")
+    batches = batch_runs(matrix["batch"], matrix.get("linger")) if matrix.get("batch") else None
+    unknown = set(matrix.get("payload", [])) - set(PAYLOAD_KINDS) - {"bytes"}
+    if unknown:
+        parser.error(f"неизвестные нагрузки: {', '.join(sorted(unknown))}")
+    if batches and matrix.get("payload"):
+        parser.error("структурированная нагрузка не пакетируется: --payload и --batch не сочетаются")
+    payloads = payload_runs(matrix["payload"]) if matrix.get("payload") else None
+    current_run_dir = run_all_tests(message_sizes, trials, placements, methods, pairs, run_dir, matrix, batches,
+                                    payloads)
     plot_results(current_run_dir)
+    record_history(current_run_dir, args.history)
 
 
 if __name__ == "__main__":
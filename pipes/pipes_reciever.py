@@ -0,0 +1,34 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_receiver, transport_size
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, TOTAL_SIZE
+from ipc.pipes import PipeChannel
+
+PIPE_PATH = os.environ.get("PIPE_PATH", "/tmp/ipc_fifo")  # "-" — stdin, для конвейера sender | receiver
+
+def main():
+    buf = bytearray(CHUNK_SIZE)
+    path = PIPE_PATH if PIPE_PATH == "-" else PIPE_PATH + NAME_SUFFIX
+
+    run = BenchRun("receiver", "pipe_reciever")
+    # ожидание подключения отправителя; при IPC_BATCH_SIZE кадр — пакет сообщений, он разбирается на месте
+    with batch_receiver(PipeChannel.reader(path), transport_size(CHUNK_SIZE)) as channel:
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            if BATCH_SIZE:
+                chunk = channel.recv_view()# сообщение — срез принятого пакета, без копирования
+            else:
+                chunk = memoryview(buf)[:channel.recv_into(buf)]# данные и начало следующего заголовка одним readv
+            nbytes = len(chunk)
+            if nbytes == 0:# пустой кадр — отправитель закончил передачу
+                break
+            if run.verify:# режим проверки: CRC32 принятого сообщения
+                run.verify.check(chunk)
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
+
+if __name__ == "__main__":
+    main()
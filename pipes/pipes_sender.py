@@ -0,0 +1,50 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_sender
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, TOTAL_SIZE
+from ipc.pipes import PipeChannel
+
+PIPE_MODE = os.environ.get("PIPE_MODE", "write")  # write (writev заголовка и чанка) или splice (чанк из memfd без копии)
+PIPE_PATH = os.environ.get("PIPE_PATH", "/tmp/ipc_fifo")  # "-" — stdout, для конвейера sender | receiver
+PIPE_SIZE = int(os.environ.get("PIPE_SIZE", "0"))  # F_SETPIPE_SZ, Б; 0 — размер ядра по умолчанию (64 КБ)
+
+def main():
+    if PIPE_MODE not in ("write", "splice"):
+        raise ValueError(f"Неизвестный режим PIPE_MODE: {PIPE_MODE}")
+    if PIPE_MODE == "splice" and BATCH_SIZE:
+        raise ValueError("PIPE_MODE=splice передаёт чанк из файла целиком и не совместим с пакетированием (IPC_BATCH_SIZE)")
+    chunk = bytearray(b'\x42' * CHUNK_SIZE) # имитация чанка для отправки
+    path = PIPE_PATH if PIPE_PATH == "-" else PIPE_PATH + NAME_SUFFIX
+
+    run = BenchRun("sender", "pipe_sender")
+    # получатель уже создал FIFO; IPC_BATCH_SIZE: мелкие сообщения копятся в пакете и уходят одним кадром
+    with batch_sender(PipeChannel.writer(path, PIPE_SIZE), CHUNK_SIZE) as channel:
+        if PIPE_MODE == "splice":
+            # Пайп держит ссылки на страницы файла, пока получатель их не прочитал, поэтому чанки идут по кольцу
+            # слотов: слот переписывается, когда после него записано больше, чем вмещает пайп
+            slots = channel.pipe_size // CHUNK_SIZE + 2
+            chunk_fd = os.memfd_create("pipe_chunk")
+            for slot in range(slots):
+                os.pwrite(chunk_fd, chunk, slot * CHUNK_SIZE)
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            if run.verify:
+                run.verify.fill(chunk)
+            if PIPE_MODE == "splice":
+                offset = run.messages % slots * CHUNK_SIZE
+                if run.verify:
+                    os.pwrite(chunk_fd, chunk, offset)# очередное сообщение узора — в свободный слот
+                channel.splice(chunk_fd, offset, CHUNK_SIZE)
+            else:
+                channel.send(chunk)#заголовок и чанк одним writev
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+    if PIPE_MODE == "splice":
+        os.close(chunk_fd)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#include <fcntl.h>
+#include <sys/stat.h>
+#include <sys/uio.h>
+#include <unistd.h>
+
+#include <cerrno>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <optional>
+#include <string>
+#include <vector>
+
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/verify.hpp"
+
+// Приём кадров из FIFO (совпадает с ipc/pipes.py). Получатель создаёт FIFO и удаляет его, как только подключился
+// отправитель. Данные сообщения и начало следующего заголовка читаются одним readv, поэтому в установившемся
+// режиме на сообщение уходит один системный вызов
+struct Frame {
+    uint64_t length;   // длина сообщения, 0 — конец потока
+    uint64_t send_ns;  // метка отправки (monotonic, нс)
+};
+
+class FrameReader {
+public:
+    explicit FrameReader(int fd) : fd_(fd) {}
+
+    // Длина кадра (0 — конец потока) или -1, если пайп закрыт посреди кадра
+    int64_t read_frame(char* buf, size_t capacity, uint64_t& send_ns) {
+        char* header = reinterpret_cast<char*>(&next_);
+        while (header_got_ < sizeof(next_)) {
+            ssize_t n = read(fd_, header + header_got_, sizeof(next_) - header_got_);
+            if (n <= 0 && !(n < 0 && errno == EINTR)) return -1;
+            if (n > 0) header_got_ += static_cast<size_t>(n);
+        }
+        const Frame frame = next_;
+        header_got_ = 0;
+        send_ns = frame.send_ns;
+        if (frame.length > capacity) return -1;
+        size_t got = 0;
+        while (got < frame.length) {
+            // Остаток данных и, если уже есть, начало следующего заголовка
+            iovec iov[2] = {{buf + got, frame.length - got}, {header, sizeof(next_)}};
+            ssize_t n = readv(fd_, iov, 2);
+            if (n < 0 && errno == EINTR) continue;
+            if (n <= 0) return -1;
+            got += static_cast<size_t>(n);
+        }
+        header_got_ = got - frame.length;
+        return static_cast<int64_t>(frame.length);
+    }
+
+private:
+    int fd_;
+    Frame next_{};
+    size_t header_got_ = 0;  // байты следующего заголовка, прочитанные вместе с прошлым сообщением
+};
+
+int main() {
+    using namespace std::chrono;
+    const size_t CHUNK_SIZE = chunk_size_from_env();
+    const size_t TOTAL_SIZE = total_size_from_env();
+    const char* path_env = std::getenv("PIPE_PATH");
+    std::string path = path_env ? path_env : "/tmp/ipc_fifo";  // "-" — stdin, для конвейера sender | receiver
+    auto wall_start = high_resolution_clock::now();
+
+    int fd = STDIN_FILENO;
+    if (path != "-") {
+        path += name_suffix();
+        unlink(path.c_str());  // FIFO прошлого (упавшего) запуска
+        if (mkfifo(path.c_str(), 0600) != 0) {
+            perror("mkfifo");
+            return 1;
+        }
+        signal_ready();  // отправитель может открывать FIFO
+        fd = open(path.c_str(), O_RDONLY);  // блокируется до подключения отправителя
+        unlink(path.c_str());  // оба конца открыты, имя больше не нужно
+        if (fd < 0) {
+            perror("open fifo");
+            return 1;
+        }
+    }
+
+    LatencyHistogram latency;
+    std::optional<PatternCheck> verify;  // режим проверки (IPC_VERIFY): CRC32 каждого сообщения
+    if (verify_enabled()) verify.emplace(CHUNK_SIZE);
+    std::vector<char> buffer(transport_size(CHUNK_SIZE));  // сообщение или пакет (IPC_BATCH_SIZE)
+    const bool batching = batch_size_from_env() > 0;
+    FrameReader reader(fd);
+
+    size_t received = 0;
+    MetricsChannel channel("receiver");  // живые замеры для оркестратора
+    auto active_start = high_resolution_clock::now();
+    while (received < TOTAL_SIZE) {
+        uint64_t send_ns = 0;
+        const int64_t length = reader.read_frame(buffer.data(), buffer.size(), send_ns);
+        if (length < 0) {
+            std::cerr << "pipe closed before end of stream\n";
+            return 1;
+        }
+        if (length == 0) break;  // отправитель закончил передачу
+        if (batching) {
+            // Пакет разбирается на месте: у каждого сообщения своя метка отправки
+            const bool ok = for_each_message(buffer.data(), static_cast<size_t>(length),
+                                             [&](const char* message, size_t size, uint64_t message_ns) {
+                if (verify) verify->check(message, size);
+                latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - message_ns));
+                received += size;
+            });
+            if (!ok) {
+                std::cerr << "malformed batch of " << length << " bytes\n";
+                return 1;
+            }
+            channel.tick(received);
+            continue;
+        }
+        if (verify) verify->check(buffer.data(), static_cast<size_t>(length));
+        latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - send_ns));
+        received += static_cast<size_t>(length);
+        channel.tick(received);
+    }
+    auto active_end = high_resolution_clock::now();
+    if (fd != STDIN_FILENO) close(fd);
+
+    double active_time = duration<double>(active_end - active_start).count();
+    double wall_time = duration<double>(high_resolution_clock::now() - wall_start).count();
+    double max_rss = MetricsChannel::peak_rss_mb();
+    std::ofstream log(metrics_path("pipe_reciever_metrics.csv"));
+    log << "active_time_sec,wall_time_sec,bytes_received,rss_mb\n";
+    log << active_time << "," << wall_time << "," << received << "," << max_rss << "\n";
+    channel.finish(received, active_time, wall_time, max_rss);
+    latency.write_csv(metrics_path("pipe_reciever"));
+    if (verify) verify->write_csv(metrics_path("pipe_reciever"));
+    return 0;
+}
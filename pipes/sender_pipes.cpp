@@ -0,0 +1,165 @@
+#include <fcntl.h>
+#include <sys/stat.h>
+#include <sys/uio.h>
+#include <unistd.h>
+
+#include <cerrno>
+#include <chrono>
+#include <csignal>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <optional>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/verify.hpp"
+
+// Поток кадров через FIFO (совпадает с ipc/pipes.py): заголовок Frame, затем данные; длина 0 — конец потока.
+// PIPE_MODE=write — заголовок и чанк одним writev (копия в буфер пайпа); PIPE_MODE=splice — заголовок write,
+// чанк vmsplice: пайп получает ссылки на страницы процесса, без копии. PIPE_SIZE — размер пайпа (F_SETPIPE_SZ)
+struct Frame {
+    uint64_t length;   // длина сообщения, 0 — конец потока
+    uint64_t send_ns;  // метка отправки (monotonic, нс)
+};
+
+std::string env_string(const char* name, const char* fallback) {
+    const char* value = std::getenv(name);
+    return value ? value : fallback;
+}
+
+// Запись всех iov, в блокирующий пайп она проходит целиком, цикл — на случай сигнала
+bool write_all(int fd, iovec* iov, int count) {
+    while (count > 0) {
+        ssize_t written = writev(fd, iov, count);
+        if (written < 0) {
+            if (errno == EINTR) continue;
+            return false;
+        }
+        while (count > 0 && static_cast<size_t>(written) >= iov->iov_len) {
+            written -= static_cast<ssize_t>(iov->iov_len);
+            ++iov;
+            --count;
+        }
+        if (count > 0) {
+            iov->iov_base = static_cast<char*>(iov->iov_base) + written;
+            iov->iov_len -= static_cast<size_t>(written);
+        }
+    }
+    return true;
+}
+
+bool splice_all(int fd, char* data, size_t length) {
+    while (length > 0) {
+        iovec iov{data, length};
+        ssize_t moved = vmsplice(fd, &iov, 1, 0);
+        if (moved < 0) {
+            if (errno == EINTR) continue;
+            return false;
+        }
+        data += moved;
+        length -= static_cast<size_t>(moved);
+    }
+    return true;
+}
+
+int main() {
+    using namespace std::chrono;
+    const size_t CHUNK_SIZE = chunk_size_from_env();
+    const size_t TOTAL_SIZE = total_size_from_env();
+    const std::string mode = env_string("PIPE_MODE", "write");
+    std::string path = env_string("PIPE_PATH", "/tmp/ipc_fifo");  // "-" — stdout, для конвейера sender | receiver
+    const size_t pipe_size = env_size("PIPE_SIZE", 0);
+    if (mode != "write" && mode != "splice") {
+        std::cerr << "unknown PIPE_MODE: " << mode << "\n";
+        return 1;
+    }
+    const bool batching = batch_size_from_env() > 0;  // пакеты мелких сообщений (common/batch.hpp)
+    if (batching && mode == "splice") {
+        std::cerr << "PIPE_MODE=splice is incompatible with IPC_BATCH_SIZE\n";
+        return 1;
+    }
+    signal(SIGPIPE, SIG_IGN);  // закрытый получателем пайп — ошибка EPIPE, а не завершение процесса
+    auto wall_start = high_resolution_clock::now();
+
+    int fd = STDOUT_FILENO;
+    if (path != "-") {
+        path += name_suffix();
+        for (int attempt = 0; (fd = open(path.c_str(), O_WRONLY)) < 0 && errno == ENOENT && attempt < 100; ++attempt) {
+            std::this_thread::sleep_for(milliseconds(50));  // ждём, пока получатель создаст FIFO
+        }
+    }
+    struct stat st{};
+    if (fd < 0 || fstat(fd, &st) != 0 || !S_ISFIFO(st.st_mode)) {
+        perror("open fifo");
+        return 1;
+    }
+    // Ядро округляет размер вверх до степени двойки страниц; без CAP_SYS_RESOURCE — не больше pipe-max-size
+    if (pipe_size && fcntl(fd, F_SETPIPE_SZ, static_cast<int>(pipe_size)) < 0) {
+        std::cerr << "[WARN] F_SETPIPE_SZ " << pipe_size << ": " << std::strerror(errno) << ", размер пайпа не изменён\n";
+    }
+    const size_t actual_pipe_size = static_cast<size_t>(fcntl(fd, F_GETPIPE_SZ));
+
+    // vmsplice оставляет в пайпе ссылки на страницы, пока получатель их не прочитал, поэтому чанки идут
+    // по кольцу слотов: слот переписывается, когда после него записано больше, чем вмещает пайп.
+    // С пакетированием единственный слот вмещает пакет, сообщения собираются в нём
+    const size_t slots = mode == "splice" ? actual_pipe_size / CHUNK_SIZE + 2 : 1;
+    std::vector<char> ring(slots * transport_size(CHUNK_SIZE), 'B');
+    BatchWriter batch(ring.data(), ring.size());
+    std::optional<PatternSource> pattern;  // режим проверки (IPC_VERIFY): узор пишется прямо в слот
+    if (verify_enabled()) pattern.emplace(CHUNK_SIZE);
+
+    size_t sent = 0;
+    size_t messages = 0;
+    MetricsChannel channel("sender");  // живые замеры для оркестратора
+    auto active_start = high_resolution_clock::now();
+    while (sent < TOTAL_SIZE) {
+        char* chunk = batching ? batch.append(CHUNK_SIZE) : ring.data() + messages % slots * CHUNK_SIZE;
+        if (pattern) pattern->fill(chunk, CHUNK_SIZE);
+        else if (batching) std::memset(chunk, 'B', CHUNK_SIZE);  // сообщение копируется в пакет
+        sent += CHUNK_SIZE;
+        ++messages;
+        if (batching && sent < TOTAL_SIZE && !batch.due(CHUNK_SIZE)) continue;  // пакет ещё собирается
+        char* data = batching ? ring.data() : chunk;
+        const size_t length = batching ? batch.size() : CHUNK_SIZE;
+        batch.reset();
+        Frame frame{length, LatencyHistogram::now_ns()};
+        bool ok;
+        if (mode == "splice") {
+            ok = write(fd, &frame, sizeof(frame)) == static_cast<ssize_t>(sizeof(frame)) && splice_all(fd, data, length);
+        } else {
+            iovec iov[2] = {{&frame, sizeof(frame)}, {data, length}};
+            ok = write_all(fd, iov, 2);
+        }
+        if (!ok) {
+            perror(mode == "splice" ? "vmsplice" : "writev");
+            return 1;
+        }
+        channel.tick(sent);
+    }
+    Frame eof{0, 0};  // пустой кадр — приёмник понимает, что отправка окончена
+    if (write(fd, &eof, sizeof(eof)) < 0 && errno != EPIPE) {  // EPIPE: получатель принял весь объём и уже вышел
+        perror("write");
+        return 1;
+    }
+    auto active_end = high_resolution_clock::now();
+    if (fd != STDOUT_FILENO) close(fd);
+
+    double active_time = duration<double>(active_end - active_start).count();
+    double wall_time = duration<double>(high_resolution_clock::now() - wall_start).count();
+    double max_rss = MetricsChannel::peak_rss_mb();
+    std::ofstream log(metrics_path("pipe_sender_metrics.csv"));
+    log << "active_time_sec,wall_time_sec,bytes_sent,rss_mb\n";
+    log << active_time << "," << wall_time << "," << sent << "," << max_rss << "\n";
+    channel.finish(sent, active_time, wall_time, max_rss);
+    if (pattern) pattern->write_csv(metrics_path("pipe_sender"));
+    return 0;
+}
@@ -0,0 +1,215 @@
+#include <fcntl.h>
+#include <semaphore.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+#include <chrono>
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <ctime>
+#include <fstream>
+#include <iostream>
+#include <optional>
+#include <string>
+#include <vector>
+
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/seq_sync.hpp"
+#include "../common/verify.hpp"
+
+// Запрос-ответ (совпадает с shm_pingpong.py): два однослотовых кольца /my_shm<суффикс>_req (клиент -> сервер)
+// и _rep (обратно) с раскладкой sender_shm.cpp. Оба сегмента создаёт клиент (ping), сервер (pong) подключается.
+// SHM_WAIT=spin — до SHM_SPIN_LIMIT раз проверить счётчики head/tail сегмента, прежде чем уснуть на семафоре
+const size_t TOTAL_SIZE = total_size_from_env();
+const size_t CHUNK_SIZE = chunk_size_from_env();
+
+const size_t HEADER_SIZE = 4096;
+const size_t HEAD_OFFSET = 64;
+const size_t TAIL_OFFSET = 128;
+const size_t SLOT_INFO_OFFSET = 256;
+
+struct Ring {
+    std::string suffix;
+    char* base = nullptr;
+    size_t size = 0;
+    uint64_t slot_size = 0;
+    uint64_t* head_ptr = nullptr;
+    uint64_t* tail_ptr = nullptr;
+    uint64_t* slot_info = nullptr;
+    sem_t* sem_empty = nullptr;
+    sem_t* sem_full = nullptr;
+    uint64_t head = 0;
+    uint64_t tail = 0;
+    bool owner = false;
+    size_t spin = 0;
+
+    bool attach(const std::string& name_suffix, bool create, size_t spin_limit) {
+        suffix = name_suffix;
+        owner = create;
+        spin = spin_limit;
+        const std::string shm_name = "/my_shm" + suffix;
+        int fd = create ? shm_open(shm_name.c_str(), O_CREAT | O_RDWR, 0666) : shm_open(shm_name.c_str(), O_RDWR, 0666);
+        if (fd < 0) {
+            perror(shm_name.c_str());
+            return false;
+        }
+        if (create && ftruncate(fd, HEADER_SIZE + CHUNK_SIZE) == -1) {
+            perror("ftruncate");
+            return false;
+        }
+        struct stat st{};
+        fstat(fd, &st);
+        size = st.st_size;
+        base = static_cast<char*>(mmap(0, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0));
+        close(fd);
+        if (base == MAP_FAILED) {
+            perror("mmap");
+            return false;
+        }
+        uint64_t* header = reinterpret_cast<uint64_t*>(base);
+        head_ptr = reinterpret_cast<uint64_t*>(base + HEAD_OFFSET);
+        tail_ptr = reinterpret_cast<uint64_t*>(base + TAIL_OFFSET);
+        slot_info = reinterpret_cast<uint64_t*>(base + SLOT_INFO_OFFSET);
+        if (create) {
+            header[0] = 1;
+            header[1] = CHUNK_SIZE;
+            __atomic_store_n(head_ptr, 0, __ATOMIC_RELEASE);
+            __atomic_store_n(tail_ptr, 0, __ATOMIC_RELEASE);
+        }
+        slot_size = header[1];
+        sem_empty = create ? sem_open(("/sem_empty" + suffix).c_str(), O_CREAT, 0666, 1)
+                           : sem_open(("/sem_empty" + suffix).c_str(), 0);
+        sem_full = create ? sem_open(("/sem_full" + suffix).c_str(), O_CREAT, 0666, 0)
+                          : sem_open(("/sem_full" + suffix).c_str(), 0);
+        return sem_empty != SEM_FAILED && sem_full != SEM_FAILED;
+    }
+
+    void send(const char* data, uint64_t length) {
+        for (size_t i = 0; i < spin && head - __atomic_load_n(tail_ptr, __ATOMIC_ACQUIRE) >= 1; ++i) {}
+        sem_wait(sem_empty);
+        slot_info[0] = LatencyHistogram::now_ns();  // метка ставится, когда слот уже получен
+        memcpy(base + HEADER_SIZE, data, length);
+        slot_info[1] = length;
+        __atomic_store_n(head_ptr, ++head, __ATOMIC_RELEASE);
+        sem_post(sem_full);
+    }
+
+    // Длина сообщения, скопированного в dst; 0 — конец потока
+    uint64_t recv(char* dst) {
+        for (size_t i = 0; i < spin && __atomic_load_n(head_ptr, __ATOMIC_ACQUIRE) <= tail; ++i) {}
+        sem_wait(sem_full);
+        const uint64_t length = slot_info[1];
+        memcpy(dst, base + HEADER_SIZE, length);
+        __atomic_store_n(tail_ptr, ++tail, __ATOMIC_RELEASE);
+        sem_post(sem_empty);
+        return length;
+    }
+
+    void finish() {
+        if (owner) {
+            // Пустое сообщение — конец потока; слот ждём не дольше секунды, как ShmChannel.close()
+            timespec deadline{};
+            clock_gettime(CLOCK_REALTIME, &deadline);
+            deadline.tv_sec += 1;
+            if (sem_timedwait(sem_empty, &deadline) == 0) {
+                slot_info[0] = 0;
+                slot_info[1] = 0;
+                __atomic_store_n(head_ptr, ++head, __ATOMIC_RELEASE);
+                sem_post(sem_full);
+            }
+        }
+        munmap(base, size);
+        sem_close(sem_empty);
+        sem_close(sem_full);
+        if (owner) {
+            shm_unlink(("/my_shm" + suffix).c_str());
+            sem_unlink(("/sem_empty" + suffix).c_str());
+            sem_unlink(("/sem_full" + suffix).c_str());
+        }
+    }
+};
+
+int main(int argc, char** argv) {
+    const std::string role = argc == 2 ? argv[1] : "";
+    if (role != "ping" && role != "pong") {
+        std::cerr << "usage: " << argv[0] << " ping|pong\n";
+        return 1;
+    }
+    const char* wait_env = std::getenv("SHM_WAIT");
+    // Бюджет опроса как у счётчиков futex: на одном CPU опроса нет, spin ведёт себя как block
+    const size_t spin = wait_env && std::string(wait_env) == "spin" ? seq_spin_budget() : 0;
+    const bool ping = role == "ping";
+
+    Ring request, reply;
+    if (!request.attach(name_suffix() + "_req", ping, spin) || !reply.attach(name_suffix() + "_rep", ping, spin)) {
+        return 1;
+    }
+    signal_ready();  // клиент создал оба кольца, сервер может подключаться
+    std::vector<char> buffer(CHUNK_SIZE, 'A');
+    std::vector<char> answer(CHUNK_SIZE);
+    LatencyHistogram latency;
+    std::optional<PatternSource> pattern;
+    std::optional<PatternCheck> verify;
+    if (verify_enabled()) {
+        if (ping) pattern.emplace(CHUNK_SIZE);
+        else verify.emplace(CHUNK_SIZE);
+    }
+
+    auto wall_start = std::chrono::high_resolution_clock::now();
+    // Первый круг — рукопожатие, не учитывается: сервер мог ещё не подключиться
+    if (ping) {
+        request.send(buffer.data(), CHUNK_SIZE);
+        reply.recv(answer.data());
+    } else {
+        reply.send(buffer.data(), request.recv(buffer.data()));
+    }
+    auto active_start = std::chrono::high_resolution_clock::now();
+
+    size_t transferred = 0;
+    MetricsChannel channel(ping ? "sender" : "receiver");  // живые замеры для оркестратора
+    if (ping) {
+        while (transferred < TOTAL_SIZE) {
+            if (pattern) pattern->fill(buffer.data(), CHUNK_SIZE);
+            const uint64_t start_ns = LatencyHistogram::now_ns();
+            request.send(buffer.data(), CHUNK_SIZE);
+            if (reply.recv(answer.data()) != CHUNK_SIZE) {
+                std::cerr << "unexpected reply length\n";
+                return 1;
+            }
+            latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - start_ns));  // полный круг — RTT
+            transferred += CHUNK_SIZE;
+            channel.tick(transferred);
+        }
+    } else {
+        while (true) {
+            const uint64_t length = request.recv(buffer.data());
+            if (length == 0) break;  // клиент закончил
+            if (verify) verify->check(buffer.data(), length);
+            reply.send(buffer.data(), length);
+            transferred += length;
+            channel.tick(transferred);
+        }
+    }
+
+    auto end = std::chrono::high_resolution_clock::now();
+    double active_time = std::chrono::duration<double>(end - active_start).count();
+    double wall_time = std::chrono::duration<double>(end - wall_start).count();
+    double max_rss = MetricsChannel::peak_rss_mb();
+    const std::string prefix = ping ? "shm_ping" : "shm_pong";
+    std::ofstream log(metrics_path(prefix + "_metrics.csv"));
+    log << "active_time_sec,wall_time_sec," << (ping ? "bytes_sent" : "bytes_received") << ",rss_mb\n";
+    log << active_time << "," << wall_time << "," << transferred << "," << max_rss << "\n";
+    channel.finish(transferred, active_time, wall_time, max_rss);
+    if (ping) latency.write_csv(metrics_path(prefix));
+    if (pattern) pattern->write_csv(metrics_path(prefix));
+    if (verify) verify->write_csv(metrics_path(prefix));
+
+    request.finish();
+    reply.finish();
+    return 0;
+}
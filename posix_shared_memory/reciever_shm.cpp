@@ -2,69 +2,129 @@
 #include <fcntl.h>
 #include <semaphore.h>
 #include <sys/mman.h>
+#include <sys/stat.h>
 #include <unistd.h>
 
 #include <chrono>
+#include <cstdint>
 #include <fstream>
 #include <iostream>
-#include <limits>
+#include <optional>
 #include <cstring>
 
-const size_t TOTAL_SIZE = 10ULL * 1024 * 1024 * 1024;  // 10 GB
-const size_t CHUNK_SIZE = 16 * 1024 * 1024; // 16 MB
-const char* SHM_NAME = "/my_shm";
-const char* SEM_EMPTY_NAME = "/sem_empty";
-const char* SEM_FULL_NAME = "/sem_full";
-
-double get_rss_in_mb() {
-    std::ifstream statm("/proc/self/statm");
-    size_t resident_pages = 0;
-    statm.ignore(std::numeric_limits<std::streamsize>::max(), ' ');
-    statm >> resident_pages;
-    return (resident_pages * sysconf(_SC_PAGESIZE)) / (1024.0 * 1024.0);
-}
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/seq_sync.hpp"
+#include "../common/shm_pages.hpp"
+#include "../common/verify.hpp"
+
+// Размеры задаёт оркестратор через окружение (IPC_TOTAL_SIZE, IPC_CHUNK_SIZE)
+const size_t TOTAL_SIZE = total_size_from_env();  // 10 GB по умолчанию
+const size_t CHUNK_SIZE = chunk_size_from_env();  // 16 MB по умолчанию
+// Суффикс IPC_NAME_SUFFIX разводит имена при параллельном запуске нескольких пар
+const std::string SHM_NAME = "/my_shm" + name_suffix();
+const std::string SEM_EMPTY_NAME = "/sem_empty" + name_suffix();
+const std::string SEM_FULL_NAME = "/sem_full" + name_suffix();
+
+// Раскладка сегмента должна совпадать с sender_shm.cpp и ipc/shm.py
+const size_t HEADER_SIZE = 4096;
+const size_t SYNC_OFFSET = 16;
+const size_t HEAD_OFFSET = 64;
+const size_t TAIL_OFFSET = 128;
+const size_t SLOT_INFO_OFFSET = 256;  // пары (метка отправки, длина сообщения)
 
 int main() {
-    int shm_fd = shm_open(SHM_NAME, O_RDWR, 0666);
-    void* ptr = mmap(0, CHUNK_SIZE, PROT_READ, MAP_SHARED, shm_fd, 0);
-
-    sem_t* sem_empty = sem_open(SEM_EMPTY_NAME, 0);
-    sem_t* sem_full = sem_open(SEM_FULL_NAME, 0);
-
-    char* buffer = new char[CHUNK_SIZE];
+    const PageSettings pages = page_settings_from_env();  // страницы сегмента те же, что у отправителя
+    int shm_fd = pages.hugetlb() ? open(hugetlb_path(SHM_NAME, pages).c_str(), O_RDWR)
+                                 : shm_open(SHM_NAME.c_str(), O_RDWR, 0666);
+    struct stat st{};
+    fstat(shm_fd, &st);
+    const size_t shm_size = st.st_size;
+    char* base = static_cast<char*>(mmap(0, shm_size, PROT_READ | PROT_WRITE, MAP_SHARED | map_flags(pages), shm_fd, 0));
+    if (base == MAP_FAILED) {
+        perror("mmap");
+        return 1;
+    }
+    prepare_mapping(base, shm_size, pages);
+
+    sem_t* sem_empty = sem_open(SEM_EMPTY_NAME.c_str(), 0);
+    sem_t* sem_full = sem_open(SEM_FULL_NAME.c_str(), 0);
+
+    // Число слотов и их размер задаёт отправитель в заголовке сегмента
+    const uint64_t* header = reinterpret_cast<const uint64_t*>(base);
+    const uint64_t slots = header[0];
+    const uint64_t slot_size = header[1];
+    const bool futex = header[SYNC_OFFSET / sizeof(uint64_t)] == SYNC_FUTEX;  // режим синхронизации тоже
+    SeqCounter head_seq(base + HEAD_OFFSET);
+    SeqCounter tail_seq(base + TAIL_OFFSET);
+    uint64_t* tail_ptr = reinterpret_cast<uint64_t*>(base + TAIL_OFFSET);
+    const uint64_t* slot_info = reinterpret_cast<const uint64_t*>(base + SLOT_INFO_OFFSET);
+    LatencyHistogram latency;
+
+    char* buffer = new char[slot_size];
+    const bool batching = batch_size_from_env() > 0;
+    std::optional<PatternCheck> verify;  // режим проверки (IPC_VERIFY): CRC32 каждого принятого сообщения
+    if (verify_enabled()) verify.emplace(slot_size);
 
     auto wall_start = std::chrono::high_resolution_clock::now();
     double active_time = 0.0;
 
-    double max_rss = 0.0;
     size_t received = 0;
+    uint64_t tail = 0;
+    MetricsChannel channel("receiver");  // живые замеры для оркестратора
 
-    for (size_t i = 0; i < TOTAL_SIZE; i += CHUNK_SIZE) {
-        sem_wait(sem_full);
+    for (size_t i = 0; received < TOTAL_SIZE; ++i) {
+        if (futex) head_seq.wait_above(static_cast<int64_t>(tail));
+        else sem_wait(sem_full);
+        const uint64_t length = slot_info[2 * (tail % slots) + 1];
+        if (length == 0) break;  // отправитель закончил передачу
 
         auto active_start = std::chrono::high_resolution_clock::now();
-        memcpy(buffer, ptr, CHUNK_SIZE);
+        memcpy(buffer, base + HEADER_SIZE + (tail % slots) * slot_size, length);
         auto active_end = std::chrono::high_resolution_clock::now();
 
         active_time += std::chrono::duration<double>(active_end - active_start).count();
-        sem_post(sem_empty);
-
-        received += CHUNK_SIZE;
-        if (i % (100 * CHUNK_SIZE) == 0) {
-            double current_rss = get_rss_in_mb();
-            if (current_rss > max_rss) max_rss = current_rss;
+        if (batching) {
+            // В слоте пакет (IPC_BATCH_SIZE): сообщения разбираются на месте в копии слота
+            const bool ok = for_each_message(buffer, length, [&](const char* message, size_t size, uint64_t send_ns) {
+                if (verify) verify->check(message, size);
+                latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - send_ns));
+                received += size;
+                channel.tick(received);
+            });
+            if (!ok) {
+                std::cerr << "malformed batch of " << length << " bytes\n";
+                break;
+            }
+        } else {
+            if (verify) verify->check(buffer, length);
+            latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - slot_info[2 * (tail % slots)]));
+            received += length;
+            channel.tick(received);
+        }
+        if (futex) {
+            tail_seq.advance(++tail);
+        } else {
+            __atomic_store_n(tail_ptr, ++tail, __ATOMIC_RELEASE);
+            sem_post(sem_empty);
         }
     }
 
     auto wall_end = std::chrono::high_resolution_clock::now();
     double wall_time = std::chrono::duration<double>(wall_end - wall_start).count();
 
-    std::ofstream log("shm_reciever_metrics.csv");
+    double max_rss = MetricsChannel::peak_rss_mb();  // пик RSS за весь прогон, без замеров в цикле
+    std::ofstream log(metrics_path("shm_reciever_metrics.csv"));
     log << "active_time_sec,wall_time_sec,bytes_received,rss_mb\n";
     log << active_time << "," << wall_time << "," << received << "," << max_rss << "\n";
+    channel.finish(received, active_time, wall_time, max_rss);
+    latency.write_csv(metrics_path("shm_reciever"));
+    if (verify) verify->write_csv(metrics_path("shm_reciever"));
 
     delete[] buffer;
-    munmap(ptr, CHUNK_SIZE);
+    munmap(base, shm_size);
     close(shm_fd);
     sem_close(sem_empty);
     sem_close(sem_full);
@@ -5,77 +5,163 @@
 #include <unistd.h>
 
 #include <chrono>
+#include <cstdint>
+#include <cstdlib>
 #include <cstring>
 #include <fstream>
 #include <iostream>
-#include <limits>
-
-const size_t TOTAL_SIZE = 10ULL * 1024 * 1024 * 1024;  // 10 GB
-const size_t CHUNK_SIZE = 16 * 1024 * 1024;
-const char* SHM_NAME = "/my_shm";
-const char* SEM_EMPTY_NAME = "/sem_empty";
-const char* SEM_FULL_NAME = "/sem_full";
-
-double get_rss_in_mb() {
-    std::ifstream statm("/proc/self/statm");
-    size_t resident_pages = 0;
-    statm.ignore(std::numeric_limits<std::streamsize>::max(), ' ');
-    statm >> resident_pages;
-    return (resident_pages * sysconf(_SC_PAGESIZE)) / (1024.0 * 1024.0);
-}
+#include <optional>
+
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/seq_sync.hpp"
+#include "../common/shm_pages.hpp"
+#include "../common/verify.hpp"
+
+// Размеры задаёт оркестратор через окружение (IPC_TOTAL_SIZE, IPC_CHUNK_SIZE)
+const size_t TOTAL_SIZE = total_size_from_env();  // 10 GB по умолчанию
+const size_t CHUNK_SIZE = chunk_size_from_env();  // 16 MB по умолчанию
+// IPC_BATCH_SIZE: слот вмещает пакет мелких сообщений (common/batch.hpp), иначе — одно сообщение
+const size_t SLOT_SIZE = transport_size(CHUNK_SIZE);
+const bool BATCHING = batch_size_from_env() > 0;
+// Суффикс IPC_NAME_SUFFIX разводит имена при параллельном запуске нескольких пар
+const std::string SHM_NAME = "/my_shm" + name_suffix();
+const std::string SEM_EMPTY_NAME = "/sem_empty" + name_suffix();
+const std::string SEM_FULL_NAME = "/sem_full" + name_suffix();
+
+// Раскладка сегмента (совпадает с ipc/shm.py): страница заголовка, затем slots слотов по SLOT_SIZE байт
+const size_t HEADER_SIZE = 4096;
+const size_t SYNC_OFFSET = 16;   // режим синхронизации: SYNC_SEM или SYNC_FUTEX (common/seq_sync.hpp)
+const size_t HEAD_OFFSET = 64;   // head (записано чанков) в отдельной кэш-линии
+const size_t TAIL_OFFSET = 128;  // tail (прочитано чанков) в отдельной кэш-линии
+const size_t SLOT_INFO_OFFSET = 256; // по паре на слот: метка отправки (monotonic, нс) и длина сообщения
+const size_t MAX_SLOTS = (HEADER_SIZE - SLOT_INFO_OFFSET) / (2 * sizeof(uint64_t));
 
 int main() {
-    int shm_fd = shm_open(SHM_NAME, O_CREAT | O_RDWR, 0666);
-    if (ftruncate(shm_fd, CHUNK_SIZE) == -1) {
-        perror("ftruncate");
+    const char* slots_env = std::getenv("SHM_SLOTS");
+    const uint64_t slots = slots_env ? std::strtoull(slots_env, nullptr, 10) : 1;  // 1 слот = режим "пинг-понг"
+    if (slots < 1 || slots > MAX_SLOTS) {
+        std::cerr << "SHM_SLOTS must be in [1, " << MAX_SLOTS << "]\n";
         return 1;
     }
-    void* ptr = mmap(0, CHUNK_SIZE, PROT_WRITE, MAP_SHARED, shm_fd, 0);
+    // Страницы сегмента (SHM_HUGEPAGES, SHM_PREFAULT): hugetlb-сегмент — файл на hugetlbfs вместо shm_open
+    const PageSettings pages = page_settings_from_env();
+    const size_t shm_size = segment_size(HEADER_SIZE + slots * SLOT_SIZE, pages);
 
-    sem_t* sem_empty = sem_open(SEM_EMPTY_NAME, O_CREAT, 0666, 1);
-    sem_t* sem_full = sem_open(SEM_FULL_NAME, O_CREAT, 0666, 0);
+    int shm_fd = pages.hugetlb() ? open(hugetlb_path(SHM_NAME, pages).c_str(), O_CREAT | O_RDWR, 0666)
+                                 : shm_open(SHM_NAME.c_str(), O_CREAT | O_RDWR, 0666);
+    if (ftruncate(shm_fd, shm_size) == -1) {
+        perror("ftruncate");
+        return 1;
+    }
+    char* base = static_cast<char*>(mmap(0, shm_size, PROT_READ | PROT_WRITE, MAP_SHARED | map_flags(pages), shm_fd, 0));
+    if (base == MAP_FAILED) {
+        perror("mmap");
+        return 1;
+    }
+    prepare_mapping(base, shm_size, pages);
+    uint64_t* header = reinterpret_cast<uint64_t*>(base);
+    uint64_t* head_ptr = reinterpret_cast<uint64_t*>(base + HEAD_OFFSET);
+    uint64_t* slot_info = reinterpret_cast<uint64_t*>(base + SLOT_INFO_OFFSET);
+    header[0] = slots;
+    header[1] = SLOT_SIZE;
+    // SHM_SYNC=futex — ждать счётчики head/tail с адаптивным опросом и сном на futex вместо семафоров
+    const bool futex = sync_mode_from_env() == SYNC_FUTEX;
+    header[SYNC_OFFSET / sizeof(uint64_t)] = futex ? SYNC_FUTEX : SYNC_SEM;
+    SeqCounter head_seq(base + HEAD_OFFSET);
+    SeqCounter tail_seq(base + TAIL_OFFSET);
+    __atomic_store_n(head_ptr, 0, __ATOMIC_RELEASE);
+    __atomic_store_n(reinterpret_cast<uint64_t*>(base + TAIL_OFFSET), 0, __ATOMIC_RELEASE);
+
+    sem_t* sem_empty = sem_open(SEM_EMPTY_NAME.c_str(), O_CREAT, 0666, static_cast<unsigned>(slots));
+    sem_t* sem_full = sem_open(SEM_FULL_NAME.c_str(), O_CREAT, 0666, 0);
 
     char* data = new char[CHUNK_SIZE];
     memset(data, 'A', CHUNK_SIZE);
+    std::optional<PatternSource> pattern;  // режим проверки (IPC_VERIFY): узор с номером сообщения вместо 'A'
+    if (verify_enabled()) pattern.emplace(CHUNK_SIZE);
 
     auto wall_start = std::chrono::high_resolution_clock::now();
     double active_time = 0.0;
 
-    double max_rss = 0.0;
     size_t sent = 0;
+    uint64_t head = 0;
+    signal_ready();  // сегмент и семафоры созданы, получатель может подключаться
+    MetricsChannel channel("sender");  // живые замеры для оркестратора
 
-    for (size_t i = 0; i < TOTAL_SIZE; i += CHUNK_SIZE) {
-        sem_wait(sem_empty);
+    while (sent < TOTAL_SIZE) {
+        if (futex) tail_seq.wait_above(static_cast<int64_t>(head) - static_cast<int64_t>(slots));
+        else sem_wait(sem_empty);
+        // метка ставится, когда слот уже получен: как у сокетов и каналов, ожидание места в задержку не входит
+        uint64_t send_ns = LatencyHistogram::now_ns();
 
         auto active_start = std::chrono::high_resolution_clock::now();
-        memcpy(ptr, data, CHUNK_SIZE);
+        char* slot = base + HEADER_SIZE + (head % slots) * SLOT_SIZE;
+        size_t length = CHUNK_SIZE;
+        if (BATCHING) {
+            // Пакет собирается прямо в слоте: сообщения добавляются, пока не подойдёт срок или не кончится место
+            BatchWriter batch(slot, SLOT_SIZE);
+            do {
+                char* message = batch.append(CHUNK_SIZE);
+                if (pattern) pattern->fill(message, CHUNK_SIZE);
+                else memcpy(message, data, CHUNK_SIZE);
+                sent += CHUNK_SIZE;
+                channel.tick(sent);
+            } while (sent < TOTAL_SIZE && !batch.due(CHUNK_SIZE));
+            length = batch.size();
+        } else {
+            if (pattern) pattern->fill(slot, CHUNK_SIZE);
+            else memcpy(slot, data, CHUNK_SIZE);
+            sent += CHUNK_SIZE;
+            channel.tick(sent);
+        }
         auto active_end = std::chrono::high_resolution_clock::now();
 
         active_time += std::chrono::duration<double>(active_end - active_start).count();
-        sem_post(sem_full);
-
-        sent += CHUNK_SIZE;
-        if (i % (100 * CHUNK_SIZE) == 0) {
-            double current_rss = get_rss_in_mb();
-            if (current_rss > max_rss) max_rss = current_rss;
+        slot_info[2 * (head % slots)] = send_ns;
+        slot_info[2 * (head % slots) + 1] = length;
+        if (futex) {
+            head_seq.advance(++head);
+        } else {
+            __atomic_store_n(head_ptr, ++head, __ATOMIC_RELEASE);
+            sem_post(sem_full);
         }
     }
 
+    // Сообщение нулевой длины — конец потока
+    if (futex) tail_seq.wait_above(static_cast<int64_t>(head) - static_cast<int64_t>(slots));
+    else sem_wait(sem_empty);
+    slot_info[2 * (head % slots)] = 0;
+    slot_info[2 * (head % slots) + 1] = 0;
+    if (futex) {
+        head_seq.advance(++head);
+    } else {
+        __atomic_store_n(head_ptr, ++head, __ATOMIC_RELEASE);
+        sem_post(sem_full);
+    }
+
     auto wall_end = std::chrono::high_resolution_clock::now();
     double wall_time = std::chrono::duration<double>(wall_end - wall_start).count();
 
-    std::ofstream log("shm_sender_metrics.csv");
+    double max_rss = MetricsChannel::peak_rss_mb();  // пик RSS за весь прогон, без замеров в цикле
+    std::ofstream log(metrics_path("shm_sender_metrics.csv"));
     log << "active_time_sec,wall_time_sec,bytes_sent,rss_mb\n";
     log << active_time << "," << wall_time << "," << sent << "," << max_rss << "\n";
+    channel.finish(sent, active_time, wall_time, max_rss);
+    if (pattern) pattern->write_csv(metrics_path("shm_sender"));
 
     delete[] data;
-    munmap(ptr, CHUNK_SIZE);
+    munmap(base, shm_size);
     close(shm_fd);
-    shm_unlink(SHM_NAME);
+    if (pages.hugetlb()) unlink(hugetlb_path(SHM_NAME, pages).c_str());
+    else shm_unlink(SHM_NAME.c_str());
     sem_close(sem_empty);
     sem_close(sem_full);
-    sem_unlink(SEM_EMPTY_NAME);
-    sem_unlink(SEM_FULL_NAME);
+    sem_unlink(SEM_EMPTY_NAME.c_str());
+    sem_unlink(SEM_FULL_NAME.c_str());
 
     return 0;
 }
@@ -0,0 +1,37 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import BenchRun, NAME_SUFFIX, TOTAL_SIZE
+from ipc.shm import AsyncShmChannel
+
+ZERO_COPY = os.environ.get("SHM_ZERO_COPY") == "1"  # отдавать потребителю memoryview на слот вместо копии
+
+def consume(chunk, verify=None):
+    # в режиме проверки (IPC_VERIFY) потребитель сверяет CRC32 сообщения, пока слот ещё не возвращён
+    if verify is None or len(chunk) == 0:
+        return len(chunk)
+    return verify.check(chunk)
+
+async def main():
+    run = BenchRun("receiver", "shm_reciever")
+    async with await AsyncShmChannel.open(NAME_SUFFIX) as channel:
+        buf = bytearray(channel.slot_size)
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            if ZERO_COPY:
+                view = await channel.recv_view()
+                nbytes = consume(view, run.verify)
+                view.release()
+                channel.release()
+            else:
+                nbytes = consume(memoryview(buf)[:await channel.recv_into(buf)], run.verify)
+            if nbytes == 0:# пустое сообщение — отправитель закончил передачу
+                break
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
+
+if __name__ == "__main__":
+    asyncio.run(main())
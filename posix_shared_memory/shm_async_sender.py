@@ -0,0 +1,36 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, TOTAL_SIZE
+from ipc.shm import AsyncShmChannel
+
+SHM_SLOTS = int(os.environ.get("SHM_SLOTS", "1"))
+ZERO_COPY = os.environ.get("SHM_ZERO_COPY") == "1"  # заполнять слот на месте вместо записи готового bytes
+
+async def main():
+    run = BenchRun("sender", "shm_sender")
+    try:
+        channel = await AsyncShmChannel.create(CHUNK_SIZE, SHM_SLOTS, NAME_SUFFIX)# ждём получателя для передачи eventfd
+    except ValueError as e:
+        sys.exit(str(e))
+    data = bytearray(b"A" * CHUNK_SIZE)
+    run.start()
+    async with channel:
+        while run.bytes < TOTAL_SIZE:
+            if ZERO_COPY:
+                slot = await channel.reserve()
+                if run.verify:
+                    run.verify.fill(slot)
+                else:
+                    slot[:] = data
+                channel.publish(CHUNK_SIZE)
+            else:
+                await channel.send(run.verify.fill(data) if run.verify else data)
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,24 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import CHUNK_SIZE, NAME_SUFFIX
+from ipc.pingpong import ping, pong, role_from_argv, spin_from_env
+from ipc.shm import ShmChannel
+
+# Запрос-ответ через два однослотовых кольца: /my_shm<суффикс>_req (клиент -> сервер) и _rep (обратно).
+# Оба сегмента создаёт клиент, поэтому он стартует первым. SHM_WAIT=spin — сначала опрос счётчиков, потом сон
+def main():
+    role = role_from_argv(sys.argv)
+    spin = spin_from_env()
+    if role == "ping":
+        with ShmChannel.create(CHUNK_SIZE, 1, NAME_SUFFIX + "_req", spin=spin) as request, \
+                ShmChannel.create(CHUNK_SIZE, 1, NAME_SUFFIX + "_rep", spin=spin) as reply:
+            ping("shm_ping", request, reply)
+    else:
+        with ShmChannel.open(NAME_SUFFIX + "_req", spin=spin) as request, \
+                ShmChannel.open(NAME_SUFFIX + "_rep", spin=spin) as reply:
+            pong("shm_pong", request, reply)
+
+if __name__ == "__main__":
+    main()
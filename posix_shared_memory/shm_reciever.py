@@ -1,53 +1,54 @@
-import mmap
 import os
-import posix_ipc
-import time
-import csv
-
-TOTAL_SIZE = 10 * 1024 * 1024 * 1024  # 4 GB
-CHUNK_SIZE = 16 * 1024 * 1024
-SHM_NAME = "/my_shm"
-SEM_EMPTY = "/sem_empty"
-SEM_FULL = "/sem_full"
-
-def get_rss_mb():
-    with open("/proc/self/statm") as f:
-        parts = f.readline().split()
-        rss_pages = int(parts[1])
-    return rss_pages * os.sysconf("SC_PAGE_SIZE") / (1024 ** 2)
-
-shm = posix_ipc.SharedMemory(SHM_NAME)#подключения к уже существующей разделяемой памяти
-mapfile = mmap.mmap(shm.fd, CHUNK_SIZE)# маппинг файла , то есть подключение к виртуальному адресному пространству
-os.close(shm.fd)#закрытие файлового дескриптора
-
-sem_empty = posix_ipc.Semaphore(SEM_EMPTY)#открываем оба семафора
-sem_full = posix_ipc.Semaphore(SEM_FULL)#открываем оба семафора
-
-start = time.time()
-active_start = time.time()
-max_rss = 0.0
-received = 0
-
-for i in range(0, TOTAL_SIZE, CHUNK_SIZE):
-    sem_full.acquire()# ожидаем семафор full со значением 1 и уменьшаем его до 0
-    mapfile.seek(0)# перемещаемся в начало файла
-    data = mapfile.read(CHUNK_SIZE)#читаем информацию из файла
-    sem_empty.release()#увеличиваем семафор empty до 1
-    received += CHUNK_SIZE#сохраняем информацию
-
-    if i % (CHUNK_SIZE * 100) == 0:#проверка необходимая для замера нагрузки на оперативную память
-        rss = get_rss_mb()
-        if rss > max_rss:
-            max_rss = rss
-
-active_end = time.time()
-wall_end = time.time()
-
-with open("shm_reciever_metrics.csv", "w", newline="") as f:
-    w = csv.writer(f)
-    w.writerow(["active_time_sec", "wall_time_sec", "bytes_received", "rss_mb"])
-    w.writerow([f"{active_end - active_start:.6f}", f"{wall_end - start:.6f}", received, f"{max_rss:.2f}"])
-
-mapfile.close()
-sem_empty.close()
-sem_full.close()
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_receiver
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, TOTAL_SIZE
+from ipc.pages import settings_from_env
+from ipc.payload import PAYLOAD, PayloadSink, scatter
+from ipc.shm import ShmChannel
+
+ZERO_COPY = os.environ.get("SHM_ZERO_COPY") == "1"  # отдавать потребителю memoryview на слот вместо копии
+
+def consume(chunk, verify=None):
+    # Потребитель чанка; в режиме zero-copy chunk — это memoryview прямо на слот разделяемой памяти
+    # в режиме проверки (IPC_VERIFY) потребитель сверяет CRC32 сообщения, пока слот ещё не возвращён
+    if verify is None or len(chunk) == 0:
+        return len(chunk)
+    return verify.check(chunk)
+
+def main():
+    run = BenchRun("receiver", "shm_reciever")
+    with ShmChannel.open(NAME_SUFFIX, settings_from_env()) as shm:#подключение к сегменту, созданному отправителем
+        buf = bytearray(shm.slot_size)# размер слота задаёт отправитель
+        # IPC_BATCH_SIZE: в слоте пакет сообщений, recv_view отдаёт их по одному срезами пакета (в режиме
+        # zero-copy — прямо из слота, слот возвращается после последнего сообщения пакета)
+        channel = batch_receiver(shm, shm.slot_size, views=ZERO_COPY)
+        sink = PayloadSink(run.verify) if PAYLOAD != "bytes" else None
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            if sink:
+                # IPC_PAYLOAD: объект собирается прямо из слота (массивы pickle oob — без копирования)
+                # и отпускается до возврата слота отправителю
+                view = channel.recv_view()
+                nbytes = len(view)
+                if nbytes:
+                    sink.consume(scatter(view))
+                    nbytes = CHUNK_SIZE
+                view.release()
+                channel.release()
+            elif ZERO_COPY or BATCH_SIZE:
+                view = channel.recv_view()
+                nbytes = consume(view, run.verify)# потребитель работает прямо со слотом или пакетом, без копирования
+                view.release()
+                channel.release()# слот возвращается отправителю только после возврата из consume
+            else:
+                nbytes = consume(memoryview(buf)[:channel.recv_into(buf)], run.verify)
+            if nbytes == 0:# пустое сообщение — отправитель закончил передачу
+                break
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
+
+if __name__ == "__main__":
+    main()
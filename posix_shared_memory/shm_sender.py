@@ -1,58 +1,59 @@
-import mmap
+import ctypes
 import os
-import posix_ipc
-import time
-import csv
-
-TOTAL_SIZE = 10 * 1024 * 1024 * 1024  # 4 GB
-CHUNK_SIZE = 16 * 1024 * 1024
-SHM_NAME = "/my_shm"
-SEM_EMPTY = "/sem_empty"
-SEM_FULL = "/sem_full"
-
-def get_rss_mb():
-    with open("/proc/self/statm") as f:
-        parts = f.readline().split()
-        rss_pages = int(parts[1])
-    return rss_pages * os.sysconf("SC_PAGE_SIZE") / (1024 ** 2)
-
-shm = posix_ipc.SharedMemory(SHM_NAME, posix_ipc.O_CREX, size=CHUNK_SIZE)#создание ячейки разделяемой памяти
-mapfile = mmap.mmap(shm.fd, CHUNK_SIZE)#маппим разделяемую память, то есть помещаем в виртуальное адресное пространство процесса
-os.close(shm.fd)# закрываем дескриптор так как можем рабоать через мапнутую часть
-
-sem_empty = posix_ipc.Semaphore(SEM_EMPTY, posix_ipc.O_CREX, initial_value=1)#инициализируем семафор empty со значением 1
-sem_full = posix_ipc.Semaphore(SEM_FULL, posix_ipc.O_CREX, initial_value=0)#инициализируем семафор full со значением 0
-
-data = b"A" * CHUNK_SIZE
-
-start = time.time()
-active_start = time.time()
-max_rss = 0.0
-sent = 0
-
-for i in range(0, TOTAL_SIZE, CHUNK_SIZE):
-    sem_empty.acquire()# ожидаем семафор empty со значением 1 и обнуляем его
-    mapfile.seek(0)# ставим курсор на начало файла
-    mapfile.write(data)# пишем наш чанк информации в начало разделяемой памяти
-    sem_full.release()#увеличиваем значение семафора full до 1 давая знак приёмнику что он может работать
-    sent += CHUNK_SIZE
-
-    if i % (CHUNK_SIZE * 100) == 0:
-        rss = get_rss_mb()
-        if rss > max_rss:
-            max_rss = rss
-
-active_end = time.time()
-wall_end = time.time()
-
-with open("shm_sender_metrics.csv", "w", newline="") as f:
-    w = csv.writer(f)
-    w.writerow(["active_time_sec", "wall_time_sec", "bytes_sent", "rss_mb"])
-    w.writerow([f"{active_end - active_start:.6f}", f"{wall_end - start:.6f}", sent, f"{max_rss:.2f}"])
-
-mapfile.close()
-sem_empty.close()
-sem_full.close()
-posix_ipc.unlink_shared_memory(SHM_NAME)
-posix_ipc.unlink_semaphore(SEM_EMPTY)
-posix_ipc.unlink_semaphore(SEM_FULL)
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_sender, transport_size
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, TOTAL_SIZE
+from ipc.pages import settings_from_env
+from ipc.payload import PAYLOAD, PayloadSource, check_payload, gather, message_capacity, write_into
+from ipc.seqsync import sync_from_env
+from ipc.shm import ShmChannel
+
+SHM_SLOTS = int(os.environ.get("SHM_SLOTS", "1"))  # 1 слот = прежний режим "пинг-понг"
+ZERO_COPY = os.environ.get("SHM_ZERO_COPY") == "1"  # заполнять слот на месте вместо записи готового bytes
+
+def produce(slot):
+    # Производитель пишет данные прямо в слот разделяемой памяти, без промежуточного объекта bytes
+    ctypes.memset(ctypes.addressof(ctypes.c_char.from_buffer(slot)), ord("A"), len(slot))
+
+def main():
+    if ZERO_COPY and BATCH_SIZE:
+        sys.exit("SHM_ZERO_COPY заполняет слот одним сообщением и не совместим с пакетированием (IPC_BATCH_SIZE)")
+    if PAYLOAD != "bytes" and (ZERO_COPY or BATCH_SIZE):
+        sys.exit("Структурированная нагрузка (IPC_PAYLOAD) пишется в слот сама и не совместима с SHM_ZERO_COPY "
+                 "и пакетированием")
+    check_payload()
+    run = BenchRun("sender", "shm_sender")
+    try:
+        # создание сегмента и семафоров; страницы сегмента — SHM_HUGEPAGES / SHM_PREFAULT,
+        # синхронизация — SHM_SYNC (sem или futex), получатель берёт её из заголовка.
+        # При IPC_BATCH_SIZE слот вмещает пакет сообщений (ipc/batch.py), при IPC_PAYLOAD — сериализованный объект
+        slot_size = message_capacity(CHUNK_SIZE) if PAYLOAD != "bytes" else transport_size(CHUNK_SIZE)
+        channel = ShmChannel.create(slot_size, SHM_SLOTS, NAME_SUFFIX, settings_from_env(),
+                                    sync=sync_from_env())
+    except ValueError as e:
+        sys.exit(str(e))
+    data = None if ZERO_COPY else bytearray(b"A" * CHUNK_SIZE)
+    source = PayloadSource(CHUNK_SIZE, verify=run.verify) if PAYLOAD != "bytes" else None
+    run.start()
+    with batch_sender(channel, CHUNK_SIZE) as channel:
+        while run.bytes < TOTAL_SIZE:
+            if source:
+                # части объекта (поток pickle и, в режиме oob, данные массивов) копируются прямо в слот
+                channel.publish(write_into(channel.reserve(), gather(source.next_parts())))
+            elif ZERO_COPY:
+                slot = channel.reserve()
+                if run.verify:
+                    run.verify.fill(slot)# узор режима проверки пишется прямо в слот
+                else:
+                    produce(slot)# заполняем свободный слот на месте
+                channel.publish(CHUNK_SIZE)
+            else:
+                channel.send(run.verify.fill(data) if run.verify else data)
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+if __name__ == "__main__":
+    main()
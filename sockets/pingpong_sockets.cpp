@@ -0,0 +1,254 @@
+#include <iostream>
+#include <fstream>
+#include <chrono>
+#include <vector>
+#include <string>
+#include <cstdint>
+#include <endian.h>
+#include <unistd.h>
+#include <arpa/inet.h>
+#include <netinet/in.h>
+#include <netinet/tcp.h>
+#include <sys/socket.h>
+#include <sys/uio.h>
+#include <sys/un.h>
+
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/verify.hpp"
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <optional>
+
+// Запрос-ответ через одно соединение (совпадает с sockets_pingpong.py): клиент (ping) подключается и шлёт кадры
+// sender_sockets.cpp, сервер (pong) слушает и возвращает каждый кадр как есть. Пустой кадр клиента — конец
+// Максимальный размер пакета SOCK_SEQPACKET, должен совпадать с sender_sockets.cpp
+const size_t SEQPACKET_SEGMENT = 64 * 1024;
+
+// Заголовок кадра: длина и метка отправки (monotonic, нс), оба поля big-endian; данные — тем же sendmsg
+bool send_frame(int fd, const char* data, size_t size, bool seqpacket) {
+    uint64_t header[2] = {htobe64(size), htobe64(size ? LatencyHistogram::now_ns() : 0)};
+    if (seqpacket) {
+        // Границы пакетов сохраняются: заголовок отдельным пакетом, данные — пакетами по SEQPACKET_SEGMENT
+        if (send(fd, header, sizeof(header), 0) < 0) {
+            perror("send");
+            return false;
+        }
+        for (size_t offset = 0; offset < size; offset += SEQPACKET_SEGMENT) {
+            if (send(fd, data + offset, std::min(SEQPACKET_SEGMENT, size - offset), 0) < 0) {
+                perror("send");
+                return false;
+            }
+        }
+        return true;
+    }
+    iovec iov[2] = {{header, sizeof(header)}, {const_cast<char*>(data), size}};
+    iovec* cur = iov;
+    int count = size ? 2 : 1;
+    while (count > 0) {
+        msghdr msg{};
+        msg.msg_iov = cur;
+        msg.msg_iovlen = count;
+        ssize_t sent = sendmsg(fd, &msg, 0);
+        if (sent < 0) {
+            perror("sendmsg");
+            return false;
+        }
+        while (count > 0 && static_cast<size_t>(sent) >= cur->iov_len) {
+            sent -= cur->iov_len;
+            ++cur;
+            --count;
+        }
+        if (count > 0) {
+            cur->iov_base = static_cast<char*>(cur->iov_base) + sent;
+            cur->iov_len -= sent;
+        }
+    }
+    return true;
+}
+
+// Читаем ровно size байт; для SOCK_SEQPACKET не больше одного пакета за раз
+bool recv_exact(int fd, char* dst, size_t size, size_t max_recv) {
+    size_t got = 0;
+    while (got < size) {
+        ssize_t n = recv(fd, dst + got, std::min(size - got, max_recv), 0);
+        if (n < 0) {
+            perror("recv");
+            return false;
+        }
+        if (n == 0) {
+            return false;  // соединение закрыто посреди кадра
+        }
+        got += n;
+    }
+    return true;
+}
+
+// Длина принятого кадра, 0 — пустой кадр (конец потока), -1 — ошибка
+int64_t recv_frame(int fd, std::vector<char>& buffer, size_t max_recv) {
+    uint64_t header[2] = {0, 0};
+    if (!recv_exact(fd, reinterpret_cast<char*>(header), sizeof(header), max_recv)) {
+        return -1;
+    }
+    const size_t length = be64toh(header[0]);
+    if (length > buffer.size()) {
+        std::cerr << "frame of " << length << " bytes exceeds buffer\n";
+        return -1;
+    }
+    if (length && !recv_exact(fd, buffer.data(), length, max_recv)) {
+        return -1;
+    }
+    return static_cast<int64_t>(length);
+}
+
+int main(int argc, char** argv) {
+    const std::string role = argc == 2 ? argv[1] : "";
+    if (role != "ping" && role != "pong") {
+        std::cerr << "usage: " << argv[0] << " ping|pong\n";
+        return 1;
+    }
+    const bool ping = role == "ping";
+    const size_t chunk_size = chunk_size_from_env();
+    const size_t total_size = total_size_from_env();
+    std::vector<char> buffer(chunk_size, 42);
+    std::vector<char> answer(chunk_size);
+
+    // tcp, unix (AF_UNIX stream) или seqpacket (AF_UNIX SOCK_SEQPACKET)
+    const char* family_env = std::getenv("SOCKET_FAMILY");
+    const std::string family = family_env ? family_env : "tcp";
+    const char* path_env = std::getenv("SOCKET_PATH");
+    const std::string socket_path = std::string(path_env ? path_env : "/tmp/ipc_sockets.sock") + name_suffix();
+    const bool seqpacket = family == "seqpacket";
+    const size_t max_recv = seqpacket ? SEQPACKET_SEGMENT : chunk_size;
+
+    sockaddr_storage addr{};
+    socklen_t addr_len = 0;
+    int sock = -1;
+    if (family == "unix" || seqpacket) {
+        sock = socket(AF_UNIX, seqpacket ? SOCK_SEQPACKET : SOCK_STREAM, 0);
+        auto* un = reinterpret_cast<sockaddr_un*>(&addr);
+        un->sun_family = AF_UNIX;
+        std::strncpy(un->sun_path, socket_path.c_str(), sizeof(un->sun_path) - 1);
+        addr_len = sizeof(sockaddr_un);
+    } else if (family == "tcp") {
+        sock = socket(AF_INET, SOCK_STREAM, 0);
+        auto* in = reinterpret_cast<sockaddr_in*>(&addr);
+        in->sin_family = AF_INET;
+        in->sin_port = htons(5000 + port_offset());
+        inet_pton(AF_INET, "127.0.0.1", &in->sin_addr);
+        addr_len = sizeof(sockaddr_in);
+    } else {
+        std::cerr << "unknown SOCKET_FAMILY " << family << "\n";
+        return 1;
+    }
+    if (sock < 0) {
+        perror("socket");
+        return 1;
+    }
+
+    auto wall_start = std::chrono::high_resolution_clock::now();
+    int server_fd = -1;
+    if (ping) {
+        if (connect(sock, (sockaddr*)&addr, addr_len) < 0) {
+            perror("connect");
+            return 1;
+        }
+    } else {
+        // Сервер стартует первым: слушаем, как reciever_sockets.cpp, и принимаем одно соединение
+        server_fd = sock;
+        int opt = 1;
+        if (family == "tcp") {
+            setsockopt(server_fd, SOL_SOCKET, SO_REUSEADDR, &opt, sizeof(opt));
+            reinterpret_cast<sockaddr_in*>(&addr)->sin_addr.s_addr = INADDR_ANY;
+        } else {
+            unlink(socket_path.c_str());
+        }
+        if (bind(server_fd, (sockaddr*)&addr, addr_len) < 0 || listen(server_fd, 1) < 0) {
+            perror("bind/listen");
+            close(server_fd);
+            return 1;
+        }
+        signal_ready();  // клиент может подключаться
+        sock = accept(server_fd, nullptr, nullptr);
+        if (sock < 0) {
+            perror("accept");
+            close(server_fd);
+            return 1;
+        }
+    }
+    if (family == "tcp") {
+        int nodelay = 1;  // маленькие кадры без задержки Nagle
+        setsockopt(sock, IPPROTO_TCP, TCP_NODELAY, &nodelay, sizeof(nodelay));
+    }
+
+    LatencyHistogram latency;
+    std::optional<PatternSource> pattern;  // режим проверки (IPC_VERIFY): узор у клиента, CRC32 у сервера
+    std::optional<PatternCheck> verify;
+    if (verify_enabled()) {
+        if (ping) pattern.emplace(chunk_size);
+        else verify.emplace(chunk_size);
+    }
+
+    // Первый круг — рукопожатие, не учитывается
+    bool ok = true;
+    if (ping) {
+        ok = send_frame(sock, buffer.data(), chunk_size, seqpacket) && recv_frame(sock, answer, max_recv) > 0;
+    } else {
+        const int64_t length = recv_frame(sock, buffer, max_recv);
+        ok = length > 0 && send_frame(sock, buffer.data(), length, seqpacket);
+    }
+    auto active_start = std::chrono::high_resolution_clock::now();
+
+    size_t transferred = 0;
+    MetricsChannel channel(ping ? "sender" : "receiver");  // живые замеры для оркестратора
+    if (ping) {
+        while (ok && transferred < total_size) {
+            if (pattern) pattern->fill(buffer.data(), chunk_size);
+            const uint64_t start_ns = LatencyHistogram::now_ns();
+            if (!send_frame(sock, buffer.data(), chunk_size, seqpacket)
+                    || recv_frame(sock, answer, max_recv) != static_cast<int64_t>(chunk_size)) {
+                std::cerr << "round trip failed\n";
+                break;
+            }
+            latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - start_ns));  // полный круг — RTT
+            transferred += chunk_size;
+            channel.tick(transferred);
+        }
+        send_frame(sock, nullptr, 0, seqpacket);  // пустой кадр — конец потока
+    } else {
+        while (ok) {
+            const int64_t length = recv_frame(sock, buffer, max_recv);
+            if (length <= 0) break;  // клиент закончил
+            if (verify) verify->check(buffer.data(), length);
+            if (!send_frame(sock, buffer.data(), length, seqpacket)) break;
+            transferred += length;
+            channel.tick(transferred);
+        }
+    }
+    auto active_end = std::chrono::high_resolution_clock::now();
+    close(sock);
+    if (server_fd >= 0) {
+        close(server_fd);
+        if (family != "tcp") {
+            unlink(socket_path.c_str());
+        }
+    }
+    auto wall_end = std::chrono::high_resolution_clock::now();
+
+    double active_time = std::chrono::duration<double>(active_end - active_start).count();
+    double wall_time = std::chrono::duration<double>(wall_end - wall_start).count();
+    double max_rss_mb = MetricsChannel::peak_rss_mb();
+    const std::string prefix = ping ? "socket_ping" : "socket_pong";
+    std::ofstream log(metrics_path(prefix + "_metrics.csv"));
+    log << "active_time_sec,wall_time_sec," << (ping ? "bytes_sent" : "bytes_received") << ",rss_mb\n";
+    log << active_time << "," << wall_time << "," << transferred << "," << max_rss_mb << "\n";
+    channel.finish(transferred, active_time, wall_time, max_rss_mb);
+    if (ping) latency.write_csv(metrics_path(prefix));
+    if (pattern) pattern->write_csv(metrics_path(prefix));
+    if (verify) verify->write_csv(metrics_path(prefix));
+
+    return ok ? 0 : 1;
+}
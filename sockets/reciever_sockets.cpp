@@ -2,59 +2,110 @@
 #include <fstream>
 #include <chrono>
 #include <vector>
-#include <limits>
 #include <cstring>
+#include <cstdint>
+#include <endian.h>
 #include <unistd.h>
 #include <sys/socket.h>
 #include <arpa/inet.h>
 #include <sys/types.h>
 
-// Функция чтения текущего RSS (Resident Set Size) в мегабайтах
-double get_rss_in_mb() {
-    std::ifstream statm("/proc/self/statm");
-    size_t resident_pages = 0;
-    // Пропускаем первое поле (размер), читаем второе — resident
-    statm.ignore(std::numeric_limits<std::streamsize>::max(), ' ');
-    statm >> resident_pages;
-    // Переводим страницы в байты, затем в МБ
-    return static_cast<double>(resident_pages * sysconf(_SC_PAGESIZE)) 
-           / (1024.0 * 1024.0);
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/verify.hpp"
+#include <sys/un.h>
+#include <algorithm>
+#include <cstdlib>
+#include <optional>
+#include <string>
+
+// Максимальный размер пакета SOCK_SEQPACKET, должен совпадать с отправителем
+const size_t SEQPACKET_SEGMENT = 64 * 1024;
+
+// Читаем ровно size байт: кадр может прийти несколькими порциями.
+// Для SOCK_SEQPACKET запрашиваем не больше одного пакета, иначе ядро обрежет его хвост
+bool recv_exact(int fd, char* dst, size_t size, size_t max_recv) {
+    size_t got = 0;
+    while (got < size) {
+        ssize_t n = recv(fd, dst + got, std::min(size - got, max_recv), 0);
+        if (n < 0) {
+            perror("recv");
+            return false;
+        }
+        if (n == 0) {
+            return false;  // соединение закрыто посреди кадра
+        }
+        got += n;
+    }
+    return true;
 }
 
 int main() {
-    const size_t CHUNK_SIZE = 16 * 1024 * 1024;               // размер буфера (16 МБ)
-    std::vector<char> buffer(CHUNK_SIZE);                     // буфер приёма
-    double max_rss_mb = 0;                                    // макс. потребление памяти
-
-    // 1) Создаём TCP-сокет
-    int server_fd = socket(AF_INET, SOCK_STREAM, 0);
-    if (server_fd < 0) {
-        perror("socket");
-        return 1;
-    }
+    const size_t CHUNK_SIZE = chunk_size_from_env();          // размер буфера (16 МБ по умолчанию)
+    std::vector<char> buffer(transport_size(CHUNK_SIZE));     // буфер приёма: сообщение или пакет (IPC_BATCH_SIZE)
+    const bool batching = batch_size_from_env() > 0;
+
+    // tcp, unix (AF_UNIX stream) или seqpacket (AF_UNIX SOCK_SEQPACKET)
+    const char* family_env = std::getenv("SOCKET_FAMILY");
+    const std::string family = family_env ? family_env : "tcp";
+    const char* path_env = std::getenv("SOCKET_PATH");
+    const std::string socket_path = std::string(path_env ? path_env : "/tmp/ipc_sockets.sock") + name_suffix();
+    const size_t max_recv = family == "seqpacket" ? SEQPACKET_SEGMENT : buffer.size();
+
+    int server_fd = -1;
+    if (family == "unix" || family == "seqpacket") {
+        // 1-3) Unix-сокету не нужен TIME_WAIT: удаляем файл сокета от прошлого запуска и привязываемся к нему
+        server_fd = socket(AF_UNIX, family == "unix" ? SOCK_STREAM : SOCK_SEQPACKET, 0);
+        if (server_fd < 0) {
+            perror("socket");
+            return 1;
+        }
+        sockaddr_un addr{};
+        addr.sun_family = AF_UNIX;
+        std::strncpy(addr.sun_path, socket_path.c_str(), sizeof(addr.sun_path) - 1);
+        unlink(socket_path.c_str());
+        if (bind(server_fd, (sockaddr*)&addr, sizeof(addr)) < 0) {
+            perror("bind");
+            close(server_fd);
+            return 1;
+        }
+    } else if (family == "tcp") {
+        // 1) Создаём TCP-сокет
+        server_fd = socket(AF_INET, SOCK_STREAM, 0);
+        if (server_fd < 0) {
+            perror("socket");
+            return 1;
+        }
 
-    // 2) Включаем опцию SO_REUSEADDR, чтобы перепривязываться к порту сразу после закрытия
-    int opt = 1;
-    if (setsockopt(server_fd, SOL_SOCKET, SO_REUSEADDR, &opt, sizeof(opt)) < 0) {
-        perror("setsockopt(SO_REUSEADDR)");
-        close(server_fd);
-        return 1;
-    }
-    // (Опционально на Linux можно также включить SO_REUSEPORT)
-    if (setsockopt(server_fd, SOL_SOCKET, SO_REUSEPORT, &opt, sizeof(opt)) < 0) {
-        perror("setsockopt(SO_REUSEPORT)");
-        // не критично, продолжаем работу
-    }
+        // 2) Включаем опцию SO_REUSEADDR, чтобы перепривязываться к порту сразу после закрытия
+        int opt = 1;
+        if (setsockopt(server_fd, SOL_SOCKET, SO_REUSEADDR, &opt, sizeof(opt)) < 0) {
+            perror("setsockopt(SO_REUSEADDR)");
+            close(server_fd);
+            return 1;
+        }
+        // (Опционально на Linux можно также включить SO_REUSEPORT)
+        if (setsockopt(server_fd, SOL_SOCKET, SO_REUSEPORT, &opt, sizeof(opt)) < 0) {
+            perror("setsockopt(SO_REUSEPORT)");
+            // не критично, продолжаем работу
+        }
 
-    // 3) Задаём адрес и порт для bind()
-    sockaddr_in addr{};
-    addr.sin_family = AF_INET;                // IPv4
-    addr.sin_port = htons(5000);              // порт 5000, сетевой порядок байт
-    addr.sin_addr.s_addr = INADDR_ANY;        // слушать все интерфейсы
+        // 3) Задаём адрес и порт для bind()
+        sockaddr_in addr{};
+        addr.sin_family = AF_INET;                // IPv4
+        addr.sin_port = htons(5000 + port_offset()); // порт 5000 + IPC_PORT_OFFSET, сетевой порядок байт
+        addr.sin_addr.s_addr = INADDR_ANY;        // слушать все интерфейсы
 
-    if (bind(server_fd, (sockaddr*)&addr, sizeof(addr)) < 0) {
-        perror("bind");
-        close(server_fd);
+        if (bind(server_fd, (sockaddr*)&addr, sizeof(addr)) < 0) {
+            perror("bind");
+            close(server_fd);
+            return 1;
+        }
+    } else {
+        std::cerr << "unknown SOCKET_FAMILY " << family << "\n";
         return 1;
     }
 
@@ -64,6 +115,7 @@ int main() {
         close(server_fd);
         return 1;
     }
+    signal_ready();  // отправитель может подключаться
 
     // 5) Засекаем wall-clock время до accept()
     auto wall_start = std::chrono::high_resolution_clock::now();
@@ -79,31 +131,47 @@ int main() {
     // 7) Засекаем active время после установления соединения
     auto active_start = std::chrono::high_resolution_clock::now();
 
-    // 8) Цикл приёма данных
+    // 8) Цикл приёма кадров: длина и метка отправки (по 8 байт big-endian), затем полезная нагрузка;
+    //    длина 0 — конец потока
     size_t total_received = 0;
-    int iter = 0;
+    LatencyHistogram latency;
+    MetricsChannel channel("receiver");  // живые замеры для оркестратора
+    std::optional<PatternCheck> verify;  // режим проверки (IPC_VERIFY): CRC32 каждого принятого сообщения
+    if (verify_enabled()) verify.emplace(buffer.size());
     while (true) {
-        ssize_t bytes = recv(client_fd, buffer.data(), buffer.size(), 0);
-        if (bytes < 0) {
-            perror("recv");
+        uint64_t header[2] = {0, 0};
+        if (!recv_exact(client_fd, reinterpret_cast<char*>(header), sizeof(header), max_recv)) {
             break;
         }
-        if (bytes == 4 && std::memcmp(buffer.data(), "DONE", 4) == 0) {
+        size_t length = be64toh(header[0]);
+        if (length == 0) {
             break;
         }
-        if (bytes == 0) {
+        if (length > buffer.size()) {
+            std::cerr << "frame of " << length << " bytes exceeds buffer\n";
             break;
         }
-        total_received += bytes;
-
-        // Обновляем пиковое потребление памяти раз в 100 итераций
-        if (iter % 100 == 0) {
-            double rss = get_rss_in_mb();
-            if (rss > max_rss_mb) {
-                max_rss_mb = rss;
+        if (!recv_exact(client_fd, buffer.data(), length, max_recv)) {
+            break;
+        }
+        if (batching) {
+            // Пакет разбирается на месте: у каждого сообщения своя метка отправки
+            const bool ok = for_each_message(buffer.data(), length, [&](const char* message, size_t size, uint64_t send_ns) {
+                if (verify) verify->check(message, size);
+                latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - send_ns));
+                total_received += size;
+            });
+            if (!ok) {
+                std::cerr << "malformed batch of " << length << " bytes\n";
+                break;
             }
+            channel.tick(total_received);
+            continue;
         }
-        iter++;
+        if (verify) verify->check(buffer.data(), length);
+        total_received += length;
+        channel.tick(total_received);
+        latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - be64toh(header[1])));
     }
 
     // 9) Засекаем время окончания передачи
@@ -113,6 +181,9 @@ int main() {
     shutdown(client_fd, SHUT_RDWR);
     close(client_fd);
     close(server_fd);
+    if (family != "tcp") {
+        unlink(socket_path.c_str());
+    }
 
     // 11) Засекаем окончательное wall-clock время
     auto wall_end = std::chrono::high_resolution_clock::now();
@@ -121,13 +192,18 @@ int main() {
     double active_time = std::chrono::duration<double>(active_end - active_start).count();
     double wall_time   = std::chrono::duration<double>(wall_end - wall_start).count();
 
+    double max_rss_mb = MetricsChannel::peak_rss_mb();  // пик RSS за весь прогон, без замеров в цикле
+
     // 13) Логируем метрики в CSV
-    std::ofstream log("socket_receiver_metrics.csv");
+    std::ofstream log(metrics_path("socket_receiver_metrics.csv"));
     log << "active_time_sec,wall_time_sec,bytes_received,rss_mb\n";
     log << active_time << "," 
         << wall_time   << "," 
         << total_received << "," 
         << max_rss_mb  << "\n";
+    channel.finish(total_received, active_time, wall_time, max_rss_mb);
+    latency.write_csv(metrics_path("socket_receiver"));
+    if (verify) verify->write_csv(metrics_path("socket_receiver"));
 
     return 0;
 }
@@ -4,47 +4,150 @@
 #include <vector>
 #include <fstream>
 #include <string>
+#include <cstdint>
+#include <endian.h>
 #include <unistd.h>
 #include <arpa/inet.h>
+#include <sys/socket.h>
+#include <sys/uio.h>
+#include <sys/un.h>
 
-double get_rss_in_mb() {
-    std::ifstream statm("/proc/self/statm");
-    size_t resident_pages = 0;
-    statm.ignore(std::numeric_limits<std::streamsize>::max(), ' ');
-    statm >> resident_pages;
-    return static_cast<double>(resident_pages * sysconf(_SC_PAGESIZE)) / (1024.0 * 1024.0);
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/verify.hpp"
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <optional>
+
+// Отправляем заголовок кадра и данные одним sendmsg (scatter-gather), досылая остаток при частичной записи
+bool send_frame(int fd, const char* data, size_t size) {
+    // Заголовок: длина и метка отправки (monotonic, нс), оба поля big-endian
+    uint64_t header[2] = {htobe64(size), htobe64(size ? LatencyHistogram::now_ns() : 0)};
+    iovec iov[2] = {{header, sizeof(header)}, {const_cast<char*>(data), size}};
+    iovec* cur = iov;
+    int count = size ? 2 : 1;
+    while (count > 0) {
+        msghdr msg{};
+        msg.msg_iov = cur;
+        msg.msg_iovlen = count;
+        ssize_t sent = sendmsg(fd, &msg, 0);
+        if (sent < 0) {
+            perror("sendmsg");
+            return false;
+        }
+        while (count > 0 && static_cast<size_t>(sent) >= cur->iov_len) {
+            sent -= cur->iov_len;
+            ++cur;
+            --count;
+        }
+        if (count > 0) {
+            cur->iov_base = static_cast<char*>(cur->iov_base) + sent;
+            cur->iov_len -= sent;
+        }
+    }
+    return true;
+}
+
+// Максимальный размер пакета SOCK_SEQPACKET, должен совпадать с приёмником
+const size_t SEQPACKET_SEGMENT = 64 * 1024;
+
+// SOCK_SEQPACKET сохраняет границы сообщений: заголовок идёт отдельным пакетом, данные — пакетами по SEQPACKET_SEGMENT
+bool send_packets(int fd, const char* data, size_t size) {
+    uint64_t header[2] = {htobe64(size), htobe64(size ? LatencyHistogram::now_ns() : 0)};
+    if (send(fd, header, sizeof(header), 0) < 0) {
+        perror("send");
+        return false;
+    }
+    for (size_t offset = 0; offset < size; offset += SEQPACKET_SEGMENT) {
+        if (send(fd, data + offset, std::min(SEQPACKET_SEGMENT, size - offset), 0) < 0) {
+            perror("send");
+            return false;
+        }
+    }
+    return true;
 }
 
 int main() {
-    const size_t chunk_size = 16 * 1024 * 1024;
-    const size_t total_size = 10ULL * 1024 * 1024 * 1024;
+    const size_t chunk_size = chunk_size_from_env();
+    const size_t total_size = total_size_from_env();
     std::vector<char> buffer(chunk_size, 42);
-    double max_rss_mb = 0.0;
+    std::optional<PatternSource> pattern;  // режим проверки (IPC_VERIFY): узор с номером сообщения вместо 42
+    if (verify_enabled()) pattern.emplace(chunk_size);
+
+    // tcp, unix (AF_UNIX stream) или seqpacket (AF_UNIX SOCK_SEQPACKET)
+    const char* family_env = std::getenv("SOCKET_FAMILY");
+    const std::string family = family_env ? family_env : "tcp";
+    const char* path_env = std::getenv("SOCKET_PATH");
+    const std::string socket_path = std::string(path_env ? path_env : "/tmp/ipc_sockets.sock") + name_suffix();
+    const bool seqpacket = family == "seqpacket";
 
-    int sock = socket(AF_INET, SOCK_STREAM, 0);
-    sockaddr_in addr{};
-    addr.sin_family = AF_INET;
-    addr.sin_port = htons(5000);
-    inet_pton(AF_INET, "127.0.0.1", &addr.sin_addr);
+    int sock = -1;
+    sockaddr_storage addr{};
+    socklen_t addr_len = 0;
+    if (family == "unix" || seqpacket) {
+        sock = socket(AF_UNIX, seqpacket ? SOCK_SEQPACKET : SOCK_STREAM, 0);
+        auto* un = reinterpret_cast<sockaddr_un*>(&addr);
+        un->sun_family = AF_UNIX;
+        std::strncpy(un->sun_path, socket_path.c_str(), sizeof(un->sun_path) - 1);
+        addr_len = sizeof(sockaddr_un);
+    } else if (family == "tcp") {
+        sock = socket(AF_INET, SOCK_STREAM, 0);
+        auto* in = reinterpret_cast<sockaddr_in*>(&addr);
+        in->sin_family = AF_INET;
+        in->sin_port = htons(5000 + port_offset());
+        inet_pton(AF_INET, "127.0.0.1", &in->sin_addr);
+        addr_len = sizeof(sockaddr_in);
+    } else {
+        std::cerr << "unknown SOCKET_FAMILY " << family << "\n";
+        return 1;
+    }
 
     auto wall_start = std::chrono::high_resolution_clock::now();
-    connect(sock, (sockaddr*)&addr, sizeof(addr));
+    connect(sock, (sockaddr*)&addr, addr_len);
     auto active_start = std::chrono::high_resolution_clock::now();
 
+    // Пакетирование (IPC_BATCH_SIZE): сообщения копируются в пакет, кадром уходит весь пакет
+    const bool batching = batch_size_from_env() > 0;
+    std::vector<char> batch_buffer(batching ? transport_size(chunk_size) : 0);
+    BatchWriter batch(batch_buffer.data(), batch_buffer.size());
+
     size_t sent_bytes = 0;
-    int iter = 0; 
+    MetricsChannel channel("sender");  // живые замеры для оркестратора
     while (sent_bytes < total_size) {
-        send(sock, buffer.data(), chunk_size, 0);
-        sent_bytes += chunk_size;
-        if (iter%100==0){
-            double rss = get_rss_in_mb();
-            if (rss > max_rss_mb) max_rss_mb = rss;  
+        const char* data = buffer.data();
+        size_t size = chunk_size;
+        if (batching) {
+            char* message = batch.append(chunk_size);
+            if (pattern) pattern->fill(message, chunk_size);
+            else std::memcpy(message, buffer.data(), chunk_size);
+            sent_bytes += chunk_size;
+            if (sent_bytes < total_size && !batch.due(chunk_size)) {
+                continue;
+            }
+            data = batch.data();
+            size = batch.size();
+            batch.reset();
+        } else {
+            if (pattern) pattern->fill(buffer.data(), chunk_size);
+            sent_bytes += chunk_size;
         }
-        iter++;
+        bool ok = seqpacket ? send_packets(sock, data, size)
+                            : send_frame(sock, data, size);
+        if (!ok) {
+            break;
+        }
+        channel.tick(sent_bytes);
         
     }
 
-    send(sock, "DONE", 4, 0);
+    if (seqpacket) {
+        send_packets(sock, nullptr, 0);  // пустой кадр — конец потока
+    } else {
+        send_frame(sock, nullptr, 0);
+    }
     auto active_end = std::chrono::high_resolution_clock::now();
     close(sock);
     auto wall_end = std::chrono::high_resolution_clock::now();
@@ -52,9 +155,12 @@ int main() {
     double active_time = std::chrono::duration<double>(active_end - active_start).count();
     double wall_time = std::chrono::duration<double>(wall_end - wall_start).count();
 
-    std::ofstream log("socket_sender_metrics.csv");
+    double max_rss_mb = MetricsChannel::peak_rss_mb();  // пик RSS за весь прогон, без замеров в цикле
+    std::ofstream log(metrics_path("socket_sender_metrics.csv"));
     log << "active_time_sec,wall_time_sec,bytes_sent,rss_mb\n";
     log << active_time << "," << wall_time << "," << sent_bytes << "," << max_rss_mb << "\n";
+    channel.finish(sent_bytes, active_time, wall_time, max_rss_mb);
+    if (pattern) pattern->write_csv(metrics_path("socket_sender"));
 
     return 0;
 }
@@ -0,0 +1,31 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, PORT_OFFSET
+from ipc.sockets import AsyncSocketChannel
+
+POOL_SIZE = 2
+SOCKET_FAMILY = os.environ.get("SOCKET_FAMILY", "tcp")  # tcp, unix (AF_UNIX stream) или seqpacket (AF_UNIX SOCK_SEQPACKET)
+SOCKET_PATH = os.environ.get("SOCKET_PATH", "/tmp/ipc_sockets.sock") + NAME_SUFFIX
+TCP_PORT = 5000 + PORT_OFFSET
+
+async def main():
+    pool = [bytearray(CHUNK_SIZE) for _ in range(POOL_SIZE)]
+    run = BenchRun("receiver", "socket_receiver")
+    async with await AsyncSocketChannel.accept(SOCKET_FAMILY, SOCKET_PATH, TCP_PORT) as channel:
+        run.start()
+        while True:
+            buf = pool[run.messages % POOL_SIZE]
+            nbytes = await channel.recv_into(buf)
+            if nbytes == 0:  # пустой кадр — отправитель закончил передачу
+                break
+            if run.verify:# режим проверки: CRC32 принятого сообщения
+                run.verify.check(memoryview(buf)[:nbytes])
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
+
+if __name__ == "__main__":
+    asyncio.run(main())
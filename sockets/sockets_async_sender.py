@@ -0,0 +1,25 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, PORT_OFFSET, TOTAL_SIZE
+from ipc.sockets import AsyncSocketChannel
+
+SOCKET_FAMILY = os.environ.get("SOCKET_FAMILY", "tcp")  # tcp, unix (AF_UNIX stream) или seqpacket (AF_UNIX SOCK_SEQPACKET)
+SOCKET_PATH = os.environ.get("SOCKET_PATH", "/tmp/ipc_sockets.sock") + NAME_SUFFIX
+TCP_PORT = 5000 + PORT_OFFSET
+
+async def main():
+    chunk = bytearray(b'\x42' * CHUNK_SIZE)
+    run = BenchRun("sender", "socket_sender")
+    async with await AsyncSocketChannel.connect(SOCKET_FAMILY, SOCKET_PATH, TCP_PORT) as channel:
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            await channel.send(run.verify.fill(chunk) if run.verify else chunk)
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+if __name__ == "__main__":
+    asyncio.run(main())
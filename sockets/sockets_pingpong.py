@@ -0,0 +1,31 @@
+import os
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import NAME_SUFFIX, PORT_OFFSET
+from ipc.pingpong import ping, pong, role_from_argv
+from ipc.sockets import SocketChannel
+
+SOCKET_FAMILY = os.environ.get("SOCKET_FAMILY", "tcp")  # tcp, unix (AF_UNIX stream) или seqpacket (AF_UNIX SOCK_SEQPACKET)
+SOCKET_PATH = os.environ.get("SOCKET_PATH", "/tmp/ipc_sockets.sock") + NAME_SUFFIX
+TCP_PORT = 5000 + PORT_OFFSET
+
+# Эхо через одно соединение: кадры те же, что у sockets_sender.py. Сервер слушает, поэтому стартует первым
+def main():
+    role = role_from_argv(sys.argv)
+    if role == "ping":
+        channel = SocketChannel.connect(SOCKET_FAMILY, SOCKET_PATH, TCP_PORT)
+    else:
+        channel = SocketChannel.accept(SOCKET_FAMILY, SOCKET_PATH, TCP_PORT)
+    if SOCKET_FAMILY == "tcp":
+        channel.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)# маленькие кадры без задержки Nagle
+    with channel:
+        if role == "ping":
+            ping("socket_ping", channel, channel)
+        else:
+            pong("socket_pong", channel, channel)
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,61 @@
-import socket
-import time
-import resource
 import os
-
-CHUNK_SIZE = 16 * 1024 * 1024
-TOTAL_SIZE = 10 * 1024**3
-
-def get_rss_mb():
-    usage = resource.getrusage(resource.RUSAGE_SELF)
-    return usage.ru_maxrss / 1024
-
-def send_data():
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)# создание объекта сокета
-
-    wall_start = time.perf_counter()#начало отсчёта времени
-    sock.connect(("localhost", 5000))# подключение по локальному хосту на 5000 порт
-    active_start = time.perf_counter()# начало отсчёта активного времени
-
-    total_sent = 0 # переменная для подсчёта отправленных данных
-    chunk = b'\x42' * CHUNK_SIZE # имитация чанка для отправки
-    iter = 0
-    max_rss = 0
-    while total_sent < TOTAL_SIZE:
-        sock.sendall(chunk) #отправка чанка в цикле
-        total_sent += CHUNK_SIZE #подсчёт размера отправленного файла
-        if iter % 100 == 0:
-            rss = get_rss_mb()
-            if rss > max_rss:
-                max_rss = rss# нагрузки на память на каждой сотой итерации цикла
-        iter += 1
-
-    sock.sendall(b"DONE")# команда чтобы приёмник понял что отправка данных окончена
-    sock.shutdown(socket.SHUT_WR)  # Закрытие стороны отправителя
-    active_end = time.perf_counter()
-    wall_end = time.perf_counter()
-
-    active_time = active_end - active_start
-    wall_time = wall_end - wall_start
-
-    with open("socket_sender_metrics.csv", "w") as f:
-        f.write("active_time_sec,wall_time_sec,bytes_sent,rss_mb\n")
-        f.write(f"{active_time:.6f},{wall_time:.6f},{total_sent},{max_rss:.2f}\n")
-
-    sock.close()
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_sender
+from ipc.bench import BenchRun, CHUNK_SIZE, NAME_SUFFIX, PORT_OFFSET, TOTAL_SIZE
+from ipc.payload import PAYLOAD, PayloadSource, check_payload, gather
+from ipc.sockets import SocketChannel
+
+SEND_MODE = os.environ.get("SOCKET_SEND_MODE", "sendmsg")  # sendmsg (scatter-gather) или sendfile
+SOCKET_FAMILY = os.environ.get("SOCKET_FAMILY", "tcp")  # tcp, unix (AF_UNIX stream) или seqpacket (AF_UNIX SOCK_SEQPACKET)
+SOCKET_PATH = os.environ.get("SOCKET_PATH", "/tmp/ipc_sockets.sock") + NAME_SUFFIX
+TCP_PORT = 5000 + PORT_OFFSET
+
+def main():
+    if SOCKET_FAMILY == "seqpacket" and SEND_MODE == "sendfile":
+        raise ValueError("sendfile не сохраняет границы пакетов SOCK_SEQPACKET")
+    if BATCH_SIZE and SEND_MODE == "sendfile":
+        raise ValueError("sendfile передаёт чанк из файла целиком и не совместим с пакетированием (IPC_BATCH_SIZE)")
+    if PAYLOAD != "bytes" and (BATCH_SIZE or SEND_MODE == "sendfile"):
+        raise ValueError("Структурированная нагрузка (IPC_PAYLOAD) передаётся только через sendmsg, без пакетирования")
+    check_payload()
+    chunk = bytearray(b'\x42' * CHUNK_SIZE) # имитация чанка для отправки
+
+    run = BenchRun("sender", "socket_sender")
+    # IPC_BATCH_SIZE: мелкие сообщения копятся в пакете и уходят одним кадром (ipc/batch.py)
+    with batch_sender(SocketChannel.connect(SOCKET_FAMILY, SOCKET_PATH, TCP_PORT), CHUNK_SIZE) as channel:
+        if SEND_MODE == "sendfile":
+            # чанки лежат в анонимном файле, откуда их читает sendfile. Ядро ссылается на страницы файла, пока
+            # получатель их не прочитал, поэтому чанки идут по кольцу слотов, как у PIPE_MODE=splice: слот
+            # переписывается, когда после него отправлено больше, чем вмещают буферы сокета
+            slots = channel.inflight_limit() // CHUNK_SIZE + 2
+            chunk_fd = os.memfd_create("socket_chunk")
+            for slot in range(slots):
+                os.pwrite(chunk_fd, chunk, slot * CHUNK_SIZE)
+        # IPC_PAYLOAD: объект сериализуется pickle 5, части сообщения уходят одним sendmsg без склейки (ipc/payload.py)
+        source = PayloadSource(CHUNK_SIZE, verify=run.verify) if PAYLOAD != "bytes" else None
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            if source:
+                channel.send_buffers(gather(source.next_parts()))
+                run.record(CHUNK_SIZE)# объект учитывается как чанк: сообщений в секунду — объектов в секунду
+                continue
+            if run.verify:
+                run.verify.fill(chunk)
+            if SEND_MODE == "sendfile":
+                offset = run.messages % slots * CHUNK_SIZE
+                if run.verify:
+                    os.pwrite(chunk_fd, chunk, offset)# очередное сообщение узора — в свободный слот
+                channel.sendfile(chunk_fd, offset, CHUNK_SIZE)
+            else:
+                channel.send(chunk)#отправка заголовка и чанка одним системным вызовом
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+    if SEND_MODE == "sendfile":
+        os.close(chunk_fd)
 
 if __name__ == "__main__":
-    send_data()
+    main()
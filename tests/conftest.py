@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# Пакет ipc импортируется от корня проекта, оркестратор — как модуль из своей папки
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "orchestrator"))
@@ -0,0 +1,103 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import orchestrator as orch
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    # Пустая база истории; comparison.csv — во временную папку, графики трендов не строятся
+    monkeypatch.setattr(orch, "HISTORY_DIR", tmp_path / "history")
+    monkeypatch.setattr(orch, "plot_trends", lambda df, cand, output_dir: None)
+    db = tmp_path / "history.sqlite"
+    with sqlite3.connect(db) as conn:
+        conn.executescript(orch.HISTORY_SCHEMA)
+    conn.close()
+    return db
+
+
+def record(db, run_dir, git_rev, mbps, p99_us=None, host="bench", chunk_size=4096):
+    # Замеры получателя одного запуска sockets py -> py: скорость и, если задан, p99 задержки
+    rows = []
+    for trial, speed in enumerate(mbps):
+        values = {"run_dir": run_dir, "run": f"sockets_py_py_t{trial}", "role": "receiver",
+                  "started_at": run_dir, "host": host, "git_rev": git_rev, "method": "sockets",
+                  "sender": "py_sender", "receiver": "py_receiver", "chunk_size": chunk_size, "batch": "none",
+                  "payload": "bytes", "placement": "none", "trial": trial, "mbps": speed,
+                  "p99_us": p99_us[trial] if p99_us else None}
+        rows.append([values.get(column) for column in orch.HISTORY_COLUMNS])
+    with sqlite3.connect(db) as conn:
+        conn.executemany(f"INSERT INTO trials VALUES ({', '.join('?' * len(orch.HISTORY_COLUMNS))})", rows)
+    conn.close()
+
+
+def comparison():
+    report = pd.read_csv(orch.HISTORY_DIR / "comparison.csv")
+    return dict(zip(report.metric, report.status))
+
+
+def test_welch_needs_two_trials_per_side():
+    assert orch.welch_significant([1.0], [1.0, 2.0]) is None
+    assert orch.welch_significant([1.0, 2.0], []) is None
+
+
+def test_welch_significance():
+    assert orch.welch_significant([100, 101, 99, 100], [80, 81, 79, 80])
+    assert not orch.welch_significant([100, 110, 90, 105], [102, 95, 108, 99])
+    # без разброса значима любая ненулевая разница
+    assert orch.welch_significant([5.0, 5.0], [6.0, 6.0])
+    assert not orch.welch_significant([5.0, 5.0], [5.0, 5.0])
+
+
+def test_welch_uses_satterthwaite_dof():
+    # разница в 8 стандартных ошибок значима по нормальному квантилю, но разброс только у базы из двух замеров
+    # оставляет одну степень свободы Уэлча (t = 12.706)
+    assert not orch.welch_significant([0.0, 2.0], [9.0, 9.0])
+    assert orch.welch_significant([0.0, 2.0] * 3, [9.0] * 6)
+
+
+def test_compare_flags_regression(history):
+    record(history, "2026-01-01", "aaaa111", [100, 101, 99, 100], p99_us=[50, 51, 49, 50])
+    record(history, "2026-01-02", "bbbb222", [80, 81, 79, 80], p99_us=[70, 71, 69, 70])
+    regressions = orch.compare_history("2026-01-01", db=history)  # сравнивается последний запуск
+    assert set(regressions.metric) == {"mbps", "p99_us"}
+    assert comparison() == {"mbps": "regression", "p99_us": "regression"}
+
+
+def test_compare_reports_improvement(history):
+    record(history, "2026-01-01", "aaaa111", [100, 101, 99, 100], p99_us=[50, 51, 49, 50])
+    record(history, "2026-01-02", "bbbb222", [120, 121, 119, 120], p99_us=[30, 31, 29, 30])
+    assert orch.compare_history("aaaa", "bbbb", db=history).empty  # база и кандидат — начала ревизий git
+    assert comparison() == {"mbps": "improvement", "p99_us": "improvement"}
+
+
+def test_compare_threshold(history):
+    # значимое по Уэлчу, но меньше порога изменение регрессией не считается
+    record(history, "2026-01-01", "aaaa111", [100, 101, 99, 100])
+    record(history, "2026-01-02", "bbbb222", [97, 98, 96, 97])
+    assert orch.compare_history("2026-01-01", db=history).empty
+    assert comparison() == {"mbps": "unchanged"}
+    assert len(orch.compare_history("2026-01-01", db=history, threshold=0.01)) == 1
+    assert comparison() == {"mbps": "regression"}
+
+
+def test_compare_insufficient_trials(history):
+    record(history, "2026-01-01", "aaaa111", [100, 101, 99])
+    record(history, "2026-01-02", "bbbb222", [50])
+    assert orch.compare_history("2026-01-01", db=history).empty
+    assert comparison() == {"mbps": "insufficient"}
+
+
+def test_compare_only_same_host(history):
+    record(history, "2026-01-01", "aaaa111", [100, 101, 99], host="other")
+    record(history, "2026-01-02", "bbbb222", [50, 51, 49])
+    with pytest.raises(ValueError):
+        orch.compare_history("2026-01-01", db=history)
+
+
+def test_compare_missing_baseline(history):
+    record(history, "2026-01-02", "bbbb222", [50, 51, 49])
+    with pytest.raises(ValueError):
+        orch.compare_history("cccc", db=history)
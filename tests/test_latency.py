@@ -0,0 +1,73 @@
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from ipc.latency import BUCKET_COUNT, HALF, SUB_BUCKETS, LatencyHistogram, bucket_index, bucket_upper
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RNG = random.Random(1)
+
+# Значения на границах корзин и степеней двойки, отрицательное и наибольшее 64-битное со знаком
+VALUES = ([-5, 0, 1, SUB_BUCKETS - 1, SUB_BUCKETS, SUB_BUCKETS + 1, 2**63 - 1]
+          + [v for shift in range(8, 63) for v in ((1 << shift) - 1, 1 << shift, (1 << shift) + 1)]
+          + [RNG.randrange(1 << RNG.randrange(1, 63)) for _ in range(2000)])
+
+# Та же последовательность значений через common/latency_histogram.hpp
+HISTOGRAM_CPP = """
+#include <iostream>
+#include "common/latency_histogram.hpp"
+
+int main(int argc, char** argv) {
+    LatencyHistogram hist;
+    long long value;
+    while (std::cin >> value) hist.record(value);
+    hist.write_csv(argv[1]);
+}
+"""
+
+
+def test_bucket_round_trip():
+    for index in range(BUCKET_COUNT):
+        assert bucket_index(bucket_upper(index)) == index
+        if index:
+            assert bucket_index(bucket_upper(index - 1) + 1) == index  # корзины идут подряд, без пропусков
+
+
+def test_bucket_relative_error():
+    for value in VALUES:
+        if value < 0:
+            continue
+        upper = bucket_upper(bucket_index(value))
+        assert value <= upper
+        if value < SUB_BUCKETS:
+            assert upper == value
+        else:
+            assert (upper - value) * HALF < value  # относительная погрешность < 1/HALF, без округления float
+
+
+def test_percentile_capped_by_max():
+    hist = LatencyHistogram()
+    for value in (100, 1000, 1_000_001):
+        hist.record(value)
+    assert hist.percentile(50) == bucket_upper(bucket_index(1000))
+    assert hist.percentile(99.9) == 1_000_001
+    assert LatencyHistogram().percentile(50) == 0
+
+
+@pytest.mark.skipif(shutil.which("g++") is None, reason="нужен g++")
+def test_matches_cpp_histogram(tmp_path):
+    source = tmp_path / "histogram.cpp"
+    source.write_text(HISTOGRAM_CPP)
+    binary = tmp_path / "histogram"
+    subprocess.run(["g++", "-O2", "-std=c++17", f"-I{PROJECT_ROOT}", str(source), "-o", str(binary)], check=True)
+    subprocess.run([str(binary), str(tmp_path / "cpp")], input="\n".join(map(str, VALUES)), text=True, check=True)
+
+    hist = LatencyHistogram()
+    for value in VALUES:
+        hist.record(value)
+    hist.write_csv(str(tmp_path / "py"))
+    for suffix in ("_latency.csv", "_latency_hist.csv"):
+        assert (tmp_path / f"py{suffix}").read_text() == (tmp_path / f"cpp{suffix}").read_text()
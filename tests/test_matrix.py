@@ -0,0 +1,121 @@
+import argparse
+import json
+
+import pytest
+
+import orchestrator as orch
+
+EXAMPLE = orch.PROJECT_ROOT / "orchestrator" / "matrix_example.toml"
+
+
+@pytest.fixture(autouse=True)
+def methods_config(monkeypatch):
+    # register_variants дописывает METHODS_CONFIG: каждый тест работает с копией
+    monkeypatch.setattr(orch, "METHODS_CONFIG", dict(orch.METHODS_CONFIG))
+
+
+def write_matrix(tmp_path, text):
+    path = tmp_path / "matrix.toml"
+    path.write_text(text)
+    return path
+
+
+def cli_args(**values):
+    # Аргументы main без явных значений
+    defaults = {"sweep": False, "min_size": orch.SWEEP_MIN_SIZE, "max_size": orch.SWEEP_MAX_SIZE, "warmup": None,
+                "min_trials": None, "trials": None, "ci_target": None, "placement": None, "methods": None,
+                "pairs": None, "batch": None, "linger": None, "payload": None, "verify": False}
+    return argparse.Namespace(**{**defaults, **values})
+
+
+def test_example_matrix():
+    matrix = orch.load_matrix(EXAMPLE)
+    orch.register_variants(matrix["variants"])
+    methods = orch.select_methods(matrix)
+    assert "shm_ring16" in methods and "posix_shared_memory_futex" in methods
+    assert all(name.startswith(("posix_shared_memory", "sockets", "shm_ring16")) for name in methods)
+    assert orch.parse_pairs(matrix["pairs"]) == [("py_sender", "py_receiver"), ("cpp_sender", "cpp_receiver")]
+
+
+def test_sweep_and_explicit_sizes(tmp_path):
+    matrix = orch.load_matrix(write_matrix(tmp_path, "sweep = { min = 64, max = 512 }\n"))
+    assert matrix == {"sizes": [64, 128, 256, 512]}
+    matrix = orch.load_matrix(write_matrix(tmp_path, "sizes = [100]\nsweep = { min = 64, max = 512 }\n"))
+    assert matrix["sizes"] == [100]
+
+
+def test_unknown_matrix_key(tmp_path):
+    with pytest.raises(ValueError, match="size"):
+        orch.load_matrix(write_matrix(tmp_path, "size = [64]\n"))
+
+
+def test_method_filter():
+    assert list(orch.select_methods({"methods": ["sockets"]})) == ["sockets"]
+    assert set(orch.select_methods({"methods": ["sockets*"]})) == {n for n in orch.METHODS_CONFIG
+                                                                   if n.startswith("sockets")}
+    assert list(orch.select_methods({})) == list(orch.METHODS_CONFIG)
+    with pytest.raises(ValueError, match="no_such"):
+        orch.select_methods({"methods": ["sockets", "no_such*"]})
+
+
+def test_method_settings_beat_matrix():
+    orch.register_variants({"shm_custom": {"base": "posix_shared_memory", "timeout": 5,
+                                           "env": {"SHM_SLOTS": "8"}}})
+    methods = orch.select_methods({"methods": ["shm_custom", "sockets"], "timeout": 30, "start_delay": 1,
+                                   "env": {"SHM_SLOTS": "2", "SHM_SPIN_LIMIT": "100"}})
+    assert methods["shm_custom"]["env"] == {"SHM_SLOTS": "8", "SHM_SPIN_LIMIT": "100"}
+    assert methods["shm_custom"]["timeout"] == 5 and methods["sockets"]["timeout"] == 30
+    assert methods["sockets"]["start_delay"] == 1
+    assert "SHM_SLOTS" not in orch.METHODS_CONFIG["sockets"].get("env", {})  # матрица не меняет сам метод
+
+
+def test_variant_inherits_base():
+    orch.register_variants({"shm_ring": {"base": "posix_shared_memory_async", "env": {"SHM_SYNC": "futex"},
+                                         "baseline": None}})
+    base, variant = orch.METHODS_CONFIG["posix_shared_memory_async"], orch.METHODS_CONFIG["shm_ring"]
+    assert variant["dir"] == "posix_shared_memory"
+    assert variant["env"] == {**base["env"], "SHM_SYNC": "futex"}
+    assert variant["py_sender"] == base["py_sender"]
+    assert "baseline" not in variant  # None снимает ключ базового метода
+
+
+def test_variant_errors():
+    with pytest.raises(ValueError, match="no_such"):
+        orch.register_variants({"broken": {"base": "no_such"}})
+    with pytest.raises(ValueError, match="receiver_metric"):
+        orch.register_variants({"broken": {"py_sender": "python3 x.py", "sender_metric": "x.csv"}})
+
+
+def test_cli_overrides_matrix():
+    matrix = {"methods": ["sockets"], "pairs": ["py-py"], "sizes": [64], "placements": ["none"],
+              "trials": {"warmup": 2, "min_trials": 5, "max_trials": 7}}
+    matrix = orch.apply_cli_args(matrix, cli_args(methods="posix_shared_memory*", trials=3, ci_target=0.1,
+                                                  placement="same_core,cross_numa", batch="0,4096"))
+    assert matrix["methods"] == ["posix_shared_memory*"]
+    assert matrix["pairs"] == ["py-py"] and matrix["sizes"] == [64]
+    assert matrix["placements"] == ["same_core", "cross_numa"]
+    assert matrix["trials"] == {"warmup": 2, "min_trials": 5, "max_trials": 3, "ci_target": 0.1}
+    assert matrix["batch"] == [0, 4096] and "linger" not in matrix
+
+
+def test_cli_sweep_replaces_sizes():
+    matrix = orch.apply_cli_args({"sizes": [64]}, cli_args(sweep=True, min_size=1024, max_size=4096))
+    assert matrix["sizes"] == [1024, 2048, 4096]
+    assert matrix["trials"] == {}
+
+
+def test_cli_verify_saved_in_matrix():
+    assert orch.apply_cli_args({}, cli_args(verify=True))["verify"] is True
+    assert "verify" not in orch.apply_cli_args({}, cli_args())
+    assert orch.apply_cli_args({"verify": True}, cli_args())["verify"] is True  # matrix.json дописываемого запуска
+
+
+def test_resume_rejects_verify_mismatch(tmp_path):
+    orch.check_resume(tmp_path, {"verify": True})  # старый запуск без matrix.json не проверяется
+    (tmp_path / "matrix.json").write_text(json.dumps({"verify": True}))
+    orch.check_resume(tmp_path, {"verify": True})
+    with pytest.raises(ValueError, match="--verify"):
+        orch.check_resume(tmp_path, {})
+    (tmp_path / "matrix.json").write_text(json.dumps({"sizes": [64]}))
+    with pytest.raises(ValueError, match="--verify"):
+        orch.check_resume(tmp_path, {"verify": True})
@@ -0,0 +1,54 @@
+import json
+
+import pandas as pd
+import pytest
+
+import orchestrator as orch
+from ipc.payload import RECORD_SIZE, RECORDS_MAX, make_object
+
+pytest.importorskip("numpy")
+
+
+def test_records_capped():
+    assert len(make_object("records", 10 * RECORD_SIZE)) == 10
+    assert len(make_object("records", 16 * 1024 * 1024)) == RECORDS_MAX
+    assert len(make_object("records", 1)) == 1
+
+
+def test_payload_size_env_caps_total_size():
+    env = orch.payload_size_env(None)  # размеры по умолчанию: 10 ГБ объектов по 16 МиБ
+    assert env["IPC_CHUNK_SIZE"] == str(orch.DEFAULT_CHUNK_SIZE)
+    assert int(env["IPC_TOTAL_SIZE"]) == orch.PAYLOAD_TOTAL_SIZE
+    env = orch.payload_size_env({**orch.sweep_env(64), "IPC_PAYLOAD": "records"})
+    assert env == {"IPC_CHUNK_SIZE": "64", "IPC_TOTAL_SIZE": str(64 * orch.SWEEP_MAX_MESSAGES),
+                   "IPC_PAYLOAD": "records"}
+    size = orch.PAYLOAD_TOTAL_SIZE * 2
+    assert orch.payload_size_env({"IPC_CHUNK_SIZE": str(size)})["IPC_TOTAL_SIZE"] == str(size)
+
+
+def write_run(results_dir, name, kind, mode):
+    run_dir = results_dir / name
+    run_dir.mkdir()
+    (run_dir / "run_info.json").write_text(json.dumps({
+        "method": "sockets", "sender": "py_sender", "receiver": "py_receiver", "chunk_size": 4096,
+        "placement": "none", "payload_kind": kind, "pickle_mode": mode}))
+
+
+def test_payload_report_keeps_killed_runs(tmp_path):
+    # records: оба режима убиты по таймауту; array/inband: один замер из двух
+    keys = {"method": "sockets", "sender": "py_sender", "receiver": "py_receiver", "chunk_size": 4096,
+            "placement": "none", "role": "receiver", "batch": "none"}
+    stats = pd.DataFrame([{**keys, "payload": payload, "msgs_per_sec_mean": speed, "msgs_per_sec_ci95": 1.0}
+                          for payload, speed in (("array/oob", 200.0), ("array/inband", 100.0), ("bytes", 400.0))])
+    results = pd.DataFrame({"run": ["array_oob_t0", "array_inband_t0", "bytes_t0"], "role": "receiver"})
+    for name, kind, mode in (("array_oob_t0", "array", "oob"), ("array_inband_t0", "array", "inband"),
+                             ("array_inband_t1", "array", "inband"), ("records_oob_t0", "records", "oob"),
+                             ("records_inband_t0", "records", "inband"), ("bytes_t0", "bytes", "oob")):
+        write_run(tmp_path, name, kind, mode)
+
+    orch.plot_payload(stats, results, tmp_path)
+    report = pd.read_csv(tmp_path / "payload.csv").set_index("kind")
+    assert report.loc["array", "oob_speedup"] == 2.0 and report.loc["array", "oob_of_bytes"] == 0.5
+    assert report.loc["array", ["failed_trials_oob", "failed_trials_inband"]].tolist() == [0, 1]
+    assert report.loc["records", ["failed_trials_oob", "failed_trials_inband"]].tolist() == [1, 1]
+    assert pd.isna(report.loc["records", "msgs_per_sec_mean_oob"])
@@ -0,0 +1,43 @@
+import pytest
+
+import orchestrator as orch
+
+# Два сокета (узлы NUMA 0 и 1) по два ядра с двумя гиперпотоками: CPU n и n + 2 — соседи по ядру
+TOPOLOGY = {cpu: {"core": cpu % 2, "package": cpu // 4, "node": cpu // 4} for cpu in range(8)}
+SINGLE_CPU = {3: {"core": 0, "package": 0, "node": 0}}
+
+
+def test_parse_cpu_list():
+    assert orch.parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+    assert orch.parse_cpu_list("5") == [5]
+    assert orch.parse_cpu_list("\n") == []
+
+
+@pytest.mark.parametrize("policy, sender, receiver", [
+    ("none", None, None),
+    ("same_core", [0], [0]),
+    ("smt_siblings", [0], [2]),
+    ("same_socket", [0], [1]),
+    ("cross_numa", [0], [4]),
+])
+def test_placement_cpus(policy, sender, receiver):
+    assert orch.placement_cpus(policy, TOPOLOGY) == {"policy": policy, "sender": sender, "receiver": receiver}
+
+
+def test_placement_impossible_on_single_cpu():
+    assert orch.placement_cpus("same_core", SINGLE_CPU) == {"policy": "same_core", "sender": [3], "receiver": [3]}
+    for policy in ("smt_siblings", "same_socket", "cross_numa"):
+        assert orch.placement_cpus(policy, SINGLE_CPU) is None
+
+
+def test_placement_without_smt():
+    # Без гиперпотоков у каждого CPU своё ядро: соседей по ядру нет, разные ядра сокета есть
+    topology = {cpu: {"core": cpu, "package": 0, "node": 0} for cpu in range(4)}
+    assert orch.placement_cpus("smt_siblings", topology) is None
+    assert orch.placement_cpus("same_socket", topology)["receiver"] == [1]
+    assert orch.placement_cpus("cross_numa", topology) is None
+
+
+def test_unknown_placement():
+    with pytest.raises(ValueError):
+        orch.placement_cpus("same_die", TOPOLOGY)
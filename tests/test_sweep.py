@@ -0,0 +1,25 @@
+import orchestrator as orch
+
+
+def test_sweep_sizes_powers_of_two():
+    assert orch.sweep_sizes(64, 1024) == [64, 128, 256, 512, 1024]
+    assert orch.sweep_sizes(64, 1000) == [64, 128, 256, 512]
+    assert orch.sweep_sizes()[0] == orch.SWEEP_MIN_SIZE and orch.sweep_sizes()[-1] == orch.SWEEP_MAX_SIZE
+
+
+def test_sweep_env_caps_message_count():
+    env = orch.sweep_env(64)
+    assert env["IPC_CHUNK_SIZE"] == "64"
+    assert int(env["IPC_TOTAL_SIZE"]) == 64 * orch.SWEEP_MAX_MESSAGES
+
+
+def test_sweep_env_caps_total_size():
+    chunk_size = 3 * 1024 * 1024  # объём не делится на размер: берётся целое число сообщений
+    total = int(orch.sweep_env(chunk_size)["IPC_TOTAL_SIZE"])
+    assert total == orch.DEFAULT_TOTAL_SIZE // chunk_size * chunk_size
+    assert total <= orch.DEFAULT_TOTAL_SIZE and total % chunk_size == 0
+
+
+def test_sweep_env_sends_at_least_one_message():
+    chunk_size = orch.DEFAULT_TOTAL_SIZE * 2
+    assert orch.sweep_env(chunk_size)["IPC_TOTAL_SIZE"] == str(chunk_size)
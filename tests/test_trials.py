@@ -0,0 +1,100 @@
+import math
+import statistics
+
+import pytest
+
+import orchestrator as orch
+
+METHOD_CONFIG = {"sender_metric": "sender_metrics.csv", "receiver_metric": "receiver_metrics.csv"}
+
+
+def write_metrics(output_subdir, speed_mbps):
+    # Итоговая строка метрик получателя: speed_mbps МБ за секунду
+    (output_subdir / METHOD_CONFIG["receiver_metric"]).write_text(
+        f"active_time_sec,wall_time_sec,bytes_received\n1.0,1.0,{int(speed_mbps * 1024**2)}\n")
+
+
+@pytest.fixture
+def fake_run_pair(monkeypatch):
+    # run_pair без процессов: замеры получают скорости из списка по очереди, прогревы — только счётчик
+    calls = {"warmup": 0, "trials": [], "speeds": []}
+
+    def run_pair(method_name, method_config, sender_key, receiver_key, output_subdir, size_env=None, placement=None):
+        if "_warmup_" in output_subdir.name:
+            calls["warmup"] += 1
+            return
+        calls["trials"].append(output_subdir.name)
+        write_metrics(output_subdir, calls["speeds"].pop(0))
+
+    monkeypatch.setattr(orch, "run_pair", run_pair)
+    return calls
+
+
+def run_trials(output_root, **trials):
+    orch.run_trials("method", METHOD_CONFIG, "py_sender", "py_receiver", output_root, "run", trials=trials)
+
+
+def test_ci95_needs_two_values():
+    assert math.isnan(orch.ci95_halfwidth([]))
+    assert math.isnan(orch.ci95_halfwidth([5.0]))
+
+
+def test_ci95_uses_t_table():
+    # [1, 2, 3]: стандартное отклонение 1, две степени свободы
+    assert orch.ci95_halfwidth([1.0, 2.0, 3.0]) == pytest.approx(4.303 / math.sqrt(3))
+    assert orch.ci95_halfwidth([1.0, 3.0]) == pytest.approx(12.706 * statistics.stdev([1.0, 3.0]) / math.sqrt(2))
+    assert orch.ci95_halfwidth([7.0, 7.0, 7.0]) == 0
+
+
+def test_ci95_falls_back_to_normal_quantile():
+    values = [float(v % 5) for v in range(50)]
+    assert orch.ci95_halfwidth(values) == pytest.approx(1.96 * statistics.stdev(values) / math.sqrt(50))
+
+
+def test_t_table_decreases_towards_normal():
+    dofs = sorted(orch.T_CRITICAL_95)
+    assert dofs == list(range(1, len(dofs) + 1))
+    values = [orch.T_CRITICAL_95[dof] for dof in dofs]
+    assert values == sorted(values, reverse=True)
+    assert values[-1] > 1.96
+
+
+def test_trials_stop_at_ci_target(tmp_path, fake_run_pair):
+    fake_run_pair["speeds"] = [100.0] * 10
+    run_trials(tmp_path, warmup=2, min_trials=3, max_trials=10, ci_target=0.05)
+    assert fake_run_pair["warmup"] == 2
+    assert fake_run_pair["trials"] == ["run_t0", "run_t1", "run_t2"]
+    assert (tmp_path / "run_t0" / "run_info.json").exists()
+
+
+def test_trials_run_to_max_when_noisy(tmp_path, fake_run_pair):
+    fake_run_pair["speeds"] = [100.0, 10.0] * 3
+    run_trials(tmp_path, warmup=0, min_trials=2, max_trials=5, ci_target=0.05)
+    assert fake_run_pair["trials"] == [f"run_t{n}" for n in range(5)]
+
+
+def test_resume_keeps_finished_trials(tmp_path, fake_run_pair):
+    # t0 завершён, у t1 оборвана итоговая строка, у t2 только заголовок метрик
+    for trial in range(3):
+        (tmp_path / f"run_t{trial}").mkdir()
+    write_metrics(tmp_path / "run_t0", 100.0)
+    metric = METHOD_CONFIG["receiver_metric"]
+    (tmp_path / "run_t1" / metric).write_text("active_time_sec,wall_time_sec,bytes_received\n1.0,1.")
+    (tmp_path / "run_t2" / metric).write_text("active_time_sec,wall_time_sec,bytes_received\n")
+    (tmp_path / "run_t1" / "stale.csv").write_text("")
+
+    fake_run_pair["speeds"] = [100.0] * 10
+    run_trials(tmp_path, warmup=1, min_trials=3, max_trials=10, ci_target=0.05)
+    # готовый t0 засчитан без прогона, поэтому трёх замеров хватает после t2
+    assert fake_run_pair["warmup"] == 1
+    assert fake_run_pair["trials"] == ["run_t1", "run_t2"]
+    assert not (tmp_path / "run_t1" / "stale.csv").exists()  # незавершённый замер переделан с нуля
+    assert orch.trial_speed(tmp_path / "run_t1", METHOD_CONFIG) == pytest.approx(100.0)
+
+
+def test_resume_of_finished_run_skips_warmup(tmp_path, fake_run_pair):
+    for trial in range(3):
+        (tmp_path / f"run_t{trial}").mkdir()
+        write_metrics(tmp_path / f"run_t{trial}", 100.0)
+    run_trials(tmp_path, warmup=2, min_trials=3, max_trials=10, ci_target=0.05)
+    assert fake_run_pair["warmup"] == 0 and fake_run_pair["trials"] == []
@@ -0,0 +1,30 @@
+import sys
+from pathlib import Path
+
+import zmq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import PORT_OFFSET
+from ipc.pingpong import ping, pong, role_from_argv
+from ipc.zmq_channel import ZmqChannel, settings_from_env
+
+PORT = 5555 + PORT_OFFSET
+
+# Запрос-ответ через пару сокетов PAIR: клиент слушает порт и по окончании шлёт DONE, сервер подключается.
+# Кадры те же, что у sender_zmq.py (метка отправки и данные); inproc:// не поддерживается — процессы разные
+def main():
+    role = role_from_argv(sys.argv)
+    settings = settings_from_env()
+    if settings["transport"] == "inproc":
+        sys.exit("inproc:// не поддерживается в режиме запрос-ответ")
+    if role == "ping":
+        with ZmqChannel.bind(PORT, 1, settings["transport"], settings["options"], settings["io_threads"],
+                             kind=zmq.PAIR) as channel:
+            ping("zmq_ping", channel, channel)
+    else:
+        with ZmqChannel.connect([PORT], settings["transport"], settings["options"], settings["io_threads"],
+                                kind=zmq.PAIR) as channel:
+            pong("zmq_pong", channel, channel)
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,66 @@
-import zmq
-import time
-import csv
 import os
+import sys
+import threading
+from pathlib import Path
 
-def get_rss_bytes():
-    with open("/proc/self/statm", "r") as f:#открываем специальный файл
-        parts = f.readline().split()#читаем первую строку
-        resident_pages = int(parts[1])#второе число(число активных странис RAM)
-        return resident_pages * os.sysconf("SC_PAGE_SIZE")#так как число может варьироваться используем функцию
+import zmq
 
-def main():
-    full_start_time = time.time()# создание таймера
-    context = zmq.Context()#создание объекта среды который управляет работой сокетов
-    socket = context.socket(zmq.PULL)#создание сокета типа PULL, только получение данных
-    socket.connect("tcp://localhost:5555")# подключение к локальному хосту на 5555 порт
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_receiver, transport_size
+from ipc.bench import BenchRun, CHUNK_SIZE, PORT_OFFSET
+from ipc.payload import PAYLOAD, PayloadSink
+from ipc.zmq_channel import ZmqChannel, settings_from_env
+from sender_zmq import send_all
 
-    received_bytes = 0
-    first_recv = True
-    active_time = 0.0
-    pure_start = full_start_time#таймеры
-    last_log = full_start_time#таймеры
+# Параллельный запуск (режим масштабирования): получатель подключается ко всем IPC_SENDERS отправителям
+# (порты 5555 + IPC_PORT_OFFSET + k) и завершается, получив DONE от каждого из них
+BASE_PORT = 5555 + PORT_OFFSET
+SENDERS = int(os.environ.get("IPC_SENDERS", "1"))
 
-    with open("zmq_receiver_metrics.csv", "w", newline="") as log_file:
-        log_writer = csv.writer(log_file)#начало записи логов
-        log_writer.writerow(["active_time_sec", "wall_time_sec", "bytes_received", "rss_bytes"])
+def main():
+    settings = settings_from_env()
+    context = None
+    sender = None
+    if settings["transport"] == "inproc":
+        # Общий контекст обязателен для inproc://, отправитель — поток этого же процесса
+        context = zmq.Context(settings["io_threads"])
+        sender = threading.Thread(target=send_all, args=(settings, context))
+        sender.start()
 
+    run = BenchRun("receiver", "zmq_receiver")
+    sink = PayloadSink(run.verify) if PAYLOAD != "bytes" else None
+    buf = bytearray(CHUNK_SIZE)
+    zmq_channel = ZmqChannel.connect([BASE_PORT + k for k in range(SENDERS)], settings["transport"],
+                                     settings["options"], settings["io_threads"], settings["zero_copy"], context)
+    # IPC_BATCH_SIZE: сообщение zmq — пакет, он разбирается на месте
+    with batch_receiver(zmq_channel, transport_size(CHUNK_SIZE)) as channel:
+        run.start()
         while True:
-            t1 = time.time()
-            msg = socket.recv()#Приём сообщения
-            t2 = time.time()
-
-            active_time += t2 - t1
-
-            if msg == b"DONE":# проверка на последнее сообщение
+            if sink:
+                # IPC_PAYLOAD: объект собирается из кадров сообщения, массивы (pickle oob) смотрят прямо в кадры
+                parts = channel.recv_parts()
+                if not parts:
+                    break
+                sink.consume(parts)
+                run.record(CHUNK_SIZE, channel.last_send_ns)
+                continue
+            if BATCH_SIZE:
+                chunk = channel.recv_view()# сообщение — срез принятого пакета, без копирования
+            elif settings["zero_copy"]:
+                chunk = channel.recv_frame()# данные остаются в кадре zmq, без копирования в buf
+            else:
+                chunk = memoryview(buf)[:channel.recv_into(buf)]
+            nbytes = len(chunk)
+            if nbytes == 0:# DONE от всех отправителей
                 break
+            if run.verify:# режим проверки: CRC32 принятого сообщения
+                run.verify.check(chunk)
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
 
-            if first_recv:
-                pure_start = t1
-                first_recv = False
-
-            received_bytes += len(msg)#увеличение размера полученных данных
-            now = time.time()#
-            if now - last_log >= 0.1:
-                rss = get_rss_bytes()/(1024*1024)
-                log_writer.writerow([active_time, now - full_start_time, received_bytes, rss])
-                last_log = now
+    if sender is not None:
+        sender.join()
+        context.term()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,32 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import BenchRun, CHUNK_SIZE, PORT_OFFSET
+from ipc.zmq_channel import AsyncZmqChannel, settings_from_env
+
+BASE_PORT = 5555 + PORT_OFFSET
+SENDERS = int(os.environ.get("IPC_SENDERS", "1"))
+
+async def main():
+    run = BenchRun("receiver", "zmq_receiver")
+    buf = bytearray(CHUNK_SIZE)
+    settings = settings_from_env()
+    if settings["transport"] == "inproc":
+        sys.exit("inproc:// не поддерживается асинхронными скриптами")
+    async with AsyncZmqChannel.connect([BASE_PORT + k for k in range(SENDERS)], settings["transport"], settings["options"],
+                                     settings["io_threads"]) as channel:
+        run.start()
+        while True:
+            nbytes = await channel.recv_into(buf)
+            if nbytes == 0:# DONE от всех отправителей
+                break
+            if run.verify:# режим проверки: CRC32 принятого сообщения
+                run.verify.check(memoryview(buf)[:nbytes])
+            run.record(nbytes, channel.last_send_ns)
+        run.finish()
+
+if __name__ == "__main__":
+    asyncio.run(main())
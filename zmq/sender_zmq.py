@@ -1,52 +1,57 @@
-import zmq
-import time
-import csv
 import os
-
-def get_rss_bytes():
-    with open("/proc/self/statm", "r") as f:
-        parts = f.readline().split()
-        resident_pages = int(parts[1])
-        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.batch import BATCH_SIZE, batch_sender
+from ipc.bench import BenchRun, CHUNK_SIZE, PORT_OFFSET, TOTAL_SIZE
+from ipc.payload import PAYLOAD, PayloadSource, check_payload
+from ipc.zmq_channel import ZmqChannel, settings_from_env
+
+# Параллельный запуск (режим масштабирования): отправитель i слушает порт 5555 + IPC_PORT_OFFSET,
+# IPC_RECEIVERS получателей забирают сообщения по очереди (PUSH распределяет их round-robin)
+PORT = 5555 + PORT_OFFSET
+RECEIVERS = int(os.environ.get("IPC_RECEIVERS", "1"))
+ZERO_COPY_POOL = 4  # буферов в режиме без копирования: буфер снова используется только после отправки
+
+def send_all(settings, context=None):
+    if settings["zero_copy"] and BATCH_SIZE:
+        raise ValueError("ZMQ_ZERO_COPY отдаёт libzmq буфер сообщения и не совместим с пакетированием (IPC_BATCH_SIZE)")
+    if PAYLOAD != "bytes" and (settings["zero_copy"] or BATCH_SIZE):
+        raise ValueError("Структурированная нагрузка (IPC_PAYLOAD) уходит частями без копирования сама и не совместима "
+                         "с ZMQ_ZERO_COPY и пакетированием")
+    check_payload()
+    run = BenchRun("sender", "zmq_sender")
+    pool = [bytearray(b'A' * CHUNK_SIZE) for _ in range(ZERO_COPY_POOL if settings["zero_copy"] else 1)]
+    trackers = [None] * len(pool)
+    # IPC_BATCH_SIZE: мелкие сообщения копятся в пакете и уходят одним сообщением zmq (ipc/batch.py)
+    zmq_channel = ZmqChannel.bind(PORT, RECEIVERS, settings["transport"], settings["options"], settings["io_threads"],
+                                  settings["zero_copy"], context)
+    # IPC_PAYLOAD: части сериализованного объекта — кадры одного сообщения zmq, без склейки (ipc/payload.py)
+    source = PayloadSource(CHUNK_SIZE, verify=run.verify) if PAYLOAD != "bytes" else None
+    with batch_sender(zmq_channel, CHUNK_SIZE) as channel:
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            if source:
+                channel.send_parts(source.next_parts())
+                run.record(CHUNK_SIZE)# объект учитывается как чанк: сообщений в секунду — объектов в секунду
+                continue
+            index = run.messages % len(pool)
+            if trackers[index] is not None:
+                trackers[index].wait()# libzmq ещё может читать этот буфер
+            if run.verify:
+                run.verify.fill(pool[index])# узор пишется только после того, как libzmq отпустила буфер
+            trackers[index] = channel.send(pool[index])
+            run.record(CHUNK_SIZE)
+        run.finish()
 
 def main():
-    full_start_time = time.time()# создание таймера
-    context = zmq.Context()#создание объекта среды который управляет работой сокетов
-    socket = context.socket(zmq.PUSH)#создание сокета типа PUSH, только отправка данных
-    socket.bind("tcp://*:5555")# подключение к локальному хосту на 5555 порт
-
-    total_bytes = 10 * 1024 * 1024 * 1024 #10Gb
-    chunk_size = 16 * 1024 * 1024  #16Mb
-    data = bytearray(b'A' * chunk_size)# массив с данными
-
-    with open("zmq_sender_metrics.csv", "w", newline="") as log_file:
-        log_writer = csv.writer(log_file)#начало записи логов
-        log_writer.writerow(["active_time_sec", "wall_time_sec", "bytes_sent", "rss_bytes"])
-
-        sent_bytes = 0
-        first_send = True
-        active_time = 0.0
-        pure_start = full_start_time#таймеры
-        last_log = full_start_time#таймеры
-
-        while sent_bytes < total_bytes:#цикл постоянной проверки отправлены ли данные
-            if first_send:
-                pure_start = time.time()
-                first_send = False
-
-            t1 = time.time()
-            socket.send(data)#отправка данных
-            t2 = time.time()
-
-            active_time += t2 - t1
-            sent_bytes += chunk_size
-            now = time.time()
-            if now - last_log >= 0.1:
-                rss = get_rss_bytes()/(1024*1024)
-                log_writer.writerow([active_time, now - full_start_time, sent_bytes, rss])
-                last_log = now
-
-        socket.send(b"DONE")#отправка финального сообщения
+    settings = settings_from_env()
+    if settings["transport"] == "inproc":
+        # inproc:// не выходит за пределы процесса: отправитель работает в потоке процесса получателя
+        print("[INFO] inproc: отправитель запускается получателем")
+        return
+    send_all(settings)
 
 if __name__ == "__main__":
     main()
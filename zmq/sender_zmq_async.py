@@ -0,0 +1,28 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from ipc.bench import BenchRun, CHUNK_SIZE, PORT_OFFSET, TOTAL_SIZE
+from ipc.zmq_channel import AsyncZmqChannel, settings_from_env
+
+PORT = 5555 + PORT_OFFSET
+RECEIVERS = int(os.environ.get("IPC_RECEIVERS", "1"))
+
+async def main():
+    run = BenchRun("sender", "zmq_sender")
+    data = bytearray(b'A' * CHUNK_SIZE)
+    settings = settings_from_env()
+    if settings["transport"] == "inproc":
+        sys.exit("inproc:// не поддерживается асинхронными скриптами")
+    async with AsyncZmqChannel.bind(PORT, RECEIVERS, settings["transport"], settings["options"],
+                                     settings["io_threads"]) as channel:
+        run.start()
+        while run.bytes < TOTAL_SIZE:
+            await channel.send(run.verify.fill(data) if run.verify else data)
+            run.record(CHUNK_SIZE)
+        run.finish()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+#include <zmq.hpp>
+#include <algorithm>
+#include <chrono>
+#include <cstring>
+#include <fstream>
+#include <iostream>
+#include <optional>
+#include <string>
+#include <vector>
+#include <unistd.h>
+
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/verify.hpp"
+
+// Запрос-ответ через пару сокетов PAIR (совпадает с pingpong_zmq.py): клиент (ping) слушает порт
+// 5555 + IPC_PORT_OFFSET и по окончании шлёт DONE, сервер (pong) подключается и возвращает каждое сообщение.
+// Сообщение — два кадра, как у zmq_sender.cpp: метка отправки и данные. Транспорт tcp или ipc
+std::string zmq_endpoint(size_t port, bool bind) {
+    const char* transport = std::getenv("ZMQ_TRANSPORT");
+    if (transport && std::string(transport) == "ipc") return "ipc:///tmp/ipc_zmq_" + std::to_string(port) + ".sock";
+    return (bind ? "tcp://*:" : "tcp://localhost:") + std::to_string(port);
+}
+
+void apply_zmq_options(zmq::socket_t& socket) {
+    if (std::getenv("ZMQ_SNDHWM")) socket.set(zmq::sockopt::sndhwm, static_cast<int>(env_size("ZMQ_SNDHWM", 0)));
+    if (std::getenv("ZMQ_RCVHWM")) socket.set(zmq::sockopt::rcvhwm, static_cast<int>(env_size("ZMQ_RCVHWM", 0)));
+    if (std::getenv("ZMQ_SNDBUF")) socket.set(zmq::sockopt::sndbuf, static_cast<int>(env_size("ZMQ_SNDBUF", 0)));
+    if (std::getenv("ZMQ_RCVBUF")) socket.set(zmq::sockopt::rcvbuf, static_cast<int>(env_size("ZMQ_RCVBUF", 0)));
+}
+
+void send_message(zmq::socket_t& socket, const char* data, size_t size) {
+    uint64_t send_ns = LatencyHistogram::now_ns();
+    socket.send(zmq::buffer(&send_ns, sizeof(send_ns)), zmq::send_flags::sndmore);
+    socket.send(zmq::buffer(data, size), zmq::send_flags::none);
+}
+
+// Длина принятого сообщения; 0 — DONE от клиента
+size_t recv_message(zmq::socket_t& socket, std::vector<char>& buffer) {
+    zmq::message_t stamp;
+    (void)socket.recv(stamp, zmq::recv_flags::none);
+    if (stamp.size() == 4 && std::memcmp(stamp.data(), "DONE", 4) == 0) return 0;
+    zmq::message_t msg;
+    (void)socket.recv(msg, zmq::recv_flags::none);
+    const size_t size = std::min(msg.size(), buffer.size());
+    std::memcpy(buffer.data(), msg.data(), size);
+    return size;
+}
+
+int main(int argc, char** argv) {
+    using namespace std::chrono;
+    const std::string role = argc == 2 ? argv[1] : "";
+    if (role != "ping" && role != "pong") {
+        std::cerr << "usage: " << argv[0] << " ping|pong\n";
+        return 1;
+    }
+    const bool ping = role == "ping";
+    auto wall_start = high_resolution_clock::now();
+
+    zmq::context_t context(static_cast<int>(env_size("ZMQ_IO_THREADS", 1)));
+    zmq::socket_t socket(context, ZMQ_PAIR);
+    apply_zmq_options(socket);
+    const std::string endpoint = zmq_endpoint(5555 + port_offset(), ping);
+    if (ping) socket.bind(endpoint);
+    else socket.connect(endpoint);
+    signal_ready();  // клиент слушает порт, сервер может подключаться
+
+    const size_t total_bytes = total_size_from_env();
+    const size_t chunk_size = chunk_size_from_env();
+    std::vector<char> buffer(chunk_size, 42);
+    std::vector<char> answer(chunk_size);
+    LatencyHistogram latency;
+    std::optional<PatternSource> pattern;  // режим проверки (IPC_VERIFY): узор у клиента, CRC32 у сервера
+    std::optional<PatternCheck> verify;
+    if (verify_enabled()) {
+        if (ping) pattern.emplace(chunk_size);
+        else verify.emplace(chunk_size);
+    }
+
+    // Первый круг — рукопожатие, не учитывается: сервер мог ещё не подключиться
+    if (ping) {
+        send_message(socket, buffer.data(), chunk_size);
+        recv_message(socket, answer);
+    } else {
+        send_message(socket, buffer.data(), recv_message(socket, buffer));
+    }
+    auto active_start = high_resolution_clock::now();
+
+    size_t transferred = 0;
+    MetricsChannel channel(ping ? "sender" : "receiver");  // живые замеры для оркестратора
+    if (ping) {
+        while (transferred < total_bytes) {
+            if (pattern) pattern->fill(buffer.data(), chunk_size);
+            const uint64_t start_ns = LatencyHistogram::now_ns();
+            send_message(socket, buffer.data(), chunk_size);
+            if (recv_message(socket, answer) != chunk_size) {
+                std::cerr << "unexpected reply length\n";
+                return 1;
+            }
+            latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - start_ns));  // полный круг — RTT
+            transferred += chunk_size;
+            channel.tick(transferred);
+        }
+        zmq::message_t done_msg("DONE", 4);
+        socket.send(done_msg, zmq::send_flags::none);
+    } else {
+        while (true) {
+            const size_t length = recv_message(socket, buffer);
+            if (length == 0) break;  // клиент закончил
+            if (verify) verify->check(buffer.data(), length);
+            send_message(socket, buffer.data(), length);
+            transferred += length;
+            channel.tick(transferred);
+        }
+    }
+    auto active_end = high_resolution_clock::now();
+    socket.close();
+    context.close();  // дожидается доставки DONE
+    if (ping && endpoint.rfind("ipc://", 0) == 0) unlink(endpoint.c_str() + 6);  // libzmq оставляет файл сокета ipc://
+
+    double active_time = duration<double>(active_end - active_start).count();
+    double wall_time = duration<double>(high_resolution_clock::now() - wall_start).count();
+    double max_rss = MetricsChannel::peak_rss_mb();
+    const std::string prefix = ping ? "zmq_ping" : "zmq_pong";
+    std::ofstream log(metrics_path(prefix + "_metrics.csv"));
+    log << "active_time_sec,wall_time_sec," << (ping ? "bytes_sent" : "bytes_received") << ",rss_mb\n";
+    log << active_time << "," << wall_time << "," << transferred << "," << max_rss << "\n";
+    channel.finish(transferred, active_time, wall_time, max_rss);
+    if (ping) latency.write_csv(metrics_path(prefix));
+    if (pattern) pattern->write_csv(metrics_path(prefix));
+    if (verify) verify->write_csv(metrics_path(prefix));
+    return 0;
+}
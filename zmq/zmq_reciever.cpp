@@ -3,33 +3,48 @@
 #include <fstream>
 #include <iostream>
 #include <cstring>
+#include <optional>
 #include <unistd.h>
 
-double get_memory_rss_mb() {
-    std::ifstream status("/proc/self/status");
-    std::string line;
-    while (std::getline(status, line)) {
-        if (line.find("VmRSS:") == 0) {
-            std::istringstream iss(line);
-            std::string key;
-            double value_kb;
-            std::string unit;
-            iss >> key >> value_kb >> unit;
-            return value_kb / 1024.0;
-        }
-    }
-    return 0.0;
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/ready.hpp"
+#include "../common/verify.hpp"
+
+// Параметры ZeroMQ из окружения (совпадают с ipc/zmq_channel.py): транспорт tcp или ipc,
+// ZMQ_SNDHWM / ZMQ_RCVHWM / ZMQ_SNDBUF / ZMQ_RCVBUF и число IO-потоков ZMQ_IO_THREADS
+std::string zmq_endpoint(size_t port, bool bind) {
+    const char* transport = std::getenv("ZMQ_TRANSPORT");
+    if (transport && std::string(transport) == "ipc") return "ipc:///tmp/ipc_zmq_" + std::to_string(port) + ".sock";
+    return (bind ? "tcp://*:" : "tcp://localhost:") + std::to_string(port);
+}
+
+void apply_zmq_options(zmq::socket_t& socket) {
+    if (std::getenv("ZMQ_SNDHWM")) socket.set(zmq::sockopt::sndhwm, static_cast<int>(env_size("ZMQ_SNDHWM", 0)));
+    if (std::getenv("ZMQ_RCVHWM")) socket.set(zmq::sockopt::rcvhwm, static_cast<int>(env_size("ZMQ_RCVHWM", 0)));
+    if (std::getenv("ZMQ_SNDBUF")) socket.set(zmq::sockopt::sndbuf, static_cast<int>(env_size("ZMQ_SNDBUF", 0)));
+    if (std::getenv("ZMQ_RCVBUF")) socket.set(zmq::sockopt::rcvbuf, static_cast<int>(env_size("ZMQ_RCVBUF", 0)));
 }
 
 int main() {
     using namespace std::chrono;
     auto full_start = high_resolution_clock::now();
 
-    zmq::context_t context(1);
+    zmq::context_t context(static_cast<int>(env_size("ZMQ_IO_THREADS", 1)));
     zmq::socket_t socket(context, ZMQ_PULL);
-    socket.connect("tcp://localhost:5555");
+    apply_zmq_options(socket);
+    // Подключаемся ко всем IPC_SENDERS отправителям (порты 5555 + IPC_PORT_OFFSET + k)
+    const size_t senders = env_size("IPC_SENDERS", 1);
+    const size_t base_port = 5555 + port_offset();
+    for (size_t k = 0; k < senders; ++k) {
+        socket.connect(zmq_endpoint(base_port + k, false));
+    }
+    signal_ready();  // получатель стартует первым: подключения заявлены, отправители могут запускаться
+    size_t done_count = 0;
 
-    std::ofstream log("zmq_receiver_metrics.csv");
+    std::ofstream log(metrics_path("zmq_receiver_metrics.csv"));
     log << "active_time_sec,wall_time_sec,bytes_received,rss_bytes\n";
 
     size_t received_bytes = 0;
@@ -37,32 +52,71 @@ int main() {
     duration<double> active_time(0);
     bool first_recv = true;
     auto last_log = full_start;
+    LatencyHistogram latency;
+    MetricsChannel channel("receiver");  // живые замеры для оркестратора
+    std::optional<PatternCheck> verify;  // режим проверки (IPC_VERIFY): CRC32 каждого принятого сообщения
+    if (verify_enabled()) verify.emplace(chunk_size_from_env());
+    const bool batching = batch_size_from_env() > 0;  // второй кадр — пакет сообщений (common/batch.hpp)
 
     while (true) {
+        zmq::message_t stamp;
         zmq::message_t msg;
         auto t1 = high_resolution_clock::now();
-        auto result = socket.recv(msg, zmq::recv_flags::none);
-        auto t2 = high_resolution_clock::now();
+        auto result = socket.recv(stamp, zmq::recv_flags::none);
+        if (!result) break;  // таймаут: остальные DONE достались другим получателям
 
-        if (!result) break;
+        if (stamp.size() == 4 && std::memcmp(stamp.data(), "DONE", 4) == 0) {
+            if (++done_count >= senders) break;
+            socket.set(zmq::sockopt::rcvtimeo, 1000);  // после первого DONE ждём остальные не дольше секунды
+            continue;
+        }
+        // Сообщение из двух кадров (как в ipc/zmq_channel.py): метка отправки и данные
+        (void)socket.recv(msg, zmq::recv_flags::none);
+        auto t2 = high_resolution_clock::now();
         active_time += t2 - t1;
 
-        if (msg.size() == 4 && std::memcmp(msg.data(), "DONE", 4) == 0) break;
-
         if (first_recv) {
             pure_start = t1;
             first_recv = false;
         }
 
-        received_bytes += msg.size();
+        if (batching) {
+            // Пакет разбирается прямо в кадре zmq: у каждого сообщения своя метка отправки
+            const bool ok = for_each_message(static_cast<const char*>(msg.data()), msg.size(),
+                                             [&](const char* message, size_t size, uint64_t send_ns) {
+                if (verify) verify->check(message, size);
+                latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - send_ns));
+                received_bytes += size;
+            });
+            if (!ok) {
+                std::cerr << "malformed batch of " << msg.size() << " bytes\n";
+                break;
+            }
+        } else {
+            uint64_t send_ns = 0;
+            std::memcpy(&send_ns, stamp.data(), sizeof(send_ns));
+            latency.record(static_cast<int64_t>(LatencyHistogram::now_ns() - send_ns));
+
+            if (verify) verify->check(static_cast<const char*>(msg.data()), msg.size());
+            received_bytes += msg.size();
+        }
+        channel.tick(received_bytes);
         auto now = high_resolution_clock::now();
         if (duration<double>(now - last_log).count() >= 0.1) {
-            double rss_mb = get_memory_rss_mb();
+            double rss_mb = MetricsChannel::peak_rss_mb();
             log << active_time.count() << "," << duration<double>(now - full_start).count()
                 << "," << received_bytes << "," << rss_mb << "\n";
             last_log = now;
         }
     }
 
+    // итоговая строка: иначе последние < 0.1 с передачи не попадают в метрики
+    log << active_time.count() << "," << duration<double>(high_resolution_clock::now() - full_start).count()
+        << "," << received_bytes << "," << MetricsChannel::peak_rss_mb() << "\n";
+    channel.finish(received_bytes, active_time.count(), duration<double>(high_resolution_clock::now() - full_start).count(),
+                   MetricsChannel::peak_rss_mb());
+
+    latency.write_csv(metrics_path("zmq_receiver"));
+    if (verify) verify->write_csv(metrics_path("zmq_receiver"));
     return 0;
 }
@@ -4,37 +4,53 @@
 #include <iostream>
 #include <vector>
 #include <fstream>
+#include <cstring>
+#include <optional>
 #include <unistd.h>
 
-double get_memory_rss_mb() {
-    std::ifstream status("/proc/self/status");
-    std::string line;
-    while (std::getline(status, line)) {
-        if (line.find("VmRSS:") == 0) {
-            std::istringstream iss(line);
-            std::string key;
-            double value_kb;
-            std::string unit;
-            iss >> key >> value_kb >> unit;
-            return value_kb / 1024.0;
-        }
-    }
-    return 0.0;
+#include "../common/batch.hpp"
+#include "../common/bench_env.hpp"
+#include "../common/latency_histogram.hpp"
+#include "../common/metrics_channel.hpp"
+#include "../common/verify.hpp"
+
+// Параметры ZeroMQ из окружения (совпадают с ipc/zmq_channel.py): транспорт tcp или ipc,
+// ZMQ_SNDHWM / ZMQ_RCVHWM / ZMQ_SNDBUF / ZMQ_RCVBUF и число IO-потоков ZMQ_IO_THREADS
+std::string zmq_endpoint(size_t port, bool bind) {
+    const char* transport = std::getenv("ZMQ_TRANSPORT");
+    if (transport && std::string(transport) == "ipc") return "ipc:///tmp/ipc_zmq_" + std::to_string(port) + ".sock";
+    return (bind ? "tcp://*:" : "tcp://localhost:") + std::to_string(port);
+}
+
+void apply_zmq_options(zmq::socket_t& socket) {
+    if (std::getenv("ZMQ_SNDHWM")) socket.set(zmq::sockopt::sndhwm, static_cast<int>(env_size("ZMQ_SNDHWM", 0)));
+    if (std::getenv("ZMQ_RCVHWM")) socket.set(zmq::sockopt::rcvhwm, static_cast<int>(env_size("ZMQ_RCVHWM", 0)));
+    if (std::getenv("ZMQ_SNDBUF")) socket.set(zmq::sockopt::sndbuf, static_cast<int>(env_size("ZMQ_SNDBUF", 0)));
+    if (std::getenv("ZMQ_RCVBUF")) socket.set(zmq::sockopt::rcvbuf, static_cast<int>(env_size("ZMQ_RCVBUF", 0)));
 }
 
 int main() {
     using namespace std::chrono;
     auto full_start = high_resolution_clock::now();
 
-    zmq::context_t context(1);
+    zmq::context_t context(static_cast<int>(env_size("ZMQ_IO_THREADS", 1)));
     zmq::socket_t socket(context, ZMQ_PUSH);
-    socket.bind("tcp://*:5555");
+    apply_zmq_options(socket);
+    // Отправитель i слушает порт 5555 + IPC_PORT_OFFSET; IPC_RECEIVERS получателей делят поток round-robin
+    socket.bind(zmq_endpoint(5555 + port_offset(), true));
+    const size_t receivers = env_size("IPC_RECEIVERS", 1);
 
-    const size_t total_bytes = 10ull * 1024 * 1024 * 1024;
-    const size_t chunk_size = 16 * 1024 * 1024;
+    const size_t total_bytes = total_size_from_env();
+    const size_t chunk_size = chunk_size_from_env();
     std::vector<char> data(chunk_size, 42);
+    std::optional<PatternSource> pattern;  // режим проверки (IPC_VERIFY): узор с номером сообщения вместо 42
+    if (verify_enabled()) pattern.emplace(chunk_size);
+    // Пакетирование (IPC_BATCH_SIZE): сообщения копируются в пакет, вторым кадром уходит весь пакет
+    const bool batching = batch_size_from_env() > 0;
+    std::vector<char> batch_buffer(batching ? transport_size(chunk_size) : 0);
+    BatchWriter batch(batch_buffer.data(), batch_buffer.size());
 
-    std::ofstream log("zmq_sender_metrics.csv");
+    std::ofstream log(metrics_path("zmq_sender_metrics.csv"));
     log << "active_time_sec,wall_time_sec,bytes_sent,rss_bytes\n";
 
     size_t sent_bytes = 0;
@@ -42,6 +58,7 @@ int main() {
     auto pure_start = full_start;
     duration<double> active_time(0);
     auto last_log = full_start;
+    MetricsChannel channel("sender");  // живые замеры для оркестратора
 
     while (sent_bytes < total_bytes) {
         if (first_send) {
@@ -49,24 +66,59 @@ int main() {
             first_send = false;
         }
 
+        if (batching) {
+            auto t1 = high_resolution_clock::now();
+            char* message = batch.append(chunk_size);
+            if (pattern) pattern->fill(message, chunk_size);
+            else std::memcpy(message, data.data(), chunk_size);
+            sent_bytes += chunk_size;
+            if (sent_bytes >= total_bytes || batch.due(chunk_size)) {
+                uint64_t send_ns = LatencyHistogram::now_ns();
+                socket.send(zmq::buffer(&send_ns, sizeof(send_ns)), zmq::send_flags::sndmore);
+                zmq::message_t msg(batch.data(), batch.size());
+                socket.send(msg, zmq::send_flags::none);
+                batch.reset();
+            }
+            active_time += high_resolution_clock::now() - t1;
+            channel.tick(sent_bytes);
+            continue;
+        }
+
+        if (pattern) pattern->fill(data.data(), chunk_size);  // message_t ниже копирует буфер
         auto t1 = high_resolution_clock::now();
+        uint64_t send_ns = LatencyHistogram::now_ns();  // первый кадр сообщения — метка отправки (как в ipc/zmq_channel.py)
+        socket.send(zmq::buffer(&send_ns, sizeof(send_ns)), zmq::send_flags::sndmore);
         zmq::message_t msg(data.data(), chunk_size);
         socket.send(msg, zmq::send_flags::none);
         auto t2 = high_resolution_clock::now();
 
         active_time += t2 - t1;
         sent_bytes += chunk_size;
+        channel.tick(sent_bytes);
 
         auto now = high_resolution_clock::now();
         if (duration<double>(now - last_log).count() >= 0.1) {
-            double rss_mb = get_memory_rss_mb();
+            double rss_mb = MetricsChannel::peak_rss_mb();
             log << active_time.count() << "," << duration<double>(now - full_start).count()
                 << "," << sent_bytes << "," << rss_mb << "\n";
             last_log = now;
         }
     }
 
-    zmq::message_t done_msg("DONE", 4);
-    socket.send(done_msg, zmq::send_flags::none);
+    // итоговая строка: иначе последние < 0.1 с передачи не попадают в метрики
+    log << active_time.count() << "," << duration<double>(high_resolution_clock::now() - full_start).count()
+        << "," << sent_bytes << "," << MetricsChannel::peak_rss_mb() << "\n";
+    channel.finish(sent_bytes, active_time.count(), duration<double>(high_resolution_clock::now() - full_start).count(),
+                   MetricsChannel::peak_rss_mb());
+    if (pattern) pattern->write_csv(metrics_path("zmq_sender"));
+
+    for (size_t i = 0; i < receivers; ++i) {  // каждому получателю своё финальное сообщение
+        zmq::message_t done_msg("DONE", 4);
+        socket.send(done_msg, zmq::send_flags::none);
+    }
+    socket.close();
+    context.close();  // дожидается доставки DONE
+    const std::string endpoint = zmq_endpoint(5555 + port_offset(), true);
+    if (endpoint.rfind("ipc://", 0) == 0) unlink(endpoint.c_str() + 6);  // libzmq оставляет файл сокета ipc://
     return 0;
 }